@@ -1,9 +1,17 @@
 import logging
 from fastapi import FastAPI
-from app.configuration.db import init_db
+from app.configuration.db import init_db, read_your_writes_middleware
 from app.configuration.config import load_env
+from app.configuration.logger import configure_logging, shutdown_logging, logging_context_middleware, setup_logger
+from app.configuration.tracing import tracing_middleware, shutdown_tracing
+from app.configuration.metrics import metrics_middleware, start_metrics_flush, stop_metrics_flush
 from app.routers.subscription_router import subscription_router
-# from app.routers.user_router import user_router, permission_router, role_router
+from app.routers.internal_router import internal_router
+from app.routers.metrics_router import metrics_router
+from app.routers.user_router import user_router, permission_page_router
+from app.services.session_hooks import register_session_hooks
+from app.services.entitlement_service import start_entitlement_refresher, stop_entitlement_refresher
+from app.services.expiry_notifier_service import start_expiry_notifier, stop_expiry_notifier
 
 # Load environment variables
 load_env()
@@ -13,13 +21,27 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI()
+app.middleware("http")(read_your_writes_middleware)
+app.middleware("http")(logging_context_middleware)
+app.middleware("http")(metrics_middleware)
+# Registered last so the trace covers the other middlewares too
+app.middleware("http")(tracing_middleware)
+register_session_hooks()
 
 app.include_router(subscription_router, prefix="/v1/api/subscriptions", tags=["Subscription"])
+app.include_router(user_router, prefix="/v1/api/users", tags=["User"])
+app.include_router(permission_page_router, prefix="/v1/api/permissions", tags=["Permission"])
+app.include_router(internal_router, prefix="/internal", tags=["Internal"])
+app.include_router(metrics_router)
 
 @app.on_event("startup")
 async def startup_event():
     try:
+        configure_logging()
         await init_db()
+        start_metrics_flush()
+        start_entitlement_refresher(setup_logger("entitlement-index"))
+        start_expiry_notifier(setup_logger("expiry-notifier"))
         logger.info("Application startup successful")
     except Exception as e:
         logger.error(f"Error during startup: {e}")
@@ -28,6 +50,11 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Application shutdown")
+    await stop_metrics_flush()
+    await stop_entitlement_refresher()
+    await stop_expiry_notifier()
+    shutdown_logging()
+    shutdown_tracing()
 
 if __name__ == "__main__":
     import uvicorn
@@ -17,9 +17,75 @@ class Config:
 
     API_URL = os.getenv("API_URL")
     DATABASE_URL = os.getenv("DATABASE_URL")
-    
+    # Read replica for GET traffic; empty means reads stay on DATABASE_URL
+    READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+    # How long a client that just wrote keeps reading from the primary
+    READ_YOUR_WRITES_SECONDS: int = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+    # Engine profile (dev, bench, prod); the DB_* overrides below win over the profile defaults
+    DB_PROFILE: str = os.getenv("DB_PROFILE", "dev").lower()
+    DB_ECHO = os.getenv("DB_ECHO")
+    DB_POOL_SIZE = os.getenv("DB_POOL_SIZE")
+    DB_MAX_OVERFLOW = os.getenv("DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT = os.getenv("DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE = os.getenv("DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING")
+
+    # In-process catalog cache (subscription -> service -> permission DTO graphs)
+    CATALOG_CACHE_MAX_ENTRIES: int = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", 1024))
+    CATALOG_CACHE_TTL_SECONDS: int = int(os.getenv("CATALOG_CACHE_TTL_SECONDS", 300))
+    # How often the entitlement index compares catalog versions to see writes from other workers
+    # (0: only after writes in this process)
+    ENTITLEMENT_VERSION_CHECK_SECONDS: float = float(os.getenv("ENTITLEMENT_VERSION_CHECK_SECONDS", 5))
+
+    # Max ids per IN (...) list when validating ids in bulk
+    BULK_ID_CHUNK_SIZE: int = int(os.getenv("BULK_ID_CHUNK_SIZE", 1000))
+    # Rows per multi-row upsert statement, and the largest array a bulk endpoint accepts
+    BULK_UPSERT_BATCH_SIZE: int = int(os.getenv("BULK_UPSERT_BATCH_SIZE", 500))
+    BULK_UPSERT_MAX_ITEMS: int = int(os.getenv("BULK_UPSERT_MAX_ITEMS", 10000))
+    # Catalog sheet imports (app.services.catalog_import_service): rows read per pandas chunk, the largest
+    # upload accepted, and how many validation errors (and created/updated names) the report lists
+    CATALOG_IMPORT_CHUNK_ROWS: int = int(os.getenv("CATALOG_IMPORT_CHUNK_ROWS", 10000))
+    CATALOG_IMPORT_MAX_BYTES: int = int(os.getenv("CATALOG_IMPORT_MAX_BYTES", 50 * 1024 * 1024))
+    CATALOG_IMPORT_MAX_ERRORS: int = int(os.getenv("CATALOG_IMPORT_MAX_ERRORS", 100))
+    # Rows fetched from the server-side cursor and encoded per chunk of a streamed export
+    EXPORT_BATCH_ROWS: int = int(os.getenv("EXPORT_BATCH_ROWS", 1000))
+    # Exact totals of paginated endpoints are cached this long (0 disables)
+    COUNT_CACHE_TTL_SECONDS: int = int(os.getenv("COUNT_CACHE_TTL_SECONDS", 30))
+    COUNT_CACHE_MAX_ENTRIES: int = int(os.getenv("COUNT_CACHE_MAX_ENTRIES", 1024))
+    # Unfiltered totals of tables above this many rows come from table statistics (0 disables)
+    COUNT_ESTIMATE_THRESHOLD: int = int(os.getenv("COUNT_ESTIMATE_THRESHOLD", 100000))
+
+    # Catalog GETs build plain dicts and encode them directly (orjson when installed), skipping response_model validation
+    FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "True").lower() == "true"
+
     LOG_TO_FILE = os.getenv("LOG_TO_FILE", "True").lower() == "true"
     LOG_TO_CONSOLE = os.getenv("LOG_TO_CONSOLE", "True").lower() == "true"
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_DIR: str = os.getenv("LOG_DIR", "./logs")
+    LOG_FILE_MAX_BYTES: int = int(os.getenv("LOG_FILE_MAX_BYTES", 5 * 1024 * 1024))
+    LOG_FILE_BACKUP_COUNT: int = int(os.getenv("LOG_FILE_BACKUP_COUNT", 5))
+    # Per-route levels and INFO sampling, e.g. "GET /v1/api/subscriptions/get_all=WARNING,/internal=ERROR"
+    # and "GET /v1/api/subscriptions/get_all=0.01" (1% of requests log below WARNING); longest prefix wins
+    LOG_ROUTE_LEVELS: str = os.getenv("LOG_ROUTE_LEVELS", "")
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")
+
+    # Per-request tracing: a Server-Timing header on every response, and the full span list of requests
+    # slower than TRACE_SLOW_REQUEST_MS written as JSON lines to TRACE_FILE (default LOG_DIR/slow_traces.jsonl)
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "True").lower() == "true"
+    TRACE_SLOW_REQUEST_MS: float = float(os.getenv("TRACE_SLOW_REQUEST_MS", 500))
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "")
+    TRACE_MAX_SPANS: int = int(os.getenv("TRACE_MAX_SPANS", 500))
+
+    # Prometheus /metrics. With several uvicorn workers, point METRICS_DIR at a directory shared by them
+    # (emptied before the server starts): each worker flushes its series there and a scrape sums them all
+    METRICS_DIR: str = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_SECONDS: float = float(os.getenv("METRICS_FLUSH_SECONDS", 5))
+
+    # Statement budgets of service functions (app.configuration.query_budget): raise fails the call, warn logs it,
+    # off stops counting. Dev fails loudly by default; a shape running more than REPEAT_LIMIT times is an N+1
+    QUERY_BUDGET_MODE: str = os.getenv("QUERY_BUDGET_MODE", "raise" if DB_PROFILE == "dev" else "warn").lower()
+    QUERY_BUDGET_REPEAT_LIMIT: int = int(os.getenv("QUERY_BUDGET_REPEAT_LIMIT", 3))
 
     # SuperAdmin Configuration
     SUPERADMIN_ROLE: str = os.getenv("SUPERADMIN_ROLE")
@@ -53,6 +119,10 @@ class Config:
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY")
     JWT_TOKEN_VALIDITY: int = int(os.getenv("JWT_TOKEN_VALIDITY", 86400000))
 
+    # Shared secret for the POST endpoints under /internal (index rebuilds, expiry notice runs), sent
+    # in the X-Internal-Token header; while it is empty those endpoints refuse every request
+    INTERNAL_API_TOKEN: str = os.getenv("INTERNAL_API_TOKEN", "")
+
     # Email Configuration
     EMAIL_HOST: str = os.getenv("EMAIL_HOST")
     EMAIL_PORT: int = int(os.getenv("EMAIL_PORT", 587))
@@ -71,6 +141,27 @@ class Config:
     # TLS version
     EMAIL_TLS_VERSION: str = os.getenv("EMAIL_TLS_VERSION", "TLSv1.2")
 
+    # SMTP pool (app.utils.smtp_pool): persistent connections, i.e. messages in flight, and how often
+    # a connection is recycled; transient failures are retried with exponential backoff
+    EMAIL_POOL_SIZE: int = int(os.getenv("EMAIL_POOL_SIZE", 4))
+    EMAIL_TIMEOUT_SECONDS: float = float(os.getenv("EMAIL_TIMEOUT_SECONDS", 30))
+    EMAIL_MAX_MESSAGES_PER_CONNECTION: int = int(os.getenv("EMAIL_MAX_MESSAGES_PER_CONNECTION", 100))
+    EMAIL_SEND_RETRIES: int = int(os.getenv("EMAIL_SEND_RETRIES", 3))
+    EMAIL_RETRY_BACKOFF_SECONDS: float = float(os.getenv("EMAIL_RETRY_BACKOFF_SECONDS", 1))
+
+    # Subscription expiry notices: a renewal reminder and an expiry notice this many days ahead, and an
+    # expired notice on the day itself, mailed to the organization's users with one of EXPIRY_NOTICE_ROLES
+    # (empty: every user). EXPIRY_NOTICE_TEMPLATE_DIR may hold <notice>.txt files overriding the built-in bodies
+    SUBSCRIPTION_RENEWAL_REMINDER_DAYS: int = int(os.getenv("SUBSCRIPTION_RENEWAL_REMINDER_DAYS", 30))
+    SUBSCRIPTION_EXPIRY_NOTICE_DAYS: int = int(os.getenv("SUBSCRIPTION_EXPIRY_NOTICE_DAYS", 7))
+    EXPIRY_NOTICE_ROLES: str = os.getenv("EXPIRY_NOTICE_ROLES", ROLE_ADMIN)
+    EXPIRY_NOTICE_BATCH_SIZE: int = int(os.getenv("EXPIRY_NOTICE_BATCH_SIZE", 500))
+    EXPIRY_NOTICE_TEMPLATE_DIR: str = os.getenv("EXPIRY_NOTICE_TEMPLATE_DIR", "")
+    # Daily run inside the app at EXPIRY_NOTIFIER_RUN_AT (HH:MM, UTC); enable it on one instance only,
+    # or leave it off and run `python -m app.services.expiry_notifier_service` from cron
+    EXPIRY_NOTIFIER_ENABLED = os.getenv("EXPIRY_NOTIFIER_ENABLED", "False").lower() == "true"
+    EXPIRY_NOTIFIER_RUN_AT: str = os.getenv("EXPIRY_NOTIFIER_RUN_AT", "02:00")
+
     # Debugging prints to ensure variables are loaded correctly
     print(f"Loaded DB_USER: {DB_USER}")
     print(f"Loaded DB_PASSWORD: {DB_PASSWORD}")
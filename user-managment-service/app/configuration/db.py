@@ -1,8 +1,18 @@
 import os
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from app.configuration.config import Config
+from app.configuration.pool_metrics import register_pool_metrics
+from app.configuration.tracing import add_span, register_sql_tracing
+from app.configuration.metrics import register_statement_metrics
+from app.configuration.query_budget import register_query_budget
 from app.models.models import Base
+from app.services.catalog_version_service import seed_catalog_versions
 
 # Load environment variables from .env file
 load_dotenv()
@@ -10,15 +20,58 @@ load_dotenv()
 # Environment variables for database connection
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# Named engine profiles; dev keeps the SQL echo, bench and prod keep logging off the hot path
+ENGINE_PROFILES = {
+    "dev": {"echo": True, "pool_size": 10, "max_overflow": 20, "pool_timeout": 60, "pool_recycle": 1800,
+            "pool_pre_ping": False},
+    "bench": {"echo": False, "pool_size": 20, "max_overflow": 0, "pool_timeout": 30, "pool_recycle": 1800,
+              "pool_pre_ping": False},
+    "prod": {"echo": False, "pool_size": 20, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": 1800,
+             "pool_pre_ping": True},
+}
+
+
+def engine_options(profile: str = None) -> dict:
+    """Engine keyword arguments for a profile, with any DB_* environment overrides applied."""
+    profile = profile or Config.DB_PROFILE
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{profile}', expected one of {sorted(ENGINE_PROFILES)}")
+    options = dict(ENGINE_PROFILES[profile])
+    if Config.DB_ECHO is not None:
+        options["echo"] = Config.DB_ECHO.lower() == "true"
+    if Config.DB_POOL_PRE_PING is not None:
+        options["pool_pre_ping"] = Config.DB_POOL_PRE_PING.lower() == "true"
+    for key, value in (("pool_size", Config.DB_POOL_SIZE), ("max_overflow", Config.DB_MAX_OVERFLOW),
+                       ("pool_timeout", Config.DB_POOL_TIMEOUT), ("pool_recycle", Config.DB_POOL_RECYCLE)):
+        if value is not None:
+            options[key] = int(value)
+    return options
+
+
 # Asynchronous engine for MySQL with aiomysql
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,             # Enable SQL query logging
-    pool_size=10,          # Set the pool size
-    max_overflow=20,       # Allow overflow connections if pool is full
-    pool_timeout=60,       # Timeout in seconds before failing
-    pool_recycle=1800      # Recycle connections after 30 minutes
-)
+engine = create_async_engine(DATABASE_URL, **engine_options())
+
+# Checkout, overflow, invalidation and recycle counters for the primary pool
+pool_metrics = register_pool_metrics(engine)
+register_sql_tracing(engine)
+register_statement_metrics(engine)
+register_query_budget(engine)
+
+# Read-only engine for GET traffic; without a replica configured it is the primary itself
+READ_DATABASE_URL = Config.READ_DATABASE_URL or DATABASE_URL
+if READ_DATABASE_URL != DATABASE_URL:
+    read_engine = create_async_engine(READ_DATABASE_URL, **engine_options())
+    read_pool_metrics = register_pool_metrics(read_engine)
+    register_sql_tracing(read_engine)
+    register_statement_metrics(read_engine)
+    register_query_budget(read_engine)
+else:
+    read_engine = engine
+    read_pool_metrics = pool_metrics
+
+READ_METHODS = ("GET", "HEAD")
+# Set on responses to writes; while present the client's reads are served by the primary
+READ_YOUR_WRITES_COOKIE = "rw_primary"
 
 # Create an async session bound to the engine
 AsyncSessionLocal = sessionmaker(
@@ -33,6 +86,7 @@ AsyncSessionLocal = sessionmaker(
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(seed_catalog_versions)
 
 # Connection Manager to handle sessions
 class ConnectionManager:
@@ -48,3 +102,46 @@ class ConnectionManager:
         if self.session:
             await self.session.close()
             self.session = None
+
+@asynccontextmanager
+async def open_session(bind_engine, metrics):
+    started = time.perf_counter()
+    try:
+        connection = await bind_engine.connect()
+    except PoolTimeoutError:
+        metrics.checkout_timeouts += 1
+        raise
+    finally:
+        metrics.observe_wait(started)
+        add_span("checkout", "pool", started)
+    try:
+        async with AsyncSessionLocal(bind=connection) as session:
+            yield session
+    finally:
+        await connection.close()
+
+
+def uses_replica(request: Request) -> bool:
+    return (read_engine is not engine and request.method in READ_METHODS
+            and READ_YOUR_WRITES_COOKIE not in request.cookies)
+
+
+def request_binding(request: Request) -> tuple:
+    """(engine, pool metrics) serving ``request``."""
+    if uses_replica(request):
+        return read_engine, read_pool_metrics
+    return engine, pool_metrics
+
+
+# Request-scoped session: one pool checkout per request, shared by every service call in it.
+# Reads go to the replica unless the client wrote within the read-your-writes window.
+async def get_db_session(request: Request):
+    async with open_session(*request_binding(request)) as session:
+        yield session
+
+
+async def read_your_writes_middleware(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in READ_METHODS and response.status_code < 400 and Config.READ_YOUR_WRITES_SECONDS > 0:
+        response.set_cookie(READ_YOUR_WRITES_COOKIE, "1", max_age=Config.READ_YOUR_WRITES_SECONDS, httponly=True)
+    return response
@@ -1,50 +1,178 @@
 # app/configuration/logger.py
 
 import os
+import queue
+import random
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import contextvars
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import uuid
 from .config import Config
+from .tracing import trace_var
+
+LOGGER_NAME = "app.configuration.logger"
+
+# Per-request worker id, set once per request and read by every record emitted in that request
+worker_id_var: contextvars.ContextVar = contextvars.ContextVar("worker_id", default="-")
+
+# Effective level of the current request, decided once by logging_context_middleware (NOTSET: logger level)
+request_level_var: contextvars.ContextVar = contextvars.ContextVar("request_log_level", default=logging.NOTSET)
+
+_listener = None
+
 
 class WorkerIdFilter(logging.Filter):
-    def __init__(self, worker_id):
-        super().__init__()
-        self.worker_id = worker_id
+    """Stamps each record with the worker id of the request that emitted it."""
 
     def filter(self, record):
-        record.worker_id = self.worker_id
+        record.worker_id = worker_id_var.get()
         return True
 
-def setup_logger(worker_id=None):
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.INFO)
 
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - [WorkerID: %(worker_id)s] - %(message)s')
+def configure_logging():
+    """Configure the shared logging pipeline once per process.
+
+    Records are put on a queue by a QueueHandler; a QueueListener thread does the
+    file and console I/O so the event loop never blocks on log writes.
+    """
+    global _listener
+    if _listener is not None:
+        return logging.getLogger(LOGGER_NAME)
 
-    logs_dir = './logs'
-    if not os.path.exists(logs_dir):
-        os.makedirs(logs_dir)
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(getattr(logging, Config.LOG_LEVEL, logging.INFO))
+    logger.propagate = False
+
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - [WorkerID: %(worker_id)s] - %(message)s')
 
+    handlers = []
     if Config.LOG_TO_FILE:
-        file_handler = RotatingFileHandler(os.path.join(logs_dir, 'app.log'), maxBytes=5*1024*1024, backupCount=5)
+        if not os.path.exists(Config.LOG_DIR):
+            os.makedirs(Config.LOG_DIR)
+        file_handler = RotatingFileHandler(os.path.join(Config.LOG_DIR, 'app.log'),
+                                           maxBytes=Config.LOG_FILE_MAX_BYTES,
+                                           backupCount=Config.LOG_FILE_BACKUP_COUNT)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
 
     if Config.LOG_TO_CONSOLE:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
-    if worker_id:
-        logger.addFilter(WorkerIdFilter(worker_id))
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(WorkerIdFilter())
+    logger.handlers = [queue_handler]
 
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
     return logger
 
 
-def get_logger(worker_id):    
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestLogger(logging.LoggerAdapter):
+    """The shared logger seen through the current request's route level and sampling decision.
+
+    ``isEnabledFor`` is checked before a record is built, so with lazy ``%s`` arguments nothing
+    is formatted for records the request's level drops.
+    """
+
+    def __init__(self, logger: logging.Logger, level: int):
+        super().__init__(logger, {})
+        self.level = level
+
+    def isEnabledFor(self, level: int) -> bool:
+        return level >= self.level and self.logger.isEnabledFor(level)
+
+    def process(self, msg, kwargs):
+        return msg, kwargs
+
+
+def parse_route_rules(value: str, parse) -> list:
+    """Parse "[METHOD ]/path/prefix=value,..." into (method, prefix, value) rules, longest prefix first."""
+    rules = []
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        route, setting = item.rsplit("=", 1)
+        parts = route.split()
+        if not parts:
+            continue
+        method, prefix = (parts[0].upper(), parts[1]) if len(parts) > 1 else (None, parts[0])
+        rules.append((method, prefix, parse(setting.strip())))
+    rules.sort(key=lambda rule: (len(rule[1]), rule[0] is not None), reverse=True)
+    return rules
+
+
+def _level(name: str) -> int:
+    level = logging.getLevelName(name.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level '{name}' in LOG_ROUTE_LEVELS")
+    return level
+
+
+ROUTE_LEVELS = parse_route_rules(Config.LOG_ROUTE_LEVELS, _level)
+SAMPLE_RATES = parse_route_rules(Config.LOG_SAMPLE_RATES, float)
+
+
+def match_route(rules: list, method: str, path: str):
+    for rule_method, prefix, setting in rules:
+        if (rule_method is None or rule_method == method) and path.startswith(prefix):
+            return setting
+    return None
+
+
+def request_log_level(method: str, path: str) -> int:
+    """Level for one request: its route's level, raised to WARNING when the request is not sampled.
+
+    Unsampled requests still log warnings and errors, so only successful requests are thinned out.
+    """
+    level = match_route(ROUTE_LEVELS, method, path) or logging.NOTSET
+    rate = match_route(SAMPLE_RATES, method, path)
+    if rate is not None and random.random() >= rate:
+        level = max(level, logging.WARNING)
+    return level
+
+
+async def logging_context_middleware(request, call_next):
+    token = request_level_var.set(request_log_level(request.method, request.url.path))
+    try:
+        return await call_next(request)
+    finally:
+        request_level_var.reset(token)
+
+
+def setup_logger(worker_id=None):
+    """Bind the worker id to the current request and return the shared logger.
+
+    No handlers or filters are added here, so the cost per request is constant. When the request
+    has its own level (LOG_ROUTE_LEVELS / LOG_SAMPLE_RATES) the logger is wrapped to apply it.
+    """
+    logger = configure_logging()
+    if worker_id:
+        worker_id_var.set(worker_id)
+        trace = trace_var.get()
+        if trace is not None:
+            trace.worker_id = worker_id
+    level = request_level_var.get()
+    if level > logging.NOTSET:
+        return RequestLogger(logger, level)
+    return logger
+
+
+def get_logger(worker_id):
     if worker_id:
         logger = setup_logger(worker_id)
     else:
         logger=setup_logger(str(uuid.uuid4()))
     return logger
-
@@ -0,0 +1,291 @@
+# app/configuration/metrics.py
+
+import asyncio
+import contextvars
+import glob
+import json
+import os
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+
+from .config import Config
+from .tracing import route_template
+
+# Upper bounds of the histogram buckets; the +Inf bucket is implied
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+# name -> (type, help, histogram bucket bounds)
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests by route template and status code.", None),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by route template.",
+                                      LATENCY_BUCKETS_SECONDS),
+    "http_requests_in_progress": ("gauge", "HTTP requests being served.", None),
+    "db_statements_per_request": ("histogram", "SQL statements executed per HTTP request.", STATEMENT_BUCKETS),
+    "db_pool_size": ("gauge", "Configured connections of the pool.", None),
+    "db_pool_checked_out": ("gauge", "Connections currently checked out of the pool.", None),
+    "db_pool_overflow": ("gauge", "Overflow connections currently open.", None),
+    "db_pool_checkout_timeouts_total": ("counter", "Checkouts that timed out waiting for a connection.", None),
+    "db_pool_checkout_wait_seconds": ("histogram", "Time spent waiting for a pool connection.", None),
+    "cache_requests_total": ("counter", "Cache lookups by cache and result.", None),
+    "cache_evictions_total": ("counter", "Entries evicted or invalidated, by cache.", None),
+    "cache_entries": ("gauge", "Entries currently held, by cache.", None),
+}
+
+# SQL statement counter of the current request; None outside a request
+statements_var: contextvars.ContextVar = contextvars.ContextVar("statements", default=None)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(**values) -> str:
+    """Prometheus label set text, also used as the series key in snapshots."""
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in values.items())
+
+
+class RequestMetrics:
+    """Per-worker request counters and histograms.
+
+    Only the event loop thread updates them, so plain dicts and ints are enough; no lock is taken.
+    Histograms keep per-bucket counts (the last one is +Inf) followed by the sum of observations.
+    """
+
+    def __init__(self):
+        self.requests = {}
+        self.latency = {}
+        self.statements = {}
+        self.in_progress = 0
+
+    @staticmethod
+    def _observe(histograms: dict, key: str, bounds: tuple, value: float):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [0] * (len(bounds) + 2)
+        histogram[bisect_left(bounds, value)] += 1
+        histogram[-1] += value
+
+    def observe(self, method: str, route: str, status_code: int, duration: float, statements: int):
+        series = labels(method=method, route=route)
+        key = labels(method=method, route=route, status=status_code)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self._observe(self.latency, series, LATENCY_BUCKETS_SECONDS, duration)
+        self._observe(self.statements, series, STATEMENT_BUCKETS, statements)
+
+
+request_metrics = RequestMetrics()
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = statements_var.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def register_statement_metrics(engine):
+    """Count the statements each request runs on an (async or sync) engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _count_statement):
+        event.listen(sync_engine, "before_cursor_execute", _count_statement)
+
+
+async def metrics_middleware(request, call_next):
+    counter = [0]
+    token = statements_var.set(counter)
+    request_metrics.in_progress += 1
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        statements_var.reset(token)
+        request_metrics.in_progress -= 1
+        # Route templates keep the label set bounded; unknown paths share one series
+        request_metrics.observe(request.method, route_template(request.scope) or UNMATCHED_ROUTE, status_code,
+                                time.perf_counter() - started, counter[0])
+
+
+def _pool_samples(snapshot: dict, pool: str, counters: dict, gauges: dict):
+    key = labels(pool=pool)
+    gauges["db_pool_size"][key] = snapshot["pool_size"] or 0
+    gauges["db_pool_checked_out"][key] = snapshot["checked_out"] or 0
+    gauges["db_pool_overflow"][key] = snapshot["overflow"]
+    counters["db_pool_checkout_timeouts_total"][key] = snapshot["checkout_timeouts"]
+
+
+def snapshot() -> dict:
+    """This worker's series as plain JSON-able dicts: counters and histograms add up across workers."""
+    # Imported here because app.configuration.db registers the statement listener from this module
+    from app.configuration.db import engine, read_engine, pool_metrics, read_pool_metrics
+    from app.configuration.pool_metrics import WAIT_BUCKETS_MS
+    from app.services.catalog_cache import catalog_cache
+    from app.services.count_cache import count_cache
+    from app.services.entitlement_service import entitlement_index
+
+    counters = {name: {} for name, (kind, _, _) in METRICS.items() if kind == "counter"}
+    gauges = {name: {} for name, (kind, _, _) in METRICS.items() if kind == "gauge"}
+    histograms = {name: {} for name, (kind, _, _) in METRICS.items() if kind == "histogram"}
+
+    counters["http_requests_total"] = dict(request_metrics.requests)
+    histograms["http_request_duration_seconds"] = {key: list(value) for key, value in request_metrics.latency.items()}
+    histograms["db_statements_per_request"] = {key: list(value) for key, value in request_metrics.statements.items()}
+    gauges["http_requests_in_progress"][""] = request_metrics.in_progress
+
+    pools = [("primary", pool_metrics)]
+    if read_engine is not engine:
+        pools.append(("replica", read_pool_metrics))
+    for pool, metrics in pools:
+        _pool_samples(metrics.snapshot(), pool, counters, gauges)
+        histograms["db_pool_checkout_wait_seconds"][labels(pool=pool)] = \
+            list(metrics.wait_buckets) + [metrics.wait_sum_ms / 1000]
+
+    catalog, counts, entitlements = catalog_cache.stats(), count_cache.stats(), entitlement_index.stats()
+    for cache, hits, misses in (("catalog", catalog["hits"], catalog["misses"]),
+                                ("count", counts["hits"], counts["misses"])):
+        counters["cache_requests_total"][labels(cache=cache, result="hit")] = hits
+        counters["cache_requests_total"][labels(cache=cache, result="miss")] = misses
+    counters["cache_requests_total"][labels(cache="count", result="estimate")] = counts["estimates"]
+    counters["cache_requests_total"][labels(cache="entitlement", result="full_load")] = entitlements["full_loads"]
+    counters["cache_requests_total"][labels(cache="entitlement", result="failed_load")] = \
+        entitlements["failed_loads"]
+    counters["cache_evictions_total"][labels(cache="catalog")] = catalog["evictions"] + catalog["invalidations"]
+    gauges["cache_entries"][labels(cache="catalog")] = catalog["entries"]
+    gauges["cache_entries"][labels(cache="count")] = counts["entries"]
+    gauges["cache_entries"][labels(cache="entitlement")] = entitlements["subscriptions"]
+
+    return {"pid": os.getpid(), "written_at": time.time(), "counters": counters, "gauges": gauges,
+            "histograms": histograms, "buckets": {"db_pool_checkout_wait_seconds": [bound / 1000 for bound in
+                                                                                   WAIT_BUCKETS_MS]}}
+
+
+def worker_file(pid: int = None) -> str:
+    return os.path.join(Config.METRICS_DIR, f"worker-{pid or os.getpid()}.json")
+
+
+def write_snapshot(data: dict):
+    """Atomically replace this worker's snapshot file in METRICS_DIR."""
+    os.makedirs(Config.METRICS_DIR, exist_ok=True)
+    path = worker_file(data["pid"])
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as snapshot_file:
+        json.dump(data, snapshot_file, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+def read_snapshots(own: dict) -> list:
+    """Snapshots of every worker sharing METRICS_DIR; this worker's in-memory one replaces its file."""
+    snapshots = [own]
+    for path in glob.glob(os.path.join(Config.METRICS_DIR, "worker-*.json")):
+        if path == worker_file(own["pid"]):
+            continue
+        try:
+            with open(path) as snapshot_file:
+                snapshots.append(json.load(snapshot_file))
+        except (OSError, ValueError):
+            continue  # replaced or removed while reading
+    return snapshots
+
+
+def merge(snapshots: list) -> dict:
+    """Sum counters and histograms of all workers; gauges only of workers that flushed recently."""
+    merged = {"counters": {}, "gauges": {}, "histograms": {}, "buckets": {}}
+    fresh_after = time.time() - 3 * Config.METRICS_FLUSH_SECONDS
+    for data in snapshots:
+        merged["buckets"].update(data.get("buckets", {}))
+        for name, series in data["counters"].items():
+            target = merged["counters"].setdefault(name, {})
+            for key, value in series.items():
+                target[key] = target.get(key, 0) + value
+        for name, series in data["histograms"].items():
+            target = merged["histograms"].setdefault(name, {})
+            for key, values in series.items():
+                current = target.get(key)
+                target[key] = list(values) if current is None else [a + b for a, b in zip(current, values)]
+        live = data is snapshots[0] or data["written_at"] >= fresh_after
+        for name, series in data["gauges"].items():
+            target = merged["gauges"].setdefault(name, {})
+            for key, value in series.items():
+                target[key] = target.get(key, 0) + (value if live else 0)
+    return merged
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def _series(name: str, key: str, value, extra: str = None) -> str:
+    label_text = ",".join(part for part in (key, extra) if part)
+    return f"{name}{{{label_text}}} {_format_value(value)}" if label_text else f"{name} {_format_value(value)}"
+
+
+def render(merged: dict) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, (kind, help_text, bounds) in METRICS.items():
+        series = merged[kind + "s"].get(name, {})
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind != "histogram":
+            lines.extend(_series(name, key, value) for key, value in sorted(series.items()))
+            continue
+        bounds = bounds or merged["buckets"].get(name, ())
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(list(bounds) + ["+Inf"], values[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_value(float(bound))
+                lines.append(_series(f"{name}_bucket", key, cumulative, f'le="{le}"'))
+            lines.append(_series(f"{name}_sum", key, float(values[-1])))
+            lines.append(_series(f"{name}_count", key, cumulative))
+    return "\n".join(lines) + "\n"
+
+
+async def collect() -> str:
+    """Metrics text for a scrape: this worker alone, or every worker when METRICS_DIR is shared."""
+    own = snapshot()
+    if not Config.METRICS_DIR:
+        return render(merge([own]))
+    snapshots = await asyncio.to_thread(read_snapshots, own)
+    return render(merge(snapshots))
+
+
+async def flush_periodically():
+    """Write this worker's snapshot to METRICS_DIR every METRICS_FLUSH_SECONDS until cancelled."""
+    try:
+        while True:
+            await asyncio.sleep(Config.METRICS_FLUSH_SECONDS)
+            await asyncio.to_thread(write_snapshot, snapshot())
+    except asyncio.CancelledError:
+        # Final counters stay in the directory so the totals never go backwards after a restart
+        write_snapshot(snapshot())
+        raise
+
+
+_flush_task = None
+
+
+def start_metrics_flush():
+    global _flush_task
+    if Config.METRICS_DIR and _flush_task is None:
+        write_snapshot(snapshot())
+        _flush_task = asyncio.get_running_loop().create_task(flush_periodically())
+
+
+async def stop_metrics_flush():
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
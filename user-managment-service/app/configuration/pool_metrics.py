@@ -0,0 +1,119 @@
+# app/configuration/pool_metrics.py
+
+import time
+import weakref
+from bisect import bisect_left
+
+from sqlalchemy import event
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class PoolMetrics:
+    """Counters fed by the pool events of one engine plus the checkout wait histogram."""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.recycles = 0
+        self.closes = 0
+        self.checkout_timeouts = 0
+        self.max_overflow_seen = 0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        # Records that have connected at least once, and whether their last close was an invalidation
+        self._records = weakref.WeakKeyDictionary()
+        self._engine = None
+
+    def observe_wait(self, started: float):
+        wait_ms = (time.perf_counter() - started) * 1000
+        self.wait_buckets[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+        self.wait_count += 1
+        self.wait_sum_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+        invalidated = self._records.get(connection_record)
+        if invalidated is False:
+            # Reconnect of a live record without an invalidate event: pool_recycle or pool-wide invalidation
+            self.recycles += 1
+        self._records[connection_record] = False
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+        overflow = self._overflow()
+        if overflow > self.max_overflow_seen:
+            self.max_overflow_seen = overflow
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+        self._records[connection_record] = True
+
+    def _on_soft_invalidate(self, dbapi_connection, connection_record, exception):
+        self.soft_invalidations += 1
+
+    def _on_close(self, dbapi_connection, connection_record):
+        self.closes += 1
+
+    @property
+    def _pool(self):
+        # Read through the engine so a disposed and recreated pool is still reported
+        return self._engine.pool
+
+    def _overflow(self) -> int:
+        overflow = getattr(self._pool, "overflow", None)
+        return max(overflow(), 0) if overflow else 0
+
+    def snapshot(self) -> dict:
+        pool = self._pool
+        size = pool.size() if hasattr(pool, "size") else None
+        checked_out = pool.checkedout() if hasattr(pool, "checkedout") else None
+        checked_in = pool.checkedin() if hasattr(pool, "checkedin") else None
+        histogram = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+        histogram["gt_60000ms"] = self.wait_buckets[-1]
+        return {
+            "pool_class": type(pool).__name__,
+            "pool_size": size,
+            "checked_out": checked_out,
+            "checked_in": checked_in,
+            "overflow": self._overflow(),
+            "max_overflow_seen": self.max_overflow_seen,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+            "recycles": self.recycles,
+            "closes": self.closes,
+            "checkout_timeouts": self.checkout_timeouts,
+            "checkout_wait": {
+                "count": self.wait_count,
+                "avg_ms": round(self.wait_sum_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                "max_ms": round(self.wait_max_ms, 3),
+                "buckets": histogram,
+            },
+        }
+
+
+def register_pool_metrics(engine) -> PoolMetrics:
+    """Attach pool event listeners to an (async or sync) engine and return its metrics."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    metrics = PoolMetrics()
+    metrics._engine = sync_engine
+    event.listen(sync_engine.pool, "connect", metrics._on_connect)
+    event.listen(sync_engine.pool, "checkout", metrics._on_checkout)
+    event.listen(sync_engine.pool, "checkin", metrics._on_checkin)
+    event.listen(sync_engine.pool, "invalidate", metrics._on_invalidate)
+    event.listen(sync_engine.pool, "soft_invalidate", metrics._on_soft_invalidate)
+    event.listen(sync_engine.pool, "close", metrics._on_close)
+    return metrics
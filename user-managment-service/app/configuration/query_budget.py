@@ -0,0 +1,178 @@
+# app/configuration/query_budget.py
+
+import contextvars
+import functools
+import inspect
+import logging
+import re
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import Config
+from .logger import LOGGER_NAME
+
+RAISE = "raise"
+WARN = "warn"
+OFF = "off"
+
+# Placeholder lists such as IN (?, ?, ?) or VALUES (%s, %s), collapsed so every list length has one shape
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Budget scopes open in the current task, innermost last; () outside any budget
+_scopes_var: contextvars.ContextVar = contextvars.ContextVar("query_budget_scopes", default=())
+
+
+class QueryBudgetExceeded(Exception):
+    """A budgeted block ran more statements than allowed, or repeated one statement shape (N+1)."""
+
+
+def statement_shape(statement: str):
+    """Normalised statement text, and whether it carried a multi-value placeholder list.
+
+    Statements with such a list are batched loads (selectinload chunks, find_missing_ids); they
+    may legitimately repeat once per chunk and are left out of the N+1 check.
+    """
+    shape, lists = _PLACEHOLDER_LIST.subn("(?)", statement)
+    return _WHITESPACE.sub(" ", shape).strip(), lists > 0
+
+
+class QueryBudget:
+    """Statement counter of one budgeted block.
+
+    ``limit`` caps the statements run inside the block (None: no cap) and ``repeat_limit`` the
+    times one single-row statement shape may run, the usual signature of an N+1 loop.
+    """
+
+    def __init__(self, limit: int = None, name: str = None, repeat_limit: int = None, mode: str = None):
+        # Arguments as given, so each decorated call resolves the defaults against the current Config
+        self._arguments = (limit, name, repeat_limit, mode)
+        self.limit = limit
+        self.name = name or "query_budget"
+        self.repeat_limit = Config.QUERY_BUDGET_REPEAT_LIMIT if repeat_limit is None else repeat_limit
+        self.mode = mode or Config.QUERY_BUDGET_MODE
+        self.count = 0
+        self.shapes = {}
+        # Set once a commit went through inside the block; a later overrun can no longer undo the write
+        self.committed = False
+        self._token = None
+
+    def record(self, statement: str):
+        self.count += 1
+        shape, batched = statement_shape(statement)
+        if not batched:
+            self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def violations(self) -> list:
+        problems = []
+        if self.limit is not None and self.count > self.limit:
+            problems.append(f"ran {self.count} statements, budget is {self.limit}")
+        if self.repeat_limit:
+            for shape, count in self.shapes.items():
+                if count > self.repeat_limit:
+                    problems.append(f"ran the same statement {count} times (possible N+1): {shape[:200]}")
+        return problems
+
+    def check(self):
+        problems = self.violations()
+        if not problems:
+            return
+        message = f"{self.name} " + "; ".join(problems)
+        if self.mode == RAISE and not self.committed:
+            raise QueryBudgetExceeded(message)
+        suffix = " (after its transaction committed)" if self.committed else ""
+        logging.getLogger(LOGGER_NAME).warning(f"Query budget exceeded: {message}{suffix}")
+
+    def __enter__(self):
+        self.count = 0
+        self.shapes = {}
+        self.committed = False
+        if self.mode != OFF:
+            self._token = _scopes_var.set(_scopes_var.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._token is None:
+            return False
+        _scopes_var.reset(self._token)
+        self._token = None
+        # An error raised by the block itself wins over the budget report
+        if exc_type is None:
+            self.check()
+        return False
+
+    def __call__(self, function):
+        limit, name, repeat_limit, mode = self._arguments
+        name = name or function.__qualname__
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with QueryBudget(limit, name, repeat_limit, mode):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with QueryBudget(limit, name, repeat_limit, mode):
+                return function(*args, **kwargs)
+        return wrapper
+
+
+def query_budget(limit: int = None, name: str = None, repeat_limit: int = None, mode: str = None) -> QueryBudget:
+    """Cap the statements a block or function may run.
+
+    As a context manager it counts the statements of the ``with`` block (one per request or test,
+    since scopes live in a context variable)::
+
+        with query_budget(3) as budget:
+            await get_service_by_id(1, session, logger)
+
+    As a decorator of a sync or async function every call gets its own budget, named after the
+    function. With QUERY_BUDGET_MODE=raise (the dev default) an overrun raises QueryBudgetExceeded,
+    with warn it is logged, and off disables counting altogether. With
+    register_query_budget_commit_check the budget is also checked before each commit, so an
+    overrun fails the write rather than a call whose write already went through; statements run
+    after the commit are only logged.
+    """
+    return QueryBudget(limit, name, repeat_limit, mode)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    for budget in _scopes_var.get():
+        budget.record(statement)
+
+
+def register_query_budget(engine):
+    """Feed the statements run on an (async or sync) engine to the open query budgets."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _count_statement):
+        event.listen(sync_engine, "before_cursor_execute", _count_statement)
+
+
+def _check_before_commit(session: Session):
+    budgets = [budget for budget in _scopes_var.get() if budget.mode == RAISE]
+    if not budgets:
+        return
+    # The commit would flush the pending changes after this listener; count them first
+    session.flush()
+    for budget in budgets:
+        budget.check()
+
+
+def _mark_committed(session: Session):
+    for budget in _scopes_var.get():
+        budget.committed = True
+
+
+def register_query_budget_commit_check(session_class=Session):
+    """Check the open budgets before each commit, so an overrun fails the write instead of the call after it.
+
+    Register it after the other before_commit listeners; listeners run in registration order, and the
+    statements of those registered later are only counted after the commit.
+    """
+    if not event.contains(session_class, "before_commit", _check_before_commit):
+        event.listen(session_class, "before_commit", _check_before_commit)
+        event.listen(session_class, "after_commit", _mark_committed)
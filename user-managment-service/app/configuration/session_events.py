@@ -0,0 +1,19 @@
+# app/configuration/session_events.py
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# session.info entries written by flush/commit listeners, forgotten when their transaction rolls back
+_ROLLBACK_KEYS = set()
+
+
+def _forget_on_rollback(session: Session, previous_transaction):
+    for key in _ROLLBACK_KEYS:
+        session.info.pop(key, None)
+
+
+def clear_info_on_rollback(*keys: str, session_class=Session):
+    """Drop the given ``session.info`` entries whenever a transaction of ``session_class`` rolls back."""
+    _ROLLBACK_KEYS.update(keys)
+    if not event.contains(session_class, "after_soft_rollback", _forget_on_rollback):
+        event.listen(session_class, "after_soft_rollback", _forget_on_rollback)
@@ -0,0 +1,346 @@
+# app/configuration/tracing.py
+
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import queue
+import time
+import uuid
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from .config import Config
+
+TRACE_LOGGER_NAME = "app.configuration.tracing.slow"
+
+# Server-Timing entries, in header order: category -> description
+TIMING_CATEGORIES = (
+    ("pool", "connection checkout"),
+    ("db", None),
+    ("service", "service calls"),
+    ("dto", "DTO conversion"),
+    ("serialize", "JSON encoding"),
+    ("framework", "validation and encoding"),
+)
+
+# Trace of the current request; None outside a request or with tracing disabled
+trace_var: contextvars.ContextVar = contextvars.ContextVar("trace", default=None)
+
+_listener = None
+
+
+class Trace:
+    """Spans of one request: (name, category, start, duration) relative to the request start.
+
+    Totals per category count only outermost spans, so a service call made by another service
+    call is not counted twice. At most TRACE_MAX_SPANS spans are kept; later ones only feed the totals.
+    """
+
+    def __init__(self, method: str, path: str):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.route = None
+        self.worker_id = None
+        self.status_code = None
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self.dropped = 0
+        self.totals = {}
+        self._depth = {}
+
+    def enter(self, category: str) -> bool:
+        """Open a span of ``category``; True when it is the outermost one."""
+        depth = self._depth.get(category, 0)
+        self._depth[category] = depth + 1
+        return depth == 0
+
+    def exit(self, name: str, category: str, started: float, outermost: bool, attrs: dict = None):
+        self._depth[category] -= 1
+        self.add(name, category, started, time.perf_counter(), outermost, attrs)
+
+    def add(self, name: str, category: str, started: float, ended: float, outermost: bool = True,
+            attrs: dict = None):
+        duration = ended - started
+        if outermost:
+            total = self.totals.get(category)
+            if total is None:
+                self.totals[category] = [duration, 1]
+            else:
+                total[0] += duration
+                total[1] += 1
+        if len(self.spans) < Config.TRACE_MAX_SPANS:
+            self.spans.append((name, category, started - self.started, duration, attrs))
+        else:
+            self.dropped += 1
+
+    def total(self, category: str) -> float:
+        return self.totals.get(category, (0.0, 0))[0]
+
+    def finish(self, status_code: int):
+        self.status_code = status_code
+        self.duration = time.perf_counter() - self.started
+        handler = self.total("handler")
+        if handler:
+            # Request parsing, response validation and encoding done by FastAPI around the endpoint
+            framework = handler - self.total("endpoint") - self.total("pool")
+            self.totals["framework"] = [max(framework, 0.0), 1]
+
+    def server_timing(self) -> str:
+        entries = []
+        for category, description in TIMING_CATEGORIES:
+            total = self.totals.get(category)
+            if total is None:
+                continue
+            if category == "db":
+                description = f"{total[1]} {'query' if total[1] == 1 else 'queries'}"
+            entries.append(f'{category};dur={total[0] * 1000:.1f};desc="{description}"')
+        entries.append(f"total;dur={self.duration * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "worker_id": self.worker_id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status_code": self.status_code,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "totals": {category: {"duration_ms": round(duration * 1000, 3), "count": count}
+                       for category, (duration, count) in self.totals.items()},
+            "spans": [{"name": name, "category": category, "start_ms": round(start * 1000, 3),
+                       "duration_ms": round(duration * 1000, 3), **({"attrs": attrs} if attrs else {})}
+                      for name, category, start, duration, attrs in sorted(self.spans, key=lambda item: item[2])],
+            "dropped_spans": self.dropped,
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "name", "category", "started", "outermost")
+
+    def __init__(self, trace: Trace, name: str, category: str):
+        self.trace = trace
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.outermost = self.trace.enter(self.category)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.trace.exit(self.name, self.category, self.started, self.outermost)
+        return False
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, category: str):
+    """Context manager timing a block as a span of the current request (a no-op outside one)."""
+    trace = trace_var.get()
+    if trace is None:
+        return _NO_SPAN
+    return _Span(trace, name, category)
+
+
+def add_span(name: str, category: str, started: float, attrs: dict = None):
+    """Record a span that started at ``started`` (perf_counter) and ends now."""
+    trace = trace_var.get()
+    if trace is not None:
+        trace.add(name, category, started, time.perf_counter(), attrs=attrs)
+
+
+def traced(category: str, name: str = None):
+    """Decorator recording each call of a function (sync or async) as a span."""
+
+    def decorator(function):
+        if getattr(function, "__traced__", False):
+            return function
+        span_name = name or function.__qualname__
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                trace = trace_var.get()
+                if trace is None:
+                    return await function(*args, **kwargs)
+                outermost = trace.enter(category)
+                started = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    trace.exit(span_name, category, started, outermost)
+            async_wrapper.__traced__ = True
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            trace = trace_var.get()
+            if trace is None:
+                return function(*args, **kwargs)
+            outermost = trace.enter(category)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                trace.exit(span_name, category, started, outermost)
+        wrapper.__traced__ = True
+        return wrapper
+
+    return decorator
+
+
+def trace_functions(module, category: str = "service", dto_category: str = "dto"):
+    """Wrap the public functions of a module in spans: coroutines as ``category``, sync ``*dto*`` helpers
+    as ``dto_category``. Module attributes are replaced, so calls between the module's functions are traced too.
+    """
+    prefix = module.__name__.rsplit(".", 1)[-1]
+    for name, value in list(vars(module).items()):
+        if name.startswith("_") or not inspect.isfunction(value) or value.__module__ != module.__name__:
+            continue
+        if inspect.iscoroutinefunction(value):
+            setattr(module, name, traced(category, f"{prefix}.{name}")(value))
+        elif "dto" in name:
+            setattr(module, name, traced(dto_category, f"{prefix}.{name}")(value))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if trace_var.get() is not None:
+        conn.info["trace_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("trace_started", None)
+    if started is not None:
+        attrs = {"statement": " ".join(statement.split())[:200]}
+        if executemany:
+            attrs["executemany"] = True
+        add_span("sql", "db", started, attrs)
+
+
+def register_sql_tracing(engine):
+    """Record every statement run on an (async or sync) engine as a ``db`` span of the current request."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_template(scope) -> str:
+    """Full path template of the matched route, e.g. /v1/api/subscriptions/get/{subscription_id}.
+
+    Routes of included routers keep their own path, so the router prefix is taken from the request
+    path: everything before the segments the route template accounts for. None when nothing matched.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return None
+    path = scope.get("path", "")
+    if ":path}" in path_format or not path.endswith(path_format.rsplit("}", 1)[-1]):
+        return path_format
+    segments = path.split("/")
+    prefix = "/".join(segments[:len(segments) - path_format.count("/")])
+    return prefix + path_format
+
+
+class TracedRoute(APIRoute):
+    """Route whose handler (validation, endpoint, encoding) and endpoint are spans of the request trace."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, traced("endpoint", f"endpoint.{endpoint.__name__}")(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            trace = trace_var.get()
+            if trace is None:
+                return await handler(request)
+            trace.route = route_template(request.scope)
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                trace.add("handler", "handler", started, time.perf_counter())
+        return traced_handler
+
+
+def trace_file() -> str:
+    return Config.TRACE_FILE or os.path.join(Config.LOG_DIR, "slow_traces.jsonl")
+
+
+def slow_trace_logger() -> logging.Logger:
+    """Logger writing one JSON trace per line to TRACE_FILE from a listener thread."""
+    global _listener
+    logger = logging.getLogger(TRACE_LOGGER_NAME)
+    if _listener is not None:
+        return logger
+
+    path = trace_file()
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    file_handler = RotatingFileHandler(path, maxBytes=Config.LOG_FILE_MAX_BYTES,
+                                       backupCount=Config.LOG_FILE_BACKUP_COUNT)
+    file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.handlers = [QueueHandler(log_queue)]
+    _listener = QueueListener(log_queue, file_handler)
+    _listener.start()
+    return logger
+
+
+def shutdown_tracing():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def write_slow_trace(trace: Trace):
+    from app.utils.fast_json import dumps
+    slow_trace_logger().info(dumps(trace.to_dict()).decode("utf-8"))
+
+
+async def tracing_middleware(request, call_next):
+    if not Config.TRACING_ENABLED:
+        return await call_next(request)
+
+    trace = Trace(request.method, request.url.path)
+    token = trace_var.set(trace)
+    try:
+        response = await call_next(request)
+    except Exception:
+        # Unhandled errors are kept whatever their duration
+        trace.finish(500)
+        write_slow_trace(trace)
+        raise
+    finally:
+        trace_var.reset(token)
+
+    trace.finish(response.status_code)
+    response.headers["Server-Timing"] = trace.server_timing()
+    if trace.duration * 1000 >= Config.TRACE_SLOW_REQUEST_MS:
+        write_slow_trace(trace)
+    return response
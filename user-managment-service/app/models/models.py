@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Date, Enum, JSON
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Date, Enum, JSON, Index, Text
 from sqlalchemy.orm import relationship
 import enum
 from sqlalchemy.ext.declarative import declarative_base
@@ -171,6 +171,8 @@ class OrganizationSubscriptionEntity(Base):
     subscription_date = Column(Date)
     subscription_id = Column(Integer, ForeignKey('subscription.id'))
     organization_id = Column(Integer, ForeignKey('organization.id'), unique=True)  # Unique constraint added
+    # subscription_date plus the plan's validity, kept up to date on flush (see subscription_expiry_service)
+    expires_on = Column(Date, nullable=True, index=True)
 
     subscription = relationship("SubscriptionEntity")
     organization = relationship("OrganizationEntity", back_populates="organization_subscription")  # Update relationship
@@ -232,6 +234,38 @@ class PermissionEntity(Base):
     user = relationship("UserEntity", back_populates="permission", foreign_keys=[user_id], uselist=False)
 
 
+# Generation number per catalog table, bumped in the same transaction as every catalog write
+class CatalogVersionEntity(Base):
+    __tablename__ = 'catalog_version'
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+
+# Search tokens of a user and its address and organization, maintained on flush (see user_search_service)
+class UserSearchTokenEntity(Base):
+    __tablename__ = 'user_search_token'
+
+    user_id = Column(Integer, ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    field = Column(String(32), primary_key=True)
+    token = Column(String(64), primary_key=True)
+    weight = Column(Integer, nullable=False)
+
+    # Prefix lookups (token LIKE 'abc%') are range scans on this index
+    __table_args__ = (Index('ix_user_search_token_token', 'token', 'user_id', 'weight'),)
+
+
+# Permission module tree of a subscription as compact JSON, rebuilt on commit of mapping writes (see permission_tree_service)
+class SubscriptionPermissionTreeEntity(Base):
+    __tablename__ = 'subscription_permission_tree'
+
+    subscription_id = Column(Integer, ForeignKey('subscription.id', ondelete='CASCADE'), primary_key=True)
+    tree = Column(Text, nullable=False)
+    action_count = Column(Integer, nullable=False)
+    built_at = Column(DateTime, nullable=False)
+
+
 
 # class ApiPermissionEntity(Base):
 #     tablename = 'api_permission'
@@ -316,6 +316,33 @@ class UserDTO(BaseModel):
     class Config:
         orm_mode = True
 
+class UserSearchResultDTO(BaseModel):
+    id: int
+    customer_id: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email_id: str
+    mobile_no: str
+    organization_name: Optional[str] = None
+    city: Optional[str] = None
+    score: int
+
+    class Config:
+        orm_mode = True
+
+class OrganizationExpiryDTO(BaseModel):
+    organization_id: int
+    organization_name: Optional[str] = None
+    display_name: Optional[str] = None
+    subscription_id: Optional[int] = None
+    subscription_name: Optional[str] = None
+    subscription_date: Optional[date] = None
+    expires_on: Optional[date] = None
+    status: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
 class PermissionUser(BaseModel):
     id: Optional[int] = None
     customer_id: Optional[str] = None
@@ -19,6 +19,22 @@ class PageableResponse(BaseModel):
     message: str
     totalPages: int
     totalElements: int
+    # False when totalElements is an estimate from table statistics
+    totalExact: bool = True
+
+    class Config:
+        populate_by_name = True
+
+class CursorPageResponse(BaseModel):
+    code: int
+    status: str
+    limit: int
+    embedded: Optional[Any] = Field(alias='data')
+    message: str
+    nextCursor: Optional[str] = None
+    hasMore: bool
+    totalElements: Optional[int] = None
+    totalExact: Optional[bool] = None
 
     class Config:
         populate_by_name = True
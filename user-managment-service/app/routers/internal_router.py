@@ -0,0 +1,162 @@
+# app/routers/internal_router.py
+
+import hmac
+import uuid
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.configuration.config import Config
+from app.configuration.db import engine, engine_options, pool_metrics, read_engine, read_pool_metrics, \
+    get_db_session
+from app.configuration.logger import setup_logger
+from app.configuration.tracing import TracedRoute
+from app.models.response import ResponseBO, StatusConstant
+from app.services.catalog_cache import catalog_cache
+from app.services.count_cache import count_cache
+from app.services.entitlement_service import entitlement_index
+from app.services import user_search_service, permission_tree_service, expiry_notifier_service, \
+    subscription_expiry_service
+
+internal_router = APIRouter(route_class=TracedRoute)
+
+
+async def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Guard for the endpoints that rewrite tables or send mail: the caller must present INTERNAL_API_TOKEN."""
+    if not Config.INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Internal maintenance endpoints are disabled.")
+    if x_internal_token is None or not hmac.compare_digest(x_internal_token.encode(),
+                                                           Config.INTERNAL_API_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Missing or invalid X-Internal-Token header.")
+
+
+@internal_router.get("/pool", response_model=ResponseBO)
+async def get_pool_metrics():
+    data = pool_metrics.snapshot()
+    options = engine_options()
+    data["profile"] = Config.DB_PROFILE
+    data["pool_timeout"] = options["pool_timeout"]
+    data["pool_recycle"] = options["pool_recycle"]
+    data["max_overflow"] = options["max_overflow"]
+    data["replica"] = read_pool_metrics.snapshot() if read_engine is not engine else None
+    return ResponseBO(
+        code=200,
+        status="OK",
+        data=data,
+        message=StatusConstant.GET
+    )
+
+
+@internal_router.get("/catalog-cache", response_model=ResponseBO)
+async def get_catalog_cache_stats():
+    return ResponseBO(
+        code=200,
+        status="OK",
+        data=catalog_cache.stats(),
+        message=StatusConstant.GET
+    )
+
+
+@internal_router.get("/entitlements", response_model=ResponseBO)
+async def get_entitlement_index_stats():
+    return ResponseBO(
+        code=200,
+        status="OK",
+        data=entitlement_index.stats(),
+        message=StatusConstant.GET
+    )
+
+
+@internal_router.get("/counts", response_model=ResponseBO)
+async def get_count_cache_stats():
+    return ResponseBO(
+        code=200,
+        status="OK",
+        data=count_cache.stats(),
+        message=StatusConstant.GET
+    )
+
+
+@internal_router.post("/user-search/rebuild", response_model=ResponseBO,
+                      dependencies=[Depends(require_internal_token)])
+async def rebuild_user_search_index(session: AsyncSession = Depends(get_db_session)):
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    try:
+        indexed = await user_search_service.rebuild_index(session, logger)
+        return ResponseBO(
+            code=200,
+            status="OK",
+            data={"indexed_users": indexed},
+            message=StatusConstant.UPDATED
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to rebuild the user search index: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="An error occurred while rebuilding the user search index.")
+
+
+@internal_router.post("/permission-trees/rebuild", response_model=ResponseBO,
+                      dependencies=[Depends(require_internal_token)])
+async def rebuild_permission_trees(session: AsyncSession = Depends(get_db_session)):
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    try:
+        rebuilt = await permission_tree_service.rebuild_all(session, logger)
+        return ResponseBO(
+            code=200,
+            status="OK",
+            data={"subscriptions": rebuilt},
+            message=StatusConstant.UPDATED
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to rebuild the permission trees: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="An error occurred while rebuilding the permission trees.")
+
+
+@internal_router.post("/subscription-expiry/rebuild", response_model=ResponseBO,
+                      dependencies=[Depends(require_internal_token)])
+async def rebuild_subscription_expiry(session: AsyncSession = Depends(get_db_session)):
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    try:
+        refreshed = await subscription_expiry_service.rebuild_all(session, logger)
+        return ResponseBO(
+            code=200,
+            status="OK",
+            data={"organization_subscriptions": refreshed},
+            message=StatusConstant.UPDATED
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to recompute the subscription expiry dates: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="An error occurred while recomputing the expiry dates.")
+
+
+@internal_router.post("/expiry-notices/run", response_model=ResponseBO,
+                      dependencies=[Depends(require_internal_token)])
+async def run_expiry_notices(run_date: Optional[date] = Query(None), dry_run: bool = Query(False),
+                             session: AsyncSession = Depends(get_db_session)):
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    try:
+        summary = await expiry_notifier_service.send_expiry_notices(run_date, dry_run, session, logger)
+        return ResponseBO(
+            code=200,
+            status="OK",
+            data=summary,
+            message=StatusConstant.ACCEPTED
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to send the expiry notices: {e}")
+        raise HTTPException(status_code=500, detail="An error occurred while sending the expiry notices.")
@@ -0,0 +1,15 @@
+# app/routers/metrics_router.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.configuration.metrics import collect
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(await collect(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,31 +1,72 @@
 # app/routers/subscription_router.py
 
+import asyncio
+import tempfile
 import uuid
+from datetime import date
+from typing import List, Optional
 
 import asyncpg
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.models.pydantic_models import CreateSubscription, CreateService, CreateSubscriptionServiceMapping, \
     CreateApiPermission, CreateServiceApiPermissionMapping, PagePermissionDTO, PagePermissionCreateDTO, \
     ServiceApiPagePermissionsMappingCreateDTO
-from app.models.response import ResponseBO
+from app.models.response import ResponseBO, PageableResponse
+from app.configuration.config import Config
+from app.configuration.db import get_db_session, open_session, request_binding
 from app.configuration.logger import setup_logger
-from app.services import subscription_service
+from app.configuration.tracing import TracedRoute
+from app.services import subscription_service, catalog_version_service, entitlement_service, \
+    permission_tree_service, subscription_expiry_service, catalog_import_service, catalog_export_service
+from app.services.subscription_expiry_service import ExpiryStatus
+from app.services.catalog_projection import CatalogProjection, SUBSCRIPTION_FIELDS, SERVICE_FIELDS, EXPANSIONS, \
+    FULL_GRAPH
+from app.utils.fast_json import envelope_response, raw_envelope_response
 
-subscription_router = APIRouter()
+subscription_router = APIRouter(route_class=TracedRoute)
+
+FIELDS_DESCRIPTION = (f"Comma-separated subscription fields {list(SUBSCRIPTION_FIELDS)}, "
+                      f"or services.<field> for {list(SERVICE_FIELDS)}")
+EXPAND_DESCRIPTION = f"Comma-separated relationships to include: {list(EXPANSIONS)}"
+
+
+def catalog_projection(fields: Optional[str], expand: Optional[str]) -> Optional[CatalogProjection]:
+    projection = CatalogProjection.parse(fields, expand)
+    if projection is None and Config.FAST_JSON_RESPONSES:
+        # Same shape as the DTO graph, built as plain dicts
+        projection = FULL_GRAPH
+    return projection
+
+
+def catalog_response(code: int, status: str, data, message: str,
+                     validators: catalog_version_service.CatalogValidators):
+    """ResponseBO envelope for catalog GETs; in fast mode the trusted dicts are encoded straight to bytes."""
+    if Config.FAST_JSON_RESPONSES:
+        return envelope_response(code, status, data, message, headers=validators.headers())
+    return ResponseBO(code=code, status=status, data=data, message=message)
+
+
+def summarize_bulk_results(results: List[dict]) -> dict:
+    summary = {}
+    for item in results:
+        summary[item["result"]] = summary.get(item["result"], 0) + 1
+    return summary
 
 
 @subscription_router.post("/create", response_model=ResponseBO)
-async def create_subscription(data: CreateSubscription):
+async def create_subscription(data: CreateSubscription, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request with data: {data}")
+        logger.debug("Received request with data: %s", data)
 
         # Check if the subscription name already exists
-        existing_subscription = await subscription_service.check_subscription_name_exists(data.name, logger)
+        existing_subscription = await subscription_service.check_subscription_name_exists(data.name, session, logger)
         if existing_subscription:
             # raise HTTPException(status_code=409, detail="Subscription name already exists")
             return ResponseBO(
@@ -35,7 +76,7 @@ async def create_subscription(data: CreateSubscription):
             message=f"Subscription name: '{data.name}' already exists for another subscription"
         )
 
-        result = await subscription_service.create_subscription(data, logger)
+        result = await subscription_service.create_subscription(data, session, logger)
 
         if not result:
             raise HTTPException(status_code=404, detail="Failed to create subscription")
@@ -64,15 +105,15 @@ async def create_subscription(data: CreateSubscription):
 
 
 @subscription_router.put("/update/{subscription_id}", response_model=ResponseBO)
-async def update_subscription(subscription_id: int, data: CreateSubscription):
+async def update_subscription(subscription_id: int, data: CreateSubscription, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request to update subscription ID {subscription_id} with data: {data}")
+        logger.debug("Received request to update subscription ID %s with data: %s", subscription_id, data)
 
         # Check if the subscription name already exists for another subscription
-        existing_subscription = await subscription_service.check_update_subscription_name_exists(data.name, subscription_id, logger)
+        existing_subscription = await subscription_service.check_update_subscription_name_exists(data.name, subscription_id, session, logger)
         if existing_subscription:
             # raise HTTPException(status_code=409, detail="Subscription name already exists for another subscription")
             return ResponseBO(
@@ -82,7 +123,7 @@ async def update_subscription(subscription_id: int, data: CreateSubscription):
                 message=f"Subscription name: '{data.name}' already exists for another subscription"
             )
 
-        result = await subscription_service.update_subscription(subscription_id, data, logger)
+        result = await subscription_service.update_subscription(subscription_id, data, session, logger)
 
         if not result:
             # raise HTTPException(status_code=404, detail="Failed to update subscription")
@@ -152,12 +193,33 @@ async def update_subscription(subscription_id: int, data: CreateSubscription):
 #After add responseBO
 
 @subscription_router.get("/get/{subscription_id}", response_model=ResponseBO)
-async def get_subscription(subscription_id: int):
+async def get_subscription(subscription_id: int, request: Request, http_response: Response,
+                           fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+                           expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+                           session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request to get subscription ID {subscription_id}")
+        logger.info(f"Received request to get subscription ID {subscription_id} (fields={fields}, expand={expand})")
+
+        try:
+            projection = catalog_projection(fields, expand)
+        except ValueError as ve:
+            logger.error(f"Invalid projection: {ve}")
+            return ResponseBO(
+                code=400,
+                status="BAD REQUEST",
+                data=None,
+                message=str(ve)
+            )
+
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.SUBSCRIPTION_GRAPH_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
 
         # Validate if subscription_id is a positive number
         if subscription_id <= 0:
@@ -170,7 +232,8 @@ async def get_subscription(subscription_id: int):
             )
 
         # Fetch the subscription from the service
-        result = await subscription_service.get_subscription_by_id(subscription_id, logger)
+        result = await subscription_service.get_subscription_by_id(subscription_id, session, logger, projection,
+                                                                   validators.etag)
 
         # Check if subscription exists
         if not result:
@@ -183,13 +246,7 @@ async def get_subscription(subscription_id: int):
             )
 
         # Create and return a success ResponseBO
-        response = ResponseBO(
-            code=200,
-            status="OK",
-            data=result,
-            message="Subscription retrieved successfully."
-        )
-        return response
+        return catalog_response(200, "OK", result, "Subscription retrieved successfully.", validators)
 
     except asyncpg.PostgresError as pg_exc:
         logger.error(f"Database error occurred: {pg_exc}")
@@ -211,32 +268,41 @@ async def get_subscription(subscription_id: int):
 
 
 @subscription_router.get("/get_all", response_model=ResponseBO)
-async def get_all_subscriptions():
+async def get_all_subscriptions(request: Request, http_response: Response,
+                                fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+                                expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+                                session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info("Received request to get all subscriptions")
-        results = await subscription_service.get_all_subscriptions(logger)
+        logger.info(f"Received request to get all subscriptions (fields={fields}, expand={expand})")
+
+        try:
+            projection = catalog_projection(fields, expand)
+        except ValueError as ve:
+            logger.error(f"Invalid projection: {ve}")
+            raise HTTPException(status_code=400, detail=f"Value error: {ve}")
+
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.SUBSCRIPTION_GRAPH_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
+        results = await subscription_service.get_all_subscriptions(session, logger, projection, validators.etag)
 
 
         if not results:
-            return ResponseBO(
-            code=204,  # HTTP status code for OK
-            status="NO CONTENT",
-            data=results,
-            message="No subscriptions found"
-        )
+            return catalog_response(204, "NO CONTENT", results, "No subscriptions found", validators)
 
         # Create and return a ResponseBO
-        response = ResponseBO(
-            code=200,  # HTTP status code for OK
-            status="LIST RETRIEVED",
-            data=results,
-            message=f"{len(results)} Subscriptions retrieved successfully."
-        )
-        return response
+        return catalog_response(200, "LIST RETRIEVED", results,
+                                f"{len(results)} Subscriptions retrieved successfully.", validators)
 
+    except HTTPException as http_exc:
+        logger.error(f"HTTPException occurred: {http_exc.detail}")
+        raise http_exc
     except asyncpg.PostgresError as pg_exc:
         logger.error(f"Database error occurred: {pg_exc}")
         raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
@@ -244,14 +310,50 @@ async def get_all_subscriptions():
         logger.error(f"An unexpected error occurred: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
+@subscription_router.get("/getPermissionTree/{subscription_id}", response_model=ResponseBO)
+async def get_permission_tree(subscription_id: int, request: Request,
+                              session: AsyncSession = Depends(get_db_session)):
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    try:
+        logger.info(f"Received request to get the permission tree of subscription ID {subscription_id}")
+
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.SUBSCRIPTION_GRAPH_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+
+        tree = await permission_tree_service.get_permission_tree(subscription_id, session, logger)
+        if tree is None:
+            logger.error(f"Subscription with ID {subscription_id} not found.")
+            return ResponseBO(
+                code=404,
+                status="NOT FOUND",
+                data=None,
+                message=f"Subscription with ID {subscription_id} not found."
+            )
+
+        # The stored document is sent as is, without decoding it
+        return raw_envelope_response(200, "OK", tree.encode("utf-8"), "Permission tree retrieved successfully.",
+                                     validators.headers())
+
+    except SQLAlchemyError as db_exc:
+        logger.error(f"Database error occurred: {db_exc}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+
 @subscription_router.delete("/delete/{subscription_id}", response_model=ResponseBO)
-async def handle_delete_subscription(subscription_id: int):
+async def handle_delete_subscription(subscription_id: int, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info(f"Received request to delete subscription ID {subscription_id}")
-        subscription = await subscription_service.delete_subscription(subscription_id, logger)
+        subscription = await subscription_service.delete_subscription(subscription_id, session, logger)
         if not subscription:
             return ResponseBO(
                 code=404,
@@ -278,28 +380,26 @@ async def handle_delete_subscription(subscription_id: int):
 
 
 @subscription_router.get("/getAllActive", response_model=ResponseBO)
-async def get_all_active_subscriptions():
+async def get_all_active_subscriptions(request: Request, http_response: Response, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info("Received request to get active subscriptions")
-        results = await subscription_service.get_active_subscriptions(logger)
+
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.SUBSCRIPTION_GRAPH_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
+        results = await subscription_service.get_active_subscriptions(session, logger, catalog_projection(None, None),
+                                                                      validators.etag)
         if not results:
-            return ResponseBO(
-                code=204,  # HTTP status code for OK
-                status="NO CONTENT",
-                data=results,
-                message="No Active subscriptions found"
-            )
+            return catalog_response(204, "NO CONTENT", results, "No Active subscriptions found", validators)
         # Create and return a ResponseBO
-        response = ResponseBO(
-            code=200,  # HTTP status code for OK
-            status="LIST RETRIEVED",
-            data=results,
-            message="Active subscriptions retrieved successfully."
-        )
-        return response
+        return catalog_response(200, "LIST RETRIEVED", results, "Active subscriptions retrieved successfully.",
+                                validators)
 
     except asyncpg.PostgresError as pg_exc:
         logger.error(f"Database error occurred: {pg_exc}")
@@ -309,6 +409,146 @@ async def get_all_active_subscriptions():
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
+@subscription_router.get("/organizations/byExpiry", response_model=PageableResponse)
+async def get_organizations_by_expiry(
+    expires_from: Optional[date] = Query(None, description="Earliest expiry date, inclusive"),
+    expires_to: Optional[date] = Query(None, description="Latest expiry date, inclusive"),
+    status: Optional[ExpiryStatus] = Query(None, description="ACTIVE (expires today or later) or EXPIRED"),
+    size: int = Query(10, ge=1, le=100, description="Number of organizations per page"),
+    page: int = Query(1, ge=1, description="Page number"),
+    session: AsyncSession = Depends(get_db_session)
+):
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    if expires_from and expires_to and expires_from > expires_to:
+        raise HTTPException(status_code=400, detail="expires_from must not be after expires_to.")
+    try:
+        # Range scan on the indexed organization_subscription_details.expires_on
+        expiry_data = await subscription_expiry_service.get_organizations_by_expiry(
+            expires_from, expires_to, status, page, size, session, logger)
+
+        return PageableResponse(
+            code=200,
+            status="success",
+            page=page,
+            size=size,
+            embedded=expiry_data["data"],  # Soonest expiry first
+            message="Fetched organizations by expiry successfully",
+            totalPages=expiry_data["total_pages"],
+            totalElements=expiry_data["total_elements"],
+            totalExact=expiry_data["total_exact"]
+        )
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while fetching organizations by expiry: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+
+@subscription_router.get("/export/{export_name}")
+async def export_catalog(
+    request: Request,
+    export_name: str,
+    file_format: str = Query(catalog_export_service.NDJSON, alias="format", description="ndjson or csv")
+):
+    """Stream a catalog or permission table; see catalog_export_service.EXPORTS for the names."""
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    if export_name not in catalog_export_service.EXPORTS:
+        raise HTTPException(status_code=404,
+                            detail=f"Unknown export '{export_name}'; expected one of {list(catalog_export_service.EXPORTS)}")
+    if file_format not in catalog_export_service.MEDIA_TYPES:
+        raise HTTPException(status_code=400,
+                            detail=f"format must be one of {list(catalog_export_service.MEDIA_TYPES)}")
+    logger.info(f"Exporting {export_name} as {file_format}")
+
+    # The body is produced after this handler returns, so it holds a session of its own for as long as it streams
+    async def body():
+        try:
+            async with open_session(*request_binding(request)) as session:
+                async for chunk in catalog_export_service.stream_export(export_name, file_format, session, logger):
+                    yield chunk
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated body
+            logger.error(f"Export of {export_name} failed: {e}")
+            raise
+
+    return StreamingResponse(
+        body(),
+        media_type=catalog_export_service.MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_name}.{file_format}"'}
+    )
+
+
+@subscription_router.post("/catalog/import", response_model=ResponseBO)
+async def import_catalog(
+    request: Request,
+    file_format: Optional[str] = Query(None, alias="format", description="csv or xlsx (default: from Content-Type)"),
+    dry_run: bool = Query(False, description="Validate and report the changes without writing them")
+):
+    """The sheet is the raw request body, e.g. ``curl --data-binary @catalog.csv -H 'Content-Type: text/csv'``.
+
+    The session is opened only once the upload is received and parsed, so a slow client does not hold a
+    pooled connection.
+    """
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    if file_format is not None and file_format not in catalog_import_service.FILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(catalog_import_service.FILE_FORMATS)}")
+    file_format = file_format or catalog_import_service.file_format_of(None, request.headers.get("content-type"))
+    try:
+        # Spooled to disk past 1 MB; pandas and openpyxl then read it back chunk by chunk
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as upload:
+            received = 0
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > Config.CATALOG_IMPORT_MAX_BYTES:
+                    return ResponseBO(
+                        code=413,
+                        status="PAYLOAD TOO LARGE",
+                        data=None,
+                        message=f"Catalog files are limited to {Config.CATALOG_IMPORT_MAX_BYTES} bytes."
+                    )
+                upload.write(chunk)
+            logger.info(f"Received catalog import of {received} bytes ({file_format}), dry run: {dry_run}")
+            upload.seek(0)
+            catalog = await asyncio.to_thread(catalog_import_service.read_catalog_file, upload, file_format)
+
+        async with open_session(*request_binding(request)) as session:
+            report = await catalog_import_service.import_catalog(catalog, dry_run, session, logger)
+        if report["error_count"]:
+            return ResponseBO(
+                code=422,
+                status="UNPROCESSABLE ENTITY",
+                data=report,
+                message=f"The catalog file has {report['error_count']} errors; nothing was imported."
+            )
+        return ResponseBO(
+            code=200,
+            status="VALIDATED" if dry_run else "IMPORTED",
+            data=report,
+            message=f"{report['rows']} catalog rows {'validated' if dry_run else 'imported'} successfully."
+        )
+
+    except catalog_import_service.CatalogImportError as e:
+        logger.error(f"Unreadable catalog file: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException as http_exc:
+        logger.error(f"HTTPException occurred: {http_exc.detail}")
+        raise http_exc
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while importing the catalog: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+
 # @subscription_router.post("/service/create", response_model=ResponseBO)
 # async def create_service(data: CreateService):
 #     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
@@ -356,15 +596,15 @@ async def get_all_active_subscriptions():
 #         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 #
 @subscription_router.post("/service/create", response_model=ResponseBO)
-async def create_service(data: CreateService):
+async def create_service(data: CreateService, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request with data: {data}")
+        logger.debug("Received request with data: %s", data)
 
         # Check if the service name already exists
-        existing_service = await subscription_service.check_service_name_exists(data.name, logger)
+        existing_service = await subscription_service.check_service_name_exists(data.name, session, logger)
         if existing_service:
             return ResponseBO(
                 code=409,
@@ -374,7 +614,7 @@ async def create_service(data: CreateService):
             )
 
         # Validate subscription_id
-        subscription_exists = await subscription_service.check_subscription_exists(data.subscription_id, logger)
+        subscription_exists = await subscription_service.check_subscription_exists(data.subscription_id, session, logger)
         if not subscription_exists:
             return ResponseBO(
                 code=404,
@@ -384,17 +624,17 @@ async def create_service(data: CreateService):
             )
 
         # Validate api_permission_ids if provided
-        invalid_permissions = await subscription_service.validate_api_permissions(data.api_permission_id, logger)
+        invalid_permissions = await subscription_service.validate_api_permissions(data.api_permission_id, session, logger)
         if invalid_permissions:
             return ResponseBO(
                 code=404,
                 status="NOT FOUND",
-                data=None,
+                data={"missing_ids": invalid_permissions},
                 message=f"Invalid API permission IDs: {invalid_permissions}."
             )
 
         # Create the service
-        result = await subscription_service.create_service(data, logger)
+        result = await subscription_service.create_service(data, session, logger)
 
         if not result:
             return ResponseBO(
@@ -441,13 +681,20 @@ async def create_service(data: CreateService):
         )
 
 @subscription_router.get("/service/get/{service_id}", response_model=ResponseBO)
-async def get_service(service_id: int):
+async def get_service(service_id: int, request: Request, http_response: Response, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info(f"Received request to get service ID {service_id}")
-        result = await subscription_service.get_service_by_id(service_id, logger)
+
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.SERVICE_GRAPH_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
+        result = await subscription_service.get_service_by_id(service_id, session, logger)
         if not result:
             return ResponseBO(
                 code=404,
@@ -483,7 +730,7 @@ async def get_service(service_id: int):
 #     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 #
 #     try:
-#         logger.info(f"Received request to update service ID {service_id} with data: {data}")
+#         logger.debug("Received request to update service ID %s with data: %s", service_id, data)
 #
 #         # Check if the service name already exists for another service
 #         existing_service = await subscription_service.check_update_service_name_exists(data.name, service_id, logger)
@@ -524,15 +771,15 @@ async def get_service(service_id: int):
 #         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 @subscription_router.put("/service/update/{service_id}", response_model=ResponseBO)
-async def update_service(service_id: int, data: CreateService):
+async def update_service(service_id: int, data: CreateService, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request to update service ID {service_id} with data: {data}")
+        logger.debug("Received request to update service ID %s with data: %s", service_id, data)
 
         # Check if the service exists
-        service = await subscription_service.get_service_by_id(service_id, logger)
+        service = await subscription_service.get_service_by_id(service_id, session, logger)
         if not service:
             logger.error(f"Service with ID {service_id} not found.")
             # raise HTTPException(
@@ -547,7 +794,7 @@ async def update_service(service_id: int, data: CreateService):
             )
 
         # Check if the new service name already exists for another service
-        existing_service = await subscription_service.check_update_service_name_exists(data.name, service_id, logger)
+        existing_service = await subscription_service.check_update_service_name_exists(data.name, service_id, session, logger)
         if existing_service:
             logger.error(f"Service name '{data.name}' already exists for another service.")
             # raise HTTPException(
@@ -563,7 +810,7 @@ async def update_service(service_id: int, data: CreateService):
 
         # Validate subscription_id
         logger.info(f"Validating subscription ID: {data.subscription_id}")
-        subscription = await subscription_service.get_subscription_by_id(data.subscription_id, logger)
+        subscription = await subscription_service.get_subscription_by_id(data.subscription_id, session, logger)
         if not subscription:
             logger.error(f"Subscription ID {data.subscription_id} not found.")
             # raise HTTPException(
@@ -581,7 +828,7 @@ async def update_service(service_id: int, data: CreateService):
         # Validate api_permission_id list
         if data.api_permission_id:
             logger.info(f"Validating API permission IDs: {data.api_permission_id}")
-            invalid_permissions = await subscription_service.validate_api_permissions(data.api_permission_id, logger)
+            invalid_permissions = await subscription_service.validate_api_permissions(data.api_permission_id, session, logger)
             if invalid_permissions:
                 logger.error(f"Invalid API permission IDs: {invalid_permissions}")
                 # raise HTTPException(
@@ -591,12 +838,12 @@ async def update_service(service_id: int, data: CreateService):
                 return ResponseBO(
                     code=404,
                     status="NOT FOUND",
-                    data=None,
+                    data={"missing_ids": invalid_permissions},
                     message=f"Invalid API permission IDs: {invalid_permissions}."
                 )
 
         # Update the service
-        result = await subscription_service.update_service(service_id, data, logger)
+        result = await subscription_service.update_service(service_id, data, session, logger)
         if not result:
             # raise HTTPException(
             #     status_code=404,
@@ -633,13 +880,20 @@ async def update_service(service_id: int, data: CreateService):
 
 
 @subscription_router.get("/service/getAll", response_model=ResponseBO)
-async def get_all_services():
+async def get_all_services(request: Request, http_response: Response, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info("Received request to get all services")
-        results = await subscription_service.get_all_services(logger)
+
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.SERVICE_GRAPH_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
+        results = await subscription_service.get_all_services(session, logger, validators.etag)
         if not results:
             return ResponseBO(
                 code=204,  # HTTP status code for OK
@@ -665,13 +919,13 @@ async def get_all_services():
 
 
 @subscription_router.delete("/service/delete/serviceId/{service_id}/subscriptionId/{subscription_id}", response_model=ResponseBO)
-async def handle_delete_service(service_id: int, subscription_id: int):
+async def handle_delete_service(service_id: int, subscription_id: int, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info(f"Received request to delete service ID {service_id} from subscription ID {subscription_id}")
-        await subscription_service.delete_service_by_id(service_id, subscription_id, logger)
+        await subscription_service.delete_service_by_id(service_id, subscription_id, session, logger)
         if not subscription_id:
             return ResponseBO(
                 code=404,
@@ -704,15 +958,22 @@ async def handle_delete_service(service_id: int, subscription_id: int):
 
 
 @subscription_router.get("/service/getBySubscriptionId/{subscription_id}", response_model=ResponseBO)
-async def get_services_by_subscription(subscription_id: int):
+async def get_services_by_subscription(subscription_id: int, request: Request, http_response: Response, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())
     logger = setup_logger(worker_id)
 
     try:
         logger.info(f"Received request to get services for subscription ID {subscription_id}")
 
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.SUBSCRIPTION_GRAPH_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
+
         # Fetch services by subscription ID using the service function
-        result = await subscription_service.get_services_by_subscription_id(subscription_id, logger)
+        result = await subscription_service.get_services_by_subscription_id(subscription_id, session, logger)
         if not result:
             return ResponseBO(
                 code=404,
@@ -749,15 +1010,15 @@ async def get_services_by_subscription(subscription_id: int):
 
 
 @subscription_router.post("/service/servicesMapping", response_model=ResponseBO)
-async def create_subscription_service_mapping(data: CreateSubscriptionServiceMapping):
+async def create_subscription_service_mapping(data: CreateSubscriptionServiceMapping, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request with data: {data}")
+        logger.debug("Received request with data: %s", data)
 
         # Check if the subscription exists
-        existing_subscription = await subscription_service.check_subscription_exists(data.subscription_id, logger)
+        existing_subscription = await subscription_service.check_subscription_exists(data.subscription_id, session, logger)
         if not existing_subscription:
             # raise HTTPException(status_code=404, detail="Subscription not found")
             return ResponseBO(
@@ -768,17 +1029,17 @@ async def create_subscription_service_mapping(data: CreateSubscriptionServiceMap
             )
 
         # Check if all services exist
-        existing_services = await subscription_service.check_services_exist(data.service_id, logger)
-        if not existing_services:
+        missing_services = await subscription_service.validate_services(data.service_id, session, logger)
+        if missing_services:
             # raise HTTPException(status_code=409, detail="One or more service IDs do not exist")
             return ResponseBO(
                 code=404,
                 status="NOT FOUND",
-                data=None,
-                message=f"Service with ID {data.service_id} not found."
+                data={"missing_ids": missing_services},
+                message=f"Service IDs not found: {missing_services}"
             )
         # Create service mapping and retrieve the updated subscription as DTO
-        response = await subscription_service.create_service_mapping(data.subscription_id, data.service_id, logger)
+        response = await subscription_service.create_service_mapping(data.subscription_id, data.service_id, session, logger)
 
         return response
 
@@ -797,15 +1058,15 @@ async def create_subscription_service_mapping(data: CreateSubscriptionServiceMap
 
 
 @subscription_router.post("/service/apiPermissions/create", response_model=ResponseBO)
-async def create_api_permission(data: CreateApiPermission):
+async def create_api_permission(data: CreateApiPermission, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request with data: {data}")
+        logger.debug("Received request with data: %s", data)
 
         # Check if the API permission name already exists
-        existing_permission = await subscription_service.check_api_permission_name_exists(data.name, logger)
+        existing_permission = await subscription_service.check_api_permission_name_exists(data.name, session, logger)
         if existing_permission:
             # raise HTTPException(status_code=409, detail="API permission name already exists")
             return ResponseBO(
@@ -815,7 +1076,7 @@ async def create_api_permission(data: CreateApiPermission):
                 message=f"Api_Permission name: '{data.name}' already exists for another api_permission"
             )
 
-        result = await subscription_service.create_api_permission(data, logger)
+        result = await subscription_service.create_api_permission(data, session, logger)
 
         if not result:
             raise HTTPException(status_code=404, detail="Failed to create API permission")
@@ -843,16 +1104,59 @@ async def create_api_permission(data: CreateApiPermission):
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
+@subscription_router.post("/service/apiPermissions/bulkUpsert", response_model=ResponseBO)
+async def bulk_upsert_api_permissions(data: List[CreateApiPermission], session: AsyncSession = Depends(get_db_session)):
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    try:
+        logger.info(f"Received bulk upsert of {len(data)} API permissions")
+
+        if not data:
+            return ResponseBO(
+                code=400,
+                status="BAD REQUEST",
+                data=None,
+                message="At least one API permission is required."
+            )
+        if len(data) > Config.BULK_UPSERT_MAX_ITEMS:
+            return ResponseBO(
+                code=413,
+                status="PAYLOAD TOO LARGE",
+                data=None,
+                message=f"At most {Config.BULK_UPSERT_MAX_ITEMS} API permissions can be upserted per request."
+            )
+
+        results = await subscription_service.bulk_upsert_api_permissions(data, session, logger)
+
+        return ResponseBO(
+            code=200,
+            status="UPSERTED",
+            data={"summary": summarize_bulk_results(results), "items": results},
+            message=f"{len(results)} API permissions processed successfully."
+        )
+
+    except HTTPException as http_exc:
+        logger.error(f"HTTPException occurred: {http_exc.detail}")
+        raise http_exc
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {ve}")
+        raise HTTPException(status_code=400, detail=f"Value error: {ve}")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+
 @subscription_router.put("/service/apiPermissions/update/{api_permission_id}", response_model=ResponseBO)
-async def update_api_permission(api_permission_id: int, data: CreateApiPermission):
+async def update_api_permission(api_permission_id: int, data: CreateApiPermission, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request to update API permission ID {api_permission_id} with data: {data}")
+        logger.debug("Received request to update API permission ID %s with data: %s", api_permission_id, data)
 
         # Check if the API permission name already exists for another permission
-        existing_permission = await subscription_service.check_update_api_permission_name_exists(data.name, api_permission_id, logger)
+        existing_permission = await subscription_service.check_update_api_permission_name_exists(data.name, api_permission_id, session, logger)
         if existing_permission:
             # raise HTTPException(status_code=409, detail="API permission name already exists for another permission")
             return ResponseBO(
@@ -862,7 +1166,7 @@ async def update_api_permission(api_permission_id: int, data: CreateApiPermissio
                 message=f"Api_Permission name: '{data.name}' already exists for another api_permission"
             )
 
-        result = await subscription_service.update_api_permission(api_permission_id, data, logger)
+        result = await subscription_service.update_api_permission(api_permission_id, data, session, logger)
 
         if not result:
             # raise HTTPException(status_code=404, detail="Failed to update API permission")
@@ -897,13 +1201,20 @@ async def update_api_permission(api_permission_id: int, data: CreateApiPermissio
 
 
 @subscription_router.get("/service/apiPermissions/getAll", response_model=ResponseBO)
-async def get_all_api_permissions():
+async def get_all_api_permissions(request: Request, http_response: Response, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info("Received request to get all API permissions")
-        results = await subscription_service.get_all_api_permissions(logger)
+
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.API_PERMISSION_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
+        results = await subscription_service.get_all_api_permissions(session, logger)
         if not results:
             return ResponseBO(
                 code=204,  # HTTP status code for OK
@@ -929,13 +1240,20 @@ async def get_all_api_permissions():
 
 
 @subscription_router.get("/service/apiPermissions/get/{api_permission_id}", response_model=ResponseBO)
-async def get_api_permission(api_permission_id: int):
+async def get_api_permission(api_permission_id: int, request: Request, http_response: Response, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info(f"Received request to get API permission ID {api_permission_id}")
-        result = await subscription_service.get_api_permission_by_id(api_permission_id, logger)
+
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.API_PERMISSION_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
+        result = await subscription_service.get_api_permission_by_id(api_permission_id, session, logger)
 
         # Check if the result is None, which means not found
         if not result:
@@ -972,13 +1290,13 @@ async def get_api_permission(api_permission_id: int):
 
 
 @subscription_router.delete("/service/apiPermissions/delete/{api_permission_id}", response_model=ResponseBO)
-async def handle_delete_api_permission(api_permission_id: int):
+async def handle_delete_api_permission(api_permission_id: int, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info(f"Received request to delete API permission ID {api_permission_id}")
-        api_permission = await subscription_service.delete_api_permission(api_permission_id, logger)
+        api_permission = await subscription_service.delete_api_permission(api_permission_id, session, logger)
         if not api_permission:
             response = ResponseBO(
                 code=404,  # HTTP status code for Not Found
@@ -1005,15 +1323,15 @@ async def handle_delete_api_permission(api_permission_id: int):
 
 
 @subscription_router.post("/service/apiPermissions/apiPermissionsMapping", response_model=ResponseBO)
-async def create_service_api_permissions_mapping(data: CreateServiceApiPermissionMapping):
+async def create_service_api_permissions_mapping(data: CreateServiceApiPermissionMapping, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request with data: {data}")
+        logger.debug("Received request with data: %s", data)
 
         # Check if the service exists
-        existing_service = await subscription_service.check_service_exists(data.service_id, logger)
+        existing_service = await subscription_service.check_service_exists(data.service_id, session, logger)
         if not existing_service:
             # raise HTTPException(status_code=404, detail="Service not found")
             return ResponseBO(
@@ -1024,18 +1342,18 @@ async def create_service_api_permissions_mapping(data: CreateServiceApiPermissio
             )
 
         # Check if all API permissions exist
-        existing_permissions = await subscription_service.check_permissions_exist(data.api_permission_id, logger)
-        if not existing_permissions:
+        missing_permissions = await subscription_service.validate_api_permissions(data.api_permission_id, session, logger)
+        if missing_permissions:
             # raise HTTPException(status_code=409, detail="One or more API permission IDs do not exist")
             return ResponseBO(
                 code=404,
                 status="NOT FOUND",
-                data=None,
-                message=f"Api_Permission_Id: '{data.api_permission_id}' not found"
+                data={"missing_ids": missing_permissions},
+                message=f"Api_Permission_Id: '{missing_permissions}' not found"
             )
 
         # Create API permission mapping and retrieve the updated service as DTO
-        response = await subscription_service.create_api_permissions_mapping(data.service_id, data.api_permission_id, logger)
+        response = await subscription_service.create_api_permissions_mapping(data.service_id, data.api_permission_id, session, logger)
 
         return response
 
@@ -1054,15 +1372,22 @@ async def create_service_api_permissions_mapping(data: CreateServiceApiPermissio
 
 
 @subscription_router.get("/service/apiPermissions/getApiPermissionsByServiceId/{service_id}", response_model=ResponseBO)
-async def get_api_permissions_by_service(service_id: int):
+async def get_api_permissions_by_service(service_id: int, request: Request, http_response: Response, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())
     logger = setup_logger(worker_id)
 
     try:
         logger.info(f"Received request to get API permissions for service ID {service_id}")
 
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.SERVICE_GRAPH_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
+
         # Fetch API permissions by service ID using the service function
-        result = await subscription_service.get_api_permissions_by_service_id(service_id, logger)
+        result = await subscription_service.get_api_permissions_by_service_id(service_id, session, logger)
         if not result:
             return ResponseBO(
                 code=404,
@@ -1099,12 +1424,12 @@ async def get_api_permissions_by_service(service_id: int):
 
 
 @subscription_router.post("/pagePermissions/create", response_model=ResponseBO, status_code=201)
-async def create_permission(data: PagePermissionDTO):
+async def create_permission(data: PagePermissionDTO, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        existing_permission = await subscription_service.check_update_page_permission_name_exists(data.name,data.id,logger)
+        existing_permission = await subscription_service.check_update_page_permission_name_exists(data.name,data.id, session, logger)
         if existing_permission:
             return ResponseBO(
                 code=409,
@@ -1114,7 +1439,7 @@ async def create_permission(data: PagePermissionDTO):
             )
 
         logger.info("Received request to create a new page permission")
-        result = await subscription_service.create_page_permission(data,logger)
+        result = await subscription_service.create_page_permission(data, session, logger)
 
         response = ResponseBO(
             code=201,  # HTTP status code for CREATED
@@ -1129,16 +1454,59 @@ async def create_permission(data: PagePermissionDTO):
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
+@subscription_router.post("/pagePermissions/bulkUpsert", response_model=ResponseBO)
+async def bulk_upsert_page_permissions(data: List[PagePermissionCreateDTO], session: AsyncSession = Depends(get_db_session)):
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    try:
+        logger.info(f"Received bulk upsert of {len(data)} page permissions")
+
+        if not data:
+            return ResponseBO(
+                code=400,
+                status="BAD REQUEST",
+                data=None,
+                message="At least one page permission is required."
+            )
+        if len(data) > Config.BULK_UPSERT_MAX_ITEMS:
+            return ResponseBO(
+                code=413,
+                status="PAYLOAD TOO LARGE",
+                data=None,
+                message=f"At most {Config.BULK_UPSERT_MAX_ITEMS} page permissions can be upserted per request."
+            )
+
+        results = await subscription_service.bulk_upsert_page_permissions(data, session, logger)
+
+        return ResponseBO(
+            code=200,
+            status="UPSERTED",
+            data={"summary": summarize_bulk_results(results), "items": results},
+            message=f"{len(results)} page permissions processed successfully."
+        )
+
+    except HTTPException as http_exc:
+        logger.error(f"HTTPException occurred: {http_exc.detail}")
+        raise http_exc
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {ve}")
+        raise HTTPException(status_code=400, detail=f"Value error: {ve}")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+
 @subscription_router.put("/pagePermissions/update/{page_permission_id}", response_model=ResponseBO)
-async def update_permission(page_permission_id: int, data: PagePermissionCreateDTO):
+async def update_permission(page_permission_id: int, data: PagePermissionCreateDTO, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request to update page permission ID {page_permission_id} with data: {data}")
+        logger.debug("Received request to update page permission ID %s with data: %s", page_permission_id, data)
 
         # Check if the page permission name already exists for another permission
-        existing_permission = await subscription_service.check_update_page_permission_name_exists(data.name, page_permission_id, logger)
+        existing_permission = await subscription_service.check_update_page_permission_name_exists(data.name, page_permission_id, session, logger)
         if existing_permission:
             return ResponseBO(
                 code=409,
@@ -1148,7 +1516,7 @@ async def update_permission(page_permission_id: int, data: PagePermissionCreateD
             )
 
         # Update the page permission
-        result = await subscription_service.update_page_permission(page_permission_id, data, logger)
+        result = await subscription_service.update_page_permission(page_permission_id, data, session, logger)
 
         if not result:
             return ResponseBO(
@@ -1179,7 +1547,7 @@ async def update_permission(page_permission_id: int, data: PagePermissionCreateD
 
 
 @subscription_router.delete("/pagePermissions/delete/{permission_id}", response_model=ResponseBO)
-async def delete_permission(permission_id: int):
+async def delete_permission(permission_id: int, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
@@ -1187,7 +1555,7 @@ async def delete_permission(permission_id: int):
         logger.info(f"Received request to delete page permission ID {permission_id}")
 
         # Delete the page permission
-        response = await subscription_service.delete_page_permission(permission_id, logger)
+        response = await subscription_service.delete_page_permission(permission_id, session, logger)
 
         if response.code == 404:
             return response  # Return the 404 response directly
@@ -1204,13 +1572,20 @@ async def delete_permission(permission_id: int):
 
 
 @subscription_router.get("/pagePermissions/get/{page_permission_id}", response_model=ResponseBO)
-async def get_page_permission(page_permission_id: int):
+async def get_page_permission(page_permission_id: int, request: Request, http_response: Response, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())
     logger = setup_logger(worker_id)
 
     try:
         logger.info(f"Received request to get page permission ID {page_permission_id}")
-        result = await subscription_service.get_page_permission_by_id(page_permission_id, logger)
+
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.PAGE_PERMISSION_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
+        result = await subscription_service.get_page_permission_by_id(page_permission_id, session, logger)
         if not result:
             return ResponseBO(
                 code=404,
@@ -1235,13 +1610,20 @@ async def get_page_permission(page_permission_id: int):
 
 # FastAPI route for getAll
 @subscription_router.get("/pagePermissions/getAll", response_model=ResponseBO)
-async def get_all_page_permissions():
+async def get_all_page_permissions(request: Request, http_response: Response, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())
     logger = setup_logger(worker_id)
 
     try:
         logger.info("Received request to get all page permissions")
-        results = await subscription_service.get_all_page_permissions(logger)
+
+        # Answer conditional polls from the catalog version rows alone
+        validators = await catalog_version_service.get_catalog_validators(catalog_version_service.PAGE_PERMISSION_TABLES, session, logger)
+        if validators.matches(request):
+            logger.info(f"Catalog unchanged, returning 304 (ETag {validators.etag})")
+            return validators.not_modified_response()
+        validators.apply(http_response)
+        results = await subscription_service.get_all_page_permissions(session, logger)
         if not results:
             return ResponseBO(
                 code=204,
@@ -1262,15 +1644,15 @@ async def get_all_page_permissions():
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 @subscription_router.post("/pagePermissions/pagePermissionsMapping", response_model=ResponseBO)
-async def create_service_page_permissions_mapping(data: ServiceApiPagePermissionsMappingCreateDTO):
+async def create_service_page_permissions_mapping(data: ServiceApiPagePermissionsMappingCreateDTO, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request with data: {data}")
+        logger.debug("Received request with data: %s", data)
 
         # Check if the service exists
-        existing_service = await subscription_service.check_service_exists(data.service_id, logger)
+        existing_service = await subscription_service.check_service_exists(data.service_id, session, logger)
         if not existing_service:
             return ResponseBO(
                 code=404,
@@ -1280,17 +1662,17 @@ async def create_service_page_permissions_mapping(data: ServiceApiPagePermission
             )
 
         # Check if the page permissions exist
-        existing_permissions = await subscription_service.check_page_permissions_exist(data.page_permission_id, logger)
-        if not existing_permissions:
+        missing_permissions = await subscription_service.validate_page_permissions(data.page_permission_id, session, logger)
+        if missing_permissions:
             return ResponseBO(
                 code=404,
                 status="NOT FOUND",
-                data=None,
-                message=f"One or more page permissions not found: {data.page_permission_id}"
+                data={"missing_ids": missing_permissions},
+                message=f"One or more page permissions not found: {missing_permissions}"
             )
 
         # Create page permission mapping and retrieve the updated service as DTO
-        response = await subscription_service.create_page_permissions_mapping(data.service_id, data.page_permission_id, logger)
+        response = await subscription_service.create_page_permissions_mapping(data.service_id, data.page_permission_id, session, logger)
 
         return response
 
@@ -1306,3 +1688,44 @@ async def create_service_page_permissions_mapping(data: ServiceApiPagePermission
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+
+@subscription_router.get("/entitlements/check", response_model=ResponseBO)
+async def check_entitlement(
+        subscription_id: int = Query(..., description="Subscription to check"),
+        method: str = Query(..., description="HTTP method of the call"),
+        path: str = Query(..., description="Request path of the call")
+):
+    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+
+    try:
+        logger.info(f"Received entitlement check for subscription ID {subscription_id}: {method} {path}")
+        result = entitlement_service.check_entitlement(subscription_id, method, path, logger)
+
+        if result is None:
+            return ResponseBO(
+                code=503,
+                status="SERVICE UNAVAILABLE",
+                data=None,
+                message="The entitlement index is still loading. Please try again shortly."
+            )
+
+        if not result["subscription_exists"]:
+            return ResponseBO(
+                code=404,
+                status="NOT FOUND",
+                data=result,
+                message=f"Subscription with ID {subscription_id} not found."
+            )
+
+        return ResponseBO(
+            code=200,
+            status="ALLOWED" if result["allowed"] else "DENIED",
+            data=result,
+            message="Access allowed." if result["allowed"] else "Access denied."
+        )
+
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
@@ -1,14 +1,16 @@
- app/routers/router.py
+# app/routers/user_router.py
 import uuid
-from typing import Optional
-from fastapi import APIRouter, HTTPException, status, Query
-from app.configuration.db import ConnectionManager
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.configuration.db import ConnectionManager, get_db_session
 from app.models.models import OrganizationEntity, UserEntity
-from app.models.pydantic_models import Register, CreateUser, UpdateUser, ResponseBO, PageableResponse, CreateRole, \
-    UpdatePermission
+from app.models.pydantic_models import Register, CreateUser, UpdateUser, CreateRole, UpdatePermission
+from app.models.response import ResponseBO, PageableResponse, CursorPageResponse
 from app.services.permission_service import PermissionService
-from app.services.user_service import UserService
+# from app.services.user_service import UserService
 from app.services.role_service import RoleService
+from app.services import user_search_service
 from app.configuration.logger import setup_logger
 
 role_router = APIRouter()
@@ -16,20 +18,20 @@ role_router = APIRouter()
 role_service = RoleService()
 
 @role_router.post("/create", response_model=ResponseBO)
-async def create_role(data: CreateRole):
+async def create_role(data: CreateRole, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request with data: {data}")
+        logger.debug("Received request with data: %s", data)
 
         # Check if the role already exists in the database
-        conflict = await role_service.check_role_exists(data.role, logger)
+        conflict = await role_service.check_role_exists(data.role, session, logger)
         if conflict:
             raise HTTPException(status_code=409, detail=f"Role '{data.role}' already exists.")
 
         # Proceed with role creation if no conflict
-        result = await role_service.create_role(data, logger)
+        result = await role_service.create_role(data, session, logger)
 
         if not result:
             raise HTTPException(status_code=404, detail="Failed to create role")
@@ -52,50 +54,49 @@ async def create_role(data: CreateRole):
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 @role_router.put("/update/{role_id}", response_model=ResponseBO)
-async def update_role(role_id: int, data: CreateRole):
+async def update_role(role_id: int, data: CreateRole, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
-    async with ConnectionManager() as session:
-        try:
-            logger.info(f"Received request to update role with ID {role_id} and data: {data}")
+    try:
+        logger.debug("Received request to update role with ID %s and data: %s", role_id, data)
 
-            # Check if the role already exists
-            if await role_service.role_exists(session, data.role, role_id):
-                logger.error(f"Conflict: Role '{data.role}' already exists.")
-                raise HTTPException(status_code=409, detail=f"Role '{data.role}' already exists.")
+        # Check if the role already exists
+        if await role_service.role_exists(session, data.role, role_id):
+            logger.error(f"Conflict: Role '{data.role}' already exists.")
+            raise HTTPException(status_code=409, detail=f"Role '{data.role}' already exists.")
 
-            result = await role_service.update_role(role_id, data, logger)
+        result = await role_service.update_role(role_id, data, session, logger)
 
-            if not result:
-                raise HTTPException(status_code=404, detail="Role not found or update failed")
+        if not result:
+            raise HTTPException(status_code=404, detail="Role not found or update failed")
 
-            return ResponseBO(
-                code=200,  # OK status code
-                status="success",
-                message="Role updated successfully.",
-                embedded=result  # Assuming result contains the updated role information
-            )
+        return ResponseBO(
+            code=200,  # OK status code
+            status="success",
+            message="Role updated successfully.",
+            embedded=result  # Assuming result contains the updated role information
+        )
 
-        except HTTPException as http_exc:
-            logger.error(f"HTTPException occurred: {http_exc.detail}")
-            raise http_exc
-        except ValueError as ve:
-            logger.error(f"ValueError occurred: {ve}")
-            raise HTTPException(status_code=400, detail=f"Value error: {ve}")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+    except HTTPException as http_exc:
+        logger.error(f"HTTPException occurred: {http_exc.detail}")
+        raise http_exc
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {ve}")
+        raise HTTPException(status_code=400, detail=f"Value error: {ve}")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
 @role_router.get("/get/{role_id}", response_model=ResponseBO)
-async def get_role_by_id(role_id: int):
+async def get_role_by_id(role_id: int, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info(f"Received request to get role with ID {role_id}")
-        result = await role_service.get_role_by_id(role_id, logger)
+        result = await role_service.get_role_by_id(role_id, session, logger)
 
         if not result:
             raise HTTPException(status_code=404, detail="Role not found")
@@ -115,13 +116,13 @@ async def get_role_by_id(role_id: int):
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 @role_router.get("/get-role-by-user/{user_id}", response_model=ResponseBO)
-async def get_role_by_user_id(user_id: int):
+async def get_role_by_user_id(user_id: int, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info(f"Received request to get role for user with ID {user_id}")
-        result = await role_service.get_role_by_user_id(user_id, logger)
+        result = await role_service.get_role_by_user_id(user_id, session, logger)
 
         if not result:
             raise HTTPException(status_code=404, detail="Role not found for the specified user")
@@ -142,13 +143,13 @@ async def get_role_by_user_id(user_id: int):
 
 
 @role_router.get("/get_all", response_model=ResponseBO)
-async def get_all_roles():
+async def get_all_roles(session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
         logger.info("Received request to get all roles")
-        result = await role_service.get_all_roles(logger)
+        result = await role_service.get_all_roles(session, logger)
 
         return ResponseBO(
             code=200,  # OK status code
@@ -162,7 +163,7 @@ async def get_all_roles():
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 @role_router.delete("/delete/{role_id}", response_model=ResponseBO)
-async def delete_role(role_id: int):
+async def delete_role(role_id: int, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
@@ -170,12 +171,12 @@ async def delete_role(role_id: int):
         logger.info(f"Received request to delete role with ID {role_id}")
 
         # Check if the role is assigned to any users
-        conflict = await role_service.check_role_assigned_to_users(role_id, logger)
+        conflict = await role_service.check_role_assigned_to_users(role_id, session, logger)
         if conflict:
             raise HTTPException(status_code=409, detail="Role is assigned to users and cannot be deleted.")
 
         # Proceed with deletion if no conflict
-        result = await role_service.delete_role(role_id, logger)
+        result = await role_service.delete_role(role_id, session, logger)
 
         if not result:
             raise HTTPException(status_code=404, detail="Role not found or delete failed")
@@ -198,384 +199,444 @@ async def delete_role(role_id: int):
 
 user_router = APIRouter()
 
-user_service = UserService()
-
-@user_router.post("/register", response_model=ResponseBO)
-async def register_user(data: Register):
-    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
-    logger = setup_logger(worker_id)  # Set up logging with the worker_id
-
-    async with ConnectionManager() as session:
-        try:
-            logger.info(f"Received registration request with data: {data}")
-
-            # Check if any values already exist
-            checks = {
-                "email_id": data.email_id,
-                "mobile_no": data.mobile_no,
-                "gstin": data.organization.gstin,
-                "pan": data.organization.pan,
-                "tan": data.organization.tan,
-                "cin": data.organization.cin
-            }
-
-            # Check email and mobile in UserEntity
-            for field, identifier in checks.items():
-                if field in ["email_id", "mobile_no"] and await user_service.is_user_identifier_exists(session, logger, identifier, field):
-                    logger.warning(f"{field.replace('_', ' ').title()} already exists: {identifier}")
-                    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
-                                        detail=f"{field.replace('_', ' ').title()} already exists")
-
-            # Check GSTIN, PAN, TAN, and CIN in OrganizationEntity
-            for field, identifier in checks.items():
-                if field in ["gstin", "pan", "tan", "cin"] and await user_service.is_organization_identifier_exists(session, logger, identifier, field):
-                    logger.warning(f"{field.upper()} already exists: {identifier}")
-                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{field.upper()} already exists")
-
-            user = await user_service.register(data, logger)  # Call the register function
-
-            return ResponseBO(
-                code=201,
-                status="success",
-                message="User registered successfully.",
-                embedded=user  # or wrap user in another object if needed
-            )
-
-        except HTTPException as http_exc:
-            logger.error(f"HTTPException occurred: {http_exc.detail}")
-            raise http_exc
-        except ValueError as ve:
-            logger.error(f"ValueError occurred: {ve}")
-            raise HTTPException(status_code=400, detail=f"Value error: {ve}")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-@user_router.post("/create", response_model=ResponseBO)
-async def create_user(data: CreateUser):
-    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
-    logger = setup_logger(worker_id)  # Set up logging with the worker_id
-
-    async with ConnectionManager() as session:
-        try:
-            logger.info(f"Received create request with data: {data}")
-
-            # Check if any values already exist
-            checks = {
-                "email_id": data.email_id,
-                "mobile_no": data.mobile_no
-            }
-
-            # Check email and mobile in UserEntity
-            for field, identifier in checks.items():
-                if field in ["email_id", "mobile_no"] and await user_service.is_user_identifier_exists(session, logger,
-                                                                                                       identifier,
-                                                                                                       field):
-                    logger.warning(f"{field.replace('_', ' ').title()} already exists: {identifier}")
-                    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
-                                        detail=f"{field.replace('_', ' ').title()} already exists")
-
-            user = await user_service.create_user(data, logger)  # Call the create_user function
-
-            return ResponseBO(
-                code=201,
-                status="success",
-                message="User created successfully.",
-                embedded=user  # or wrap user in another object if needed
-            )
-
-        except HTTPException as http_exc:
-            logger.error(f"HTTPException occurred: {http_exc.detail}")
-            raise http_exc
-        except ValueError as ve:
-            logger.error(f"ValueError occurred: {ve}")
-            raise HTTPException(status_code=400, detail=f"Value error: {ve}")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-@user_router.put("/update/{user_id}", response_model=ResponseBO)
-async def update_user(user_id: int, data: UpdateUser):
-    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
-    logger = setup_logger(worker_id)  # Set up logging with the worker_id
-
-    async with ConnectionManager() as session:
-        try:
-            logger.info(f"Received update request for user_id: {user_id} with data: {data}")
-
-            # Fetch the existing user
-            existing_user = await user_service.fetch_existing_user(session, user_id, logger)
-
-            if not existing_user:
-                logger.error(f"User not found: {user_id}")
-                raise HTTPException(status_code=404, detail="User not found.")
-
-            # Check for mobile number uniqueness
-            if not await user_service.check_unique_value(session, UserEntity, 'mobile_no', data.mobile_no, exclude_id=user_id):
-                logger.error(f"Mobile number already exists: {data.mobile_no}")
-                raise HTTPException(status_code=409, detail="Mobile number already exists.")
-
-            # Check for organization-related fields if organization data is provided
-            if data.organization:
-                organization_fields = ['gstin', 'pan', 'tan', 'cin']
-                for field in organization_fields:
-                    value = getattr(data.organization, field, None)
-                    if not await user_service.check_unique_value(session, OrganizationEntity, field, value, exclude_id=existing_user.organization_id):
-                        logger.error(f"{field.upper()} already exists: {value}")
-                        raise HTTPException(status_code=409, detail=f"{field.upper()} already exists.")
-
-            # Call the update_user function and get the updated user information
-            updated_user = await user_service.update_user(user_id, data, logger)
-
-            return ResponseBO(
-                code=200,
-                status="success",
-                message="User updated successfully.",
-                embedded=updated_user  # or wrap updated_user in another object if needed
-            )
-
-        except HTTPException as http_exc:
-            logger.error(f"HTTPException occurred: {http_exc.detail}")
-            raise http_exc
-        except ValueError as ve:
-            logger.error(f"ValueError occurred: {ve}")
-            raise HTTPException(status_code=400, detail=f"Value error: {ve}")
-        except Exception as e:
-            logger.error(f"Unexpected error occurred: {e}")
-            await session.rollback()
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-
-@user_router.get("/get/{user_id}", response_model=ResponseBO)
-async def get_user(user_id: int):
+# UserService is disabled along with app/services/user_service.py; the endpoints using it are
+# commented out until it is restored
+# user_service = UserService()
+
+# @user_router.post("/register", response_model=ResponseBO)
+# async def register_user(data: Register):
+#     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+#     logger = setup_logger(worker_id)  # Set up logging with the worker_id
+#
+#     async with ConnectionManager() as session:
+#         try:
+#             logger.debug("Received registration request with data: %s", data)
+#
+#             # Check if any values already exist
+#             checks = {
+#                 "email_id": data.email_id,
+#                 "mobile_no": data.mobile_no,
+#                 "gstin": data.organization.gstin,
+#                 "pan": data.organization.pan,
+#                 "tan": data.organization.tan,
+#                 "cin": data.organization.cin
+#             }
+#
+#             # Check email and mobile in UserEntity
+#             for field, identifier in checks.items():
+#                 if field in ["email_id", "mobile_no"] and await user_service.is_user_identifier_exists(session, logger, identifier, field):
+#                     logger.warning(f"{field.replace('_', ' ').title()} already exists: {identifier}")
+#                     raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+#                                         detail=f"{field.replace('_', ' ').title()} already exists")
+#
+#             # Check GSTIN, PAN, TAN, and CIN in OrganizationEntity
+#             for field, identifier in checks.items():
+#                 if field in ["gstin", "pan", "tan", "cin"] and await user_service.is_organization_identifier_exists(session, logger, identifier, field):
+#                     logger.warning(f"{field.upper()} already exists: {identifier}")
+#                     raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{field.upper()} already exists")
+#
+#             user = await user_service.register(data, logger)  # Call the register function
+#
+#             return ResponseBO(
+#                 code=201,
+#                 status="success",
+#                 message="User registered successfully.",
+#                 embedded=user  # or wrap user in another object if needed
+#             )
+#
+#         except HTTPException as http_exc:
+#             logger.error(f"HTTPException occurred: {http_exc.detail}")
+#             raise http_exc
+#         except ValueError as ve:
+#             logger.error(f"ValueError occurred: {ve}")
+#             raise HTTPException(status_code=400, detail=f"Value error: {ve}")
+#         except Exception as e:
+#             logger.error(f"An unexpected error occurred: {e}")
+#             raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+#
+# @user_router.post("/create", response_model=ResponseBO)
+# async def create_user(data: CreateUser):
+#     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+#     logger = setup_logger(worker_id)  # Set up logging with the worker_id
+#
+#     async with ConnectionManager() as session:
+#         try:
+#             logger.debug("Received create request with data: %s", data)
+#
+#             # Check if any values already exist
+#             checks = {
+#                 "email_id": data.email_id,
+#                 "mobile_no": data.mobile_no
+#             }
+#
+#             # Check email and mobile in UserEntity
+#             for field, identifier in checks.items():
+#                 if field in ["email_id", "mobile_no"] and await user_service.is_user_identifier_exists(session, logger,
+#                                                                                                        identifier,
+#                                                                                                        field):
+#                     logger.warning(f"{field.replace('_', ' ').title()} already exists: {identifier}")
+#                     raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+#                                         detail=f"{field.replace('_', ' ').title()} already exists")
+#
+#             user = await user_service.create_user(data, logger)  # Call the create_user function
+#
+#             return ResponseBO(
+#                 code=201,
+#                 status="success",
+#                 message="User created successfully.",
+#                 embedded=user  # or wrap user in another object if needed
+#             )
+#
+#         except HTTPException as http_exc:
+#             logger.error(f"HTTPException occurred: {http_exc.detail}")
+#             raise http_exc
+#         except ValueError as ve:
+#             logger.error(f"ValueError occurred: {ve}")
+#             raise HTTPException(status_code=400, detail=f"Value error: {ve}")
+#         except Exception as e:
+#             logger.error(f"An unexpected error occurred: {e}")
+#             raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+#
+# @user_router.put("/update/{user_id}", response_model=ResponseBO)
+# async def update_user(user_id: int, data: UpdateUser):
+#     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+#     logger = setup_logger(worker_id)  # Set up logging with the worker_id
+#
+#     async with ConnectionManager() as session:
+#         try:
+#             logger.debug("Received update request for user_id: %s with data: %s", user_id, data)
+#
+#             # Fetch the existing user
+#             existing_user = await user_service.fetch_existing_user(session, user_id, logger)
+#
+#             if not existing_user:
+#                 logger.error(f"User not found: {user_id}")
+#                 raise HTTPException(status_code=404, detail="User not found.")
+#
+#             # Check for mobile number uniqueness
+#             if not await user_service.check_unique_value(session, UserEntity, 'mobile_no', data.mobile_no, exclude_id=user_id):
+#                 logger.error(f"Mobile number already exists: {data.mobile_no}")
+#                 raise HTTPException(status_code=409, detail="Mobile number already exists.")
+#
+#             # Check for organization-related fields if organization data is provided
+#             if data.organization:
+#                 organization_fields = ['gstin', 'pan', 'tan', 'cin']
+#                 for field in organization_fields:
+#                     value = getattr(data.organization, field, None)
+#                     if not await user_service.check_unique_value(session, OrganizationEntity, field, value, exclude_id=existing_user.organization_id):
+#                         logger.error(f"{field.upper()} already exists: {value}")
+#                         raise HTTPException(status_code=409, detail=f"{field.upper()} already exists.")
+#
+#             # Call the update_user function and get the updated user information
+#             updated_user = await user_service.update_user(user_id, data, logger)
+#
+#             return ResponseBO(
+#                 code=200,
+#                 status="success",
+#                 message="User updated successfully.",
+#                 embedded=updated_user  # or wrap updated_user in another object if needed
+#             )
+#
+#         except HTTPException as http_exc:
+#             logger.error(f"HTTPException occurred: {http_exc.detail}")
+#             raise http_exc
+#         except ValueError as ve:
+#             logger.error(f"ValueError occurred: {ve}")
+#             raise HTTPException(status_code=400, detail=f"Value error: {ve}")
+#         except Exception as e:
+#             logger.error(f"Unexpected error occurred: {e}")
+#             await session.rollback()
+#             raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+#
+#
+# @user_router.get("/get/{user_id}", response_model=ResponseBO)
+# async def get_user(user_id: int):
+#     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+#     logger = setup_logger(worker_id)  # Set up logging with the worker_id
+#
+#     try:
+#         logger.info(f"Received request to fetch user by ID: {user_id}")
+#         user = await user_service.get_by_id(user_id, logger)
+#
+#         if user is None:
+#             logger.warning(f"No user found with ID: {user_id}")
+#             return ResponseBO(
+#                 code=404,
+#                 status="failure",
+#                 message="User not found",
+#                 embedded=None
+#             )
+#
+#         return ResponseBO(
+#             code=200,
+#             status="success",
+#             message="User found",
+#             embedded=user  # or wrap user in another object if needed
+#         )
+#
+#     except Exception as e:
+#         logger.error(f"Unexpected error occurred: {e}")
+#         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+#
+# @user_router.get("/get/username/{username}", response_model=ResponseBO)
+# async def get_user_by_username(username: str):
+#     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+#     logger = setup_logger(worker_id)  # Set up logging with the worker_id
+#
+#     try:
+#         logger.info(f"Received request to fetch user by username: {username}")
+#         user = await user_service.get_by_username(username, logger)
+#
+#         if user is None:
+#             logger.warning(f"No user found with username: {username}")
+#             return ResponseBO(
+#                 code=404,
+#                 status="failure",
+#                 message="User not found",
+#                 embedded=None
+#             )
+#
+#         return ResponseBO(
+#             code=200,
+#             status="success",
+#             message="User found",
+#             embedded=user  # or wrap user in another object if needed
+#         )
+#
+#     except Exception as e:
+#         logger.error(f"Unexpected error occurred: {e}")
+#         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+#
+# @user_router.get("/get/role/{role_id}", response_model=ResponseBO)
+# async def get_user_by_role_id(role_id: int):
+#     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+#     logger = setup_logger(worker_id)  # Set up logging with the worker_id
+#
+#     try:
+#         logger.info(f"Received request to fetch users by role ID: {role_id}")
+#         users = await user_service.get_by_role_id(role_id, logger)
+#
+#         if not users:
+#             logger.warning(f"No users found with role ID: {role_id}")
+#             return ResponseBO(
+#                 code=404,
+#                 status="failure",
+#                 message="No users found for the given role ID",
+#                 embedded=None
+#             )
+#
+#         return ResponseBO(
+#             code=200,
+#             status="success",
+#             message="Users found",
+#             embedded=users  # Wrap users in another object if needed
+#         )
+#
+#     except Exception as e:
+#         logger.error(f"Unexpected error occurred: {e}")
+#         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+#
+#
+# @user_router.get("/get_all", response_model=PageableResponse)
+# async def get_all_users(
+#     size: int = Query(10, description="Number of users per page"),
+#     page: int = Query(1, description="Page number"),
+#     search_key: Optional[str] = Query(None, description="Search keyword")
+# ):
+#     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+#     logger = setup_logger(worker_id)  # Set up logging with the worker_id
+#
+#     try:
+#         logger.info(f"Received request to fetch all users - page: {page}, size: {size}, searchKey: {search_key}")
+#         # Fetch paginated users
+#         paginated_data = await user_service.get_all(logger, page, size, search_key)
+#
+#         if not paginated_data["data"]:
+#             logger.warning("No users found")
+#
+#         # Return paginated response
+#         return PageableResponse(
+#             code=200,
+#             status="success",
+#             page=page,
+#             size=size,
+#             embedded=paginated_data["data"],  # Users DTOs
+#             message="Fetched all users successfully",
+#             totalPages=paginated_data["total_pages"],
+#             totalElements=paginated_data["total_elements"]
+#         )
+#
+#     except Exception as e:
+#         logger.error(f"Unexpected error occurred: {e}")
+#         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+
+@user_router.get("/search", response_model=PageableResponse)
+async def search_users(
+    search_key: str = Query(..., min_length=1, description="Words to match against user, address and organization"),
+    size: int = Query(10, ge=1, le=100, description="Number of users per page"),
+    page: int = Query(1, ge=1, description="Page number"),
+    session: AsyncSession = Depends(get_db_session)
+):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request to fetch user by ID: {user_id}")
-        user = await user_service.get_by_id(user_id, logger)
-
-        if user is None:
-            logger.warning(f"No user found with ID: {user_id}")
-            return ResponseBO(
-                code=404,
-                status="failure",
-                message="User not found",
-                embedded=None
-            )
+        logger.info(f"Received request to search users - page: {page}, size: {size}, searchKey: {search_key}")
 
-        return ResponseBO(
+        # Ranked lookup in the user search token index
+        search_data = await user_search_service.search_users(search_key, page, size, session, logger)
+
+        return PageableResponse(
             code=200,
             status="success",
-            message="User found",
-            embedded=user  # or wrap user in another object if needed
+            page=page,
+            size=size,
+            embedded=search_data["data"],  # User search results, best match first
+            message="Fetched matching users successfully",
+            totalPages=search_data["total_pages"],
+            totalElements=search_data["total_elements"],
+            totalExact=search_data["total_exact"]
         )
 
     except Exception as e:
         logger.error(f"Unexpected error occurred: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
-@user_router.get("/get/username/{username}", response_model=ResponseBO)
-async def get_user_by_username(username: str):
-    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
-    logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
-    try:
-        logger.info(f"Received request to fetch user by username: {username}")
-        user = await user_service.get_by_username(username, logger)
-
-        if user is None:
-            logger.warning(f"No user found with username: {username}")
-            return ResponseBO(
-                code=404,
-                status="failure",
-                message="User not found",
-                embedded=None
-            )
+# @user_router.delete("/delete/{user_id}", status_code=status.HTTP_200_OK)
+# async def delete_user(user_id: int):
+#     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
+#     logger = setup_logger(worker_id)  # Set up logging with the worker_id
+#
+#     try:
+#         logger.info(f"Received request to delete user with ID: {user_id}")
+#         # Call the delete_user function
+#         await user_service.delete_user(user_id, logger)
+#
+#         return ResponseBO(
+#             code=200,
+#             status="success",
+#             message=f"User with ID {user_id} has been successfully deleted.",
+#             embedded=None
+#         )
+#
+#     except HTTPException as http_exc:
+#         logger.error(f"HTTPException occurred: {http_exc.detail}")
+#         raise http_exc
+#     except Exception as e:
+#         logger.error(f"An unexpected error occurred while deleting user: {e}")
+#         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
-        return ResponseBO(
-            code=200,
-            status="success",
-            message="User found",
-            embedded=user  # or wrap user in another object if needed
-        )
+permission_router = APIRouter()
+# The paginated permission listing on its own, for mounting without the rest of permission_router
+permission_page_router = APIRouter()
 
-    except Exception as e:
-        logger.error(f"Unexpected error occurred: {e}")
-        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+permission_service = PermissionService()
 
-@user_router.get("/get/role/{role_id}", response_model=ResponseBO)
-async def get_user_by_role_id(role_id: int):
+@permission_router.put("/update/{permission_id}", response_model=ResponseBO)
+async def update_permission(permission_id: int, data: UpdatePermission, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request to fetch users by role ID: {role_id}")
-        users = await user_service.get_by_role_id(role_id, logger)
-
-        if not users:
-            logger.warning(f"No users found with role ID: {role_id}")
-            return ResponseBO(
-                code=404,
-                status="failure",
-                message="No users found for the given role ID",
-                embedded=None
-            )
-
-        return ResponseBO(
-            code=200,
-            status="success",
-            message="Users found",
-            embedded=users  # Wrap users in another object if needed
-        )
+        logger.debug("Received request to update permission with ID %s and data: %s", permission_id, data)
 
-    except Exception as e:
-        logger.error(f"Unexpected error occurred: {e}")
-        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-
-@user_router.get("/get_all", response_model=PageableResponse)
-async def get_all_users(
-    size: int = Query(10, description="Number of users per page"),
-    page: int = Query(1, description="Page number"),
-    search_key: Optional[str] = Query(None, description="Search keyword")
-):
-    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
-    logger = setup_logger(worker_id)  # Set up logging with the worker_id
+        # Check if the permission already exists
+        # if await permission_service.permission_exists(session, data.name, permission_id):
+        #     logger.error(f"Conflict: Permission '{data.name}' already exists.")
+        #     raise HTTPException(status_code=409, detail=f"Permission '{data.name}' already exists.")
 
-    try:
-        logger.info(f"Received request to fetch all users - page: {page}, size: {size}, searchKey: {search_key}")
-        # Fetch paginated users
-        paginated_data = await user_service.get_all(logger, page, size, search_key)
+        result = await permission_service.update_permission(permission_id, data, session, logger)
 
-        if not paginated_data["data"]:
-            logger.warning("No users found")
+        if not result:
+            raise HTTPException(status_code=404, detail="Permission not found or update failed")
 
-        # Return paginated response
-        return PageableResponse(
-            code=200,
+        return ResponseBO(
+            code=200,  # OK status code
             status="success",
-            page=page,
-            size=size,
-            embedded=paginated_data["data"],  # Users DTOs
-            message="Fetched all users successfully",
-            totalPages=paginated_data["total_pages"],
-            totalElements=paginated_data["total_elements"]
+            message="Permission updated successfully.",
+            embedded=result  # Assuming result contains the updated permission information
         )
 
+    except HTTPException as http_exc:
+        logger.error(f"HTTPException occurred: {http_exc.detail}")
+        raise http_exc
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {ve}")
+        raise HTTPException(status_code=400, detail=f"Value error: {ve}")
     except Exception as e:
-        logger.error(f"Unexpected error occurred: {e}")
+        logger.error(f"An unexpected error occurred: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
-
-@user_router.delete("/delete/{user_id}", status_code=status.HTTP_200_OK)
-async def delete_user(user_id: int):
+@permission_router.get("/get/{permission_id}", response_model=ResponseBO)
+async def get_permission(permission_id: int, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
     try:
-        logger.info(f"Received request to delete user with ID: {user_id}")
-        # Call the delete_user function
-        await user_service.delete_user(user_id, logger)
+        logger.info(f"Received request to get permission with ID {permission_id}")
+
+        # Fetch the permission by ID
+        permission_dto = await permission_service.get_permission_by_id(permission_id, session, logger)
+
+        if not permission_dto:
+            raise HTTPException(status_code=404, detail="Permission not found")
 
         return ResponseBO(
             code=200,
             status="success",
-            message=f"User with ID {user_id} has been successfully deleted.",
-            embedded=None
+            message="Permission retrieved successfully.",
+            embedded=permission_dto  # Return the permission DTO in the response
         )
 
     except HTTPException as http_exc:
         logger.error(f"HTTPException occurred: {http_exc.detail}")
         raise http_exc
     except Exception as e:
-        logger.error(f"An unexpected error occurred while deleting user: {e}")
+        logger.error(f"An unexpected error occurred: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
-permission_router = APIRouter()
-
-permission_service = PermissionService()
-
-@permission_router.put("/update/{permission_id}", response_model=ResponseBO)
-async def update_permission(permission_id: int, data: UpdatePermission):
-    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
-    logger = setup_logger(worker_id)  # Set up logging with the worker_id
-
-    async with ConnectionManager() as session:
-        try:
-            logger.info(f"Received request to update permission with ID {permission_id} and data: {data}")
-
-            # Check if the permission already exists
-            # if await permission_service.permission_exists(session, data.name, permission_id):
-            #     logger.error(f"Conflict: Permission '{data.name}' already exists.")
-            #     raise HTTPException(status_code=409, detail=f"Permission '{data.name}' already exists.")
 
-            result = await permission_service.update_permission(permission_id, data, logger)
-
-            if not result:
-                raise HTTPException(status_code=404, detail="Permission not found or update failed")
-
-            return ResponseBO(
-                code=200,  # OK status code
-                status="success",
-                message="Permission updated successfully.",
-                embedded=result  # Assuming result contains the updated permission information
-            )
-
-        except HTTPException as http_exc:
-            logger.error(f"HTTPException occurred: {http_exc.detail}")
-            raise http_exc
-        except ValueError as ve:
-            logger.error(f"ValueError occurred: {ve}")
-            raise HTTPException(status_code=400, detail=f"Value error: {ve}")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-@permission_router.get("/get/{permission_id}", response_model=ResponseBO)
-async def get_permission(permission_id: int):
+@permission_page_router.get("/get_all", response_model=Union[PageableResponse, CursorPageResponse])
+@permission_router.get("/get_all", response_model=Union[PageableResponse, CursorPageResponse])
+async def get_all_permissions(
+        size: int = Query(10, description="Number of permissions per page"),
+        page: int = Query(1, description="Page number"),
+        search_key: Optional[str] = Query(None, description="Search keyword"),
+        after: Optional[str] = Query(None, description="Cursor from a previous page's nextCursor (cursor mode)"),
+        limit: Optional[int] = Query(None, ge=1, le=1000, description="Permissions per page (cursor mode)"),
+        include_total: bool = Query(False, description="Also count the matching permissions (cursor mode)"),
+        session: AsyncSession = Depends(get_db_session)
+):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
-    async with ConnectionManager() as session:
-        try:
-            logger.info(f"Received request to get permission with ID {permission_id}")
-
-            # Fetch the permission by ID
-            permission_dto = await permission_service.get_permission_by_id(permission_id, session, logger)
+    try:
+        if after is not None or limit is not None:
+            limit = limit or size
+            logger.info(f"Received request to fetch permissions by cursor - after: {after}, limit: {limit}, "
+                        f"searchKey: {search_key}, includeTotal: {include_total}")
 
-            if not permission_dto:
-                raise HTTPException(status_code=404, detail="Permission not found")
+            cursor_data = await permission_service.get_all_after(session, logger, limit, after, search_key,
+                                                                 include_total)
 
-            return ResponseBO(
+            return CursorPageResponse(
                 code=200,
                 status="success",
-                message="Permission retrieved successfully.",
-                embedded=permission_dto  # Return the permission DTO in the response
+                limit=limit,
+                embedded=cursor_data["data"],  # Permissions DTOs
+                message="Fetched all permissions successfully",
+                nextCursor=cursor_data["next_cursor"],
+                hasMore=cursor_data["has_more"],
+                totalElements=cursor_data["total_elements"],
+                totalExact=cursor_data["total_exact"]
             )
 
-        except HTTPException as http_exc:
-            logger.error(f"HTTPException occurred: {http_exc.detail}")
-            raise http_exc
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-
-@permission_router.get("/get_all", response_model=PageableResponse)
-async def get_all_permissions(
-        size: int = Query(10, description="Number of permissions per page"),
-        page: int = Query(1, description="Page number"),
-        search_key: Optional[str] = Query(None, description="Search keyword")
-):
-    worker_id = str(uuid.uuid4())  # Generate a unique worker_id
-    logger = setup_logger(worker_id)  # Set up logging with the worker_id
-
-    try:
         logger.info(f"Received request to fetch all permissions - page: {page}, size: {size}, searchKey: {search_key}")
 
         # Fetch paginated permissions
-        paginated_data = await permission_service.get_all(logger, page, size, search_key)
+        paginated_data = await permission_service.get_all(session, logger, page, size, search_key)
 
         if not paginated_data["data"]:
             logger.warning("No permissions found")
@@ -589,16 +650,20 @@ async def get_all_permissions(
             embedded=paginated_data["data"],  # Permissions DTOs
             message="Fetched all permissions successfully",
             totalPages=paginated_data["total_pages"],
-            totalElements=paginated_data["total_elements"]
+            totalElements=paginated_data["total_elements"],
+            totalExact=paginated_data["total_exact"]
         )
 
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {ve}")
+        raise HTTPException(status_code=400, detail=f"Value error: {ve}")
     except Exception as e:
         logger.error(f"Unexpected error occurred: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
 @permission_router.delete("/delete/{permission_id}", response_model=ResponseBO)
-async def delete_permission(permission_id: int):
+async def delete_permission(permission_id: int, session: AsyncSession = Depends(get_db_session)):
     worker_id = str(uuid.uuid4())  # Generate a unique worker_id
     logger = setup_logger(worker_id)  # Set up logging with the worker_id
 
@@ -606,12 +671,12 @@ async def delete_permission(permission_id: int):
         logger.info(f"Received request to delete permission with ID {permission_id}")
 
         # Check if the permission is assigned to any users
-        conflict = await permission_service.check_permission_assigned_to_users(permission_id, logger)
+        conflict = await permission_service.check_permission_assigned_to_users(permission_id, session, logger)
         if conflict:
             raise HTTPException(status_code=409, detail="Permission is assigned to users and cannot be deleted.")
 
         # Proceed with deletion if no conflict
-        result = await permission_service.delete_permission(permission_id, logger)
+        result = await permission_service.delete_permission(permission_id, session, logger)
 
         if not result:
             raise HTTPException(status_code=404, detail="Permission not found or delete failed")
@@ -0,0 +1,160 @@
+# app/services/catalog_cache.py
+
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Hashable, Iterable
+
+from app.configuration.config import Config
+from app.configuration.db import engine, read_engine
+
+# Returned by get() on a miss, so a cached empty list or None is still a hit
+MISS = object()
+
+# List tags: dropped whenever a row is created or removed, or may enter/leave a filtered list
+SUBSCRIPTION_LIST = "subscription:list"
+SERVICE_LIST = "service:list"
+
+
+def subscription_tag(subscription_id: int):
+    return ("subscription", subscription_id)
+
+
+def service_tag(service_id: int):
+    return ("service", service_id)
+
+
+def api_permission_tag(api_permission_id: int):
+    return ("api_permission", api_permission_id)
+
+
+def page_permission_tag(page_permission_id: int):
+    return ("page_permission", page_permission_id)
+
+
+def service_dto_tags(services) -> set:
+    tags = set()
+    for service in services:
+        tags.add(service_tag(service.id))
+        tags.update(api_permission_tag(permission.id) for permission in service.api_permissions or [])
+        tags.update(page_permission_tag(permission.id) for permission in service.page_permissions or [])
+    return tags
+
+
+def subscription_dto_tags(subscriptions) -> set:
+    tags = set()
+    for subscription in subscriptions:
+        tags.add(subscription_tag(subscription.id))
+        tags.update(service_dto_tags(subscription.services or []))
+    return tags
+
+
+class CatalogCache:
+    """LRU cache of catalog DTO graphs, invalidated by the tags of the rows each entry was built from.
+
+    Every invalidation bumps ``version``. Readers capture the version before going to the
+    database and pass it to ``set``; if a write committed in between, the result is dropped
+    instead of caching a graph that may already be stale.
+
+    Tags only see the writes of this process. Entries are therefore also stamped with a
+    ``generation``, the catalog ETag the request read before building them; a ``get`` with a
+    different generation (another worker wrote since) is a miss, so a body is never older
+    than the validators it is sent with. Callers without a generation (reads inside a write path)
+    bypass the cache: they neither see nor replace the versioned entries.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, settle_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # With a lagging replica, results read shortly after a write may predate it
+        self.settle_seconds = settle_seconds
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bypasses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._keys_by_tag = defaultdict(set)
+        self._last_invalidated = float("-inf")
+
+    def get(self, key: Hashable, generation: Hashable = None) -> Any:
+        if generation is None:
+            self.bypasses += 1
+            return MISS
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISS
+        value, tags, expires_at, entry_generation = entry
+        if expires_at < time.monotonic() or entry_generation != generation:
+            self._discard(key)
+            self.misses += 1
+            return MISS
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable], version: int,
+            generation: Hashable = None) -> bool:
+        if generation is None or version != self.version or self.max_entries <= 0:
+            return False
+        if time.monotonic() - self._last_invalidated < self.settle_seconds:
+            return False
+        self._discard(key)
+        tags = frozenset(tags)
+        self._entries[key] = (value, tags, time.monotonic() + self.ttl_seconds, generation)
+        for tag in tags:
+            self._keys_by_tag[tag].add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+        return True
+
+    def invalidate(self, *tags: Hashable) -> int:
+        """Drop every entry built from any of the given tags; returns the number dropped."""
+        self.version += 1
+        self.invalidations += 1
+        self._last_invalidated = time.monotonic()
+        keys = set()
+        for tag in tags:
+            keys.update(self._keys_by_tag.get(tag, ()))
+        for key in keys:
+            self._discard(key)
+        return len(keys)
+
+    def clear(self):
+        self.version += 1
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+    def _discard(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "bypasses": self.bypasses,
+        }
+
+
+catalog_cache = CatalogCache(
+    max_entries=Config.CATALOG_CACHE_MAX_ENTRIES,
+    ttl_seconds=Config.CATALOG_CACHE_TTL_SECONDS,
+    settle_seconds=Config.READ_YOUR_WRITES_SECONDS if read_engine is not engine else 0,
+)
@@ -0,0 +1,102 @@
+# app/services/catalog_export_service.py
+"""Streaming exports of the catalog and permission tables as NDJSON or CSV.
+
+Rows come from a server-side cursor (``yield_per``) and are encoded EXPORT_BATCH_ROWS at a time,
+so memory stays flat whatever the table size and the first bytes go out after the first batch.
+The ``catalog`` export is the subscription -> service -> permission sheet in the layout
+catalog_import_service reads back.
+"""
+
+import csv
+import io
+import logging
+from enum import Enum
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import literal, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.configuration.config import Config
+from app.models.models import SubscriptionEntity, ServiceEntity, SubscriptionServicesMapping, ApiPermissionEntity, \
+    ServiceApiPermissionsMapping, PagePermissionEntity, ServiceApiPagePermissionsMapping
+from app.utils.fast_json import dumps
+
+NDJSON = "ndjson"
+CSV = "csv"
+MEDIA_TYPES = {NDJSON: "application/x-ndjson", CSV: "text/csv; charset=utf-8"}
+
+CATALOG = "catalog"
+
+
+def _table_export(entity):
+    return lambda: select(entity.__table__).order_by(entity.id)
+
+
+def _catalog_export():
+    """One row per (subscription, service, API permission), a row without one for services that have none,
+    and one row per page permission; subscriptions without services are left out."""
+    plan = (SubscriptionEntity.name.label("subscription"), SubscriptionEntity.validity,
+            SubscriptionEntity.subscription_type, SubscriptionEntity.cost,
+            SubscriptionEntity.active_status.label("subscription_active_status"),
+            ServiceEntity.name.label("service"), ServiceEntity.description.label("service_description"),
+            ServiceEntity.active_status.label("service_active_status"))
+    pairs = (
+        lambda statement: statement
+        .select_from(SubscriptionServicesMapping)
+        .join(SubscriptionEntity, SubscriptionEntity.id == SubscriptionServicesMapping.subscription_id)
+        .join(ServiceEntity, ServiceEntity.id == SubscriptionServicesMapping.service_id)
+    )
+    api_rows = pairs(select(*plan, ApiPermissionEntity.name.label("api_permission"),
+                            null().label("page_permission"), SubscriptionEntity.id.label("subscription_id"),
+                            ServiceEntity.id.label("service_id"), literal(0).label("kind"))) \
+        .outerjoin(ServiceApiPermissionsMapping, ServiceApiPermissionsMapping.service_id == ServiceEntity.id) \
+        .outerjoin(ApiPermissionEntity, ApiPermissionEntity.id == ServiceApiPermissionsMapping.api_permission_id)
+    page_rows = pairs(select(*plan, null().label("api_permission"), PagePermissionEntity.name.label("page_permission"),
+                             SubscriptionEntity.id.label("subscription_id"), ServiceEntity.id.label("service_id"),
+                             literal(1).label("kind"))) \
+        .join(ServiceApiPagePermissionsMapping, ServiceApiPagePermissionsMapping.service_id == ServiceEntity.id) \
+        .join(PagePermissionEntity, PagePermissionEntity.id == ServiceApiPagePermissionsMapping.page_permission_id)
+    rows = union_all(api_rows, page_rows).subquery()
+    return (select(*(column for column in rows.c if column.key not in ("subscription_id", "service_id", "kind")))
+            .order_by(rows.c.subscription_id, rows.c.service_id, rows.c.kind, rows.c.api_permission,
+                      rows.c.page_permission))
+
+
+# export name -> statement factory
+EXPORTS = {
+    "subscriptions": _table_export(SubscriptionEntity),
+    "services": _table_export(ServiceEntity),
+    "api_permissions": _table_export(ApiPermissionEntity),
+    "page_permissions": _table_export(PagePermissionEntity),
+    "subscription_services": _table_export(SubscriptionServicesMapping),
+    "service_api_permissions": _table_export(ServiceApiPermissionsMapping),
+    "service_page_permissions": _table_export(ServiceApiPagePermissionsMapping),
+    CATALOG: _catalog_export,
+}
+
+
+def encode_ndjson(columns: Sequence[str], rows) -> bytes:
+    return b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    # Enums as their value; None is written as an empty cell
+    writer.writerows([value.value if isinstance(value, Enum) else value for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_export(name: str, file_format: str, session: AsyncSession,
+                        logger: logging.Logger) -> AsyncIterator[bytes]:
+    """Encoded chunks of the ``name`` export, one per EXPORT_BATCH_ROWS rows (CSV starts with its header)."""
+    statement = EXPORTS[name]().execution_options(yield_per=Config.EXPORT_BATCH_ROWS)
+    result = await session.stream(statement)
+    columns = list(result.keys())
+    if file_format == CSV:
+        yield encode_csv([columns])
+    exported = 0
+    async for rows in result.partitions():
+        exported += len(rows)
+        yield encode_ndjson(columns, rows) if file_format == NDJSON else encode_csv(rows)
+    logger.info(f"Exported {exported} rows of {name} as {file_format}")
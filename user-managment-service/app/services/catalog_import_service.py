@@ -0,0 +1,584 @@
+# app/services/catalog_import_service.py
+"""Bulk import of the plan -> service -> API/page permission matrix from a CSV or XLSX sheet.
+
+One row per (subscription, service) pair, optionally naming one API and/or one page permission of the
+service; header names are case-insensitive:
+
+    subscription, service                                     required
+    validity, subscription_type, cost, subscription_active_status   plan attributes
+    service_description, service_active_status                service attributes
+    api_permission, page_permission                           existing permission names
+
+The file is authoritative for what it mentions: each listed subscription ends up mapped to exactly
+the services listed with it, and, when the column is present, each listed service to exactly the
+API (page) permissions listed with it. Subscriptions and services are created when missing, which
+takes every attribute in SUBSCRIPTION_CREATE_COLUMNS (SERVICE_CREATE_COLUMNS) on one of their rows, as
+the create endpoints require; on existing ones, blank attribute cells leave the stored value
+unchanged. Anything the file does not mention is untouched.
+
+The sheet is read in chunks of CATALOG_IMPORT_CHUNK_ROWS rows and validated column-wise with pandas,
+folding each chunk into name sets and pairs. That is diffed against the stored catalog, and the
+changes are written with batched Core statements in one transaction, or only reported (dry run).
+Any validation error rejects the whole file.
+
+    python -m app.services.catalog_import_service catalog.xlsx --dry-run
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import os
+import uuid
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.configuration.config import Config
+from app.configuration.query_budget import query_budget
+from app.models.models import SubscriptionType, SubscriptionEntity, ServiceEntity, SubscriptionServicesMapping, \
+    ApiPermissionEntity, ServiceApiPermissionsMapping, PagePermissionEntity, ServiceApiPagePermissionsMapping
+from app.services.catalog_cache import SUBSCRIPTION_LIST, SERVICE_LIST, subscription_tag, service_tag
+from app.services.catalog_version_service import bump_catalog_versions, SUBSCRIPTION, SERVICE, \
+    SUBSCRIPTION_SERVICES_MAPPING, SERVICE_API_PERMISSIONS_MAPPING, SERVICE_PAGE_PERMISSIONS_MAPPING
+from app.services.permission_tree_service import mark_permission_trees
+from app.services.subscription_expiry_service import refresh_expiry_sync
+from app.services.subscription_service import invalidate_catalog
+
+CSV = "csv"
+XLSX = "xlsx"
+FILE_FORMATS = (CSV, XLSX)
+
+REQUIRED_COLUMNS = ("subscription", "service")
+# file column -> SubscriptionEntity / ServiceEntity column
+SUBSCRIPTION_COLUMNS = {"validity": "validity", "subscription_type": "subscription_type", "cost": "cost",
+                        "subscription_active_status": "active_status"}
+SERVICE_COLUMNS = {"service_description": "description", "service_active_status": "active_status"}
+# Attributes a new subscription (service) must be given, the required fields of CreateSubscription (CreateService)
+SUBSCRIPTION_CREATE_COLUMNS = ("validity", "subscription_type", "cost", "subscription_active_status")
+SERVICE_CREATE_COLUMNS = ("service_active_status",)
+# file column -> (permission entity, mapping entity, mapping's permission id column, catalog version table)
+PERMISSION_COLUMNS = {
+    "api_permission": (ApiPermissionEntity, ServiceApiPermissionsMapping, "api_permission_id",
+                       SERVICE_API_PERMISSIONS_MAPPING),
+    "page_permission": (PagePermissionEntity, ServiceApiPagePermissionsMapping, "page_permission_id",
+                        SERVICE_PAGE_PERMISSIONS_MAPPING),
+}
+KNOWN_COLUMNS = set(REQUIRED_COLUMNS) | set(SUBSCRIPTION_COLUMNS) | set(SERVICE_COLUMNS) | set(PERMISSION_COLUMNS)
+
+NAME_LENGTH = SubscriptionEntity.__table__.c.name.type.length
+DESCRIPTION_LENGTH = ServiceEntity.__table__.c.description.type.length
+STATUS_VALUES = {"true": True, "yes": True, "y": True, "1": True, "active": True,
+                 "false": False, "no": False, "n": False, "0": False, "inactive": False}
+# Spreadsheet row of the first data row: the header is row 1
+FIRST_ROW = 2
+
+
+class CatalogImportError(ValueError):
+    """The file cannot be read as a catalog sheet (format, header)."""
+
+
+class ImportErrors:
+    """Validation errors, keeping the first CATALOG_IMPORT_MAX_ERRORS and counting the rest."""
+
+    def __init__(self):
+        self.items = []
+        self.count = 0
+
+    def add(self, row: Optional[int], column: Optional[str], message: str):
+        self.count += 1
+        if len(self.items) < Config.CATALOG_IMPORT_MAX_ERRORS:
+            self.items.append({"row": row, "column": column, "message": message})
+
+    def flag(self, frame: pd.DataFrame, mask: pd.Series, column: str, message: str):
+        """One error per row of ``frame`` selected by the boolean ``mask``."""
+        flagged = int(mask.sum())
+        if not flagged:
+            return
+        room = max(Config.CATALOG_IMPORT_MAX_ERRORS - len(self.items), 0)
+        for row in frame.index[mask][:room]:
+            self.items.append({"row": int(row), "column": column, "message": message})
+        self.count += flagged
+
+
+class CatalogFile:
+    """A catalog sheet folded into names, attributes and pairs; memory grows with distinct pairs, not rows."""
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+        self.rows = 0
+        self.errors = ImportErrors()
+        self.ignored_columns = [column for column in columns if column not in KNOWN_COLUMNS]
+        self.subscription_columns = [column for column in SUBSCRIPTION_COLUMNS if column in columns]
+        self.service_columns = [column for column in SERVICE_COLUMNS if column in columns]
+        self.permission_columns = [column for column in PERMISSION_COLUMNS if column in columns]
+        # name -> {file column: value} of the non-blank attribute cells, and name -> first row naming it
+        self.subscriptions: Dict[str, dict] = {}
+        self.services: Dict[str, dict] = {}
+        self.subscription_rows: Dict[str, int] = {}
+        self.service_rows: Dict[str, int] = {}
+        self.subscription_services = set()
+        # permission column -> {(service name, permission name)}, and permission name -> first row naming it
+        self.service_permissions = {column: set() for column in self.permission_columns}
+        self.permission_rows = {column: {} for column in self.permission_columns}
+
+
+def normalize_columns(columns) -> List[str]:
+    return [str(column).strip().lower().replace(" ", "_") for column in columns]
+
+
+def read_chunks(source, file_format: str) -> Iterator[pd.DataFrame]:
+    """The sheet as DataFrames of at most CATALOG_IMPORT_CHUNK_ROWS rows, every cell a string ("" when blank)."""
+    chunk_rows = Config.CATALOG_IMPORT_CHUNK_ROWS
+    if file_format == CSV:
+        try:
+            yield from pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False,
+                                   skipinitialspace=True)
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+            raise CatalogImportError(f"Unreadable CSV file: {e}")
+        return
+    if file_format != XLSX:
+        raise CatalogImportError(f"Unsupported file format '{file_format}', expected one of {list(FILE_FORMATS)}")
+    try:
+        import openpyxl
+    except ImportError:  # openpyxl is optional; only XLSX imports need it
+        raise CatalogImportError("XLSX imports need the openpyxl package; upload the sheet as CSV instead.")
+    try:
+        # Read-only mode streams the rows from the zip instead of loading the whole workbook
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except Exception as e:
+        raise CatalogImportError(f"Unreadable XLSX file: {e}")
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = ["" if value is None else str(value) for value in header]
+        batch = []
+        for row in rows:
+            batch.append(row[:len(header)])
+            if len(batch) == chunk_rows:
+                yield _sheet_frame(batch, header)
+                batch = []
+        if batch:
+            yield _sheet_frame(batch, header)
+    finally:
+        workbook.close()
+
+
+def _sheet_frame(rows: list, header: list) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(rows, columns=header[:max(len(row) for row in rows)])
+    frame = frame.reindex(columns=header)
+    return frame.map(_cell_text)
+
+
+def _cell_text(value) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    # Whole numbers come back from Excel as floats
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# Whole-number columns -> (lowest value, error message), as CreateSubscription validates them
+WHOLE_NUMBER_COLUMNS = {"validity": (None, "must be a whole number"),
+                        "cost": (1, "must be a whole number greater than 0")}
+
+
+def _parse_whole_number(values: pd.Series, frame: pd.DataFrame, column: str, errors: ImportErrors) -> pd.Series:
+    minimum, message = WHOLE_NUMBER_COLUMNS[column]
+    numbers = pd.to_numeric(values.where(values != ""), errors="coerce")
+    invalid = numbers.isna() | (numbers % 1 != 0)
+    if minimum is not None:
+        invalid |= numbers < minimum
+    invalid &= values != ""
+    errors.flag(frame, invalid, column, message)
+    return numbers.where(~invalid).astype("Int64").astype(object).where(lambda series: series.notna(), None)
+
+
+def _parse_status(values: pd.Series, frame: pd.DataFrame, column: str, errors: ImportErrors) -> pd.Series:
+    lowered = values.str.lower()
+    invalid = (values != "") & ~lowered.isin(list(STATUS_VALUES))
+    errors.flag(frame, invalid, column, "must be true or false")
+    return lowered.map(STATUS_VALUES).astype(object).where(lambda series: series.notna(), None)
+
+
+def _parse_attributes(frame: pd.DataFrame, columns: List[str], errors: ImportErrors) -> pd.DataFrame:
+    """Typed attribute values of a chunk, None where the cell is blank or invalid."""
+    parsed = pd.DataFrame(index=frame.index)
+    for column in columns:
+        values = frame[column]
+        if column in WHOLE_NUMBER_COLUMNS:
+            parsed[column] = _parse_whole_number(values, frame, column, errors)
+        elif column == "subscription_type":
+            upper = values.str.upper()
+            invalid = (values != "") & ~upper.isin([member.name for member in SubscriptionType])
+            errors.flag(frame, invalid, column, f"must be one of {[member.name for member in SubscriptionType]}")
+            parsed[column] = upper.where((values != "") & ~invalid, None)
+        elif column.endswith("active_status"):
+            parsed[column] = _parse_status(values, frame, column, errors)
+        else:
+            too_long = values.str.len() > DESCRIPTION_LENGTH
+            errors.flag(frame, too_long, column, f"is longer than {DESCRIPTION_LENGTH} characters")
+            parsed[column] = values.where((values != "") & ~too_long, None)
+    return parsed
+
+
+def _fold_attributes(target: Dict[str, dict], names: pd.Series, parsed: pd.DataFrame, kind: str,
+                     errors: ImportErrors):
+    """Merge the chunk's non-blank attribute values per name, flagging names given two different values."""
+    for column in parsed.columns:
+        values = pd.DataFrame({"name": names, "value": parsed[column]}).dropna().drop_duplicates()
+        for row, name, value in zip(values.index, values["name"], values["value"]):
+            attributes = target.setdefault(name, {})
+            previous = attributes.setdefault(column, value)
+            if previous != value:
+                errors.add(int(row), column, f"{kind} '{name}' has conflicting values {previous!r} and {value!r}")
+
+
+def fold_chunk(catalog: CatalogFile, frame: pd.DataFrame):
+    frame.columns = normalize_columns(frame.columns)
+    frame.index = pd.RangeIndex(FIRST_ROW + catalog.rows, FIRST_ROW + catalog.rows + len(frame))
+    catalog.rows += len(frame)
+    errors = catalog.errors
+    frame = frame.apply(lambda column: column.astype(str).str.strip())
+
+    valid = pd.Series(True, index=frame.index)
+    for column in REQUIRED_COLUMNS + tuple(catalog.permission_columns):
+        blank = frame[column] == ""
+        if column in REQUIRED_COLUMNS:
+            errors.flag(frame, blank, column, "is required")
+            valid &= ~blank
+        too_long = frame[column].str.len() > NAME_LENGTH
+        errors.flag(frame, too_long, column, f"is longer than {NAME_LENGTH} characters")
+        valid &= ~too_long
+    frame = frame[valid]
+
+    for column, names, rows in (("subscription", catalog.subscriptions, catalog.subscription_rows),
+                                ("service", catalog.services, catalog.service_rows)):
+        first_rows = frame[column].drop_duplicates()
+        for row, name in zip(first_rows.index, first_rows):
+            names.setdefault(name, {})
+            rows.setdefault(name, int(row))
+    _fold_attributes(catalog.subscriptions, frame["subscription"],
+                     _parse_attributes(frame, catalog.subscription_columns, errors), "Subscription", errors)
+    _fold_attributes(catalog.services, frame["service"],
+                     _parse_attributes(frame, catalog.service_columns, errors), "Service", errors)
+
+    pairs = frame[["subscription", "service"]].drop_duplicates()
+    catalog.subscription_services.update(zip(pairs["subscription"], pairs["service"]))
+    for column in catalog.permission_columns:
+        named = frame[frame[column] != ""]
+        pairs = named[["service", column]].drop_duplicates()
+        catalog.service_permissions[column].update(zip(pairs["service"], pairs[column]))
+        first_rows = named[column].drop_duplicates()
+        for row, name in zip(first_rows.index, first_rows):
+            catalog.permission_rows[column].setdefault(name, int(row))
+
+
+def read_catalog_file(source, file_format: str) -> CatalogFile:
+    """Read and validate a catalog sheet chunk by chunk (blocking; run it in a thread from async code)."""
+    catalog = None
+    for frame in read_chunks(source, file_format):
+        if catalog is None:
+            columns = normalize_columns(frame.columns)
+            missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+            if missing:
+                raise CatalogImportError(f"Missing required columns {missing}; found {columns}")
+            duplicated = sorted({column for column in columns if columns.count(column) > 1})
+            if duplicated:
+                raise CatalogImportError(f"Duplicated columns {duplicated}")
+            catalog = CatalogFile(columns)
+        fold_chunk(catalog, frame)
+    if catalog is None or not catalog.rows:
+        raise CatalogImportError("The file has no catalog rows.")
+    return catalog
+
+
+async def _select_in(session: AsyncSession, statement_for, values) -> list:
+    """Rows of ``statement_for(chunk)`` over BULK_ID_CHUNK_SIZE chunks of ``values``."""
+    values = list(values)
+    rows = []
+    chunk_size = Config.BULK_ID_CHUNK_SIZE
+    for start in range(0, len(values), chunk_size):
+        result = await session.execute(statement_for(values[start:start + chunk_size]))
+        rows.extend(result.all())
+    return rows
+
+
+def _check_creatable(names: Dict[str, dict], rows: Dict[str, int], existing: dict, required: tuple, kind: str,
+                     errors: ImportErrors):
+    """Flag the names the file would create without one of the ``required`` attributes."""
+    for name, attributes in names.items():
+        if name in existing:
+            continue
+        for column in required:
+            if column not in attributes:
+                errors.add(rows[name], column, f"is required to create {kind} '{name}'")
+
+
+def _entity_changes(names: Dict[str, dict], columns: Dict[str, str], file_columns: List[str],
+                    existing: dict) -> tuple:
+    """(rows to insert, rows to update by id, unchanged count) for the named entities."""
+    to_create, to_update = [], []
+    for name, attributes in names.items():
+        values = {columns[column]: _column_value(column, value) for column, value in attributes.items()}
+        current = existing.get(name)
+        if current is None:
+            to_create.append({"name": name, **{columns[column]: None for column in file_columns}, **values})
+        elif any(getattr(current, column) != value for column, value in values.items()):
+            # executemany needs the same keys on every row; unspecified columns keep their value
+            to_update.append({"match_id": current.id,
+                              **{columns[column]: getattr(current, columns[column]) for column in file_columns},
+                              **values})
+    return to_create, to_update, len(names) - len(to_create) - len(to_update)
+
+
+def _column_value(column: str, value):
+    return SubscriptionType[value] if column == "subscription_type" else value
+
+
+async def _write_entities(session: AsyncSession, entity, to_create: List[dict], to_update: List[dict],
+                          file_columns: List[str], columns: Dict[str, str]) -> Dict[str, int]:
+    """Insert and update the entity rows; returns name -> id of the created ones."""
+    table = entity.__table__
+    batch_size = Config.BULK_UPSERT_BATCH_SIZE
+    # executemany of one cached INSERT; the dialect sends each batch as multi-row VALUES
+    for start in range(0, len(to_create), batch_size):
+        await session.execute(insert(table), to_create[start:start + batch_size])
+    if to_update:
+        await session.execute(
+            update(table).where(table.c.id == bindparam("match_id"))
+            .values({columns[column]: bindparam(columns[column]) for column in file_columns}),
+            to_update
+        )
+    rows = await _select_in(session, lambda chunk: select(entity.name, entity.id).where(entity.name.in_(chunk)),
+                            [row["name"] for row in to_create])
+    return dict(rows)
+
+
+async def _write_mappings(session: AsyncSession, mapping, removed_ids: List[int], added: List[dict]):
+    table = mapping.__table__
+    chunk_size = Config.BULK_ID_CHUNK_SIZE
+    for start in range(0, len(removed_ids), chunk_size):
+        await session.execute(delete(table).where(table.c.id.in_(removed_ids[start:start + chunk_size])))
+    batch_size = Config.BULK_UPSERT_BATCH_SIZE
+    for start in range(0, len(added), batch_size):
+        await session.execute(insert(table), added[start:start + batch_size])
+
+
+def _names(rows: List[dict], limit: int) -> List[str]:
+    return [row["name"] for row in rows[:limit]]
+
+
+def _updated_names(existing: dict, to_update: List[dict], limit: int) -> List[str]:
+    updated_ids = {row["match_id"] for row in to_update}
+    return [name for name, row in existing.items() if row.id in updated_ids][:limit]
+
+
+# Statements grow with the file (one per chunk of names or batch of rows); the budget only catches per-row lookups
+@query_budget()
+async def import_catalog(catalog: CatalogFile, dry_run: bool, session: AsyncSession,
+                         logger: logging.Logger) -> dict:
+    """Diff a read catalog file against the stored catalog and apply it in one transaction.
+
+    Returns the report; ``applied`` is False for a dry run or when the file has errors, in which
+    case nothing is written.
+    """
+    errors = catalog.errors
+    report_limit = Config.CATALOG_IMPORT_MAX_ERRORS
+
+    # Current catalog rows of every name in the file, one IN query per chunk of names
+    existing_subscriptions = {row.name: row for row in await _select_in(
+        session, lambda chunk: select(SubscriptionEntity.id, SubscriptionEntity.name, SubscriptionEntity.validity,
+                                      SubscriptionEntity.subscription_type, SubscriptionEntity.cost,
+                                      SubscriptionEntity.active_status).where(SubscriptionEntity.name.in_(chunk)),
+        catalog.subscriptions)}
+    existing_services = {row.name: row for row in await _select_in(
+        session, lambda chunk: select(ServiceEntity.id, ServiceEntity.name, ServiceEntity.description,
+                                      ServiceEntity.active_status).where(ServiceEntity.name.in_(chunk)),
+        catalog.services)}
+    permission_ids = {}
+    for column in catalog.permission_columns:
+        entity = PERMISSION_COLUMNS[column][0]
+        permission_ids[column] = dict(await _select_in(
+            session, lambda chunk: select(entity.name, entity.id).where(entity.name.in_(chunk)),
+            catalog.permission_rows[column]))
+        for name, row in catalog.permission_rows[column].items():
+            if name not in permission_ids[column]:
+                errors.add(row, column, f"Unknown {column.replace('_', ' ')} '{name}'")
+
+    _check_creatable(catalog.subscriptions, catalog.subscription_rows, existing_subscriptions,
+                     SUBSCRIPTION_CREATE_COLUMNS, "subscription", errors)
+    _check_creatable(catalog.services, catalog.service_rows, existing_services, SERVICE_CREATE_COLUMNS,
+                     "service", errors)
+
+    subscriptions_created, subscriptions_updated, subscriptions_unchanged = _entity_changes(
+        catalog.subscriptions, SUBSCRIPTION_COLUMNS, catalog.subscription_columns,
+        existing_subscriptions)
+    services_created, services_updated, services_unchanged = _entity_changes(
+        catalog.services, SERVICE_COLUMNS, catalog.service_columns, existing_services)
+
+    # Stored mappings of the file's existing subscriptions and services, by name
+    subscription_ids = {name: row.id for name, row in existing_subscriptions.items()}
+    service_ids = {name: row.id for name, row in existing_services.items()}
+    stored_services = await _select_in(
+        session, lambda chunk: select(SubscriptionServicesMapping.id, SubscriptionEntity.name, ServiceEntity.name)
+        .join(SubscriptionEntity, SubscriptionEntity.id == SubscriptionServicesMapping.subscription_id)
+        .join(ServiceEntity, ServiceEntity.id == SubscriptionServicesMapping.service_id)
+        .where(SubscriptionServicesMapping.subscription_id.in_(chunk)),
+        subscription_ids.values())
+    removed_services = [(mapping_id, subscription, service) for mapping_id, subscription, service in stored_services
+                        if (subscription, service) not in catalog.subscription_services]
+    added_services = catalog.subscription_services - {(subscription, service)
+                                                      for _, subscription, service in stored_services}
+
+    permission_changes = {}
+    for column in catalog.permission_columns:
+        entity, mapping, id_column, _ = PERMISSION_COLUMNS[column]
+        stored = await _select_in(
+            session, lambda chunk: select(mapping.id, ServiceEntity.name, entity.name)
+            .join(ServiceEntity, ServiceEntity.id == mapping.service_id)
+            .join(entity, entity.id == getattr(mapping, id_column))
+            .where(mapping.service_id.in_(chunk)),
+            service_ids.values())
+        wanted = catalog.service_permissions[column]
+        removed = [(mapping_id, service, name) for mapping_id, service, name in stored if (service, name) not in wanted]
+        added = wanted - {(service, name) for _, service, name in stored}
+        permission_changes[column] = (removed, added)
+
+    report = {
+        "dry_run": dry_run,
+        "applied": False,
+        "rows": catalog.rows,
+        "ignored_columns": catalog.ignored_columns,
+        "error_count": errors.count,
+        "errors": errors.items,
+        "subscriptions": {"created": len(subscriptions_created), "updated": len(subscriptions_updated),
+                          "unchanged": subscriptions_unchanged,
+                          "created_names": _names(subscriptions_created, report_limit),
+                          "updated_names": _updated_names(existing_subscriptions, subscriptions_updated,
+                                                          report_limit)},
+        "services": {"created": len(services_created), "updated": len(services_updated),
+                     "unchanged": services_unchanged,
+                     "created_names": _names(services_created, report_limit),
+                     "updated_names": _updated_names(existing_services, services_updated, report_limit)},
+        SUBSCRIPTION_SERVICES_MAPPING: {"added": len(added_services), "removed": len(removed_services)},
+    }
+    for column, (removed, added) in permission_changes.items():
+        report[PERMISSION_COLUMNS[column][3]] = {"added": len(added), "removed": len(removed)}
+    logger.info(f"Catalog import of {catalog.rows} rows: {errors.count} errors, "
+                f"subscriptions {report['subscriptions']['created']} new / {report['subscriptions']['updated']} "
+                f"changed, services {report['services']['created']} new / {report['services']['updated']} changed"
+                f"{' (dry run)' if dry_run else ''}.")
+    if dry_run or errors.count:
+        return report
+
+    try:
+        subscription_ids.update(await _write_entities(session, SubscriptionEntity, subscriptions_created,
+                                                      subscriptions_updated, catalog.subscription_columns,
+                                                      SUBSCRIPTION_COLUMNS))
+        service_ids.update(await _write_entities(session, ServiceEntity, services_created, services_updated,
+                                                 catalog.service_columns, SERVICE_COLUMNS))
+        await _write_mappings(session, SubscriptionServicesMapping,
+                              [mapping_id for mapping_id, _, _ in removed_services],
+                              [{"subscription_id": subscription_ids[subscription], "service_id": service_ids[service]}
+                               for subscription, service in sorted(added_services)])
+        changed_services = set()
+        for column, (removed, added) in permission_changes.items():
+            _, mapping, id_column, _ = PERMISSION_COLUMNS[column]
+            await _write_mappings(session, mapping, [mapping_id for mapping_id, _, _ in removed],
+                                  [{"service_id": service_ids[service], id_column: permission_ids[column][name]}
+                                   for service, name in sorted(added)])
+            if column == "api_permission":
+                changed_services.update(service_ids[service] for _, service, _ in removed)
+                changed_services.update(service_ids[service] for service, _ in added)
+
+        # Core updates bypass the ORM flush listener that maintains organization expiry dates
+        retimed = [item["match_id"] for item in subscriptions_updated]
+        if retimed and {"validity", "subscription_type"} & set(catalog.subscription_columns):
+            await session.run_sync(lambda sync_session: refresh_expiry_sync(sync_session.connection(),
+                                                                            subscription_ids=retimed))
+
+        remapped = {subscription_ids[subscription] for _, subscription, _ in removed_services}
+        remapped.update(subscription_ids[subscription] for subscription, _ in added_services)
+        await mark_permission_trees(session, subscription_ids=remapped, service_ids=changed_services)
+
+        tables = []
+        if subscriptions_created or subscriptions_updated:
+            tables.append(SUBSCRIPTION)
+        if services_created or services_updated:
+            tables.append(SERVICE)
+        if removed_services or added_services:
+            tables.append(SUBSCRIPTION_SERVICES_MAPPING)
+        tables.extend(PERMISSION_COLUMNS[column][3] for column, (removed, added) in permission_changes.items()
+                      if removed or added)
+        if tables:
+            await bump_catalog_versions(session, *tables)
+        await session.commit()
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to import the catalog: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+
+    tags = [subscription_tag(subscription_ids[name]) for name in catalog.subscriptions]
+    tags.extend(service_tag(service_ids[name]) for name in catalog.services)
+    if subscriptions_created:
+        tags.append(SUBSCRIPTION_LIST)
+    if services_created:
+        tags.append(SERVICE_LIST)
+    invalidate_catalog(logger, *tags)
+    report["applied"] = True
+    return report
+
+
+def file_format_of(path: str, content_type: str = None) -> str:
+    """csv or xlsx from a content type or, failing that, a file name."""
+    if content_type:
+        if "spreadsheetml" in content_type or "ms-excel" in content_type:
+            return XLSX
+        if "csv" in content_type or content_type.startswith("text/"):
+            return CSV
+    return XLSX if (path or "").lower().endswith((".xlsx", ".xlsm")) else CSV
+
+
+def main(argv=None):
+    from app.configuration.db import engine, open_session, pool_metrics
+    from app.configuration.logger import setup_logger
+    from app.services.session_hooks import register_session_hooks
+    from app.utils.fast_json import dumps
+
+    parser = argparse.ArgumentParser(description="Import a subscription catalog sheet (CSV or XLSX).")
+    parser.add_argument("path", help="Catalog file")
+    parser.add_argument("--format", choices=FILE_FORMATS, help="File format (default: from the extension)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report the changes without writing")
+    args = parser.parse_args(argv)
+    logger = setup_logger(f"catalog-import-{uuid.uuid4()}")
+    # The listeners the app installs; without them the import would write under different rules
+    register_session_hooks()
+
+    async def run():
+        try:
+            with open(args.path, "rb") as source:
+                catalog = await asyncio.to_thread(read_catalog_file, source, args.format or file_format_of(args.path))
+            async with open_session(engine, pool_metrics) as session:
+                return await import_catalog(catalog, args.dry_run, session, logger)
+        finally:
+            await engine.dispose()
+
+    try:
+        report = asyncio.run(run())
+    except CatalogImportError as e:
+        raise SystemExit(f"{os.path.basename(args.path)}: {e}")
+    print(dumps(report).decode("utf-8"))
+    if report["error_count"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# app/services/catalog_projection.py
+
+from typing import FrozenSet, Optional
+
+from sqlalchemy.orm import selectinload
+
+from app.models.models import SubscriptionEntity, ServiceEntity
+from app.services.catalog_cache import subscription_tag, service_tag, api_permission_tag, page_permission_tag
+
+SUBSCRIPTION_FIELDS = ("id", "name", "validity", "cost", "active_status", "subscription_type")
+SERVICE_FIELDS = ("id", "name", "description", "active_status")
+
+SERVICES = "services"
+API_PERMISSIONS = "services.api_permissions"
+PAGE_PERMISSIONS = "services.page_permissions"
+EXPANSIONS = (SERVICES, API_PERMISSIONS, PAGE_PERMISSIONS)
+
+
+def _split(value: Optional[str]) -> list:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+class CatalogProjection:
+    """Which subscription columns and relationships a catalog GET returns (``fields=`` / ``expand=``).
+
+    ``fields`` lists subscription columns, plus ``services.<column>`` for service columns;
+    ``expand`` lists the relationships to load. ``id`` is always included. Without expansions the
+    subscriptions are read with one column query and no relationship is loaded.
+    """
+
+    def __init__(self, subscription_fields: FrozenSet[str], service_fields: FrozenSet[str], expand: FrozenSet[str]):
+        self.subscription_fields = subscription_fields
+        self.service_fields = service_fields
+        self.expand = expand
+
+    @classmethod
+    def parse(cls, fields: Optional[str], expand: Optional[str]) -> Optional["CatalogProjection"]:
+        """None when neither parameter is given, meaning the full DTO graph; ValueError on unknown names."""
+        if fields is None and expand is None:
+            return None
+
+        expansions = set(_split(expand))
+        unknown = expansions - set(EXPANSIONS)
+        if unknown:
+            raise ValueError(f"Unknown expand value(s) {sorted(unknown)}; expected any of {list(EXPANSIONS)}")
+        if expansions & {API_PERMISSIONS, PAGE_PERMISSIONS}:
+            expansions.add(SERVICES)
+
+        subscription_fields, service_fields = {"id"}, {"id"}
+        requested = _split(fields)
+        for field in requested:
+            if field.startswith(SERVICES + "."):
+                name = field[len(SERVICES) + 1:]
+                if name not in SERVICE_FIELDS:
+                    raise ValueError(f"Unknown field '{field}'; services fields are {list(SERVICE_FIELDS)}")
+                service_fields.add(name)
+                expansions.add(SERVICES)
+            elif field in SUBSCRIPTION_FIELDS:
+                subscription_fields.add(field)
+            else:
+                raise ValueError(f"Unknown field '{field}'; subscription fields are {list(SUBSCRIPTION_FIELDS)}")
+
+        # Omitting fields= keeps every column of the levels that are returned
+        if not any(field in SUBSCRIPTION_FIELDS for field in requested):
+            subscription_fields = set(SUBSCRIPTION_FIELDS)
+        if not any(field.startswith(SERVICES + ".") for field in requested):
+            service_fields = set(SERVICE_FIELDS)
+        return cls(frozenset(subscription_fields), frozenset(service_fields), frozenset(expansions))
+
+    @property
+    def key(self) -> tuple:
+        return tuple(sorted(self.subscription_fields)), tuple(sorted(self.service_fields)), tuple(sorted(self.expand))
+
+    @property
+    def loads_services(self) -> bool:
+        return SERVICES in self.expand
+
+    def columns(self) -> list:
+        """Subscription columns for the narrow query, in DTO order."""
+        return [getattr(SubscriptionEntity, field) for field in SUBSCRIPTION_FIELDS if field in self.subscription_fields]
+
+    def load_options(self) -> list:
+        options = []
+        if API_PERMISSIONS in self.expand:
+            options.append(selectinload(SubscriptionEntity.services).selectinload(ServiceEntity.api_permissions))
+        if PAGE_PERMISSIONS in self.expand:
+            options.append(selectinload(SubscriptionEntity.services).selectinload(ServiceEntity.page_permissions))
+        if not options and SERVICES in self.expand:
+            options.append(selectinload(SubscriptionEntity.services))
+        return options
+
+
+# Every column and relationship: the shape of the full DTO graph, built as plain dicts
+FULL_GRAPH = CatalogProjection(frozenset(SUBSCRIPTION_FIELDS), frozenset(SERVICE_FIELDS), frozenset(EXPANSIONS))
+
+
+def projection_tags(subscriptions: list) -> set:
+    """Catalog cache tags of projected subscription dicts (see subscription_dto_tags)."""
+    tags = set()
+    for subscription in subscriptions:
+        tags.add(subscription_tag(subscription["id"]))
+        for service in subscription.get(SERVICES) or []:
+            tags.add(service_tag(service["id"]))
+            tags.update(api_permission_tag(permission["id"]) for permission in service.get("api_permissions") or [])
+            tags.update(page_permission_tag(permission["id"]) for permission in service.get("page_permissions") or [])
+    return tags
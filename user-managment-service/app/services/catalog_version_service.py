@@ -0,0 +1,124 @@
+# app/services/catalog_version_service.py
+
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import CatalogVersionEntity, SubscriptionEntity, ServiceEntity, SubscriptionServicesMapping, \
+    ApiPermissionEntity, ServiceApiPermissionsMapping, PagePermissionEntity, ServiceApiPagePermissionsMapping
+
+SUBSCRIPTION = SubscriptionEntity.__tablename__
+SERVICE = ServiceEntity.__tablename__
+SUBSCRIPTION_SERVICES_MAPPING = SubscriptionServicesMapping.__tablename__
+API_PERMISSION = ApiPermissionEntity.__tablename__
+SERVICE_API_PERMISSIONS_MAPPING = ServiceApiPermissionsMapping.__tablename__
+PAGE_PERMISSION = PagePermissionEntity.__tablename__
+SERVICE_PAGE_PERMISSIONS_MAPPING = ServiceApiPagePermissionsMapping.__tablename__
+
+CATALOG_TABLES = (SUBSCRIPTION, SERVICE, SUBSCRIPTION_SERVICES_MAPPING, API_PERMISSION,
+                  SERVICE_API_PERMISSIONS_MAPPING, PAGE_PERMISSION, SERVICE_PAGE_PERMISSIONS_MAPPING)
+
+# Tables each family of catalog GET endpoints is built from
+SUBSCRIPTION_GRAPH_TABLES = CATALOG_TABLES
+SERVICE_GRAPH_TABLES = (SERVICE, API_PERMISSION, SERVICE_API_PERMISSIONS_MAPPING, PAGE_PERMISSION,
+                        SERVICE_PAGE_PERMISSIONS_MAPPING)
+API_PERMISSION_TABLES = (API_PERMISSION,)
+PAGE_PERMISSION_TABLES = (PAGE_PERMISSION,)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def seed_catalog_versions(connection):
+    """Insert a version row for every catalog table that does not have one yet (run via run_sync)."""
+    existing = set(connection.execute(select(CatalogVersionEntity.table_name)).scalars())
+    missing = [name for name in CATALOG_TABLES if name not in existing]
+    if missing:
+        now = _utcnow()
+        connection.execute(
+            CatalogVersionEntity.__table__.insert(),
+            [{"table_name": name, "version": 0, "updated_at": now} for name in missing]
+        )
+
+
+async def bump_catalog_versions(session: AsyncSession, *tables: str):
+    """Bump the generation of the given tables inside the caller's transaction (before its commit)."""
+    # Sorted so concurrent writers lock the rows in the same order
+    await session.execute(
+        update(CatalogVersionEntity)
+        .where(CatalogVersionEntity.table_name.in_(sorted(set(tables))))
+        .values(version=CatalogVersionEntity.version + 1, updated_at=_utcnow())
+    )
+
+
+class CatalogValidators:
+    def __init__(self, etag: str, last_modified: Optional[datetime]):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def last_modified_header(self) -> Optional[str]:
+        if self.last_modified is None:
+            return None
+        return format_datetime(self.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+
+    @property
+    def last_modified_settled(self) -> bool:
+        """False while the last write is in the current second: another write in that second would
+        keep the same whole-second stamp, so the date cannot tell the two copies apart."""
+        return self.last_modified is not None and self.last_modified < _utcnow()
+
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        # Clients revalidate such responses with If-None-Match only
+        if self.last_modified_settled:
+            headers["Last-Modified"] = self.last_modified_header
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """True when the client's cached copy is current (If-None-Match wins over If-Modified-Since)."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified_settled:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is not None:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+            return self.last_modified <= since
+        return False
+
+    def apply(self, response: Response):
+        response.headers.update(self.headers())
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+
+async def get_catalog_validators(tables: Iterable[str], session: AsyncSession,
+                                 logger: logging.Logger) -> CatalogValidators:
+    tables = tuple(tables)
+    result = await session.execute(
+        select(CatalogVersionEntity.table_name, CatalogVersionEntity.version, CatalogVersionEntity.updated_at)
+        .where(CatalogVersionEntity.table_name.in_(tables))
+    )
+    rows = {row.table_name: row for row in result}
+    versions = "-".join(str(rows[name].version) if name in rows else "0" for name in tables)
+    stamps = [row.updated_at for row in rows.values() if row.updated_at is not None]
+    last_modified = max(stamps) if stamps else None
+    # The timestamp keeps tags unique if the version rows are ever reseeded from zero
+    stamp = int(last_modified.replace(tzinfo=timezone.utc).timestamp()) if last_modified else 0
+    validators = CatalogValidators(f'"{versions}.{stamp}"', last_modified)
+    logger.debug(f"Catalog validators for {tables}: etag={validators.etag}")
+    return validators
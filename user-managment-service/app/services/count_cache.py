@@ -0,0 +1,116 @@
+# app/services/count_cache.py
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.configuration.config import Config
+
+
+class CountCache:
+    """TTL cache of exact totals for paginated endpoints, keyed by (table, endpoint, filter).
+
+    Writes to a table drop its counts through ``invalidate``; other worker processes only see
+    the change once their entries expire, so the TTL bounds how stale a total can get.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.estimates = 0
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: tuple, total: int, version: int):
+        if version != self.version or self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (total, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *tables: str):
+        """Drop the cached totals of every endpoint that counts one of the given tables."""
+        self.version += 1
+        for key in [key for key in self._entries if key[0] in tables]:
+            del self._entries[key]
+
+    def clear(self):
+        self.version += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "estimate_threshold": Config.COUNT_ESTIMATE_THRESHOLD,
+            "hits": self.hits,
+            "misses": self.misses,
+            "estimates": self.estimates,
+        }
+
+
+count_cache = CountCache(max_entries=Config.COUNT_CACHE_MAX_ENTRIES, ttl_seconds=Config.COUNT_CACHE_TTL_SECONDS)
+
+
+async def estimate_row_count(session: AsyncSession, table_name: str) -> Optional[int]:
+    """Row count from the database's table statistics, or None where the dialect keeps none."""
+    dialect = session.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        result = await session.execute(
+            text("SELECT TABLE_ROWS FROM information_schema.TABLES "
+                 "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"),
+            {"table_name": table_name}
+        )
+    elif dialect == "postgresql":
+        result = await session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {"table_name": table_name}
+        )
+    else:
+        return None
+    estimate = result.scalar()
+    # Postgres reports -1 for tables that were never analyzed
+    return int(estimate) if estimate is not None and estimate >= 0 else None
+
+
+async def get_total(table_name: str, endpoint: str, filters: Hashable, count: Callable[[], Awaitable[int]],
+                    session: AsyncSession, logger: logging.Logger) -> Tuple[int, bool]:
+    """Total for a paginated endpoint as ``(total, exact)``.
+
+    Unfiltered totals of tables larger than COUNT_ESTIMATE_THRESHOLD come from table statistics
+    (``exact`` is False); everything else runs ``count`` and is cached for COUNT_CACHE_TTL_SECONDS.
+    """
+    key = (table_name, endpoint, filters)
+    total = count_cache.get(key)
+    if total is not None:
+        return total, True
+
+    if filters is None and Config.COUNT_ESTIMATE_THRESHOLD > 0:
+        estimate = await estimate_row_count(session, table_name)
+        if estimate is not None and estimate >= Config.COUNT_ESTIMATE_THRESHOLD:
+            count_cache.estimates += 1
+            logger.info(f"Using estimated total {estimate} for {table_name} ({endpoint}).")
+            return estimate, False
+
+    version = count_cache.version
+    total = await count()
+    count_cache.set(key, total, version)
+    return total, True
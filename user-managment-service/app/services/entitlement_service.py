@@ -0,0 +1,237 @@
+# app/services/entitlement_service.py
+
+import asyncio
+import logging
+from typing import Dict, Hashable, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.configuration.config import Config
+from app.models.models import SubscriptionEntity, ServiceEntity, SubscriptionServicesMapping, ApiPermissionEntity, \
+    ServiceApiPermissionsMapping
+from app.services import catalog_version_service
+
+# Trie keys that cannot collide with a path segment
+PARAM = "{}"
+TEMPLATE = "{template}"
+
+
+def normalize_path(path: str) -> str:
+    path = path.split("?", 1)[0].split("#", 1)[0].strip()
+    if not path.startswith("/"):
+        path = "/" + path
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return path
+
+
+def is_param_segment(segment: str) -> bool:
+    return segment.startswith("{") and segment.endswith("}")
+
+
+class SubscriptionEntitlements:
+    """Allowed (method, path) pairs of one subscription.
+
+    Concrete URLs live in a per-method set; templated URLs such as /service/get/{id} go into a
+    per-method segment trie, so a check is one set lookup plus at most one walk down the trie.
+    """
+
+    def __init__(self, exists: bool = True, active: bool = True):
+        self.exists = exists
+        self.active = active
+        self.exact: Dict[str, Set[str]] = {}
+        self.templates: Dict[str, dict] = {}
+
+    def add(self, method: str, api_url: str):
+        path = normalize_path(api_url)
+        segments = path.split("/")[1:]
+        if not any(is_param_segment(segment) for segment in segments):
+            self.exact.setdefault(method, set()).add(path)
+            return
+        node = self.templates.setdefault(method, {})
+        for segment in segments:
+            node = node.setdefault(PARAM if is_param_segment(segment) else segment, {})
+        node[TEMPLATE] = path
+
+    def match(self, method: str, path: str) -> Optional[str]:
+        """Return the permission URL that grants (method, path), or None."""
+        if not (self.exists and self.active):
+            return None
+        if path in self.exact.get(method, ()):
+            return path
+        root = self.templates.get(method)
+        if root is None:
+            return None
+        return self._walk(root, path.split("/")[1:], 0)
+
+    def _walk(self, node: dict, segments: list, index: int) -> Optional[str]:
+        if index == len(segments):
+            return node.get(TEMPLATE)
+        segment = segments[index]
+        # Literal segments win over parameters, as in the router
+        child = node.get(segment)
+        if child is not None:
+            found = self._walk(child, segments, index + 1)
+            if found is not None:
+                return found
+        child = node.get(PARAM)
+        if child is not None and segment:
+            return self._walk(child, segments, index + 1)
+        return None
+
+
+class EntitlementIndex:
+    """Per-process index of subscription entitlements, answered from memory only.
+
+    A background task (start_entitlement_refresher) builds it from the mapping tables at startup and
+    rebuilds it whenever the catalog version rows change. They are compared every
+    ENTITLEMENT_VERSION_CHECK_SECONDS, to pick up writes made by other worker processes, and at once
+    after a write in this process. Checks never touch the database; until the first build finishes
+    the index is not ready.
+    """
+
+    def __init__(self):
+        self.full_loads = 0
+        self.failed_loads = 0
+        self._entries: Dict[int, SubscriptionEntitlements] = {}
+        self._loaded = False
+        self._catalog_etag: Optional[str] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._loaded
+
+    def invalidate(self, *tags: Hashable):
+        """A catalog write in this process: compare the catalog versions now instead of at the next poll."""
+        self._changed.set()
+
+    async def wait_for_change(self, timeout: Optional[float]):
+        """Wait until a write in this process or ``timeout`` seconds (None waits for a write only)."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def refresh(self, session: AsyncSession, logger: logging.Logger) -> bool:
+        """Rebuild the index when the catalog versions changed since the last build; True when rebuilt."""
+        # Writes that land from here on wake the refresher again
+        self._changed.clear()
+        validators = await catalog_version_service.get_catalog_validators(
+            catalog_version_service.SUBSCRIPTION_GRAPH_TABLES, session, logger)
+        if self._loaded and validators.etag == self._catalog_etag:
+            return False
+        entries = await self._load(session)
+        # Swapped in whole, so a check sees either the old or the new index, never a partial one
+        self._entries = entries
+        self._catalog_etag = validators.etag
+        self._loaded = True
+        self.full_loads += 1
+        logger.info(f"Entitlement index built: {len(entries)} subscriptions at catalog version {validators.etag}.")
+        return True
+
+    @staticmethod
+    async def _load(session: AsyncSession) -> Dict[int, SubscriptionEntitlements]:
+        query = (
+            select(SubscriptionEntity.id, SubscriptionEntity.active_status, ServiceEntity.active_status,
+                   ApiPermissionEntity.method, ApiPermissionEntity.api_url, ApiPermissionEntity.status)
+            .select_from(SubscriptionEntity)
+            .outerjoin(SubscriptionServicesMapping, SubscriptionServicesMapping.subscription_id == SubscriptionEntity.id)
+            .outerjoin(ServiceEntity, ServiceEntity.id == SubscriptionServicesMapping.service_id)
+            .outerjoin(ServiceApiPermissionsMapping, ServiceApiPermissionsMapping.service_id == ServiceEntity.id)
+            .outerjoin(ApiPermissionEntity, ApiPermissionEntity.id == ServiceApiPermissionsMapping.api_permission_id)
+        )
+        result = await session.execute(query)
+
+        entries: Dict[int, SubscriptionEntitlements] = {}
+        for sub_id, sub_active, service_active, method, api_url, status in result:
+            entry = entries.get(sub_id)
+            if entry is None:
+                entry = entries[sub_id] = SubscriptionEntitlements(active=sub_active is not False)
+            if service_active is False or status is False or method is None or not api_url:
+                continue
+            entry.add(method.value if hasattr(method, "value") else str(method), api_url)
+        return entries
+
+    def get(self, subscription_id: int) -> Optional[SubscriptionEntitlements]:
+        """The subscription's entitlements, or None while the index is not ready."""
+        if not self._loaded:
+            return None
+        return self._entries.get(subscription_id, NOT_FOUND)
+
+    def stats(self) -> dict:
+        return {
+            "subscriptions": len(self._entries),
+            "loaded": self._loaded,
+            "catalog_etag": self._catalog_etag,
+            "full_loads": self.full_loads,
+            "failed_loads": self.failed_loads,
+        }
+
+
+NOT_FOUND = SubscriptionEntitlements(exists=False)
+
+entitlement_index = EntitlementIndex()
+
+
+async def refresh_entitlements(logger: logging.Logger):
+    """Keep the entitlement index current until cancelled, on a session of its own per pass."""
+    from app.configuration.db import open_session, engine, pool_metrics
+    while True:
+        try:
+            # The primary, so a write in this process is visible as soon as it wakes the refresher
+            async with open_session(engine, pool_metrics) as session:
+                await entitlement_index.refresh(session, logger)
+        except Exception as e:
+            entitlement_index.failed_loads += 1
+            logger.error(f"Entitlement index refresh failed: {e}")
+        interval = Config.ENTITLEMENT_VERSION_CHECK_SECONDS
+        await entitlement_index.wait_for_change(interval if interval > 0 else None)
+
+
+_refresher_task = None
+
+
+def start_entitlement_refresher(logger: logging.Logger):
+    global _refresher_task
+    if _refresher_task is None:
+        _refresher_task = asyncio.get_running_loop().create_task(refresh_entitlements(logger))
+
+
+async def stop_entitlement_refresher():
+    global _refresher_task
+    if _refresher_task is not None:
+        _refresher_task.cancel()
+        try:
+            await _refresher_task
+        except asyncio.CancelledError:
+            pass
+        _refresher_task = None
+
+
+def check_entitlement(subscription_id: int, method: str, path: str, logger: logging.Logger) -> Optional[dict]:
+    """Answer a check from the in-memory index; None while the index is not ready."""
+    method = method.upper()
+    path = normalize_path(path)
+    entry = entitlement_index.get(subscription_id)
+    if entry is None:
+        return None
+    matched = entry.match(method, path)
+    logger.info(f"Entitlement check subscription={subscription_id} {method} {path}: "
+                f"{'allowed by ' + matched if matched else 'denied'}")
+    return {
+        "subscription_id": subscription_id,
+        "method": method,
+        "path": path,
+        "allowed": matched is not None,
+        "matched_permission": matched,
+        "subscription_exists": entry.exists,
+        "subscription_active": entry.active,
+    }
+
+
+def is_entitled(subscription_id: int, method: str, path: str) -> bool:
+    """False while the index is not ready: no access is granted without it."""
+    entry = entitlement_index.get(subscription_id)
+    return entry is not None and entry.match(method.upper(), normalize_path(path)) is not None
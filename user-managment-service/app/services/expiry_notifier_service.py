@@ -0,0 +1,280 @@
+# app/services/expiry_notifier_service.py
+"""Subscription expiry notices: renewal reminder, expiry notice and expired notice.
+
+One keyset-paged query per EXPIRY_NOTICE_BATCH_SIZE organizations finds the subscriptions expiring on
+the notice dates through the indexed expires_on, with their organization and recipients joined in;
+each batch is rendered and handed to a pool of persistent SMTP connections while the next one is read.
+
+    python -m app.services.expiry_notifier_service --date 2026-10-17 --dry-run
+
+Against a local sink (``python -m aiosmtpd -n -l localhost:1025``, or any catch-all SMTP server), run
+with EMAIL_HOST=localhost EMAIL_PORT=1025 EMAIL_USE_TLS=false.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from email.message import EmailMessage
+from string import Template
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.configuration.config import Config
+from app.configuration.query_budget import query_budget
+from app.models.models import SubscriptionEntity, OrganizationSubscriptionEntity, OrganizationEntity, UserEntity, \
+    RoleEntity
+from app.utils.smtp_pool import SmtpPool, SmtpDeliveryError
+
+RENEWAL_REMINDER = "renewal_reminder"
+EXPIRY = "expiry"
+EXPIRED = "expired"
+
+# notice -> (Config subject attribute, default subject, default body); both are string.Template text
+NOTICES = {
+    RENEWAL_REMINDER: (
+        "MAIL_SUBJECT_SUBSCRIPTION_RENEWAL_REMINDER",
+        "Your $subscription_name plan is due for renewal",
+        "Hello $first_name,\n\n"
+        "The $subscription_name plan of $organization_name expires on $expires_on, in $days_left days.\n"
+        "Renew it before then to keep uninterrupted access.\n"),
+    EXPIRY: (
+        "MAIL_SUBJECT_SUBSCRIPTION_EXPIRY",
+        "Your $subscription_name plan expires on $expires_on",
+        "Hello $first_name,\n\n"
+        "The $subscription_name plan of $organization_name expires on $expires_on, in $days_left days.\n"
+        "After that date its users lose access to the services of the plan.\n"),
+    EXPIRED: (
+        "MAIL_SUBJECT_SUBSCRIPTION_EXPIRED",
+        "Your $subscription_name plan has expired",
+        "Hello $first_name,\n\n"
+        "The $subscription_name plan of $organization_name expired on $expires_on.\n"
+        "Renew it to restore access to its services.\n"),
+}
+
+
+def notice_dates(run_date: date) -> Dict[date, str]:
+    """Expiry date -> notice sent for it on ``run_date``; the expired notice wins when leads coincide."""
+    return {
+        run_date + timedelta(days=Config.SUBSCRIPTION_RENEWAL_REMINDER_DAYS): RENEWAL_REMINDER,
+        run_date + timedelta(days=Config.SUBSCRIPTION_EXPIRY_NOTICE_DAYS): EXPIRY,
+        run_date: EXPIRED,
+    }
+
+
+def notice_roles() -> List[str]:
+    return [role.strip() for role in (Config.EXPIRY_NOTICE_ROLES or "").split(",") if role.strip()]
+
+
+def load_templates() -> Dict[str, tuple]:
+    """notice -> (subject Template, body Template), with bodies from EXPIRY_NOTICE_TEMPLATE_DIR when present."""
+    templates = {}
+    for notice, (subject_setting, subject, body) in NOTICES.items():
+        path = os.path.join(Config.EXPIRY_NOTICE_TEMPLATE_DIR, f"{notice}.txt")
+        if Config.EXPIRY_NOTICE_TEMPLATE_DIR and os.path.isfile(path):
+            with open(path, encoding="utf-8") as template_file:
+                body = template_file.read()
+        templates[notice] = (Template(getattr(Config, subject_setting) or subject), Template(body))
+    return templates
+
+
+def expiring_batch_query(dates: List[date], after_id: int, limit: int):
+    """The next ``limit`` organization subscriptions past ``after_id`` expiring on one of ``dates``, one row per
+    recipient (recipient columns are None for an organization without one), in organization subscription order.
+
+    The batch is picked in a derived table, so its LIMIT counts organizations rather than recipients.
+    """
+    expires_on = OrganizationSubscriptionEntity.expires_on
+    batch = (
+        select(OrganizationSubscriptionEntity.id, OrganizationSubscriptionEntity.organization_id,
+               SubscriptionEntity.name.label("subscription_name"), expires_on)
+        .join(SubscriptionEntity, SubscriptionEntity.id == OrganizationSubscriptionEntity.subscription_id)
+        .where(expires_on.in_(dates), OrganizationSubscriptionEntity.id > after_id)
+        .order_by(OrganizationSubscriptionEntity.id)
+        .limit(limit)
+        .subquery()
+    )
+    recipient = UserEntity.organization_id == batch.c.organization_id
+    roles = notice_roles()
+    if roles:
+        recipient = and_(recipient, UserEntity.role_id.in_(select(RoleEntity.id).where(RoleEntity.role.in_(roles))))
+    return (
+        select(batch.c.id, OrganizationEntity.organization_name, OrganizationEntity.display_name,
+               batch.c.subscription_name, batch.c.expires_on, UserEntity.first_name, UserEntity.last_name,
+               UserEntity.email_id)
+        .select_from(batch)
+        .join(OrganizationEntity, OrganizationEntity.id == batch.c.organization_id)
+        .outerjoin(UserEntity, recipient)
+        .order_by(batch.c.id, UserEntity.id)
+    )
+
+
+def render_batch(rows, notices: Dict[date, str], templates: Dict[str, tuple], run_date: date,
+                 summary: dict) -> List[EmailMessage]:
+    """One message per recipient row; counts organizations and notices into ``summary``."""
+    messages = []
+    last_id = None
+    for subscription_row_id, organization_name, display_name, subscription_name, expires_on, first_name, \
+            last_name, email_id in rows:
+        notice = notices[expires_on]
+        if subscription_row_id != last_id:
+            last_id = subscription_row_id
+            summary["organizations"] += 1
+            summary["notices"][notice] += 1
+        if not email_id:
+            summary["without_recipients"] += 1
+            continue
+        values = {
+            "first_name": first_name or "",
+            "last_name": last_name or "",
+            "organization_name": display_name or organization_name or "",
+            "subscription_name": subscription_name,
+            "expires_on": expires_on.isoformat(),
+            "days_left": (expires_on - run_date).days,
+        }
+        subject, body = templates[notice]
+        message = EmailMessage()
+        message["From"] = Config.EMAIL_FROM
+        message["To"] = email_id
+        message["Subject"] = subject.safe_substitute(values)
+        message.set_content(body.safe_substitute(values))
+        messages.append(message)
+    summary["messages"] += len(messages)
+    return messages
+
+
+async def deliver(messages: List[EmailMessage], pool: SmtpPool, summary: dict, logger: logging.Logger):
+    results = await asyncio.gather(*(pool.send(message) for message in messages), return_exceptions=True)
+    for result in results:
+        if isinstance(result, SmtpDeliveryError):
+            summary["failed"] += 1
+            logger.warning(f"Expiry notice not delivered: {result}")
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            summary["sent"] += 1
+
+
+# Statements grow with the organization count (one per batch); the budget only guards against per-row lookups
+@query_budget()
+async def send_expiry_notices(run_date: Optional[date], dry_run: bool, session: AsyncSession,
+                              logger: logging.Logger, pool: SmtpPool = None) -> dict:
+    """Render and send the notices due on ``run_date`` (default today, UTC); returns the run summary.
+
+    With ``dry_run`` messages are rendered and counted but not sent. Delivery failures are counted
+    and logged, not raised, so one bad address does not stop the run.
+    """
+    run_date = run_date or datetime.now(timezone.utc).date()
+    if not dry_run and not (Config.EMAIL_HOST and Config.EMAIL_FROM):
+        raise ValueError("EMAIL_HOST and EMAIL_FROM must be set to send expiry notices.")
+    notices = notice_dates(run_date)
+    templates = load_templates()
+    summary = {"run_date": run_date.isoformat(), "dry_run": dry_run, "organizations": 0,
+               "notices": {notice: 0 for notice in NOTICES}, "without_recipients": 0, "messages": 0,
+               "sent": 0, "failed": 0}
+    owns_pool = pool is None and not dry_run
+    if owns_pool:
+        pool = SmtpPool()
+    sending = None
+    last_id = 0
+    try:
+        while True:
+            result = await session.execute(
+                expiring_batch_query(list(notices), last_id, Config.EXPIRY_NOTICE_BATCH_SIZE))
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            messages = render_batch(rows, notices, templates, run_date, summary)
+            if dry_run:
+                continue
+            # The previous batch finishes sending while this one was read and rendered
+            if sending is not None:
+                await sending
+            sending = asyncio.ensure_future(deliver(messages, pool, summary, logger))
+        if sending is not None:
+            await sending
+    finally:
+        if sending is not None and not sending.done():
+            sending.cancel()
+        if owns_pool:
+            await pool.close()
+    logger.info(f"Expiry notices for {summary['run_date']}: {summary['organizations']} organizations, "
+                f"{summary['messages']} messages, {summary['sent']} sent, {summary['failed']} failed, "
+                f"{summary['without_recipients']} without recipients{' (dry run)' if dry_run else ''}.")
+    return summary
+
+
+async def run_expiry_notices(run_date: Optional[date], dry_run: bool, logger: logging.Logger) -> dict:
+    """send_expiry_notices on a session of its own, reading from the replica when one is configured."""
+    from app.configuration.db import open_session, read_engine, read_pool_metrics
+    async with open_session(read_engine, read_pool_metrics) as session:
+        return await send_expiry_notices(run_date, dry_run, session, logger)
+
+
+def seconds_until(run_at: str, now: datetime = None) -> float:
+    """Seconds from ``now`` (UTC) to the next HH:MM."""
+    now = now or datetime.now(timezone.utc)
+    hour, minute = (int(part) for part in run_at.split(":"))
+    next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+async def notify_daily(logger: logging.Logger):
+    """Run the expiry notices every day at EXPIRY_NOTIFIER_RUN_AT until cancelled."""
+    while True:
+        await asyncio.sleep(seconds_until(Config.EXPIRY_NOTIFIER_RUN_AT))
+        try:
+            await run_expiry_notices(None, False, logger)
+        except Exception as e:
+            logger.error(f"Expiry notice run failed: {e}")
+
+
+_notifier_task = None
+
+
+def start_expiry_notifier(logger: logging.Logger):
+    global _notifier_task
+    if Config.EXPIRY_NOTIFIER_ENABLED and _notifier_task is None:
+        _notifier_task = asyncio.get_running_loop().create_task(notify_daily(logger))
+
+
+async def stop_expiry_notifier():
+    global _notifier_task
+    if _notifier_task is not None:
+        _notifier_task.cancel()
+        try:
+            await _notifier_task
+        except asyncio.CancelledError:
+            pass
+        _notifier_task = None
+
+
+def main(argv=None):
+    from app.configuration.db import read_engine
+    from app.configuration.logger import setup_logger
+    from app.utils.fast_json import dumps
+
+    parser = argparse.ArgumentParser(description="Send the subscription expiry notices due on a date.")
+    parser.add_argument("--date", type=date.fromisoformat, help="Run date, YYYY-MM-DD (default: today, UTC)")
+    parser.add_argument("--dry-run", action="store_true", help="Render and count the notices without sending")
+    args = parser.parse_args(argv)
+    logger = setup_logger(f"expiry-notifier-{uuid.uuid4()}")
+
+    async def run():
+        try:
+            return await run_expiry_notices(args.date, args.dry_run, logger)
+        finally:
+            await read_engine.dispose()
+
+    print(dumps(asyncio.run(run())).decode("utf-8"))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,10 @@ from typing import Optional, Type
 from fastapi import HTTPException
 from sqlalchemy import func
 from sqlalchemy.orm import selectinload
-from app.configuration.db import ConnectionManager
 from app.models.models import PermissionEntity, UserEntity, OrganizationEntity, OrganizationSubscriptionEntity, \
     SubscriptionEntity, ServiceEntity
+from app.services.count_cache import count_cache, get_total
+from app.utils.CommonFucntions import encode_cursor, decode_cursor
 from app.models.pydantic_models import UpdatePermission, PermissionDTO, AddressDTO, SubscriptionDTO, ServiceDTO, \
     ApiPermissionDTO, OrganizationSubscriptionDTO, OrganizationDTO, LoginDTO, RoleDTO, PermissionUser
 from sqlalchemy.exc import SQLAlchemyError
@@ -64,47 +65,46 @@ class PermissionService:
             raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching the permission.")
 
     @staticmethod
-    async def check_permission_assigned_to_users(permission_id: int, logger: logging.Logger):
-        async with ConnectionManager() as session:
-            try:
-                # Query to check if any users are associated with the permission_id
-                users_with_permission = await session.execute(
-                    select(UserEntity).where(UserEntity.permission_id == permission_id)
-                )
-                users = users_with_permission.scalars().all()
+    async def check_permission_assigned_to_users(permission_id: int, session: AsyncSession, logger: logging.Logger):
+        try:
+            # Query to check if any users are associated with the permission_id
+            users_with_permission = await session.execute(
+                select(UserEntity).where(UserEntity.permission_id == permission_id)
+            )
+            users = users_with_permission.scalars().all()
 
-                if users:  # If users are found, return conflict
-                    logger.warning(f"Permission with ID {permission_id} is assigned to {len(users)} users.")
-                    return True  # Conflict found
+            if users:  # If users are found, return conflict
+                logger.warning(f"Permission with ID {permission_id} is assigned to {len(users)} users.")
+                return True  # Conflict found
 
-                return False  # No conflict
+            return False  # No conflict
 
-            except SQLAlchemyError as e:
-                logger.error(f"Error while checking permission assignment: {e}")
-                raise HTTPException(status_code=500, detail="An error occurred while checking permission assignment.")
+        except SQLAlchemyError as e:
+            logger.error(f"Error while checking permission assignment: {e}")
+            raise HTTPException(status_code=500, detail="An error occurred while checking permission assignment.")
 
-    async def update_permission(self, permission_id: int, data: UpdatePermission, logger: logging.Logger):
-        async with ConnectionManager() as session:
-            try:
-                # Fetch the existing permission
-                existing_permission = await self.fetch_permission_entity_by_id(permission_id, session, logger)
-                if not existing_permission:
-                    logger.error(f"Permission with ID {permission_id} not found.")
-                    return None
+    async def update_permission(self, permission_id: int, data: UpdatePermission, session: AsyncSession, logger: logging.Logger):
+        try:
+            # Fetch the existing permission
+            existing_permission = await self.fetch_permission_entity_by_id(permission_id, session, logger)
+            if not existing_permission:
+                logger.error(f"Permission with ID {permission_id} not found.")
+                return None
 
-                # Update the permission's fields with the new data
-                for key, value in data.dict(exclude_unset=True).items():
-                    setattr(existing_permission, key, value)
+            # Update the permission's fields with the new data
+            for key, value in data.dict(exclude_unset=True).items():
+                setattr(existing_permission, key, value)
 
-                await session.commit()
-                await session.refresh(existing_permission)
-                logger.info(f"Permission updated: {existing_permission}")
-                return self.entity_to_dto(existing_permission, logger)
+            await session.commit()
+            count_cache.invalidate(PermissionEntity.__tablename__)
+            await session.refresh(existing_permission)
+            logger.info("Permission updated: %s", existing_permission)
+            return self.entity_to_dto(existing_permission, logger)
 
-            except SQLAlchemyError as e:
-                logger.error(f"Failed to update permission: {e}")
-                await session.rollback()
-                raise
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to update permission: {e}")
+            await session.rollback()
+            raise
 
     async def get_permission_by_id(self, permission_id: int, session: AsyncSession, logger: logging.Logger) -> PermissionDTO:
         """Retrieve a permission by its ID and return it as a DTO."""
@@ -124,86 +124,152 @@ class PermissionService:
             logger.error(f"Error processing permission with ID {permission_id}: {e}")
             raise HTTPException(status_code=500, detail="An unexpected error occurred while processing the permission.")
 
-    async def get_all(self, logger: logging.Logger, page: int, size: int, search_key: Optional[str] = None):
-        async with ConnectionManager() as session:
-            try:
-                logger.info(
-                    f"Fetching permissions with pagination - page: {page}, size: {size}, searchKey: {search_key}")
+    @staticmethod
+    def permission_filters(search_key: Optional[str] = None) -> list:
+        """WHERE clauses shared by the page query and its count."""
+        filters = []
+        # Apply search_key if provided to filter permissions by name
+        if search_key:
+            filters.append(PermissionEntity.permission_name.ilike(f"%{search_key}%"))
+        return filters
 
-                # Define the query with the updated relationships and entities
-                query = select(PermissionEntity).options(
-                    selectinload(PermissionEntity.user)
-                    .selectinload(UserEntity.address),  # Loading UserEntity's Address
-                    selectinload(PermissionEntity.user)
-                    .selectinload(UserEntity.organization)
-                    .selectinload(OrganizationEntity.organization_subscription)
-                    .selectinload(OrganizationSubscriptionEntity.subscription)
-                    .selectinload(SubscriptionEntity.services)
-                    .selectinload(ServiceEntity.api_permissions),  # Loading ServiceEntity's ApiPermissions
-                    selectinload(PermissionEntity.user)
-                    .selectinload(UserEntity.role),  # Loading UserEntity's Role
-                    selectinload(PermissionEntity.user)
-                    .selectinload(UserEntity.login)  # Loading UserEntity's Login
-                )
+    @staticmethod
+    def permission_list_query():
+        # Define the query with the updated relationships and entities
+        return select(PermissionEntity).options(
+            selectinload(PermissionEntity.user)
+            .selectinload(UserEntity.address),  # Loading UserEntity's Address
+            selectinload(PermissionEntity.user)
+            .selectinload(UserEntity.organization)
+            .selectinload(OrganizationEntity.organization_subscription)
+            .selectinload(OrganizationSubscriptionEntity.subscription)
+            .selectinload(SubscriptionEntity.services)
+            .selectinload(ServiceEntity.api_permissions),  # Loading ServiceEntity's ApiPermissions
+            selectinload(PermissionEntity.user)
+            .selectinload(UserEntity.role),  # Loading UserEntity's Role
+            selectinload(PermissionEntity.user)
+            .selectinload(UserEntity.login)  # Loading UserEntity's Login
+        )
+
+    @staticmethod
+    async def count_permissions(session: AsyncSession, logger: logging.Logger, search_key: Optional[str] = None):
+        """Total of the filtered permissions as ``(total, exact)``, cached per search key."""
+        async def count() -> int:
+            # Count over the bare table; the eager-load options only matter for the page itself
+            filters = PermissionService.permission_filters(search_key)
+            result = await session.execute(select(func.count(PermissionEntity.id)).where(*filters))
+            return result.scalar()
+
+        return await get_total(PermissionEntity.__tablename__, "permission.get_all", search_key or None, count,
+                               session, logger)
+
+    async def get_all(self, session: AsyncSession, logger: logging.Logger, page: int, size: int, search_key: Optional[str] = None):
+        try:
+            logger.info(
+                f"Fetching permissions with pagination - page: {page}, size: {size}, searchKey: {search_key}")
+
+            filters = self.permission_filters(search_key)
+            query = self.permission_list_query().where(*filters).order_by(PermissionEntity.id)
+
+            # Fetch total count of filtered permissions
+            total_elements, total_exact = await self.count_permissions(session, logger, search_key)
+
+            # Apply pagination to the query
+            paginated_query = query.offset((page - 1) * size).limit(size)
+            result = await session.execute(paginated_query)
+            permissions = result.scalars().all()
+
+            if permissions:
+                logger.info(f"{len(permissions)} permissions found on page {page}")
+                permissions_dto = [self.entity_to_dto(permission, logger) for permission in permissions]
+
+                # Returning paginated data
+                return {
+                    "data": permissions_dto,
+                    "total_pages": (total_elements // size) + (1 if total_elements % size > 0 else 0),
+                    "total_elements": total_elements,
+                    "total_exact": total_exact
+                }
+            else:
+                logger.warning("No permissions found")
+                return {
+                    "data": [],
+                    "total_pages": 0,
+                    "total_elements": 0,
+                    "total_exact": True
+                }
+
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to fetch permissions, error: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error during get_all_permissions: {e}")
+            raise
+
+    async def get_all_after(self, session: AsyncSession, logger: logging.Logger, limit: int,
+                            after: Optional[str] = None, search_key: Optional[str] = None,
+                            include_total: bool = False):
+        """Keyset page ordered by id: rows after the ``after`` cursor, so every page costs the same.
+
+        The total is only counted when ``include_total`` is set.
+        """
+        try:
+            last_id = None
+            if after:
+                last_id = decode_cursor(after).get("id")
+                if not isinstance(last_id, int):
+                    raise ValueError(f"Invalid cursor: {after}")
+            logger.info(
+                f"Fetching permissions by cursor - after id: {last_id}, limit: {limit}, searchKey: {search_key}")
+
+            filters = self.permission_filters(search_key)
+            query = self.permission_list_query().where(*filters)
+            if last_id is not None:
+                query = query.where(PermissionEntity.id > last_id)
+
+            # One extra row tells whether another page exists without counting
+            result = await session.execute(query.order_by(PermissionEntity.id).limit(limit + 1))
+            permissions = result.scalars().all()
+            has_more = len(permissions) > limit
+            permissions = permissions[:limit]
+
+            total_elements, total_exact = None, None
+            if include_total:
+                total_elements, total_exact = await self.count_permissions(session, logger, search_key)
+
+            logger.info(f"{len(permissions)} permissions found after id {last_id}, has_more: {has_more}")
+            return {
+                "data": [self.entity_to_dto(permission, logger) for permission in permissions],
+                "next_cursor": encode_cursor({"id": permissions[-1].id}) if has_more else None,
+                "has_more": has_more,
+                "total_elements": total_elements,
+                "total_exact": total_exact
+            }
+
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to fetch permissions by cursor, error: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error during get_all_after: {e}")
+            raise
+
+    async def delete_permission(self, permission_id: int, session: AsyncSession, logger: logging.Logger):
+        try:
+            permission = await self.fetch_permission_entity_by_id(permission_id, session, logger)
+            if not permission:
+                logger.error(f"Permission with ID {permission_id} not found.")
+                return None
+
+            await session.delete(permission)  # Delete the permission
+            await session.commit()  # Commit the changes
+            count_cache.invalidate(PermissionEntity.__tablename__)
+            logger.info(f"Permission deleted: {permission_id}")
+            return True  # Indicate success
 
-                # Apply search_key if provided to filter permissions by name
-                if search_key:
-                    query = query.where(
-                        PermissionEntity.name.ilike(f"%{search_key}%")
-                    )
-
-                # Fetch total count of filtered permissions
-                total_elements_query = select(func.count()).select_from(query.subquery())
-                total_elements = await session.execute(total_elements_query)
-                total_elements = total_elements.scalar()
-
-                # Apply pagination to the query
-                paginated_query = query.offset((page - 1) * size).limit(size)
-                result = await session.execute(paginated_query)
-                permissions = result.scalars().all()
-
-                if permissions:
-                    logger.info(f"{len(permissions)} permissions found on page {page}")
-                    permissions_dto = [self.entity_to_dto(permission, logger) for permission in permissions]
-
-                    # Returning paginated data
-                    return {
-                        "data": permissions_dto,
-                        "total_pages": (total_elements // size) + (1 if total_elements % size > 0 else 0),
-                        "total_elements": total_elements
-                    }
-                else:
-                    logger.warning("No permissions found")
-                    return {
-                        "data": [],
-                        "total_pages": 0,
-                        "total_elements": 0
-                    }
-
-            except SQLAlchemyError as e:
-                logger.error(f"Failed to fetch permissions, error: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Unexpected error during get_all_permissions: {e}")
-                raise
-
-    async def delete_permission(self, permission_id: int, logger: logging.Logger):
-        async with ConnectionManager() as session:
-            try:
-                permission = await self.fetch_permission_entity_by_id(permission_id, session, logger)
-                if not permission:
-                    logger.error(f"Permission with ID {permission_id} not found.")
-                    return None
-
-                await session.delete(permission)  # Delete the permission
-                await session.commit()  # Commit the changes
-                logger.info(f"Permission deleted: {permission_id}")
-                return True  # Indicate success
-
-            except SQLAlchemyError as e:
-                logger.error(f"Failed to delete permission: {e}")
-                await session.rollback()  # Rollback in case of an error
-                raise
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to delete permission: {e}")
+            await session.rollback()  # Rollback in case of an error
+            raise
 
     @staticmethod
     def entity_to_dto(permission_entity: PermissionEntity, logger: logging.Logger) -> PermissionDTO:
@@ -317,7 +383,7 @@ class PermissionService:
             # Creating PermissionDTO from the above mappings
             permission_dto = PermissionDTO(
                 id=permission_entity.id,
-                name=permission_entity.name,
+                name=permission_entity.permission_name,
                 permission=json.loads(permission_entity.permission) if permission_entity.permission else {},
                 user=permission_user_dto
             )
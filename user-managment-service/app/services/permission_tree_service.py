@@ -0,0 +1,225 @@
+# app/services/permission_tree_service.py
+
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.configuration.config import Config
+from app.configuration.session_events import clear_info_on_rollback
+from app.models.models import SubscriptionEntity, SubscriptionServicesMapping, ApiPermissionEntity, \
+    ServiceApiPermissionsMapping, SubscriptionPermissionTreeEntity
+from app.utils.fast_json import dumps
+
+# (keyword, document key, module id, module name, parent module id); the first keyword found in a
+# permission name decides its module, in this order
+PERMISSION_MODULES = (
+    ("subscription", "subscription_module", "subscription_01", "Subscription Module", None),
+    ("service", "subscription_module", "service_01", "Service Module", "subscription_01"),
+    ("api_permission", "subscription_module", "api_permission_01", "API Permission Module", "service_01"),
+    ("user", "user_module", "user_01", "User Module", None),
+    ("role", "user_module", "role_01", "Role Module", "user_01"),
+    ("permission", "user_module", "permission_01", "Permission Module", "role_01"),
+)
+
+# Subscriptions whose tree is rebuilt when the session commits
+PENDING_KEY = "permission_trees"
+
+
+@lru_cache(maxsize=4096)
+def permission_module(name: str) -> Optional[tuple]:
+    """Module entry of PERMISSION_MODULES for a permission name, or None when no keyword matches."""
+    name = name.lower()
+    return next((module for module in PERMISSION_MODULES if module[0] in name), None)
+
+
+def permission_action(name: str, method, api_url: str, description: str, status: bool) -> dict:
+    return {
+        "name": name,
+        "method": method.value if hasattr(method, "value") else method,
+        "api_url": api_url,
+        "description": description,
+        "status": status
+    }
+
+
+class PermissionTreeBuilder:
+    """Groups the API permissions of one subscription into the user permission document.
+
+    Modules are indexed by id, so each permission is one dict lookup; a permission reachable
+    through several services is listed once.
+    """
+
+    def __init__(self):
+        self.document = {"subscription_module": [], "user_module": []}
+        self.action_count = 0
+        self._modules = {}
+        self._seen = set()
+
+    def add(self, permission_id: int, name: str, method, api_url: str, description: str, status: bool):
+        if permission_id in self._seen:
+            return
+        self._seen.add(permission_id)
+        module = permission_module(name)
+        if module is None:
+            return
+        _, key, module_id, module_name, parent_id = module
+        entry = self._modules.get(module_id)
+        if entry is None:
+            entry = self._modules[module_id] = {"id": module_id, "name": module_name, "parentId": parent_id,
+                                                "actions": []}
+            self.document[key].append(entry)
+        entry["actions"].append(permission_action(name, method, api_url, description, status))
+        self.action_count += 1
+
+
+def tree_source_query(subscription_ids: Iterable[int]):
+    """API permissions of the given subscriptions in mapping order, one row per (subscription, permission).
+
+    Subscriptions without permissions still give one row, with None permission columns.
+    """
+    return (
+        select(SubscriptionEntity.id, ApiPermissionEntity.id, ApiPermissionEntity.name, ApiPermissionEntity.method,
+               ApiPermissionEntity.api_url, ApiPermissionEntity.description, ApiPermissionEntity.status)
+        .select_from(SubscriptionEntity)
+        .outerjoin(SubscriptionServicesMapping, SubscriptionServicesMapping.subscription_id == SubscriptionEntity.id)
+        .outerjoin(ServiceApiPermissionsMapping,
+                   ServiceApiPermissionsMapping.service_id == SubscriptionServicesMapping.service_id)
+        .outerjoin(ApiPermissionEntity, ApiPermissionEntity.id == ServiceApiPermissionsMapping.api_permission_id)
+        .where(SubscriptionEntity.id.in_(list(subscription_ids)))
+        .order_by(SubscriptionEntity.id, SubscriptionServicesMapping.id, ServiceApiPermissionsMapping.id)
+    )
+
+
+def build_trees(rows) -> dict:
+    """subscription id -> PermissionTreeBuilder from ``tree_source_query`` rows."""
+    builders = {}
+    for subscription_id, permission_id, *permission in rows:
+        builder = builders.get(subscription_id)
+        if builder is None:
+            builder = builders[subscription_id] = PermissionTreeBuilder()
+        if permission_id is not None:
+            builder.add(permission_id, *permission)
+    return builders
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def rebuild_trees_sync(connection, subscription_ids: Set[int]):
+    """Replace the stored trees of the given subscriptions (sync, on the committing session's connection).
+
+    Ids of deleted subscriptions only lose their row.
+    """
+    subscription_ids = sorted(subscription_ids)
+    chunk_size = Config.BULK_ID_CHUNK_SIZE
+    for start in range(0, len(subscription_ids), chunk_size):
+        chunk = subscription_ids[start:start + chunk_size]
+        connection.execute(delete(SubscriptionPermissionTreeEntity)
+                           .where(SubscriptionPermissionTreeEntity.subscription_id.in_(chunk)))
+        builders = build_trees(connection.execute(tree_source_query(chunk)))
+        if not builders:
+            continue
+        built_at = _utcnow()
+        connection.execute(insert(SubscriptionPermissionTreeEntity), [
+            {"subscription_id": subscription_id, "tree": dumps(builder.document).decode("utf-8"),
+             "action_count": builder.action_count, "built_at": built_at}
+            for subscription_id, builder in builders.items()
+        ])
+
+
+async def mark_permission_trees(session: AsyncSession, subscription_ids: Iterable[Optional[int]] = (),
+                                service_ids: Iterable[int] = (), api_permission_ids: Iterable[int] = ()):
+    """Queue the trees touched by a catalog write for a rebuild when ``session`` commits.
+
+    Services and API permissions are resolved to their subscriptions now, so call this before
+    deleting their mapping rows.
+    """
+    pending = session.info.setdefault(PENDING_KEY, set())
+    pending.update(subscription_id for subscription_id in subscription_ids if subscription_id is not None)
+    chunk_size = Config.BULK_ID_CHUNK_SIZE
+    for ids, services_of in ((list(service_ids), None), (list(api_permission_ids), _services_of_api_permissions)):
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            service_filter = services_of(chunk) if services_of else chunk
+            result = await session.execute(
+                select(SubscriptionServicesMapping.subscription_id)
+                .where(SubscriptionServicesMapping.service_id.in_(service_filter)).distinct())
+            pending.update(result.scalars())
+
+
+def _services_of_api_permissions(api_permission_ids: list):
+    return (select(ServiceApiPermissionsMapping.service_id)
+            .where(ServiceApiPermissionsMapping.api_permission_id.in_(api_permission_ids)))
+
+
+def _before_commit(session: Session):
+    subscription_ids = session.info.pop(PENDING_KEY, None)
+    if not subscription_ids:
+        return
+    # The mapping rows added by the caller are still pending until the commit's own flush
+    session.flush()
+    rebuild_trees_sync(session.connection(), subscription_ids)
+
+
+def register_permission_tree_index(session_class=Session):
+    """Rebuild the trees queued by mark_permission_trees inside the transaction that changed them."""
+    if not event.contains(session_class, "before_commit", _before_commit):
+        event.listen(session_class, "before_commit", _before_commit)
+        clear_info_on_rollback(PENDING_KEY, session_class=session_class)
+
+
+async def rebuild_all(session: AsyncSession, logger: logging.Logger) -> int:
+    """Rebuild the tree of every subscription in id order, one chunk at a time; returns the subscription count."""
+    last_id, rebuilt = 0, 0
+    chunk_size = Config.BULK_ID_CHUNK_SIZE
+    while True:
+        result = await session.execute(
+            select(SubscriptionEntity.id).where(SubscriptionEntity.id > last_id)
+            .order_by(SubscriptionEntity.id).limit(chunk_size))
+        subscription_ids = list(result.scalars())
+        if not subscription_ids:
+            break
+        await session.run_sync(lambda sync_session: rebuild_trees_sync(sync_session.connection(),
+                                                                       set(subscription_ids)))
+        rebuilt += len(subscription_ids)
+        last_id = subscription_ids[-1]
+    await session.commit()
+    logger.info(f"Rebuilt the permission trees of {rebuilt} subscriptions.")
+    return rebuilt
+
+
+async def get_permission_tree(subscription_id: int, session: AsyncSession, logger: logging.Logger) -> Optional[str]:
+    """The stored permission document of a subscription as JSON text, or None when it does not exist.
+
+    A subscription without a stored tree (created before the table existed) is built on the fly;
+    POST /internal/permission-trees/rebuild stores them all.
+    """
+    result = await session.execute(
+        select(SubscriptionPermissionTreeEntity.tree)
+        .where(SubscriptionPermissionTreeEntity.subscription_id == subscription_id))
+    tree = result.scalar()
+    if tree is not None:
+        return tree
+
+    builder = build_trees(await session.execute(tree_source_query([subscription_id]))).get(subscription_id)
+    if builder is None:
+        return None
+    logger.warning(f"No stored permission tree for subscription {subscription_id}, built it on the fly.")
+    return dumps(builder.document).decode("utf-8")
+
+
+async def attach_permission_tree(permission, subscription_id: int, session: AsyncSession,
+                                 logger: logging.Logger) -> bool:
+    """Set a PermissionEntity's document to the subscription's ready-made tree; False when there is none."""
+    tree = await get_permission_tree(subscription_id, session, logger)
+    if tree is None:
+        logger.warning(f"Subscription {subscription_id} not found, permission document left empty.")
+        return False
+    permission.permission = tree
+    return True
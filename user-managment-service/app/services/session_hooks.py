@@ -0,0 +1,22 @@
+# app/services/session_hooks.py
+
+from sqlalchemy.orm import Session
+
+from app.configuration.query_budget import register_query_budget_commit_check
+from app.services.permission_tree_service import register_permission_tree_index
+from app.services.subscription_expiry_service import register_subscription_expiry
+from app.services.user_search_service import register_user_search_index
+
+
+def register_session_hooks(session_class=Session):
+    """Install the write-side session listeners: the user search index, the permission trees, the
+    organization expiry dates and the query budget check.
+
+    The app calls this at import and every CLI that writes through the ORM calls it before its first
+    session, so both run under the same rules. Calling it again is a no-op.
+    """
+    register_user_search_index(session_class)
+    register_permission_tree_index(session_class)
+    register_subscription_expiry(session_class)
+    # After the listeners above, so the statements they run before commit count against the budgets
+    register_query_budget_commit_check(session_class)
@@ -0,0 +1,236 @@
+# app/services/subscription_expiry_service.py
+
+import enum
+import logging
+from datetime import date, datetime, timezone
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import Date, event, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.configuration.config import Config
+from app.configuration.session_events import clear_info_on_rollback
+from app.models.models import SubscriptionType, SubscriptionEntity, OrganizationSubscriptionEntity, \
+    OrganizationEntity
+from app.models.pydantic_models import OrganizationExpiryDTO
+from app.services.count_cache import count_cache, get_total
+
+EXPIRY_TABLE = OrganizationSubscriptionEntity.__tablename__
+
+MONTH = SubscriptionType.MONTH.name
+YEAR = SubscriptionType.YEAR.name
+
+
+class ExpiryStatus(str, enum.Enum):
+    ACTIVE = "ACTIVE"
+    EXPIRED = "EXPIRED"
+
+
+class expiry_date(FunctionElement):
+    """``expiry_date(subscription_date, validity, subscription_type)``: the start date moved forward by
+    the plan's validity in days, months or years; NULL without a validity.
+
+    The arguments are rendered more than once, so pass columns rather than bound values.
+    """
+    type = Date()
+    name = "expiry_date"
+    inherit_cache = True
+
+
+@compiles(expiry_date)
+def _expiry_date_sqlite(element, compiler, **kw):
+    # SQLite rolls month-end overflow forward (Jan 31 + 1 month is Mar 2 or 3), MySQL and Postgres clamp it
+    start, validity, unit = (compiler.process(clause, **kw) for clause in element.clauses)
+    return (f"date({start}, '+' || {validity} || "
+            f"CASE {unit} WHEN '{MONTH}' THEN ' months' WHEN '{YEAR}' THEN ' years' ELSE ' days' END)")
+
+
+@compiles(expiry_date, "mysql")
+def _expiry_date_mysql(element, compiler, **kw):
+    start, validity, unit = (compiler.process(clause, **kw) for clause in element.clauses)
+    return (f"CASE {unit} WHEN '{MONTH}' THEN DATE_ADD({start}, INTERVAL {validity} MONTH) "
+            f"WHEN '{YEAR}' THEN DATE_ADD({start}, INTERVAL {validity} YEAR) "
+            f"ELSE DATE_ADD({start}, INTERVAL {validity} DAY) END")
+
+
+@compiles(expiry_date, "postgresql")
+def _expiry_date_postgresql(element, compiler, **kw):
+    start, validity, unit = (compiler.process(clause, **kw) for clause in element.clauses)
+    return (f"CASE CAST({unit} AS TEXT) "
+            f"WHEN '{MONTH}' THEN CAST({start} + make_interval(months => {validity}) AS DATE) "
+            f"WHEN '{YEAR}' THEN CAST({start} + make_interval(years => {validity}) AS DATE) "
+            f"ELSE {start} + {validity} END")
+
+
+def expires_on_source():
+    """Expiry of the organization subscription being updated, from its plan (correlated subquery)."""
+    return (
+        select(expiry_date(OrganizationSubscriptionEntity.subscription_date, SubscriptionEntity.validity,
+                           SubscriptionEntity.subscription_type))
+        .where(SubscriptionEntity.id == OrganizationSubscriptionEntity.subscription_id)
+        .scalar_subquery()
+    )
+
+
+def refresh_expiry_sync(connection, row_ids: Iterable[int] = (), subscription_ids: Iterable[int] = ()) -> int:
+    """Recompute ``expires_on`` of the given organization subscriptions and of every organization on the
+    given plans (sync, on the flushing session's connection); returns the rows updated."""
+    updated = 0
+    chunk_size = Config.BULK_ID_CHUNK_SIZE
+    for column, ids in ((OrganizationSubscriptionEntity.id, sorted(row_ids)),
+                        (OrganizationSubscriptionEntity.subscription_id, sorted(subscription_ids))):
+        for start in range(0, len(ids), chunk_size):
+            result = connection.execute(
+                update(OrganizationSubscriptionEntity)
+                .where(column.in_(ids[start:start + chunk_size]))
+                .values(expires_on=expires_on_source()))
+            updated += result.rowcount
+    return updated
+
+
+def _changed(instance, *attributes) -> bool:
+    state = inspect(instance)
+    return any(state.attrs[attribute].history.has_changes() for attribute in attributes)
+
+
+def affected_ids(session: Session):
+    """Organization subscriptions written in this flush, and plans whose validity or type changed."""
+    row_ids, subscription_ids = set(), set()
+    for instance in session.new:
+        if isinstance(instance, OrganizationSubscriptionEntity):
+            row_ids.add(instance.id)
+    for instance in session.dirty:
+        if isinstance(instance, OrganizationSubscriptionEntity) \
+                and _changed(instance, "subscription_date", "subscription_id", "subscription"):
+            row_ids.add(instance.id)
+        elif isinstance(instance, SubscriptionEntity) and _changed(instance, "validity", "subscription_type"):
+            subscription_ids.add(instance.id)
+    row_ids.discard(None)
+    subscription_ids.discard(None)
+    return row_ids, subscription_ids
+
+
+def _refresh_loaded(session: Session, row_ids: Set[int], subscription_ids: Set[int]):
+    """Give loaded OrganizationSubscriptionEntity objects their new expiry, so nothing lazy-loads it later."""
+    # Objects inserted by this flush join the identity map only after it
+    instances = list(session.identity_map.values()) + list(session.new)
+    loaded = {instance.id: instance for instance in instances
+              if isinstance(instance, OrganizationSubscriptionEntity)
+              and (instance.id in row_ids or instance.subscription_id in subscription_ids)}
+    if not loaded:
+        return
+    result = session.connection().execute(
+        select(OrganizationSubscriptionEntity.id, OrganizationSubscriptionEntity.expires_on)
+        .where(OrganizationSubscriptionEntity.id.in_(list(loaded))))
+    for row_id, expires_on in result:
+        set_committed_value(loaded[row_id], "expires_on", expires_on)
+
+
+def _after_flush(session: Session, flush_context):
+    row_ids, subscription_ids = affected_ids(session)
+    if not (row_ids or subscription_ids):
+        return
+    refresh_expiry_sync(session.connection(), row_ids, subscription_ids)
+    _refresh_loaded(session, row_ids, subscription_ids)
+    session.info["subscription_expiry_changed"] = True
+
+
+def _after_commit(session: Session):
+    if session.info.pop("subscription_expiry_changed", False):
+        count_cache.invalidate(EXPIRY_TABLE)
+
+
+def register_subscription_expiry(session_class=Session):
+    """Keep organization_subscription_details.expires_on in step with its plan on every flush."""
+    if not event.contains(session_class, "after_flush", _after_flush):
+        event.listen(session_class, "after_flush", _after_flush)
+        event.listen(session_class, "after_commit", _after_commit)
+        clear_info_on_rollback("subscription_expiry_changed", session_class=session_class)
+
+
+async def rebuild_all(session: AsyncSession, logger: logging.Logger) -> int:
+    """Recompute the expiry of every organization subscription in id order, one chunk per statement."""
+    last_id, refreshed = 0, 0
+    chunk_size = Config.BULK_ID_CHUNK_SIZE
+    while True:
+        result = await session.execute(
+            select(OrganizationSubscriptionEntity.id).where(OrganizationSubscriptionEntity.id > last_id)
+            .order_by(OrganizationSubscriptionEntity.id).limit(chunk_size))
+        row_ids = list(result.scalars())
+        if not row_ids:
+            break
+        await session.run_sync(lambda sync_session: refresh_expiry_sync(sync_session.connection(), row_ids))
+        refreshed += len(row_ids)
+        last_id = row_ids[-1]
+    await session.commit()
+    count_cache.invalidate(EXPIRY_TABLE)
+    logger.info(f"Recomputed the expiry date of {refreshed} organization subscriptions.")
+    return refreshed
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+async def get_organizations_by_expiry(expires_from: Optional[date], expires_to: Optional[date],
+                                      status: Optional[ExpiryStatus], page: int, size: int,
+                                      session: AsyncSession, logger: logging.Logger) -> dict:
+    """Page of organizations whose plan expires within [expires_from, expires_to], soonest first.
+
+    ``status`` is relative to today (UTC): ACTIVE expires today or later, EXPIRED before today.
+    Organizations whose plan has no validity have no expiry and only appear without any filter.
+    """
+    logger.info(f"Fetching organizations by expiry - from: {expires_from}, to: {expires_to}, status: {status}, "
+                f"page: {page}, size: {size}")
+    expires_on = OrganizationSubscriptionEntity.expires_on
+    conditions = []
+    if expires_from is not None:
+        conditions.append(expires_on >= expires_from)
+    if expires_to is not None:
+        conditions.append(expires_on <= expires_to)
+    today = _today()
+    if status == ExpiryStatus.ACTIVE:
+        conditions.append(expires_on >= today)
+    elif status == ExpiryStatus.EXPIRED:
+        conditions.append(expires_on < today)
+
+    async def count() -> int:
+        result = await session.execute(
+            select(func.count()).select_from(OrganizationSubscriptionEntity).where(*conditions))
+        return result.scalar()
+
+    filters = (expires_from, expires_to, status, today) if conditions else None
+    total_elements, total_exact = await get_total(EXPIRY_TABLE, "organization.expiry", filters, count,
+                                                  session, logger)
+
+    result = await session.execute(
+        select(OrganizationEntity.id.label("organization_id"), OrganizationEntity.organization_name,
+               OrganizationEntity.display_name, SubscriptionEntity.id.label("subscription_id"),
+               SubscriptionEntity.name.label("subscription_name"), OrganizationSubscriptionEntity.subscription_date,
+               expires_on)
+        .select_from(OrganizationSubscriptionEntity)
+        .join(OrganizationEntity, OrganizationEntity.id == OrganizationSubscriptionEntity.organization_id)
+        .outerjoin(SubscriptionEntity, SubscriptionEntity.id == OrganizationSubscriptionEntity.subscription_id)
+        .where(*conditions)
+        .order_by(expires_on, OrganizationSubscriptionEntity.id)
+        .offset((page - 1) * size)
+        .limit(size)
+    )
+    organizations = [
+        OrganizationExpiryDTO(
+            **row._mapping,
+            status=None if row.expires_on is None
+            else (ExpiryStatus.ACTIVE if row.expires_on >= today else ExpiryStatus.EXPIRED).value)
+        for row in result
+    ]
+    logger.info(f"{len(organizations)} organizations found on page {page} of {total_elements}")
+    return {
+        "data": organizations,
+        "total_pages": (total_elements // size) + (1 if total_elements % size > 0 else 0),
+        "total_elements": total_elements,
+        "total_exact": total_exact
+    }
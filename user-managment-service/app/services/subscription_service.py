@@ -1,7 +1,7 @@
 from typing import List, Optional, Union
 
 import asyncpg
-from sqlalchemy import delete
+from sqlalchemy import delete, insert, update, bindparam
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,48 +10,65 @@ from app.models.models import SubscriptionEntity, SubscriptionType, ServiceEntit
 from app.models.pydantic_models import CreateSubscription, SubscriptionDTO, ServiceDTO, ApiPermissionDTO, CreateService, \
     CreateApiPermission, PagePermissionDTO, PagePermissionCreateDTO
 import logging
+import sys
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from app.configuration.db import ConnectionManager
 from fastapi import HTTPException
 
 from app.models.response import ResponseBO
+from app.services.catalog_cache import catalog_cache, MISS, SUBSCRIPTION_LIST, SERVICE_LIST, subscription_tag, \
+    service_tag, api_permission_tag, page_permission_tag, subscription_dto_tags, service_dto_tags
+from app.services.catalog_version_service import bump_catalog_versions, SUBSCRIPTION, SERVICE, \
+    SUBSCRIPTION_SERVICES_MAPPING, API_PERMISSION, SERVICE_API_PERMISSIONS_MAPPING, PAGE_PERMISSION, \
+    SERVICE_PAGE_PERMISSIONS_MAPPING
+from app.services.catalog_projection import CatalogProjection, projection_tags, SUBSCRIPTION_FIELDS, SERVICE_FIELDS, \
+    API_PERMISSIONS, PAGE_PERMISSIONS
+from app.services.entitlement_service import entitlement_index
+from app.services.permission_tree_service import mark_permission_trees
+from app.utils.CommonFucntions import find_missing_ids, build_upsert
+from app.configuration.config import Config
+from app.configuration.tracing import trace_functions
+from app.configuration.query_budget import query_budget
+
+
+def invalidate_catalog(logger: logging.Logger, *tags):
+    # Called after the commit, so a reader that raced the write never re-caches the old graph
+    dropped = catalog_cache.invalidate(*tags)
+    entitlement_index.invalidate(*tags)
+    logger.info(f"Catalog cache invalidated {dropped} entries for tags: {tags}")
+
+
+async def check_subscription_name_exists(name: str, session: AsyncSession, logger: logging.Logger) -> bool:
+    try:
+        # Query the SubscriptionEntity to check for existing subscription name
+        result = await session.execute(
+            select(SubscriptionEntity).filter_by(name=name)
+        )
+        # Check if any subscription with the given name exists
+        return result.scalars().first() is not None
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while checking subscription name: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
 
+async def check_service_name_exists(name: str, session: AsyncSession, logger: logging.Logger) -> bool:
+    try:
+        existing_service = await session.execute(
+            select(ServiceEntity).filter_by(name=name)
+        )
+        return existing_service.scalars().first() is not None
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while checking service name: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
 
-async def check_subscription_name_exists(name: str, logger: logging.Logger) -> bool:
-    async with ConnectionManager() as session:  # Assuming ConnectionManager manages your async session
-        try:
-            # Query the SubscriptionEntity to check for existing subscription name
-            result = await session.execute(
-                select(SubscriptionEntity).filter_by(name=name)
-            )
-            # Check if any subscription with the given name exists
-            return result.scalars().first() is not None
-        except SQLAlchemyError as e:
-            logger.error(f"Database error while checking subscription name: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred.")
-
-async def check_service_name_exists(name: str, logger: logging.Logger) -> bool:
-    async with ConnectionManager() as session:
-        try:
-            existing_service = await session.execute(
-                select(ServiceEntity).filter_by(name=name)
-            )
-            return existing_service.scalars().first() is not None
-        except SQLAlchemyError as e:
-            logger.error(f"Database error while checking service name: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred.")
-
-async def check_update_subscription_name_exists(name: str, exclude_id: int, logger: logging.Logger) -> bool:
-    async with ConnectionManager() as session:
-        try:
-            existing_subscription = await session.execute(
-                select(SubscriptionEntity).filter(SubscriptionEntity.name == name, SubscriptionEntity.id != exclude_id)
-            )
-            return existing_subscription.scalars().first() is not None
-        except SQLAlchemyError as e:
-            logger.error(f"Database error while checking subscription name: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred.")
+async def check_update_subscription_name_exists(name: str, exclude_id: int, session: AsyncSession, logger: logging.Logger) -> bool:
+    try:
+        existing_subscription = await session.execute(
+            select(SubscriptionEntity).filter(SubscriptionEntity.name == name, SubscriptionEntity.id != exclude_id)
+        )
+        return existing_subscription.scalars().first() is not None
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while checking subscription name: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
 
 
 async def fetch_subscription_with_relationships(subscription_id: int, session, logger) -> SubscriptionEntity:
@@ -73,7 +90,7 @@ async def fetch_subscription_with_relationships(subscription_id: int, session, l
         subscription = result.scalars().first()
 
         if subscription:
-            logger.info(f"Successfully retrieved subscription: {subscription}")
+            logger.debug("Successfully retrieved subscription: %s", subscription)
         else:
             logger.warning(f"Subscription with ID {subscription_id} not found.")
 
@@ -86,48 +103,52 @@ async def fetch_subscription_with_relationships(subscription_id: int, session, l
 
 
 
-async def create_subscription(data: CreateSubscription, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            new_subscription = dto_to_entity(data, logger)  # Convert DTO to entity
-            session.add(new_subscription)
-            await session.commit()
-            subscription = await fetch_subscription_with_relationships(new_subscription.id, session, logger)
-            logger.info(f"Subscription created: {new_subscription}")
-            return entity_to_dto(subscription, logger)  # Convert entity to DTO
-        except SQLAlchemyError as e:
-            logger.error(f"Failed to create subscription: {e}")
-            await session.rollback()
-            raise
-
-async def update_subscription(subscription_id: int, data: CreateSubscription, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the existing subscription
-            existing_subscription = await fetch_subscription_with_relationships(subscription_id, session, logger)
-            if not existing_subscription:
-                logger.error(f"Subscription with ID {subscription_id} not found.")
-                # raise HTTPException(status_code=404, detail="Subscription not found")
-                return None
-
-            existing_subscription.name = data.name
-            existing_subscription.validity = data.validity
-            existing_subscription.cost = data.cost
-            existing_subscription.active_status = data.active_status
-            existing_subscription.subscription_type = SubscriptionType[data.subscription_type]
-
-            session.add(existing_subscription)
-            await session.commit()
-            logger.info(f"Subscription updated: {existing_subscription}")
-            return entity_to_dto(existing_subscription, logger)  # Return the updated entity or convert to DTO if needed
-
-        except SQLAlchemyError as e:
-            logger.error(f"Failed to update subscription: {e}")
-            await session.rollback()
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while updating: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+@query_budget(5)
+async def create_subscription(data: CreateSubscription, session: AsyncSession, logger: logging.Logger):
+    try:
+        new_subscription = dto_to_entity(data, logger)  # Convert DTO to entity
+        session.add(new_subscription)
+        await bump_catalog_versions(session, SUBSCRIPTION)
+        await session.commit()
+        invalidate_catalog(logger, SUBSCRIPTION_LIST)
+        subscription = await fetch_subscription_with_relationships(new_subscription.id, session, logger)
+        logger.info("Subscription created: %s", new_subscription)
+        return entity_to_dto(subscription, logger)  # Convert entity to DTO
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to create subscription: {e}")
+        await session.rollback()
+        raise
+
+@query_budget(8)
+async def update_subscription(subscription_id: int, data: CreateSubscription, session: AsyncSession, logger: logging.Logger):
+    try:
+        # Fetch the existing subscription
+        existing_subscription = await fetch_subscription_with_relationships(subscription_id, session, logger)
+        if not existing_subscription:
+            logger.error(f"Subscription with ID {subscription_id} not found.")
+            # raise HTTPException(status_code=404, detail="Subscription not found")
+            return None
+
+        existing_subscription.name = data.name
+        existing_subscription.validity = data.validity
+        existing_subscription.cost = data.cost
+        existing_subscription.active_status = data.active_status
+        existing_subscription.subscription_type = SubscriptionType[data.subscription_type]
+
+        session.add(existing_subscription)
+        await bump_catalog_versions(session, SUBSCRIPTION)
+        await session.commit()
+        invalidate_catalog(logger, subscription_tag(subscription_id), SUBSCRIPTION_LIST)
+        logger.info("Subscription updated: %s", existing_subscription)
+        return entity_to_dto(existing_subscription, logger)  # Return the updated entity or convert to DTO if needed
+
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to update subscription: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while updating: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
 # async def get_subscription_by_id(subscription_id: int, logger: logging.Logger):
@@ -149,120 +170,226 @@ async def update_subscription(subscription_id: int, data: CreateSubscription, lo
 #             raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 #After add responseBO
-async def get_subscription_by_id(subscription_id: int, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the subscription by ID
-            subscription = await fetch_subscription_with_relationships(subscription_id, session, logger)
-
-            if not subscription:
-                logger.error(f"Subscription with ID {subscription_id} not found.")
-                # Return None to let the router handle the 404 error
-                return None
+@query_budget(5)
+async def get_subscription_by_id(subscription_id: int, session: AsyncSession, logger: logging.Logger,
+                                 projection: Optional[CatalogProjection] = None, etag: Optional[str] = None):
+    if projection is not None:
+        return await get_projected_subscriptions(projection, session, logger, subscription_id, etag=etag)
+
+    cache_key = ("subscription", subscription_id)
+    cached = catalog_cache.get(cache_key, etag)
+    if cached is not MISS:
+        logger.info(f"Subscription {subscription_id} served from catalog cache.")
+        return cached
+    version = catalog_cache.version
 
-            logger.info(f"Retrieved subscription: {subscription}")
-            # Convert entity to DTO if needed
-            return entity_to_dto(subscription, logger)
+    try:
+        # Fetch the subscription by ID
+        subscription = await fetch_subscription_with_relationships(subscription_id, session, logger)
 
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while fetching subscription: {e}")
-            # Return a custom object indicating a database error
-            return {"error": "db_error", "message": "Database error occurred. Please try again later."}
+        if not subscription:
+            logger.error(f"Subscription with ID {subscription_id} not found.")
+            # Return None to let the router handle the 404 error
+            return None
 
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching subscription: {e}")
-            # Return a generic error response to handle at the router level
-            return {"error": "unexpected", "message": "An unexpected error occurred. Please try again later."}
+        logger.debug("Retrieved subscription: %s", subscription)
+        # Convert entity to DTO if needed
+        dto = entity_to_dto(subscription, logger)
+        catalog_cache.set(cache_key, dto, subscription_dto_tags([dto]), version, etag)
+        return dto
 
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while fetching subscription: {e}")
+        # Return a custom object indicating a database error
+        return {"error": "db_error", "message": "Database error occurred. Please try again later."}
 
-async def get_all_subscriptions(logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch all subscriptions from the database with eager loading
-            result = await session.execute(
-                select(SubscriptionEntity)
-                .options(
-                    selectinload(SubscriptionEntity.services)
-                    .selectinload(ServiceEntity.api_permissions),
-                    selectinload(SubscriptionEntity.services)
-                    .selectinload(ServiceEntity.page_permissions)
-                )
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching subscription: {e}")
+        # Return a generic error response to handle at the router level
+        return {"error": "unexpected", "message": "An unexpected error occurred. Please try again later."}
+
+
+@query_budget(5)
+async def get_all_subscriptions(session: AsyncSession, logger: logging.Logger,
+                                projection: Optional[CatalogProjection] = None, etag: Optional[str] = None):
+    if projection is not None:
+        return await get_projected_subscriptions(projection, session, logger, etag=etag)
+
+    cached = catalog_cache.get("subscriptions:all", etag)
+    if cached is not MISS:
+        logger.info(f"Retrieved {len(cached)} subscriptions from catalog cache.")
+        return cached
+    version = catalog_cache.version
+
+    try:
+        # Fetch all subscriptions from the database with eager loading
+        result = await session.execute(
+            select(SubscriptionEntity)
+            .options(
+                selectinload(SubscriptionEntity.services)
+                .selectinload(ServiceEntity.api_permissions),
+                selectinload(SubscriptionEntity.services)
+                .selectinload(ServiceEntity.page_permissions)
             )
-            subscriptions = result.scalars().all()  # Fetch all results
-
-            if not subscriptions:
-                logger.warning("No subscriptions found.")
-                return []  # Return an empty list if no subscriptions are found
-
-            logger.info(f"Retrieved {len(subscriptions)} subscriptions.")
-            return [entity_to_dto(subscription, logger) for subscription in subscriptions]
-
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while fetching subscriptions: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching subscriptions: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-async def get_active_subscriptions(logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch first 3 active subscriptions from the database
-            result = await session.execute(
-                select(SubscriptionEntity)
-                .where(SubscriptionEntity.active_status == True)  # Filter by active status
-                .limit(3)  # Fetch only the first 3 subscriptions
-                .options(
-                    selectinload(SubscriptionEntity.services)  # Eager load related services
-                    # .selectinload(SubscriptionServicesMapping.service_id)
-                    .selectinload(ServiceEntity.api_permissions),  # Eager load related ApiPermissionEntity
-                    selectinload(SubscriptionEntity.services)
-                    .selectinload(ServiceEntity.page_permissions)
-                )
+        )
+        subscriptions = result.scalars().all()  # Fetch all results
+
+        if not subscriptions:
+            logger.warning("No subscriptions found.")
+            catalog_cache.set("subscriptions:all", [], {SUBSCRIPTION_LIST}, version, etag)
+            return []  # Return an empty list if no subscriptions are found
+
+        logger.info(f"Retrieved {len(subscriptions)} subscriptions.")
+        dtos = [entity_to_dto(subscription, logger) for subscription in subscriptions]
+        catalog_cache.set("subscriptions:all", dtos, subscription_dto_tags(dtos) | {SUBSCRIPTION_LIST}, version, etag)
+        return dtos
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while fetching subscriptions: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching subscriptions: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+@query_budget(5)
+async def get_projected_subscriptions(projection: CatalogProjection, session: AsyncSession, logger: logging.Logger,
+                                      subscription_id: Optional[int] = None, active_only: bool = False,
+                                      etag: Optional[str] = None):
+    """Subscriptions shaped by ``fields=`` / ``expand=`` as plain dicts: one subscription when an id
+    is given, else all (or the first 3 active ones, as get_active_subscriptions).
+
+    Without expansions this is a single query over the requested columns; otherwise only the
+    expanded relationships are eager loaded. The dicts match the DTO shapes without being validated.
+    ``etag`` is the catalog ETag the caller answers with; cached results built under another one are not used.
+    """
+    if subscription_id is not None:
+        cache_name = "subscription"
+    else:
+        cache_name = "subscriptions:active" if active_only else "subscriptions:all"
+    cache_key = (cache_name, subscription_id, projection.key)
+    cached = catalog_cache.get(cache_key, etag)
+    if cached is not MISS:
+        logger.info(f"Projected subscriptions {projection.key} served from catalog cache.")
+        return cached
+    version = catalog_cache.version
+
+    try:
+        if projection.loads_services:
+            query = select(SubscriptionEntity).options(*projection.load_options())
+        else:
+            query = select(*projection.columns())
+        if subscription_id is not None:
+            query = query.where(SubscriptionEntity.id == subscription_id)
+        if active_only:
+            query = query.where(SubscriptionEntity.active_status == True).limit(3)
+        result = await session.execute(query)
+
+        if projection.loads_services:
+            dtos = [entity_to_dto(subscription, logger, projection) for subscription in result.scalars().all()]
+        else:
+            dtos = [project_subscription_fields(dict(row._mapping)) for row in result]
+        logger.info(f"Retrieved {len(dtos)} subscriptions with projection {projection.key}.")
+
+        if subscription_id is not None:
+            if not dtos:
+                # Misses are not cached: nothing would drop the entry when the id is created later
+                return None
+            catalog_cache.set(cache_key, dtos[0], projection_tags(dtos) | {subscription_tag(subscription_id)}, version,
+                              etag)
+            return dtos[0]
+        catalog_cache.set(cache_key, dtos, projection_tags(dtos) | {SUBSCRIPTION_LIST}, version, etag)
+        return dtos
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while fetching projected subscriptions: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+
+
+def project_subscription_fields(dto: dict) -> dict:
+    # Same value types SubscriptionDTO would produce
+    if dto.get("cost") is not None:
+        dto["cost"] = float(dto["cost"])
+    if dto.get("subscription_type") is not None:
+        dto["subscription_type"] = dto["subscription_type"].name  # Convert Enum to string
+    return dto
+
+
+@query_budget(5)
+async def get_active_subscriptions(session: AsyncSession, logger: logging.Logger,
+                                   projection: Optional[CatalogProjection] = None, etag: Optional[str] = None):
+    if projection is not None:
+        return await get_projected_subscriptions(projection, session, logger, active_only=True, etag=etag)
+
+    cached = catalog_cache.get("subscriptions:active", etag)
+    if cached is not MISS:
+        logger.info(f"Retrieved {len(cached)} active subscriptions from catalog cache.")
+        return cached
+    version = catalog_cache.version
+
+    try:
+        # Fetch first 3 active subscriptions from the database
+        result = await session.execute(
+            select(SubscriptionEntity)
+            .where(SubscriptionEntity.active_status == True)  # Filter by active status
+            .limit(3)  # Fetch only the first 3 subscriptions
+            .options(
+                selectinload(SubscriptionEntity.services)  # Eager load related services
+                # .selectinload(SubscriptionServicesMapping.service_id)
+                .selectinload(ServiceEntity.api_permissions),  # Eager load related ApiPermissionEntity
+                selectinload(SubscriptionEntity.services)
+                .selectinload(ServiceEntity.page_permissions)
             )
-            subscriptions = result.scalars().all()  # Fetch all results
-
-            if not subscriptions:
-                logger.warning("No active subscriptions found.")
-                return []  # Return an empty list if no active subscriptions are found
-
-            logger.info(f"Retrieved {len(subscriptions)} active subscriptions.")
-            return [entity_to_dto(subscription, logger) for subscription in subscriptions]
-
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while fetching active subscriptions: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching active subscriptions: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-async def delete_subscription(subscription_id: int, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the subscription by ID to ensure it exists
-            subscription = await fetch_subscription_with_relationships(subscription_id, session, logger)
-            if not subscription:
-                logger.error(f"Subscription with ID {subscription_id} not found for deletion.")
-                # raise HTTPException(status_code=404, detail="Subscription not found.")
-                return False
-
-            # Proceed to delete the subscription
-            await session.delete(subscription)
-            await session.commit()  # Commit the transaction
-
-            logger.info(f"Successfully deleted subscription with ID {subscription_id}.")
-            return True
-
-        except asyncpg.PostgresError as pg_exc:
-            logger.error(f"Database error occurred while deleting subscription: {pg_exc}")
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while deleting subscription: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+        )
+        subscriptions = result.scalars().all()  # Fetch all results
+
+        if not subscriptions:
+            logger.warning("No active subscriptions found.")
+            catalog_cache.set("subscriptions:active", [], {SUBSCRIPTION_LIST}, version, etag)
+            return []  # Return an empty list if no active subscriptions are found
+
+        logger.info(f"Retrieved {len(subscriptions)} active subscriptions.")
+        dtos = [entity_to_dto(subscription, logger) for subscription in subscriptions]
+        catalog_cache.set("subscriptions:active", dtos, subscription_dto_tags(dtos) | {SUBSCRIPTION_LIST}, version,
+                          etag)
+        return dtos
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while fetching active subscriptions: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching active subscriptions: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+@query_budget(7)
+async def delete_subscription(subscription_id: int, session: AsyncSession, logger: logging.Logger):
+    try:
+        # Fetch the subscription by ID to ensure it exists
+        subscription = await fetch_subscription_with_relationships(subscription_id, session, logger)
+        if not subscription:
+            logger.error(f"Subscription with ID {subscription_id} not found for deletion.")
+            # raise HTTPException(status_code=404, detail="Subscription not found.")
+            return False
+
+        # Proceed to delete the subscription
+        await session.delete(subscription)
+        await mark_permission_trees(session, subscription_ids=[subscription_id])
+        await bump_catalog_versions(session, SUBSCRIPTION, SUBSCRIPTION_SERVICES_MAPPING)
+        await session.commit()  # Commit the transaction
+        invalidate_catalog(logger, subscription_tag(subscription_id), SUBSCRIPTION_LIST)
+
+        logger.info(f"Successfully deleted subscription with ID {subscription_id}.")
+        return True
+
+    except asyncpg.PostgresError as pg_exc:
+        logger.error(f"Database error occurred while deleting subscription: {pg_exc}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while deleting subscription: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
 def dto_to_entity(dto: CreateSubscription, logger: logging.Logger) -> SubscriptionEntity:
-    logger.debug(f"Converting DTO to entity: {dto}")
+    logger.debug("Converting DTO to entity: %s", dto)
     entity = SubscriptionEntity(
         name=dto.name,
         validity=dto.validity,
@@ -270,7 +397,7 @@ def dto_to_entity(dto: CreateSubscription, logger: logging.Logger) -> Subscripti
         active_status=dto.active_status,
         subscription_type=SubscriptionType[dto.subscription_type]  # Convert string to enum
     )
-    logger.info(f"Converted DTO to entity: {entity}")
+    logger.debug("Converted DTO to entity: %s", entity)
     return entity
 
 
@@ -312,8 +439,17 @@ def dto_to_entity(dto: CreateSubscription, logger: logging.Logger) -> Subscripti
 #     logger.info(f"Converted entity to DTO: {dto}")
 #     return dto
 
-def entity_to_dto(entity: SubscriptionEntity, logger: logging.Logger) -> SubscriptionDTO:
-    logger.debug(f"Converting entity to DTO: {entity}")
+def entity_to_dto(entity: SubscriptionEntity, logger: logging.Logger,
+                  projection: Optional[CatalogProjection] = None) -> Union[SubscriptionDTO, dict]:
+    logger.debug("Converting entity to DTO: %s", entity)
+
+    # Projected: only the requested columns, and services only when they were expanded
+    if projection is not None:
+        dto = project_subscription_fields(
+            {field: getattr(entity, field) for field in SUBSCRIPTION_FIELDS if field in projection.subscription_fields})
+        if projection.loads_services:
+            dto["services"] = [entity_to_service_dto(service, logger, projection) for service in entity.services]
+        return dto
 
     # Convert the related ServiceEntity instances to ServiceDTO
     services = [
@@ -357,22 +493,21 @@ def entity_to_dto(entity: SubscriptionEntity, logger: logging.Logger) -> Subscri
         services=services
     )
 
-    logger.info(f"Converted entity to DTO: {dto}")
+    logger.debug("Converted entity to DTO: %s", dto)
     return dto
 
 
 
 
-async def check_update_service_name_exists(name: str, exclude_id: int, logger: logging.Logger) -> bool:
-    async with ConnectionManager() as session:
-        try:
-            existing_service = await session.execute(
-                select(ServiceEntity).filter(ServiceEntity.name == name, ServiceEntity.id != exclude_id)
-            )
-            return existing_service.scalars().first() is not None
-        except SQLAlchemyError as e:
-            logger.error(f"Database error while checking service name: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred.")
+async def check_update_service_name_exists(name: str, exclude_id: int, session: AsyncSession, logger: logging.Logger) -> bool:
+    try:
+        existing_service = await session.execute(
+            select(ServiceEntity).filter(ServiceEntity.name == name, ServiceEntity.id != exclude_id)
+        )
+        return existing_service.scalars().first() is not None
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while checking service name: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
 
 async def fetch_service_with_relationships(service_id: int, session, logger) -> ServiceEntity:
     logger.info(f"Fetching service with ID: {service_id}")
@@ -392,7 +527,7 @@ async def fetch_service_with_relationships(service_id: int, session, logger) ->
         service = result.scalars().first()
 
         if service:
-            logger.info(f"Successfully retrieved service: {service}")
+            logger.debug("Successfully retrieved service: %s", service)
         else:
             logger.warning(f"Service with ID {service_id} not found.")
 
@@ -402,363 +537,374 @@ async def fetch_service_with_relationships(service_id: int, session, logger) ->
         logger.error(f"Error occurred while fetching service with ID {service_id}: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching the service.")
 
-async def check_subscription_exists(subscription_id: int, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        result = await session.execute(select(SubscriptionEntity).filter_by(id=subscription_id))
-        return result.scalars().first() is not None
+async def check_subscription_exists(subscription_id: int, session: AsyncSession, logger: logging.Logger):
+    return not await find_missing_ids(session, SubscriptionEntity, [subscription_id], logger)
 
-async def check_services_exist(service_ids: List[int], logger: logging.Logger):
-    async with ConnectionManager() as session:
-        result = await session.execute(select(ServiceEntity).filter(ServiceEntity.id.in_(service_ids)))
-        return len(result.scalars().all()) == len(service_ids)
+async def validate_services(service_ids: Optional[List[int]], session: AsyncSession, logger: logging.Logger) -> List[int]:
+    # Returns the service IDs that do not exist
+    return await find_missing_ids(session, ServiceEntity, service_ids, logger)
 
-async def validate_api_permissions(api_permission_ids: Optional[List[int]], logger: logging.Logger) -> List[
+async def validate_api_permissions(api_permission_ids: Optional[List[int]], session: AsyncSession, logger: logging.Logger) -> List[
         int]:
-        if not api_permission_ids:
-            return []  # No IDs to validate
-
-        async with ConnectionManager() as session:
-            # Check which IDs are invalid
-            invalid_ids = []
-            for perm_id in api_permission_ids:
-                permission = await session.get(ApiPermissionEntity, perm_id)
-                if not permission:
-                    invalid_ids.append(perm_id)
-                    logger.error(f"API permission with ID {perm_id} not found.")
-
-            return invalid_ids
-async def fetch_delete_service_with_relationships(service_id: int, logger: logging.Logger):
+    # Returns the API permission IDs that do not exist
+    return await find_missing_ids(session, ApiPermissionEntity, api_permission_ids, logger)
+async def fetch_delete_service_with_relationships(service_id: int, session: AsyncSession, logger: logging.Logger):
     """Fetch the service along with related API permissions and subscriptions."""
-    async with ConnectionManager() as session:
-        logger.info(f"Fetching service with ID: {service_id}")
-        result = await session.execute(
-            select(ServiceEntity).filter(ServiceEntity.id == service_id)
-        )
-        service = result.scalars().first()
+    logger.info(f"Fetching service with ID: {service_id}")
+    result = await session.execute(
+        select(ServiceEntity).filter(ServiceEntity.id == service_id)
+    )
+    service = result.scalars().first()
 
-        if service:
-            logger.info(f"Service {service_id} found.")
-        else:
-            logger.warning(f"Service with ID {service_id} not found.")
+    if service:
+        logger.info(f"Service {service_id} found.")
+    else:
+        logger.warning(f"Service with ID {service_id} not found.")
+
+    return service
 
-        return service
 
 
+@query_budget(17)
+async def create_service(data: CreateService, session: AsyncSession, logger: logging.Logger):
+    try:
+        # Convert DTO to ServiceEntity
+        new_service = await dto_to_service_entity(data, session, logger)
 
-async def create_service(data: CreateService, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Convert DTO to ServiceEntity
-            new_service = await dto_to_service_entity(data, session, logger)
+        # Add the new service entity to the session
+        session.add(new_service)
+        logger.info("New service entity added to session: %s", new_service)
 
-            # Add the new service entity to the session
-            session.add(new_service)
-            logger.info(f"New service entity added to session: {new_service}")
+        await bump_catalog_versions(session, SERVICE, SERVICE_API_PERMISSIONS_MAPPING)
+        await session.commit()
 
-            await session.commit()
+        # Fetch the subscription entity using subscription_id from the DTO
+        if data.subscription_id:
+            logger.info(f"Fetching subscription with ID: {data.subscription_id}")
 
-            # Fetch the subscription entity using subscription_id from the DTO
-            if data.subscription_id:
-                logger.info(f"Fetching subscription with ID: {data.subscription_id}")
+            result = await session.execute(
+                select(SubscriptionEntity).filter(SubscriptionEntity.id == data.subscription_id)
+            )
+            subscription = result.scalars().first()
 
-                result = await session.execute(
-                    select(SubscriptionEntity).filter(SubscriptionEntity.id == data.subscription_id)
+            if subscription is not None:
+                # Associate the subscription with the new service
+                subscription_mapping = SubscriptionServicesMapping(
+                    subscription_id=subscription.id,
+                    service_id=new_service.id
                 )
-                subscription = result.scalars().first()
+                session.add(subscription_mapping)
+                logger.info(f"Associated subscription ID {data.subscription_id} with the service.")
+            else:
+                logger.warning(f"No subscription found with ID: {data.subscription_id}")
 
-                if subscription is not None:
-                    # Associate the subscription with the new service
-                    subscription_mapping = SubscriptionServicesMapping(
-                        subscription_id=subscription.id,
-                        service_id=new_service.id
+        await bump_catalog_versions(session, SUBSCRIPTION_SERVICES_MAPPING)
+        await session.commit()
+
+        # If api_permission_id is provided, check for existing mappings
+        if data.api_permission_id is not None:  # Check if api_permission_id is not None
+            logger.info(f"Checking existing API permissions for service ID: {new_service.id}")
+
+            existing_permissions_query = await session.execute(
+                select(ServiceApiPermissionsMapping.api_permission_id).where(
+                    ServiceApiPermissionsMapping.service_id == new_service.id,
+                    ServiceApiPermissionsMapping.api_permission_id.in_(data.api_permission_id)
+                )
+            )
+            existing_permissions_ids = {perm_id for perm_id in existing_permissions_query.scalars()}
+
+            # Add only those API permissions that are not already mapped
+            for api_permission_id in data.api_permission_id:
+                if api_permission_id not in existing_permissions_ids:
+                    api_permission_mapping = ServiceApiPermissionsMapping(
+                        service_id=new_service.id,
+                        api_permission_id=api_permission_id
                     )
-                    session.add(subscription_mapping)
-                    logger.info(f"Associated subscription ID {data.subscription_id} with the service.")
+                    session.add(api_permission_mapping)
+                    logger.info(f"Added API permission ID {api_permission_id} to service ID {new_service.id}.")
                 else:
-                    logger.warning(f"No subscription found with ID: {data.subscription_id}")
+                    logger.info(f"API permission ID {api_permission_id} already exists for service ID {new_service.id}, skipping.")
 
-            await session.commit()
+        # Commit the transaction
+        await mark_permission_trees(session, subscription_ids=[data.subscription_id])
+        await bump_catalog_versions(session, SERVICE_API_PERMISSIONS_MAPPING)
+        await session.commit()
+        invalidate_catalog(logger, SERVICE_LIST, subscription_tag(data.subscription_id))
+        logger.info("Service created: %s", new_service)
 
-            # If api_permission_id is provided, check for existing mappings
-            if data.api_permission_id is not None:  # Check if api_permission_id is not None
-                logger.info(f"Checking existing API permissions for service ID: {new_service.id}")
+        service = await fetch_service_with_relationships(new_service.id, session, logger)
 
-                existing_permissions_query = await session.execute(
-                    select(ServiceApiPermissionsMapping.api_permission_id).where(
-                        ServiceApiPermissionsMapping.service_id == new_service.id,
-                        ServiceApiPermissionsMapping.api_permission_id.in_(data.api_permission_id)
-                    )
-                )
-                existing_permissions_ids = {perm_id for perm_id in existing_permissions_query.scalars()}
-
-                # Add only those API permissions that are not already mapped
-                for api_permission_id in data.api_permission_id:
-                    if api_permission_id not in existing_permissions_ids:
-                        api_permission_mapping = ServiceApiPermissionsMapping(
-                            service_id=new_service.id,
-                            api_permission_id=api_permission_id
-                        )
-                        session.add(api_permission_mapping)
-                        logger.info(f"Added API permission ID {api_permission_id} to service ID {new_service.id}.")
-                    else:
-                        logger.info(f"API permission ID {api_permission_id} already exists for service ID {new_service.id}, skipping.")
-
-            # Commit the transaction
-            await session.commit()
-            logger.info(f"Service created: {new_service}")
-
-            service = await fetch_service_with_relationships(new_service.id, session, logger)
-
-            return entity_to_service_dto(service, logger)  # Convert entity to DTO
-
-        except SQLAlchemyError as e:
-            logger.error(f"Failed to create service: {e}")
-            await session.rollback()
-            raise HTTPException(status_code=500, detail="Database error occurred.")
-
-async def update_service(service_id: int, data: CreateService, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the existing service
-            existing_service = await fetch_service_with_relationships(service_id, session, logger)
-            if not existing_service:
-                logger.error(f"Service with ID {service_id} not found.")
-                raise HTTPException(status_code=404, detail="Service not found")
-
-            # Update service fields
-            if data.name is not None:
-                existing_service.name = data.name
-            if data.description is not None:
-                existing_service.description = data.description
-            if data.active_status is not None:
-                existing_service.active_status = data.active_status
-
-            # Update API permissions if provided
-            if data.api_permission_id:
-                # Clear existing permissions if needed, then add the new ones
-                existing_service.api_permissions.clear()  # Clear existing relationships
-
-                api_permissions_query = await session.execute(
-                    select(ApiPermissionEntity).where(
-                        ApiPermissionEntity.id.in_(data.api_permission_id)
-                    )
-                )
-                api_permissions = api_permissions_query.scalars().all()
+        return entity_to_service_dto(service, logger)  # Convert entity to DTO
 
-                for api_permission in api_permissions:
-                    existing_service.api_permissions.append(api_permission)
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to create service: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred.")
 
-            # If a subscription ID is provided, handle that logic
-            if data.subscription_id:
-                subscription_mapping = SubscriptionServicesMapping(
-                    subscription_id=data.subscription_id,
-                    service_id=existing_service.id
+# 6 reads, the version bump, 4 writes at flush and 3 for the permission tree rebuilt before commit
+@query_budget(14)
+async def update_service(service_id: int, data: CreateService, session: AsyncSession, logger: logging.Logger):
+    try:
+        # Fetch the existing service
+        existing_service = await fetch_service_with_relationships(service_id, session, logger)
+        if not existing_service:
+            logger.error(f"Service with ID {service_id} not found.")
+            raise HTTPException(status_code=404, detail="Service not found")
+
+        # Update service fields
+        if data.name is not None:
+            existing_service.name = data.name
+        if data.description is not None:
+            existing_service.description = data.description
+        if data.active_status is not None:
+            existing_service.active_status = data.active_status
+
+        # Update API permissions if provided
+        if data.api_permission_id:
+            # Clear existing permissions if needed, then add the new ones
+            existing_service.api_permissions.clear()  # Clear existing relationships
+
+            api_permissions_query = await session.execute(
+                select(ApiPermissionEntity).where(
+                    ApiPermissionEntity.id.in_(data.api_permission_id)
                 )
-                session.add(subscription_mapping)
-                logger.info(f"Associated subscription ID {data.subscription_id} with the service.")
+            )
+            api_permissions = api_permissions_query.scalars().all()
 
-            # Commit the changes
-            await session.commit()
-            logger.info(f"Service updated: {existing_service}")
-            return entity_to_service_dto(existing_service, logger)  # Return the updated entity as DTO
-
-        except SQLAlchemyError as e:
-            logger.error(f"Failed to update service: {e}")
-            await session.rollback()
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while updating: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-
-async def get_service_by_id(service_id: int, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the service by ID
-            service = await fetch_service_with_relationships(service_id, session, logger)
-            if not service:
-                logger.error(f"Service with ID {service_id} not found.")
-                raise HTTPException(status_code=404, detail="Service not found")
-            logger.info(f"Retrieved service: {service}")
-            return entity_to_service_dto(service, logger)  # Convert to DTO if needed
-
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while fetching service: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching service: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-
-async def get_all_services(logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch all services from the database with eager loading
-            result = await session.execute(
-                select(ServiceEntity)
-                .options(
-                    selectinload(ServiceEntity.api_permissions),  # Eager load related API permissions
-                    selectinload(ServiceEntity.page_permissions)
-                )
+            for api_permission in api_permissions:
+                existing_service.api_permissions.append(api_permission)
+
+        # If a subscription ID is provided, handle that logic
+        if data.subscription_id:
+            subscription_mapping = SubscriptionServicesMapping(
+                subscription_id=data.subscription_id,
+                service_id=existing_service.id
             )
-            services = result.scalars().all()  # Fetch all results
-
-            if not services:
-                logger.warning("No services found.")
-                return []  # Return an empty list if no services are found
-
-            logger.info(f"Retrieved {len(services)} services.")
-            return [entity_to_service_dto(service, logger) for service in services]
-
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while fetching services: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching services: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-async def get_services_by_subscription_id(subscription_id: int, logger: logging.Logger) -> Optional[List[ServiceDTO]]:
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the subscription entity with related services
-            subscription = await fetch_subscription_with_relationships(subscription_id, session, logger)
-
-            if not subscription:
-                logger.error(f"Subscription with ID {subscription_id} not found.")
-                # raise HTTPException(status_code=404, detail="Subscription not found")
-                return None
+            session.add(subscription_mapping)
+            logger.info(f"Associated subscription ID {data.subscription_id} with the service.")
 
-            # Convert the services to DTOs
-            service_dtos = [
-                entity_to_service_dto(service, logger) for service in subscription.services
-            ]
+        # Commit the changes
+        await mark_permission_trees(session, subscription_ids=[data.subscription_id], service_ids=[service_id])
+        await bump_catalog_versions(session, SERVICE, SERVICE_API_PERMISSIONS_MAPPING, SUBSCRIPTION_SERVICES_MAPPING)
+        await session.commit()
+        invalidate_catalog(logger, service_tag(service_id), subscription_tag(data.subscription_id))
+        logger.info("Service updated: %s", existing_service)
+        return entity_to_service_dto(existing_service, logger)  # Return the updated entity as DTO
+
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to update service: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while updating: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
-            if not service_dtos:
-                logger.warning(f"No services found for subscription ID {subscription_id}.")
-                # raise HTTPException(status_code=404, detail="No services found for the subscription")
-                return None
 
-            logger.info(f"Successfully retrieved {len(service_dtos)} services for subscription ID {subscription_id}")
-            return service_dtos
-
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred: {e}")
-            raise HTTPException(status_code=500, detail="Database error. Please try again later.")
-        # except Exception as e:
-        #     logger.error(f"An unexpected error occurred: {e}")
-        #     raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-async def create_service_mapping(subscription_id: int, service_ids: List[int], logger: logging.Logger):
-    async with ConnectionManager() as session:
-        # Retrieve existing mappings for the given subscription_id
-        existing_mappings = await session.execute(
-            select(SubscriptionServicesMapping).where(SubscriptionServicesMapping.subscription_id == subscription_id)
-        )
-        existing_service_ids = {mapping.service_id for mapping in existing_mappings.scalars().all()}
+@query_budget(5)
+async def get_service_by_id(service_id: int, session: AsyncSession, logger: logging.Logger):
+    try:
+        # Fetch the service by ID
+        service = await fetch_service_with_relationships(service_id, session, logger)
+        if not service:
+            logger.error(f"Service with ID {service_id} not found.")
+            raise HTTPException(status_code=404, detail="Service not found")
+        logger.debug("Retrieved service: %s", service)
+        return entity_to_service_dto(service, logger)  # Convert to DTO if needed
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while fetching service: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching service: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
-        # Filter service_ids to include only those not already mapped
-        new_service_ids = [service_id for service_id in service_ids if service_id not in existing_service_ids]
 
-        # Create mappings for the new service IDs
-        for service_id in new_service_ids:
-            mapping = SubscriptionServicesMapping(subscription_id=subscription_id, service_id=service_id)
-            session.add(mapping)
+@query_budget(4)
+async def get_all_services(session: AsyncSession, logger: logging.Logger, etag: Optional[str] = None):
+    cached = catalog_cache.get("services:all", etag)
+    if cached is not MISS:
+        logger.info(f"Retrieved {len(cached)} services from catalog cache.")
+        return cached
+    version = catalog_cache.version
 
-        await session.commit()
-        logger.info(f"Services mapped to subscription {subscription_id}: {service_ids}")
+    try:
+        # Fetch all services from the database with eager loading
+        result = await session.execute(
+            select(ServiceEntity)
+            .options(
+                selectinload(ServiceEntity.api_permissions),  # Eager load related API permissions
+                selectinload(ServiceEntity.page_permissions)
+            )
+        )
+        services = result.scalars().all()  # Fetch all results
 
-        # Fetch the updated subscription from the database
-        updated_subscription = await fetch_subscription_with_relationships(subscription_id, session, logger)
+        if not services:
+            logger.warning("No services found.")
+            catalog_cache.set("services:all", [], {SERVICE_LIST}, version, etag)
+            return []  # Return an empty list if no services are found
 
-        # Convert the updated subscription entity to DTO
-        subscription_dto = entity_to_dto(updated_subscription, logger)
+        logger.info(f"Retrieved {len(services)} services.")
+        dtos = [entity_to_service_dto(service, logger) for service in services]
+        catalog_cache.set("services:all", dtos, service_dto_tags(dtos) | {SERVICE_LIST}, version, etag)
+        return dtos
 
-        # Construct and return the ResponseBO
-        return ResponseBO(
-            code=201,  # HTTP status code for Created
-            status="success",
-            data=subscription_dto,
-            message="Service mapping created successfully."
-        )
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while fetching services: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching services: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
-async def delete_service_by_id(service_id: int, subscription_id: int, logger: logging.Logger):
-    """Deletes a service by ID along with related mappings."""
-    async with ConnectionManager() as session:
-        # Fetch the service entity
-        service = await fetch_delete_service_with_relationships(service_id, logger)
-        if not service:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Service ID {service_id} not found."
-            )
+@query_budget(5)
+async def get_services_by_subscription_id(subscription_id: int, session: AsyncSession, logger: logging.Logger) -> Optional[List[ServiceDTO]]:
+    try:
+        # Fetch the subscription entity with related services
+        subscription = await fetch_subscription_with_relationships(subscription_id, session, logger)
 
-        # Verify if the subscription exists
-        subscription = await session.get(SubscriptionEntity, subscription_id)
         if not subscription:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Subscription ID {subscription_id} not found."
-            )
+            logger.error(f"Subscription with ID {subscription_id} not found.")
+            # raise HTTPException(status_code=404, detail="Subscription not found")
+            return None
 
-        # Check if API permission mappings exist for the service
-        api_permission_mappings = await session.execute(
-            select(ServiceApiPermissionsMapping)
-            .where(ServiceApiPermissionsMapping.service_id == service_id)
-        )
-        if not api_permission_mappings.scalars().all():
-            logger.warning(f"No API permission mappings found for service ID {service_id}.")
+        # Convert the services to DTOs
+        service_dtos = [
+            entity_to_service_dto(service, logger) for service in subscription.services
+        ]
 
-        # Delete API permission mappings
-        await session.execute(
-            delete(ServiceApiPermissionsMapping)
-            .where(ServiceApiPermissionsMapping.service_id == service_id)
-        )
+        if not service_dtos:
+            logger.warning(f"No services found for subscription ID {subscription_id}.")
+            # raise HTTPException(status_code=404, detail="No services found for the subscription")
+            return None
+
+        logger.info(f"Successfully retrieved {len(service_dtos)} services for subscription ID {subscription_id}")
+        return service_dtos
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred: {e}")
+        raise HTTPException(status_code=500, detail="Database error. Please try again later.")
+    # except Exception as e:
+    #     logger.error(f"An unexpected error occurred: {e}")
+    #     raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+@query_budget(10)
+async def create_service_mapping(subscription_id: int, service_ids: List[int], session: AsyncSession, logger: logging.Logger):
+    # Retrieve existing mappings for the given subscription_id
+    existing_mappings = await session.execute(
+        select(SubscriptionServicesMapping).where(SubscriptionServicesMapping.subscription_id == subscription_id)
+    )
+    existing_service_ids = {mapping.service_id for mapping in existing_mappings.scalars().all()}
+
+    # Filter service_ids to include only those not already mapped
+    new_service_ids = [service_id for service_id in service_ids if service_id not in existing_service_ids]
+
+    # Create mappings for the new service IDs
+    for service_id in new_service_ids:
+        mapping = SubscriptionServicesMapping(subscription_id=subscription_id, service_id=service_id)
+        session.add(mapping)
+
+    await mark_permission_trees(session, subscription_ids=[subscription_id])
+    await bump_catalog_versions(session, SUBSCRIPTION_SERVICES_MAPPING)
+    await session.commit()
+    invalidate_catalog(logger, subscription_tag(subscription_id))
+    logger.info(f"Services mapped to subscription {subscription_id}: {service_ids}")
+
+    # Fetch the updated subscription from the database
+    updated_subscription = await fetch_subscription_with_relationships(subscription_id, session, logger)
+
+    # Convert the updated subscription entity to DTO
+    subscription_dto = entity_to_dto(updated_subscription, logger)
+
+    # Construct and return the ResponseBO
+    return ResponseBO(
+        code=201,  # HTTP status code for Created
+        status="success",
+        data=subscription_dto,
+        message="Service mapping created successfully."
+    )
 
-        page_permission_mappings = await session.execute(
-            select(ServiceApiPagePermissionsMapping)
-            .where(ServiceApiPagePermissionsMapping.service_id == service_id)
+@query_budget(19)
+async def delete_service_by_id(service_id: int, subscription_id: int, session: AsyncSession, logger: logging.Logger):
+    """Deletes a service by ID along with related mappings."""
+    # Fetch the service entity
+    service = await fetch_delete_service_with_relationships(service_id, session, logger)
+    if not service:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Service ID {service_id} not found."
         )
-        if not page_permission_mappings.scalars().all():
-            logger.warning(f"No Page permission mappings found for service ID {service_id}.")
 
-        # Delete page permission mappings
-        await session.execute(
-            delete(ServiceApiPagePermissionsMapping)
-            .where(ServiceApiPagePermissionsMapping.service_id == service_id)
+    # Verify if the subscription exists
+    subscription = await session.get(SubscriptionEntity, subscription_id)
+    if not subscription:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Subscription ID {subscription_id} not found."
         )
 
-        # Check if the service is linked with the subscription
-        subscription_mapping = await session.execute(
-            select(SubscriptionServicesMapping)
-            .where(
-                SubscriptionServicesMapping.subscription_id == subscription_id,
-                SubscriptionServicesMapping.service_id == service_id
-            )
+    # Resolved while the service's mappings still exist
+    await mark_permission_trees(session, service_ids=[service_id])
+
+    # Check if API permission mappings exist for the service
+    api_permission_mappings = await session.execute(
+        select(ServiceApiPermissionsMapping)
+        .where(ServiceApiPermissionsMapping.service_id == service_id)
+    )
+    if not api_permission_mappings.scalars().all():
+        logger.warning(f"No API permission mappings found for service ID {service_id}.")
+
+    # Delete API permission mappings
+    await session.execute(
+        delete(ServiceApiPermissionsMapping)
+        .where(ServiceApiPermissionsMapping.service_id == service_id)
+    )
+
+    page_permission_mappings = await session.execute(
+        select(ServiceApiPagePermissionsMapping)
+        .where(ServiceApiPagePermissionsMapping.service_id == service_id)
+    )
+    if not page_permission_mappings.scalars().all():
+        logger.warning(f"No Page permission mappings found for service ID {service_id}.")
+
+    # Delete page permission mappings
+    await session.execute(
+        delete(ServiceApiPagePermissionsMapping)
+        .where(ServiceApiPagePermissionsMapping.service_id == service_id)
+    )
+
+    # Check if the service is linked with the subscription
+    subscription_mapping = await session.execute(
+        select(SubscriptionServicesMapping)
+        .where(
+            SubscriptionServicesMapping.subscription_id == subscription_id,
+            SubscriptionServicesMapping.service_id == service_id
+        )
+    )
+    if not subscription_mapping.scalars().first():
+        raise HTTPException(
+            status_code=404,
+            detail=f"No mapping found between subscription {subscription_id} and service {service_id}."
         )
-        if not subscription_mapping.scalars().first():
-            raise HTTPException(
-                status_code=404,
-                detail=f"No mapping found between subscription {subscription_id} and service {service_id}."
-            )
 
-        # Delete subscription-service mappings
-        await session.execute(
-            delete(SubscriptionServicesMapping)
-            .where(
-                SubscriptionServicesMapping.subscription_id == subscription_id,
-                SubscriptionServicesMapping.service_id == service_id
-            )
+    # Delete subscription-service mappings
+    await session.execute(
+        delete(SubscriptionServicesMapping)
+        .where(
+            SubscriptionServicesMapping.subscription_id == subscription_id,
+            SubscriptionServicesMapping.service_id == service_id
         )
+    )
 
-        # Delete the service entity
-        await session.delete(service)
-        await session.commit()
+    # Delete the service entity
+    await session.delete(service)
+    await bump_catalog_versions(session, SERVICE, SUBSCRIPTION_SERVICES_MAPPING, SERVICE_API_PERMISSIONS_MAPPING, SERVICE_PAGE_PERMISSIONS_MAPPING)
+    await session.commit()
+    invalidate_catalog(logger, service_tag(service_id), subscription_tag(subscription_id), SERVICE_LIST)
 
-        logger.info(f"Successfully deleted service with ID {service_id}.")
-        return {"status": "success", "message": f"Service with ID {service_id} deleted successfully."}
+    logger.info(f"Successfully deleted service with ID {service_id}.")
+    return {"status": "success", "message": f"Service with ID {service_id} deleted successfully."}
 
 async def dto_to_service_entity(service_dto: CreateService, session: AsyncSession, logger: logging.Logger) -> ServiceEntity:
-    logger.info(f"Mapping CreateService DTO to ServiceEntity: {service_dto}")
+    logger.debug("Mapping CreateService DTO to ServiceEntity: %s", service_dto)
 
     # Create ServiceEntity from the DTO
     service_entity = ServiceEntity(
@@ -785,8 +931,37 @@ async def dto_to_service_entity(service_dto: CreateService, session: AsyncSessio
 
     return service_entity
 
-def entity_to_service_dto(service_entity: ServiceEntity, logger: logging.Logger) -> ServiceDTO:
-    logger.info(f"Mapping ServiceEntity to ServiceDTO: {service_entity}")
+def entity_to_service_dto(service_entity: ServiceEntity, logger: logging.Logger,
+                          projection: Optional[CatalogProjection] = None) -> Union[ServiceDTO, dict]:
+    logger.debug("Mapping ServiceEntity to ServiceDTO: %s", service_entity)
+
+    # Projected: only the requested columns and the expanded permission lists
+    if projection is not None:
+        dto = {field: getattr(service_entity, field) for field in SERVICE_FIELDS if field in projection.service_fields}
+        if API_PERMISSIONS in projection.expand:
+            dto["api_permissions"] = [
+                {
+                    "id": perm.id,
+                    "name": perm.name,
+                    "method": perm.method.name if perm.method else None,  # Convert Enum to string
+                    "api_url": perm.api_url,
+                    "description": perm.description,
+                    "status": perm.status
+                }
+                for perm in service_entity.api_permissions
+            ]
+        if PAGE_PERMISSIONS in projection.expand:
+            dto["page_permissions"] = [
+                {
+                    "id": perm.id,
+                    "name": perm.name,
+                    "description": perm.description,
+                    "status": perm.status,
+                    "page_url": perm.page_url
+                }
+                for perm in service_entity.page_permissions
+            ]
+        return dto
 
     # Map API permissions if they exist
     api_permissions_dto = [
@@ -827,42 +1002,42 @@ def entity_to_service_dto(service_entity: ServiceEntity, logger: logging.Logger)
         page_permissions = page_permissions_dto
     )
 
-    logger.info(f"Mapped ServiceEntity to ServiceDTO with {len(api_permissions_dto)} API permissions.")
+    logger.debug("Mapped ServiceEntity to ServiceDTO with %s API permissions.", len(api_permissions_dto))
     return service_dto
 
 
-async def create_api_permission(data: CreateApiPermission, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            new_api_permission = dto_to_api_permission_entity(data, logger)  # Convert DTO to entity
-            session.add(new_api_permission)
-            await session.commit()
-            logger.info(f"API permission created: {new_api_permission}")
+@query_budget(3)
+async def create_api_permission(data: CreateApiPermission, session: AsyncSession, logger: logging.Logger):
+    try:
+        new_api_permission = dto_to_api_permission_entity(data, logger)  # Convert DTO to entity
+        session.add(new_api_permission)
+        await bump_catalog_versions(session, API_PERMISSION)
+        await session.commit()
+        logger.info("API permission created: %s", new_api_permission)
 
-            # Fetch the newly created API permission
-            return entity_to_api_permission_dto(new_api_permission, logger)
+        # Fetch the newly created API permission
+        return entity_to_api_permission_dto(new_api_permission, logger)
 
-        except SQLAlchemyError as e:
-            logger.error(f"Failed to create API permission: {e}")
-            await session.rollback()
-            raise
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to create API permission: {e}")
+        await session.rollback()
+        raise
 
-async def check_api_permission_name_exists(name: str, logger: logging.Logger) -> bool:
-    async with ConnectionManager() as session:
-        try:
-            # Query the ApiPermissionEntity to check for existing permission name
-            result = await session.execute(
-                select(ApiPermissionEntity).filter_by(name=name)
-            )
-            # Check if any permission with the given name exists
-            return result.scalars().first() is not None
-        except SQLAlchemyError as e:
-            logger.error(f"Database error while checking API permission name: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred.")
+async def check_api_permission_name_exists(name: str, session: AsyncSession, logger: logging.Logger) -> bool:
+    try:
+        # Query the ApiPermissionEntity to check for existing permission name
+        result = await session.execute(
+            select(ApiPermissionEntity).filter_by(name=name)
+        )
+        # Check if any permission with the given name exists
+        return result.scalars().first() is not None
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while checking API permission name: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
 
 
 def dto_to_api_permission_entity(dto: CreateApiPermission, logger: logging.Logger) -> ApiPermissionEntity:
-    logger.debug(f"Converting DTO to entity: {dto}")
+    logger.debug("Converting DTO to entity: %s", dto)
     entity = ApiPermissionEntity(
         name=dto.name,
         method=dto.method,
@@ -870,12 +1045,12 @@ def dto_to_api_permission_entity(dto: CreateApiPermission, logger: logging.Logge
         description=dto.description,
         status=dto.status
     )
-    logger.info(f"Converted DTO to entity: {entity}")
+    logger.debug("Converted DTO to entity: %s", entity)
     return entity
 
 
 def entity_to_api_permission_dto(entity: ApiPermissionEntity, logger: logging.Logger) -> ApiPermissionDTO:
-    logger.debug(f"Converting entity to DTO: {entity}")
+    logger.debug("Converting entity to DTO: %s", entity)
 
     dto = ApiPermissionDTO(
         id=entity.id,
@@ -886,50 +1061,52 @@ def entity_to_api_permission_dto(entity: ApiPermissionEntity, logger: logging.Lo
         status=entity.status
     )
 
-    logger.info(f"Converted entity to DTO: {dto}")
+    logger.debug("Converted entity to DTO: %s", dto)
     return dto
 
 
-async def check_update_api_permission_name_exists(name: str, exclude_id: int, logger: logging.Logger) -> bool:
-    async with ConnectionManager() as session:
-        try:
-            existing_permission = await session.execute(
-                select(ApiPermissionEntity).filter(ApiPermissionEntity.name == name, ApiPermissionEntity.id != exclude_id)
-            )
-            return existing_permission.scalars().first() is not None
-        except SQLAlchemyError as e:
-            logger.error(f"Database error while checking API permission name: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred.")
-
-async def update_api_permission(api_permission_id: int, data: CreateApiPermission, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the existing API permission
-            existing_permission = await fetch_api_permission_with_relationships(api_permission_id, session, logger)
-            if not existing_permission:
-                logger.error(f"API permission with ID {api_permission_id} not found.")
-                # raise HTTPException(status_code=404, detail="API permission not found")
-                return None
-
-            # Update the existing permission with new data
-            existing_permission.name = data.name
-            existing_permission.method = data.method
-            existing_permission.api_url = data.api_url
-            existing_permission.description = data.description
-            existing_permission.status = data.status
-
-            session.add(existing_permission)
-            await session.commit()
-            logger.info(f"API permission updated: {existing_permission}")
-            return entity_to_api_permission_dto(existing_permission, logger)  # Return the updated entity or convert to DTO if needed
+async def check_update_api_permission_name_exists(name: str, exclude_id: int, session: AsyncSession, logger: logging.Logger) -> bool:
+    try:
+        existing_permission = await session.execute(
+            select(ApiPermissionEntity).filter(ApiPermissionEntity.name == name, ApiPermissionEntity.id != exclude_id)
+        )
+        return existing_permission.scalars().first() is not None
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while checking API permission name: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
 
-        except SQLAlchemyError as e:
-            logger.error(f"Failed to update API permission: {e}")
-            await session.rollback()
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while updating: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+@query_budget(9)
+async def update_api_permission(api_permission_id: int, data: CreateApiPermission, session: AsyncSession, logger: logging.Logger):
+    try:
+        # Fetch the existing API permission
+        existing_permission = await fetch_api_permission_with_relationships(api_permission_id, session, logger)
+        if not existing_permission:
+            logger.error(f"API permission with ID {api_permission_id} not found.")
+            # raise HTTPException(status_code=404, detail="API permission not found")
+            return None
+
+        # Update the existing permission with new data
+        existing_permission.name = data.name
+        existing_permission.method = data.method
+        existing_permission.api_url = data.api_url
+        existing_permission.description = data.description
+        existing_permission.status = data.status
+
+        session.add(existing_permission)
+        await mark_permission_trees(session, api_permission_ids=[api_permission_id])
+        await bump_catalog_versions(session, API_PERMISSION)
+        await session.commit()
+        invalidate_catalog(logger, api_permission_tag(api_permission_id))
+        logger.info("API permission updated: %s", existing_permission)
+        return entity_to_api_permission_dto(existing_permission, logger)  # Return the updated entity or convert to DTO if needed
+
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to update API permission: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while updating: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
 async def fetch_api_permission_with_relationships(api_permission_id: int, session, logger) -> ApiPermissionEntity:
@@ -948,7 +1125,7 @@ async def fetch_api_permission_with_relationships(api_permission_id: int, sessio
         api_permission = result.scalars().first()
 
         if api_permission:
-            logger.info(f"Successfully retrieved API permission: {api_permission}")
+            logger.debug("Successfully retrieved API permission: %s", api_permission)
         else:
             logger.warning(f"API permission with ID {api_permission_id} not found.")
 
@@ -959,194 +1136,295 @@ async def fetch_api_permission_with_relationships(api_permission_id: int, sessio
         raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching the API permission.")
 
 
-async def get_all_api_permissions(logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch all API permissions from the database with eager loading
-            result = await session.execute(
-                select(ApiPermissionEntity)
-                .options(
-                    selectinload(ApiPermissionEntity.services)  # Eager load related services
-                )
+@query_budget(3)
+async def get_all_api_permissions(session: AsyncSession, logger: logging.Logger):
+    try:
+        # Fetch all API permissions from the database with eager loading
+        result = await session.execute(
+            select(ApiPermissionEntity)
+            .options(
+                selectinload(ApiPermissionEntity.services)  # Eager load related services
             )
-            api_permissions = result.scalars().all()  # Fetch all results
-
-            if not api_permissions:
-                logger.warning("No API permissions found.")
-                return []  # Return an empty list if no API permissions are found
-
-            logger.info(f"Retrieved {len(api_permissions)} API permissions.")
-            return [entity_to_api_permission_dto(api_permission, logger) for api_permission in api_permissions]
-
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while fetching API permissions: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching API permissions: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-
-async def get_api_permission_by_id(api_permission_id: int, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the API permission by ID
-            api_permission = await fetch_api_permission_with_relationships(api_permission_id, session, logger)
-            if not api_permission:
-                logger.error(f"API permission with ID {api_permission_id} not found.")
-                # raise HTTPException(status_code=404, detail="API permission not found")
-                return None
-            logger.info(f"Retrieved API permission: {api_permission}")
-            return entity_to_api_permission_dto(api_permission, logger)  # Return the entity or convert to DTO if needed
-
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while fetching API permission: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching API permission: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
-
-async def delete_api_permission(api_permission_id: int, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the API permission by ID to ensure it exists
-            api_permission = await fetch_api_permission_with_relationships(api_permission_id, session, logger)
-            if not api_permission:
-                logger.error(f"API permission with ID {api_permission_id} not found for deletion.")
-                # raise HTTPException(status_code=404, detail="API permission not found.")
-                return None
+        )
+        api_permissions = result.scalars().all()  # Fetch all results
 
-            # Proceed to delete the API permission
-            await session.delete(api_permission)
-            await session.commit()  # Commit the transaction
+        if not api_permissions:
+            logger.warning("No API permissions found.")
+            return []  # Return an empty list if no API permissions are found
 
-            logger.info(f"Successfully deleted API permission with ID {api_permission_id}.")
+        logger.info(f"Retrieved {len(api_permissions)} API permissions.")
+        return [entity_to_api_permission_dto(api_permission, logger) for api_permission in api_permissions]
 
-        except asyncpg.PostgresError as pg_exc:
-            logger.error(f"Database error occurred while deleting API permission: {pg_exc}")
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while deleting API permission: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while fetching API permissions: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching API permissions: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
+@query_budget(3)
+async def get_api_permission_by_id(api_permission_id: int, session: AsyncSession, logger: logging.Logger):
+    try:
+        # Fetch the API permission by ID
+        api_permission = await fetch_api_permission_with_relationships(api_permission_id, session, logger)
+        if not api_permission:
+            logger.error(f"API permission with ID {api_permission_id} not found.")
+            # raise HTTPException(status_code=404, detail="API permission not found")
+            return None
+        logger.debug("Retrieved API permission: %s", api_permission)
+        return entity_to_api_permission_dto(api_permission, logger)  # Return the entity or convert to DTO if needed
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while fetching API permission: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching API permission: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
-async def check_service_exists(service_id: int, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        result = await session.execute(select(ServiceEntity).filter_by(id=service_id))
-        return result.scalars().first() is not None
+@query_budget(10)
+async def delete_api_permission(api_permission_id: int, session: AsyncSession, logger: logging.Logger):
+    try:
+        # Fetch the API permission by ID to ensure it exists
+        api_permission = await fetch_api_permission_with_relationships(api_permission_id, session, logger)
+        if not api_permission:
+            logger.error(f"API permission with ID {api_permission_id} not found for deletion.")
+            # raise HTTPException(status_code=404, detail="API permission not found.")
+            return None
+
+        # Proceed to delete the API permission
+        await mark_permission_trees(session, api_permission_ids=[api_permission_id])
+        await session.delete(api_permission)
+        await bump_catalog_versions(session, API_PERMISSION, SERVICE_API_PERMISSIONS_MAPPING)
+        await session.commit()  # Commit the transaction
+        invalidate_catalog(logger, api_permission_tag(api_permission_id))
+
+        logger.info(f"Successfully deleted API permission with ID {api_permission_id}.")
+
+    except asyncpg.PostgresError as pg_exc:
+        logger.error(f"Database error occurred while deleting API permission: {pg_exc}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while deleting API permission: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
-async def check_permissions_exist(api_permission_ids: List[int], logger: logging.Logger):
-    async with ConnectionManager() as session:
-        result = await session.execute(select(ApiPermissionEntity).filter(ApiPermissionEntity.id.in_(api_permission_ids)))
-        return len(result.scalars().all()) == len(api_permission_ids)
 
 
-async def create_api_permissions_mapping(service_id: int, api_permission_ids: List[int], logger: logging.Logger):
-    async with ConnectionManager() as session:
-        # Fetch existing mappings to check for duplicates
-        existing_mappings = await session.execute(
-            select(ServiceApiPermissionsMapping).where(
-                ServiceApiPermissionsMapping.service_id == service_id,
-                ServiceApiPermissionsMapping.api_permission_id.in_(api_permission_ids)
-            )
+async def check_service_exists(service_id: int, session: AsyncSession, logger: logging.Logger):
+    return not await find_missing_ids(session, ServiceEntity, [service_id], logger)
+
+
+@query_budget(11)
+async def create_api_permissions_mapping(service_id: int, api_permission_ids: List[int], session: AsyncSession, logger: logging.Logger):
+    # Fetch existing mappings to check for duplicates
+    existing_mappings = await session.execute(
+        select(ServiceApiPermissionsMapping).where(
+            ServiceApiPermissionsMapping.service_id == service_id,
+            ServiceApiPermissionsMapping.api_permission_id.in_(api_permission_ids)
         )
-        existing_mappings_ids = {mapping.api_permission_id for mapping in existing_mappings.scalars()}
+    )
+    existing_mappings_ids = {mapping.api_permission_id for mapping in existing_mappings.scalars()}
 
-        # Create mappings for the API permission IDs that do not already exist
-        new_mappings = [
-            ServiceApiPermissionsMapping(service_id=service_id, api_permission_id=api_permission_id)
-            for api_permission_id in api_permission_ids
-            if api_permission_id not in existing_mappings_ids
-        ]
+    # Create mappings for the API permission IDs that do not already exist
+    new_mappings = [
+        ServiceApiPermissionsMapping(service_id=service_id, api_permission_id=api_permission_id)
+        for api_permission_id in api_permission_ids
+        if api_permission_id not in existing_mappings_ids
+    ]
 
-        # Add new mappings to the session
-        for mapping in new_mappings:
-            session.add(mapping)
+    # Add new mappings to the session
+    for mapping in new_mappings:
+        session.add(mapping)
 
-        await session.commit()
+    await mark_permission_trees(session, service_ids=[service_id])
+    await bump_catalog_versions(session, SERVICE_API_PERMISSIONS_MAPPING)
+    await session.commit()
+    invalidate_catalog(logger, service_tag(service_id))
 
-        logger.info(f"API permissions mapped to service {service_id}: {api_permission_ids}")
+    logger.info(f"API permissions mapped to service {service_id}: {api_permission_ids}")
 
-        # Fetch the updated service from the database
-        updated_service = await fetch_service_with_relationships(service_id, session, logger)
+    # Fetch the updated service from the database
+    updated_service = await fetch_service_with_relationships(service_id, session, logger)
 
-        # Convert the updated service entity to DTO
-        service_dto = entity_to_service_dto(updated_service, logger)
+    # Convert the updated service entity to DTO
+    service_dto = entity_to_service_dto(updated_service, logger)
 
-        # Construct and return the ResponseBO
-        return ResponseBO(
-            code=201,  # HTTP status code for Created
-            status="CREATED",
-            data=service_dto,
-            message="API permission mapping created successfully."
-        )
+    # Construct and return the ResponseBO
+    return ResponseBO(
+        code=201,  # HTTP status code for Created
+        status="CREATED",
+        data=service_dto,
+        message="API permission mapping created successfully."
+    )
 
 
 
-async def get_api_permissions_by_service_id(service_id: int, logger: logging.Logger) -> Union[
+@query_budget(5)
+async def get_api_permissions_by_service_id(service_id: int, session: AsyncSession, logger: logging.Logger) -> Union[
     None, ResponseBO, List[ApiPermissionDTO]]:
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the service entity with related API permissions
-            service = await fetch_service_with_relationships(service_id, session, logger)
-
-            if not service:
-                logger.error(f"Service with ID {service_id} not found.")
-                # raise HTTPException(status_code=404, detail="Service not found")
-                return None
+    try:
+        # Fetch the service entity with related API permissions
+        service = await fetch_service_with_relationships(service_id, session, logger)
 
-            # Convert the API permissions to DTOs
-            # api_permission_dtos = [
-            #     entity_to_api_permission_dto(permission, logger) for permission in service.api_permissions
-            # ]
-            #
-            # if not api_permission_dtos:
-            #     logger.warning(f"No API permissions found for service ID {service_id}.")
-            #     raise HTTPException(status_code=404, detail="No API permissions found for the service")
-            api_permission_dtos = [
-                entity_to_api_permission_dto(permission, logger) for permission in service.api_permissions
-            ]
+        if not service:
+            logger.error(f"Service with ID {service_id} not found.")
+            # raise HTTPException(status_code=404, detail="Service not found")
+            return None
+
+        # Convert the API permissions to DTOs
+        # api_permission_dtos = [
+        #     entity_to_api_permission_dto(permission, logger) for permission in service.api_permissions
+        # ]
+        #
+        # if not api_permission_dtos:
+        #     logger.warning(f"No API permissions found for service ID {service_id}.")
+        #     raise HTTPException(status_code=404, detail="No API permissions found for the service")
+        api_permission_dtos = [
+            entity_to_api_permission_dto(permission, logger) for permission in service.api_permissions
+        ]
 
-            if not api_permission_dtos:
-                logger.warning(f"No API permissions found for service ID {service_id}.")
-                return ResponseBO(
-                    code=404,
-                    status="NOT FOUND",
-                    embedded=None,
-                    message="No API permissions found for the service"
-                )
-            logger.info(f"Successfully retrieved {len(api_permission_dtos)} API permissions for service ID {service_id}")
+        if not api_permission_dtos:
+            logger.warning(f"No API permissions found for service ID {service_id}.")
             return ResponseBO(
-                code=200,
-                status="OK",
-                embedded=api_permission_dtos,  # Use the embedded field to return the list of DTOs
-                message=f"{len(api_permission_dtos)} API permissions retrieved successfully."
+                code=404,
+                status="NOT FOUND",
+                embedded=None,
+                message="No API permissions found for the service"
             )
-            # return api_permission_dtos
+        logger.info(f"Successfully retrieved {len(api_permission_dtos)} API permissions for service ID {service_id}")
+        return ResponseBO(
+            code=200,
+            status="OK",
+            embedded=api_permission_dtos,  # Use the embedded field to return the list of DTOs
+            message=f"{len(api_permission_dtos)} API permissions retrieved successfully."
+        )
+        # return api_permission_dtos
 
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred: {e}")
-            raise HTTPException(status_code=500, detail="Database error. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred: {e}")
+        raise HTTPException(status_code=500, detail="Database error. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
 
 
 
-#Page Permissions
+# No cap: the statement count grows with the number of batches; repeated single-row statements still fail
+@query_budget()
+async def bulk_upsert_by_name(entity, rows: List[dict], session: AsyncSession, logger: logging.Logger) -> List[dict]:
+    """Upsert rows on the entity's unique name inside the caller's transaction.
+
+    Existing rows are read once per chunk of names, unchanged rows are skipped, and the rest are
+    written with multi-row upsert statements of BULK_UPSERT_BATCH_SIZE rows. Returns one result per
+    input row: CREATED, UPDATED, UNCHANGED, or DUPLICATE for an earlier row repeating a later name.
+    """
+    table = entity.__table__
+    columns = [column for column in rows[0] if column != "name"]
+    chunk_size = Config.BULK_ID_CHUNK_SIZE
+    batch_size = Config.BULK_UPSERT_BATCH_SIZE
 
-async def check_update_page_permission_name_exists(name: str, exclude_id: int, logger: logging.Logger) -> bool:
-    async with ConnectionManager() as session:
-        try:
-            existing_permission = await session.execute(
-                select(PagePermissionEntity).filter(PagePermissionEntity.name == name, PagePermissionEntity.id != exclude_id)
+    # The last occurrence of a name wins
+    last_index = {row["name"]: index for index, row in enumerate(rows)}
+    names = list(last_index)
+
+    existing = {}
+    for start in range(0, len(names), chunk_size):
+        result = await session.execute(
+            select(entity.id, entity.name, *[getattr(entity, column) for column in columns])
+            .where(entity.name.in_(names[start:start + chunk_size]))
+        )
+        existing.update({row.name: row for row in result})
+
+    outcome = {}
+    to_create, to_update = [], []
+    for name, index in last_index.items():
+        row = rows[index]
+        current = existing.get(name)
+        if current is None:
+            outcome[name] = "CREATED"
+            to_create.append(row)
+        elif any(getattr(current, column) != row[column] for column in columns):
+            outcome[name] = "UPDATED"
+            to_update.append(row)
+        else:
+            outcome[name] = "UNCHANGED"
+
+    to_write = to_create + to_update
+    dialect_name = session.get_bind().dialect.name
+    for start in range(0, len(to_write), batch_size):
+        batch = to_write[start:start + batch_size]
+        statement = build_upsert(dialect_name, table, batch, "name", columns)
+        if statement is not None:
+            await session.execute(statement)
+            continue
+        # No native upsert: plain multi-row insert for new names, executemany update for the rest
+        new_rows = [row for row in batch if outcome[row["name"]] == "CREATED"]
+        changed_rows = [{**row, "match_name": row["name"]} for row in batch if outcome[row["name"]] == "UPDATED"]
+        if new_rows:
+            await session.execute(insert(table).values(new_rows))
+        if changed_rows:
+            await session.execute(
+                update(table).where(table.c.name == bindparam("match_name"))
+                .values({column: bindparam(column) for column in columns}),
+                changed_rows
             )
-            return existing_permission.scalars().first() is not None
-        except SQLAlchemyError as e:
-            logger.error(f"Database error while checking page permission name: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred.")
+    logger.info(f"Bulk upsert on {table.name}: {len(to_create)} created, {len(to_update)} updated, "
+                f"{len(names) - len(to_write)} unchanged in {-(-len(to_write) // batch_size)} statements.")
+
+    ids = {name: row.id for name, row in existing.items()}
+    created_names = [row["name"] for row in to_create]
+    for start in range(0, len(created_names), chunk_size):
+        result = await session.execute(
+            select(entity.id, entity.name).where(entity.name.in_(created_names[start:start + chunk_size]))
+        )
+        ids.update({row.name: row.id for row in result})
+
+    return [
+        {
+            "index": index,
+            "name": row["name"],
+            "id": ids.get(row["name"]),
+            "result": outcome[row["name"]] if last_index[row["name"]] == index else "DUPLICATE"
+        }
+        for index, row in enumerate(rows)
+    ]
+
+
+@query_budget()
+async def bulk_upsert_api_permissions(items: List[CreateApiPermission], session: AsyncSession, logger: logging.Logger) -> List[dict]:
+    rows = [
+        {"name": item.name, "method": item.method, "api_url": item.api_url,
+         "description": item.description, "status": item.status}
+        for item in items
+    ]
+    try:
+        results = await bulk_upsert_by_name(ApiPermissionEntity, rows, session, logger)
+        updated_ids = [item["id"] for item in results if item["result"] == "UPDATED"]
+        await mark_permission_trees(session, api_permission_ids=updated_ids)
+        if any(item["result"] in ("CREATED", "UPDATED") for item in results):
+            await bump_catalog_versions(session, API_PERMISSION)
+        await session.commit()
+        invalidate_catalog(logger, *[api_permission_tag(api_permission_id) for api_permission_id in updated_ids])
+        return results
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to bulk upsert API permissions: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+
+
+#Page Permissions
+
+async def check_update_page_permission_name_exists(name: str, exclude_id: int, session: AsyncSession, logger: logging.Logger) -> bool:
+    try:
+        existing_permission = await session.execute(
+            select(PagePermissionEntity).filter(PagePermissionEntity.name == name, PagePermissionEntity.id != exclude_id)
+        )
+        return existing_permission.scalars().first() is not None
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while checking page permission name: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
 
 
 async def fetch_page_permission_with_relationships(page_permission_id: int, session, logger) -> PagePermissionEntity:
@@ -1163,7 +1441,7 @@ async def fetch_page_permission_with_relationships(page_permission_id: int, sess
         page_permission = result.scalars().first()
 
         if page_permission:
-            logger.info(f"Successfully retrieved page permission: {page_permission}")
+            logger.debug("Successfully retrieved page permission: %s", page_permission)
         else:
             logger.warning(f"Page Permission with ID {page_permission_id} not found.")
 
@@ -1173,181 +1451,179 @@ async def fetch_page_permission_with_relationships(page_permission_id: int, sess
         logger.error(f"Error occurred while fetching page permission with ID {page_permission_id}: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching the page permission.")
 
-async def create_page_permission(data: PagePermissionDTO, logger: logging.Logger) -> PagePermissionDTO:
-    async with ConnectionManager() as session:
-        try:
-            new_permission = dto_to_page_permission_entity(data)  # Convert DTO to entity
-            session.add(new_permission)
-            await session.commit()
-            logger.info("Page permission created successfully.")
-            return entity_to_page_permission_dto(new_permission)  # Convert entity back to DTO for the response
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while creating page permission: {e}")
-            await session.rollback()
-            raise HTTPException(status_code=500, detail="Failed to create page permission.")
+@query_budget(3)
+async def create_page_permission(data: PagePermissionDTO, session: AsyncSession, logger: logging.Logger) -> PagePermissionDTO:
+    try:
+        new_permission = dto_to_page_permission_entity(data)  # Convert DTO to entity
+        session.add(new_permission)
+        await bump_catalog_versions(session, PAGE_PERMISSION)
+        await session.commit()
+        logger.info("Page permission created successfully.")
+        return entity_to_page_permission_dto(new_permission)  # Convert entity back to DTO for the response
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while creating page permission: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Failed to create page permission.")
 
 
+@query_budget(4)
 async def update_page_permission(page_permission_id: int, data: PagePermissionCreateDTO,
-                                 logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            permission = await session.get(PagePermissionEntity, page_permission_id)
-            if not permission:
-                logger.error(f"Page Permission with ID {page_permission_id} not found.")
-                # raise HTTPException(status_code=404, detail=f"Page Permission with ID {page_permission_id} not found.")
-                return None
+                                 session: AsyncSession, logger: logging.Logger):
+    try:
+        permission = await session.get(PagePermissionEntity, page_permission_id)
+        if not permission:
+            logger.error(f"Page Permission with ID {page_permission_id} not found.")
+            # raise HTTPException(status_code=404, detail=f"Page Permission with ID {page_permission_id} not found.")
+            return None
 
-            # Update entity fields using the DTO
-            for key, value in data.dict().items():
-                setattr(permission, key, value)
-
-            await session.commit()
-            logger.info(f"Page permission with ID {page_permission_id} updated successfully.")
-            return entity_to_page_permission_dto(permission)  # Convert entity back to DTO for the response
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while updating page permission: {e}")
-            await session.rollback()
-            raise HTTPException(status_code=500, detail="Failed to update page permission.")
-
-
-async def delete_page_permission(permission_id: int, logger: logging.Logger) -> Optional[ResponseBO]:
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the page permission by ID to ensure it exists
-            page_permission = await fetch_page_permission_with_relationships(permission_id, session, logger)
-            if not page_permission:
-                logger.error(f"Page Permission with ID {permission_id} not found for deletion.")
-                return ResponseBO(
-                    code=404,  # HTTP status code for Not Found
-                    status="NOT FOUND",
-                    data=None,
-                    message=f"Page Permission with ID {permission_id} not found."
-                )
+        # Update entity fields using the DTO
+        for key, value in data.dict().items():
+            setattr(permission, key, value)
+
+        await bump_catalog_versions(session, PAGE_PERMISSION)
+        await session.commit()
+        invalidate_catalog(logger, page_permission_tag(page_permission_id))
+        logger.info(f"Page permission with ID {page_permission_id} updated successfully.")
+        return entity_to_page_permission_dto(permission)  # Convert entity back to DTO for the response
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while updating page permission: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Failed to update page permission.")
 
-            # Proceed to delete the page permission
-            await session.delete(page_permission)
-            await session.commit()  # Commit the transaction
-            logger.info(f"Successfully deleted page permission with ID {permission_id}.")
 
-            # Return a response indicating successful deletion
+@query_budget(5)
+async def delete_page_permission(permission_id: int, session: AsyncSession, logger: logging.Logger) -> Optional[ResponseBO]:
+    try:
+        # Fetch the page permission by ID to ensure it exists
+        page_permission = await fetch_page_permission_with_relationships(permission_id, session, logger)
+        if not page_permission:
+            logger.error(f"Page Permission with ID {permission_id} not found for deletion.")
             return ResponseBO(
-                code=200,  # HTTP status code for OK
-                status="DELETED",
+                code=404,  # HTTP status code for Not Found
+                status="NOT FOUND",
                 data=None,
-                message=f"Page permission with ID {permission_id} deleted successfully."
+                message=f"Page Permission with ID {permission_id} not found."
             )
 
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while deleting page permission: {e}")
-            await session.rollback()  # Rollback in case of error
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while deleting page permission: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+        # Proceed to delete the page permission
+        await session.delete(page_permission)
+        await bump_catalog_versions(session, PAGE_PERMISSION, SERVICE_PAGE_PERMISSIONS_MAPPING)
+        await session.commit()  # Commit the transaction
+        invalidate_catalog(logger, page_permission_tag(permission_id))
+        logger.info(f"Successfully deleted page permission with ID {permission_id}.")
+
+        # Return a response indicating successful deletion
+        return ResponseBO(
+            code=200,  # HTTP status code for OK
+            status="DELETED",
+            data=None,
+            message=f"Page permission with ID {permission_id} deleted successfully."
+        )
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while deleting page permission: {e}")
+        await session.rollback()  # Rollback in case of error
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while deleting page permission: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
 # Fetch a PagePermissionEntity by ID
-async def get_page_permission_by_id(page_permission_id: int, logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            # Fetch the page permission by ID with relationships
-            page_permission = await fetch_page_permission_with_relationships(page_permission_id, session, logger)
-            if not page_permission:
-                logger.error(f"Page Permission with ID {page_permission_id} not found.")
-                # raise HTTPException(status_code=404, detail="Page Permission not found")
-                return None
-            logger.info(f"Retrieved Page Permission: {page_permission}")
-            return entity_to_page_permission_dto(page_permission)  # Convert to DTO if needed
-
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while fetching page permission: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching page permission: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+@query_budget(3)
+async def get_page_permission_by_id(page_permission_id: int, session: AsyncSession, logger: logging.Logger):
+    try:
+        # Fetch the page permission by ID with relationships
+        page_permission = await fetch_page_permission_with_relationships(page_permission_id, session, logger)
+        if not page_permission:
+            logger.error(f"Page Permission with ID {page_permission_id} not found.")
+            # raise HTTPException(status_code=404, detail="Page Permission not found")
+            return None
+        logger.debug("Retrieved Page Permission: %s", page_permission)
+        return entity_to_page_permission_dto(page_permission)  # Convert to DTO if needed
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while fetching page permission: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching page permission: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
 
 # Fetch all PagePermissionEntity records
-async def get_all_page_permissions(logger: logging.Logger):
-    async with ConnectionManager() as session:
-        try:
-            result = await session.execute(
-                select(PagePermissionEntity)
-                .options(
-                    selectinload(PagePermissionEntity.services),  # Eager load related services
-                )
+@query_budget(3)
+async def get_all_page_permissions(session: AsyncSession, logger: logging.Logger):
+    try:
+        result = await session.execute(
+            select(PagePermissionEntity)
+            .options(
+                selectinload(PagePermissionEntity.services),  # Eager load related services
             )
-            page_permissions = result.scalars().all()
-
-            if not page_permissions:
-                logger.warning("No page permissions found.")
-                return []  # Return empty list if none are found
-
-            logger.info(f"Retrieved {len(page_permissions)} page permissions.")
-            return [entity_to_page_permission_dto(page_permission) for page_permission in page_permissions]
+        )
+        page_permissions = result.scalars().all()
 
-        except SQLAlchemyError as e:
-            logger.error(f"Database error occurred while fetching page permissions: {e}")
-            raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching page permissions: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+        if not page_permissions:
+            logger.warning("No page permissions found.")
+            return []  # Return empty list if none are found
 
+        logger.info(f"Retrieved {len(page_permissions)} page permissions.")
+        return [entity_to_page_permission_dto(page_permission) for page_permission in page_permissions]
 
-async def check_page_permissions_exist(page_permission_ids: List[int], logger: logging.Logger):
-    async with ConnectionManager() as session:
-        # Use .in_() to check if page permissions exist
-        result = await session.execute(
-            select(PagePermissionEntity).filter(PagePermissionEntity.id.in_(page_permission_ids))
-        )
-        permissions = result.scalars().all()
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred while fetching page permissions: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching page permissions: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
 
-        # Log the number of found permissions
-        logger.info(f"Found {len(permissions)} page permissions for the given IDs.")
 
-        # Return true if all permissions were found
-        return len(permissions) == len(page_permission_ids)
+async def validate_page_permissions(page_permission_ids: Optional[List[int]], session: AsyncSession,
+                                    logger: logging.Logger) -> List[int]:
+    # Returns the page permission IDs that do not exist
+    return await find_missing_ids(session, PagePermissionEntity, page_permission_ids, logger)
 
 
-async def create_page_permissions_mapping(service_id: int, page_permission_ids: List[int], logger: logging.Logger):
-    async with ConnectionManager() as session:
-        # Fetch existing mappings to avoid duplicates
-        existing_mappings = await session.execute(
-            select(ServiceApiPagePermissionsMapping).where(
-                ServiceApiPagePermissionsMapping.service_id == service_id,
-                ServiceApiPagePermissionsMapping.page_permission_id.in_(page_permission_ids)
-            )
+@query_budget(7)
+async def create_page_permissions_mapping(service_id: int, page_permission_ids: List[int], session: AsyncSession, logger: logging.Logger):
+    # Fetch existing mappings to avoid duplicates
+    existing_mappings = await session.execute(
+        select(ServiceApiPagePermissionsMapping).where(
+            ServiceApiPagePermissionsMapping.service_id == service_id,
+            ServiceApiPagePermissionsMapping.page_permission_id.in_(page_permission_ids)
         )
-        existing_mappings_ids = {mapping.page_permission_id for mapping in existing_mappings.scalars()}
+    )
+    existing_mappings_ids = {mapping.page_permission_id for mapping in existing_mappings.scalars()}
 
-        # Create new mappings for page permissions that are not already mapped
-        new_mappings = [
-            ServiceApiPagePermissionsMapping(service_id=service_id, page_permission_id=page_permission_id)
-            for page_permission_id in page_permission_ids
-            if page_permission_id not in existing_mappings_ids
-        ]
+    # Create new mappings for page permissions that are not already mapped
+    new_mappings = [
+        ServiceApiPagePermissionsMapping(service_id=service_id, page_permission_id=page_permission_id)
+        for page_permission_id in page_permission_ids
+        if page_permission_id not in existing_mappings_ids
+    ]
 
-        # Add new mappings to the session
-        for mapping in new_mappings:
-            session.add(mapping)
+    # Add new mappings to the session
+    for mapping in new_mappings:
+        session.add(mapping)
 
-        await session.commit()
+    await bump_catalog_versions(session, SERVICE_PAGE_PERMISSIONS_MAPPING)
+    await session.commit()
+    invalidate_catalog(logger, service_tag(service_id))
 
-        logger.info(f"Page permissions mapped to service {service_id}: {page_permission_ids}")
+    logger.info(f"Page permissions mapped to service {service_id}: {page_permission_ids}")
 
-        # Fetch the updated service from the database
-        updated_service = await fetch_service_with_relationships(service_id, session, logger)
+    # Fetch the updated service from the database
+    updated_service = await fetch_service_with_relationships(service_id, session, logger)
 
-        # Convert the updated service entity to DTO
-        service_dto = entity_to_service_dto(updated_service, logger)
+    # Convert the updated service entity to DTO
+    service_dto = entity_to_service_dto(updated_service, logger)
 
-        # Return the response
-        return ResponseBO(
-            code=201,  # HTTP status code for Created
-            status="CREATED",
-            data=service_dto,
-            message="Page permission mapping created successfully."
-        )
+    # Return the response
+    return ResponseBO(
+        code=201,  # HTTP status code for Created
+        status="CREATED",
+        data=service_dto,
+        message="Page permission mapping created successfully."
+    )
 
 async def fetch_service_page_permission_with_relationships(service_id: int, session, logger) -> ServiceEntity:
     logger.info(f"Fetching service with ID: {service_id}")
@@ -1361,7 +1637,7 @@ async def fetch_service_page_permission_with_relationships(service_id: int, sess
         service = result.scalars().first()
 
         if service:
-            logger.info(f"Successfully retrieved service: {service}")
+            logger.debug("Successfully retrieved service: %s", service)
         else:
             logger.warning(f"Service with ID {service_id} not found.")
 
@@ -1372,6 +1648,27 @@ async def fetch_service_page_permission_with_relationships(service_id: int, sess
         raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching the service.")
 
 
+@query_budget()
+async def bulk_upsert_page_permissions(items: List[PagePermissionCreateDTO], session: AsyncSession,
+                                       logger: logging.Logger) -> List[dict]:
+    rows = [
+        {"name": item.name, "description": item.description, "status": item.status, "page_url": item.page_url}
+        for item in items
+    ]
+    try:
+        results = await bulk_upsert_by_name(PagePermissionEntity, rows, session, logger)
+        updated_ids = [item["id"] for item in results if item["result"] == "UPDATED"]
+        if any(item["result"] in ("CREATED", "UPDATED") for item in results):
+            await bump_catalog_versions(session, PAGE_PERMISSION)
+        await session.commit()
+        invalidate_catalog(logger, *[page_permission_tag(page_permission_id) for page_permission_id in updated_ids])
+        return results
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to bulk upsert page permissions: {e}")
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred. Please try again later.")
+
+
 def entity_to_page_permission_dto(entity: PagePermissionEntity) -> PagePermissionDTO:
     return PagePermissionDTO(
         id=entity.id,
@@ -1389,3 +1686,7 @@ def dto_to_page_permission_entity(dto: PagePermissionDTO) -> PagePermissionEntit
         status=dto.status,
         page_url=dto.page_url
     )
+
+
+# Every service call and DTO conversion above is a span of the request trace
+trace_functions(sys.modules[__name__])
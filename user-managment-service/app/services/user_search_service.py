@@ -0,0 +1,217 @@
+# app/services/user_search_service.py
+
+import logging
+import re
+from typing import Iterable, List, Set
+
+from sqlalchemy import case, delete, event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.configuration.config import Config
+from app.configuration.session_events import clear_info_on_rollback
+from app.models.models import UserEntity, AddressEntity, OrganizationEntity, UserSearchTokenEntity
+from app.models.pydantic_models import UserSearchResultDTO
+from app.services.count_cache import count_cache, get_total
+
+SEARCH_TABLE = UserSearchTokenEntity.__tablename__
+
+# Relevance of a hit per source column; a whole-token match counts double a prefix match
+FIELD_WEIGHTS = {
+    (UserEntity, "first_name"): 10,
+    (UserEntity, "last_name"): 10,
+    (UserEntity, "email_id"): 8,
+    (UserEntity, "mobile_no"): 6,
+    (UserEntity, "customer_id"): 6,
+    (OrganizationEntity, "organization_name"): 5,
+    (OrganizationEntity, "display_name"): 5,
+    (OrganizationEntity, "gstin"): 6,
+    (OrganizationEntity, "pan"): 6,
+    (OrganizationEntity, "tan"): 6,
+    (OrganizationEntity, "cin"): 6,
+    (OrganizationEntity, "organization_type"): 2,
+    (OrganizationEntity, "incorporation_date"): 1,
+    (AddressEntity, "city"): 3,
+    (AddressEntity, "state"): 2,
+    (AddressEntity, "country"): 2,
+    (AddressEntity, "pincode"): 3,
+    (AddressEntity, "address_line_1"): 1,
+    (AddressEntity, "address_line_2"): 1,
+}
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+MAX_TOKEN_LENGTH = UserSearchTokenEntity.__table__.c.token.type.length
+MAX_QUERY_TERMS = 8
+
+
+def tokenize(value) -> List[str]:
+    """Lower-cased alphanumeric runs of a value; dates are tokenized in ISO form."""
+    if value is None:
+        return []
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return [token[:MAX_TOKEN_LENGTH] for token in TOKEN_PATTERN.findall(str(value).lower())]
+
+
+def search_columns():
+    return [getattr(entity, column).label(f"{entity.__tablename__}_{column}") for entity, column in FIELD_WEIGHTS]
+
+
+def token_rows(row) -> List[dict]:
+    """Token rows of one user from a ``search_columns()`` result row."""
+    tokens = {}
+    for (entity, column), weight in FIELD_WEIGHTS.items():
+        field = f"{entity.__tablename__}_{column}"
+        for token in tokenize(getattr(row, field)):
+            key = (field[:32], token)
+            tokens[key] = max(tokens.get(key, 0), weight)
+    return [{"user_id": row.user_id, "field": field, "token": token, "weight": weight}
+            for (field, token), weight in tokens.items()]
+
+
+def user_source_query(user_ids: Iterable[int]):
+    return (
+        select(UserEntity.id.label("user_id"), *search_columns())
+        .select_from(UserEntity)
+        .outerjoin(AddressEntity, AddressEntity.id == UserEntity.address_id)
+        .outerjoin(OrganizationEntity, OrganizationEntity.id == UserEntity.organization_id)
+        .where(UserEntity.id.in_(list(user_ids)))
+    )
+
+
+def reindex_users_sync(connection, user_ids: Set[int]):
+    """Replace the tokens of the given users (sync, on the flushing session's connection)."""
+    user_ids = sorted(user_ids)
+    chunk_size = Config.BULK_ID_CHUNK_SIZE
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        connection.execute(delete(UserSearchTokenEntity).where(UserSearchTokenEntity.user_id.in_(chunk)))
+        rows = [token for row in connection.execute(user_source_query(chunk)) for token in token_rows(row)]
+        if rows:
+            connection.execute(insert(UserSearchTokenEntity), rows)
+
+
+def affected_user_ids(session: Session) -> Set[int]:
+    """Ids of users whose searchable columns (or address/organization) changed in this flush."""
+    user_ids, address_ids, organization_ids = set(), set(), set()
+    for instance in list(session.new) + list(session.dirty):
+        if isinstance(instance, UserEntity):
+            user_ids.add(instance.id)
+        elif isinstance(instance, AddressEntity):
+            address_ids.add(instance.id)
+        elif isinstance(instance, OrganizationEntity):
+            organization_ids.add(instance.id)
+
+    connection = session.connection()
+    if address_ids:
+        user_ids.update(connection.execute(
+            select(UserEntity.id).where(UserEntity.address_id.in_(address_ids))).scalars())
+    if organization_ids:
+        user_ids.update(connection.execute(
+            select(UserEntity.id).where(UserEntity.organization_id.in_(organization_ids))).scalars())
+    user_ids.discard(None)
+    return user_ids
+
+
+def _after_flush(session: Session, flush_context):
+    deleted_ids = {instance.id for instance in session.deleted if isinstance(instance, UserEntity)}
+    user_ids = affected_user_ids(session) - deleted_ids
+    if not (user_ids or deleted_ids):
+        return
+    connection = session.connection()
+    if deleted_ids:
+        connection.execute(delete(UserSearchTokenEntity).where(UserSearchTokenEntity.user_id.in_(deleted_ids)))
+    if user_ids:
+        reindex_users_sync(connection, user_ids)
+    session.info["user_search_changed"] = True
+
+
+def _after_commit(session: Session):
+    if session.info.pop("user_search_changed", False):
+        count_cache.invalidate(SEARCH_TABLE)
+
+
+def register_user_search_index(session_class=Session):
+    """Keep the token table in step with user, address and organization writes on every flush."""
+    if not event.contains(session_class, "after_flush", _after_flush):
+        event.listen(session_class, "after_flush", _after_flush)
+        event.listen(session_class, "after_commit", _after_commit)
+        clear_info_on_rollback("user_search_changed", session_class=session_class)
+
+
+async def rebuild_index(session: AsyncSession, logger: logging.Logger) -> int:
+    """Re-tokenize every user in id order, one chunk per statement batch; returns the user count."""
+    last_id, indexed = 0, 0
+    chunk_size = Config.BULK_ID_CHUNK_SIZE
+    while True:
+        result = await session.execute(
+            select(UserEntity.id).where(UserEntity.id > last_id).order_by(UserEntity.id).limit(chunk_size))
+        user_ids = list(result.scalars())
+        if not user_ids:
+            break
+        await session.run_sync(lambda sync_session: reindex_users_sync(sync_session.connection(), set(user_ids)))
+        indexed += len(user_ids)
+        last_id = user_ids[-1]
+    await session.commit()
+    count_cache.invalidate(SEARCH_TABLE)
+    logger.info(f"Rebuilt the user search index for {indexed} users.")
+    return indexed
+
+
+def ranked_matches(terms: List[str]):
+    """Subquery of (user_id, score) for users matching every term as a token prefix."""
+    matches = None
+    score = None
+    for index, term in enumerate(terms):
+        per_term = (
+            select(UserSearchTokenEntity.user_id.label("user_id"),
+                   func.max(case((UserSearchTokenEntity.token == term, UserSearchTokenEntity.weight * 2),
+                                 else_=UserSearchTokenEntity.weight)).label("score"))
+            .where(UserSearchTokenEntity.token.like(f"{term}%"))
+            .group_by(UserSearchTokenEntity.user_id)
+            .subquery(f"term_{index}")
+        )
+        if matches is None:
+            matches, first, score = per_term, per_term, per_term.c.score
+        else:
+            matches = matches.join(per_term, per_term.c.user_id == first.c.user_id)
+            score = score + per_term.c.score
+    return select(first.c.user_id.label("user_id"), score.label("score")).select_from(matches).subquery("matches")
+
+
+async def search_users(search_key: str, page: int, size: int, session: AsyncSession,
+                       logger: logging.Logger) -> dict:
+    """Relevance-ranked page of users whose indexed columns contain every term of ``search_key``."""
+    terms = list(dict.fromkeys(tokenize(search_key)))[:MAX_QUERY_TERMS]
+    logger.info(f"Searching users for terms {terms} - page: {page}, size: {size}")
+    if not terms:
+        return {"data": [], "total_pages": 0, "total_elements": 0, "total_exact": True}
+
+    matches = ranked_matches(terms)
+
+    async def count() -> int:
+        result = await session.execute(select(func.count()).select_from(matches))
+        return result.scalar()
+
+    total_elements, total_exact = await get_total(SEARCH_TABLE, "user.search", tuple(terms), count, session, logger)
+
+    result = await session.execute(
+        select(UserEntity.id, UserEntity.customer_id, UserEntity.first_name, UserEntity.last_name,
+               UserEntity.email_id, UserEntity.mobile_no, OrganizationEntity.organization_name,
+               AddressEntity.city, matches.c.score)
+        .select_from(matches)
+        .join(UserEntity, UserEntity.id == matches.c.user_id)
+        .outerjoin(AddressEntity, AddressEntity.id == UserEntity.address_id)
+        .outerjoin(OrganizationEntity, OrganizationEntity.id == UserEntity.organization_id)
+        .order_by(matches.c.score.desc(), UserEntity.id)
+        .offset((page - 1) * size)
+        .limit(size)
+    )
+    users = [UserSearchResultDTO(**row._mapping) for row in result]
+    logger.info(f"{len(users)} users found on page {page} of {total_elements} matches")
+    return {
+        "data": users,
+        "total_pages": (total_elements // size) + (1 if total_elements % size > 0 else 0),
+        "total_elements": total_elements,
+        "total_exact": total_exact
+    }
@@ -1,7 +1,15 @@
-from typing import Type, TypeVar, Generic
+import base64
+import binascii
+import json
+import logging
+from typing import Type, TypeVar, Generic, Iterable, List
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 
+from app.configuration.config import Config
+
 # Type variables for generic usage
 T = TypeVar('T', bound=BaseModel)  # For Pydantic models
 R = TypeVar('R')  # For ORM models
@@ -17,3 +25,67 @@ def orm_to_pydantic(orm_instance: R, pydantic_model: Type[T]) -> T:
             value = False  # Defaulting None to False
         data[column.name] = value
     return pydantic_model(**data)
+
+
+async def find_missing_ids(session: AsyncSession, entity, ids: Iterable[int], logger: logging.Logger,
+                           chunk_size: int = None) -> List[int]:
+    """Return the ids that have no row in the entity's table, in request order and without duplicates.
+
+    Runs one ``SELECT id ... WHERE id IN (...)`` per chunk of ``chunk_size`` ids, so long lists
+    stay within the driver's parameter limits.
+    """
+    unique_ids = list(dict.fromkeys(ids or []))
+    if not unique_ids:
+        return []
+    chunk_size = chunk_size or Config.BULK_ID_CHUNK_SIZE
+
+    found = set()
+    for start in range(0, len(unique_ids), chunk_size):
+        chunk = unique_ids[start:start + chunk_size]
+        result = await session.execute(select(entity.id).where(entity.id.in_(chunk)))
+        found.update(result.scalars())
+
+    missing = [entity_id for entity_id in unique_ids if entity_id not in found]
+    if missing:
+        logger.error(f"{entity.__name__} IDs not found: {missing}")
+    return missing
+
+
+def build_upsert(dialect_name: str, table, rows: List[dict], conflict_column: str, update_columns: List[str]):
+    """Multi-row INSERT that updates ``update_columns`` when ``conflict_column`` already exists.
+
+    Returns None for dialects without a native upsert so the caller can fall back.
+    """
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        statement = mysql_insert(table).values(rows)
+        return statement.on_duplicate_key_update({column: statement.inserted[column] for column in update_columns})
+    if dialect_name in ("postgresql", "sqlite"):
+        if dialect_name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(table).values(rows)
+        return statement.on_conflict_do_update(
+            index_elements=[conflict_column],
+            set_={column: statement.excluded[column] for column in update_columns}
+        )
+    return None
+
+
+def encode_cursor(values: dict) -> str:
+    """Opaque, URL-safe token for keyset pagination (the last row's sort key)."""
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    """Inverse of ``encode_cursor``; raises ValueError for tokens it did not produce."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+    if not isinstance(values, dict):
+        raise ValueError(f"Invalid cursor: {token}")
+    return values
@@ -0,0 +1,63 @@
+# app/utils/fast_json.py
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Optional
+
+from fastapi import Response
+
+from app.configuration.tracing import span
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library encoder is used without it
+    orjson = None
+
+
+def _default(obj: Any):
+    """Encode the few non-JSON types that reach a response: DTO models, enums, decimals, dates and sets."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(by_alias=True)
+    if hasattr(obj, "dict"):
+        return obj.dict(by_alias=True)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded straight to bytes, bypassing response_model validation and jsonable_encoder."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with span("render", "serialize"):
+            return dumps(content)
+
+
+def envelope_response(code: int, status: str, data: Any, message: str,
+                      headers: Optional[dict] = None) -> FastJSONResponse:
+    """ResponseBO-shaped body (code, status, data, message) for already trusted data."""
+    return FastJSONResponse({"code": code, "status": status, "data": data, "message": message}, headers=headers)
+
+
+def raw_envelope_response(code: int, status: str, raw_data: bytes, message: str,
+                          headers: Optional[dict] = None) -> Response:
+    """ResponseBO-shaped body around ``raw_data``, a JSON document that is already encoded."""
+    head = dumps({"code": code, "status": status})[:-1]
+    body = head + b',"data":' + raw_data + b',"message":' + dumps(message) + b"}"
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,156 @@
+# app/utils/smtp_pool.py
+
+import asyncio
+import smtplib
+import ssl
+from email.message import EmailMessage
+from typing import Optional
+
+from app.configuration.config import Config
+
+TLS_VERSIONS = {
+    "TLSv1.2": ssl.TLSVersion.TLSv1_2,
+    "TLSv1.3": ssl.TLSVersion.TLSv1_3,
+}
+
+
+class SmtpDeliveryError(Exception):
+    """A message could not be delivered, permanently or after every retry."""
+
+
+def is_transient(error: Exception) -> bool:
+    """Connection drops, timeouts and 4xx replies are worth retrying; 5xx replies and refused recipients are not."""
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return False
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+
+class _Connection:
+    __slots__ = ("smtp", "sent")
+
+    def __init__(self):
+        self.smtp = None
+        self.sent = 0
+
+
+class SmtpPool:
+    """A fixed number of persistent SMTP connections shared by concurrent senders.
+
+    ``size`` caps the messages in flight; each connection is opened on first use, reused for up to
+    ``max_messages`` messages and reopened after a failure. smtplib is blocking, so every SMTP
+    exchange runs in a worker thread with one connection used by one thread at a time.
+
+        async with SmtpPool() as pool:
+            await pool.send(message)
+    """
+
+    def __init__(self, host: str = None, port: int = None, size: int = None, username: str = None,
+                 password: str = None, use_tls: bool = None, use_ssl: bool = None, timeout: float = None,
+                 max_messages: int = None, retries: int = None, retry_backoff: float = None):
+        self.host = host or Config.EMAIL_HOST
+        self.port = port or Config.EMAIL_PORT
+        self.size = size or Config.EMAIL_POOL_SIZE
+        self.username = Config.EMAIL_USERNAME if username is None else username
+        self.password = Config.EMAIL_PASSWORD if password is None else password
+        self.use_tls = Config.EMAIL_USE_TLS if use_tls is None else use_tls
+        self.use_ssl = Config.EMAIL_USE_SSL if use_ssl is None else use_ssl
+        self.timeout = timeout or Config.EMAIL_TIMEOUT_SECONDS
+        self.max_messages = Config.EMAIL_MAX_MESSAGES_PER_CONNECTION if max_messages is None else max_messages
+        self.retries = Config.EMAIL_SEND_RETRIES if retries is None else retries
+        self.retry_backoff = Config.EMAIL_RETRY_BACKOFF_SECONDS if retry_backoff is None else retry_backoff
+        self._idle: Optional[asyncio.LifoQueue] = None
+        self._connections = []
+        self.stats = {"sent": 0, "failed": 0, "retries": 0, "connects": 0}
+
+    def _tls_context(self) -> ssl.SSLContext:
+        context = ssl.create_default_context()
+        context.minimum_version = TLS_VERSIONS.get(Config.EMAIL_TLS_VERSION, ssl.TLSVersion.TLSv1_2)
+        return context
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=self._tls_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls and not self.use_ssl:
+                smtp.starttls(context=self._tls_context())
+            if self.username:
+                smtp.login(self.username, self.password)
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+            raise
+        return smtp
+
+    @staticmethod
+    def _close(connection: _Connection):
+        smtp, connection.smtp, connection.sent = connection.smtp, None, 0
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def _send_sync(self, connection: _Connection, message: EmailMessage) -> bool:
+        """Send on the given connection, (re)opening it first when needed; True when it was opened."""
+        if connection.smtp is not None and self.max_messages and connection.sent >= self.max_messages:
+            self._close(connection)
+        connected = connection.smtp is None
+        if connected:
+            connection.smtp = self._connect()
+        connection.smtp.send_message(message)
+        connection.sent += 1
+        return connected
+
+    async def open(self):
+        if self._idle is None:
+            self._connections = [_Connection() for _ in range(self.size)]
+            self._idle = asyncio.LifoQueue()
+            for connection in self._connections:
+                self._idle.put_nowait(connection)
+
+    async def close(self):
+        if self._idle is None:
+            return
+        # Waits for the messages in flight by taking every connection back first
+        for _ in range(self.size):
+            await self._idle.get()
+        await asyncio.gather(*(asyncio.to_thread(self._close, connection) for connection in self._connections))
+        self._idle = None
+        self._connections = []
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
+
+    async def send(self, message: EmailMessage):
+        """Deliver one message, retrying transient failures with exponential backoff."""
+        if self._idle is None:
+            await self.open()
+        attempt = 0
+        while True:
+            connection = await self._idle.get()
+            try:
+                if await asyncio.to_thread(self._send_sync, connection, message):
+                    self.stats["connects"] += 1
+                self.stats["sent"] += 1
+                return
+            except (smtplib.SMTPException, OSError) as error:
+                # smtplib resets the transaction after a refusal; anything else leaves the connection unusable
+                if not isinstance(error, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                    await asyncio.to_thread(self._close, connection)
+                if not is_transient(error) or attempt >= self.retries:
+                    self.stats["failed"] += 1
+                    raise SmtpDeliveryError(f"Delivery to {message['To']} failed: {error}") from error
+            finally:
+                self._idle.put_nowait(connection)
+            attempt += 1
+            self.stats["retries"] += 1
+            await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
@@ -0,0 +1,490 @@
+# benchmarks/generate_data.py
+"""Seeded synthetic catalog and tenant data for scale testing.
+
+Loads subscriptions, services, API and page permissions (with their mapping tables), organizations and
+their subscriptions, and users with their address, login and PermissionEntity document, using batched
+Core inserts. The same seed and profile always produce the same rows; every unique column (names,
+gstin, pan, tan, cin, email_id, mobile_no, login username, permission_name) is derived from the row
+number through a seeded bijection, so values never collide. The target tables must be empty.
+
+    python -m benchmarks.generate_data --profile medium --seed 7 --database-url mysql+aiomysql://...
+    python -m benchmarks.generate_data --profile small --users 50000
+
+Without ``--database-url`` the app's DATABASE_URL is used.
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.configuration.config import Config  # noqa: E402
+from app.models.models import Base, SubscriptionType, HttpMethod, SubscriptionEntity, ServiceEntity, \
+    SubscriptionServicesMapping, ApiPermissionEntity, ServiceApiPermissionsMapping, PagePermissionEntity, \
+    ServiceApiPagePermissionsMapping, RoleEntity, LoginEntity, AddressEntity, OrganizationEntity, \
+    OrganizationSubscriptionEntity, UserEntity, PermissionEntity, SubscriptionPermissionTreeEntity  # noqa: E402
+from app.services.catalog_version_service import CATALOG_TABLES, seed_catalog_versions, \
+    bump_catalog_versions  # noqa: E402
+from app.services.user_search_service import rebuild_index  # noqa: E402
+from app.services import permission_tree_service, subscription_expiry_service  # noqa: E402
+
+# Row counts per profile; the *_per_* entries are mapping fan-outs
+PROFILES = {
+    "tiny": {"subscriptions": 20, "services": 100, "api_permissions": 1000, "page_permissions": 200,
+             "organizations": 50, "users": 500,
+             "services_per_subscription": 5, "api_permissions_per_service": 10, "page_permissions_per_service": 3},
+    "small": {"subscriptions": 200, "services": 1000, "api_permissions": 10000, "page_permissions": 2000,
+              "organizations": 1000, "users": 20000,
+              "services_per_subscription": 6, "api_permissions_per_service": 10, "page_permissions_per_service": 3},
+    "medium": {"subscriptions": 1000, "services": 5000, "api_permissions": 50000, "page_permissions": 10000,
+               "organizations": 10000, "users": 200000,
+               "services_per_subscription": 8, "api_permissions_per_service": 10, "page_permissions_per_service": 3},
+    "large": {"subscriptions": 5000, "services": 20000, "api_permissions": 200000, "page_permissions": 40000,
+              "organizations": 50000, "users": 1000000,
+              "services_per_subscription": 8, "api_permissions_per_service": 10, "page_permissions_per_service": 3},
+}
+
+# Tables the generator fills; they must be empty so explicit ids and derived unique values cannot collide
+GENERATED_TABLES = (SubscriptionEntity, ServiceEntity, SubscriptionServicesMapping, ApiPermissionEntity,
+                    ServiceApiPermissionsMapping, PagePermissionEntity, ServiceApiPagePermissionsMapping,
+                    OrganizationEntity, OrganizationSubscriptionEntity, AddressEntity, LoginEntity, UserEntity,
+                    PermissionEntity)
+
+FIRST_NAMES = ("Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Krishna", "Ishaan", "Rohan",
+               "Ananya", "Diya", "Aadhya", "Saanvi", "Pari", "Anika", "Navya", "Myra", "Kavya", "Meera",
+               "Rahul", "Priya", "Amit", "Neha", "Vikram", "Pooja", "Suresh", "Lakshmi", "Karan", "Sneha")
+LAST_NAMES = ("Sharma", "Verma", "Gupta", "Iyer", "Reddy", "Nair", "Patel", "Shah", "Mehta", "Joshi",
+              "Kulkarni", "Desai", "Rao", "Menon", "Pillai", "Singh", "Chopra", "Bose", "Das", "Mukherjee")
+# (city, state, GST state code)
+CITIES = (("Mumbai", "Maharashtra", "27"), ("Pune", "Maharashtra", "27"), ("Bengaluru", "Karnataka", "29"),
+          ("Chennai", "Tamil Nadu", "33"), ("Hyderabad", "Telangana", "36"), ("Kolkata", "West Bengal", "19"),
+          ("New Delhi", "Delhi", "07"), ("Ahmedabad", "Gujarat", "24"), ("Jaipur", "Rajasthan", "08"),
+          ("Kochi", "Kerala", "32"), ("Lucknow", "Uttar Pradesh", "09"), ("Indore", "Madhya Pradesh", "23"))
+ORGANIZATION_WORDS = ("Apex", "Blue", "Cedar", "Delta", "Everest", "Falcon", "Granite", "Harbor", "Indus",
+                      "Jade", "Kestrel", "Lotus", "Meridian", "Nova", "Orbit", "Pioneer", "Quartz", "Summit")
+ORGANIZATION_SUFFIXES = ("Technologies", "Industries", "Logistics", "Foods", "Textiles", "Pharma", "Retail",
+                         "Infra", "Finance", "Systems")
+ORGANIZATION_TYPES = ("Private Limited", "Public Limited", "LLP", "Partnership", "Proprietorship")
+EMAIL_DOMAINS = ("example.com", "example.in", "example.org", "example.net")
+
+# API permission names are <resource>_<action>_<n>; the resource decides the module of the user document
+RESOURCES = ("subscription", "service", "api_permission", "user", "role", "permission", "report", "invoice")
+ACTIONS = (("get", HttpMethod.GET), ("list", HttpMethod.GET), ("create", HttpMethod.POST),
+           ("update", HttpMethod.PUT), ("delete", HttpMethod.DELETE))
+# keyword -> (document key, module id, module name, parent module id), checked in this order
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+GSTIN_CHARS = "0123456789" + LETTERS
+PASSWORD_HASH = "$2b$12$" + "b" * 53  # placeholder bcrypt hash; generated users are not meant to log in
+
+
+class UniqueSequence:
+    """Seeded bijection of 0..capacity-1 (an affine map), so distinct row numbers give distinct codes."""
+
+    def __init__(self, capacity: int, rng: random.Random):
+        self.capacity = capacity
+        self.multiplier = rng.randrange(1, capacity)
+        while math.gcd(self.multiplier, capacity) != 1:
+            self.multiplier = rng.randrange(1, capacity)
+        self.offset = rng.randrange(capacity)
+
+    def __call__(self, index: int) -> int:
+        if index >= self.capacity:
+            raise ValueError(f"Row {index} exceeds the {self.capacity} unique values of this sequence")
+        return (self.multiplier * index + self.offset) % self.capacity
+
+
+def digits(value: int, width: int) -> str:
+    return str(value).zfill(width)
+
+
+def letters(value: int, width: int) -> str:
+    chars = []
+    for _ in range(width):
+        value, remainder = divmod(value, 26)
+        chars.append(LETTERS[remainder])
+    return "".join(reversed(chars))
+
+
+def gstin_check_character(body: str) -> str:
+    """GSTIN check character (weighted mod 36 over the first 14 characters)."""
+    total = 0
+    for position, char in enumerate(body):
+        product = GSTIN_CHARS.index(char) * (2 if position % 2 else 1)
+        total += product // 36 + product % 36
+    return GSTIN_CHARS[(36 - total % 36) % 36]
+
+
+class TaxCodes:
+    """Unique PAN, TAN, GSTIN and CIN values for organization row numbers."""
+
+    def __init__(self, seed: int):
+        rng = random.Random(f"{seed}:tax-codes")
+        self.pan = UniqueSequence(26 ** 3 * 10 ** 4 * 26, rng)
+        self.tan = UniqueSequence(26 ** 3 * 10 ** 5 * 26, rng)
+        self.cin = UniqueSequence(70 * 10 ** 6, rng)
+
+    def for_organization(self, index: int, name: str, state_code: str, city: str) -> dict:
+        value = self.pan(index)
+        head, value = divmod(value, 10 ** 4 * 26)
+        number, check = divmod(value, 26)
+        # AAA + C (company) + first letter of the name + 4 digits + check letter
+        pan = letters(head, 3) + "C" + name[0].upper() + digits(number, 4) + LETTERS[check]
+
+        value = self.tan(index)
+        head, value = divmod(value, 10 ** 5 * 26)
+        number, check = divmod(value, 26)
+        # AAA + first letter of the name + 5 digits + check letter
+        tan = letters(head, 3) + name[0].upper() + digits(number, 5) + LETTERS[check]
+
+        gstin_body = state_code + pan + "1Z"
+        value = self.cin(index)
+        year, registration = divmod(value, 10 ** 6)
+        cin = ("U" if index % 3 else "L") + digits(10000 + index % 90000, 5) + city[:2].upper() \
+            + str(1950 + year) + ("PTC" if index % 3 else "PLC") + digits(registration, 6)
+        return {"pan": pan, "tan": tan, "gstin": gstin_body + gstin_check_character(gstin_body), "cin": cin}
+
+
+def batched(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def insert_rows(engine: AsyncEngine, entity, rows: Iterable[dict], batch_size: int) -> int:
+    """Executemany INSERT per batch, committed batch by batch so a large load holds no long transaction."""
+    inserted = 0
+    async with engine.connect() as connection:
+        for batch in batched(rows, batch_size):
+            await connection.execute(insert(entity.__table__), batch)
+            await connection.commit()
+            inserted += len(batch)
+    return inserted
+
+
+def spread(rng: random.Random, count: int, skew: float) -> int:
+    """1-based id in 1..count, skewed towards low ids (a few large tenants, many small ones)."""
+    return 1 + min(count - 1, int(count * rng.random() ** skew))
+
+
+def sample_ids(rng: random.Random, count: int, k: int) -> List[int]:
+    return sorted(1 + index for index in rng.sample(range(count), min(k, count)))
+
+
+class DataGenerator:
+    """Builds the rows of one profile; row ids are explicit, starting at 1 in every table."""
+
+    def __init__(self, profile: dict, seed: int):
+        self.profile = profile
+        self.seed = seed
+        self.tax_codes = TaxCodes(seed)
+        self.mobile_numbers = UniqueSequence(4 * 10 ** 9, random.Random(f"{seed}:mobile"))
+        self._api_permissions = {}
+        self._service_permissions = {}
+        self._subscription_services = {}
+        self._documents = {}
+
+    def rng(self, name: str) -> random.Random:
+        return random.Random(f"{self.seed}:{name}")
+
+    def subscriptions(self) -> Iterator[dict]:
+        rng = self.rng("subscriptions")
+        tiers = ("Starter", "Basic", "Standard", "Professional", "Business", "Enterprise")
+        for index in range(self.profile["subscriptions"]):
+            subscription_type = rng.choice((SubscriptionType.DAYS, SubscriptionType.MONTH, SubscriptionType.YEAR))
+            yield {"id": index + 1, "name": f"{rng.choice(tiers)} Plan {index + 1}",
+                   "validity": rng.choice((7, 15, 30)) if subscription_type == SubscriptionType.DAYS else rng.choice((1, 3, 6, 12)),
+                   "cost": rng.randrange(99, 99999), "active_status": rng.random() < 0.9,
+                   "subscription_type": subscription_type}
+
+    def services(self) -> Iterator[dict]:
+        rng = self.rng("services")
+        for index in range(self.profile["services"]):
+            resource = RESOURCES[index % len(RESOURCES)]
+            yield {"id": index + 1, "name": f"{resource.replace('_', ' ').title()} Service {index + 1}",
+                   "description": f"Generated {resource} service", "active_status": rng.random() < 0.95}
+
+    def api_permission(self, index: int) -> dict:
+        rng = random.Random(f"{self.seed}:api-permission:{index}")
+        resource = RESOURCES[index % len(RESOURCES)]
+        action, method = ACTIONS[(index // len(RESOURCES)) % len(ACTIONS)]
+        return {"id": index + 1, "name": f"{resource}_{action}_{index + 1}", "method": method,
+                "api_url": f"/v1/api/{resource}s/{action}/{index + 1}" + ("/{id}" if action in ("get", "update", "delete") else ""),
+                "description": f"{action.title()} {resource.replace('_', ' ')} {index + 1}",
+                "status": rng.random() < 0.97}
+
+    def api_permissions(self) -> Iterator[dict]:
+        for index in range(self.profile["api_permissions"]):
+            yield self.api_permission(index)
+
+    def page_permissions(self) -> Iterator[dict]:
+        rng = self.rng("page-permissions")
+        for index in range(self.profile["page_permissions"]):
+            resource = RESOURCES[index % len(RESOURCES)]
+            yield {"id": index + 1, "name": f"{resource}_page_{index + 1}",
+                   "description": f"{resource.replace('_', ' ').title()} page {index + 1}",
+                   "status": rng.random() < 0.97, "page_url": f"/{resource.replace('_', '-')}s/{index + 1}"}
+
+    def subscription_services(self, subscription_id: int) -> List[int]:
+        services = self._subscription_services.get(subscription_id)
+        if services is None:
+            rng = random.Random(f"{self.seed}:subscription-services:{subscription_id}")
+            services = sample_ids(rng, self.profile["services"], self.profile["services_per_subscription"])
+            self._subscription_services[subscription_id] = services
+        return services
+
+    def service_api_permissions(self, service_id: int) -> List[int]:
+        permissions = self._service_permissions.get(service_id)
+        if permissions is None:
+            rng = random.Random(f"{self.seed}:service-api-permissions:{service_id}")
+            permissions = sample_ids(rng, self.profile["api_permissions"], self.profile["api_permissions_per_service"])
+            self._service_permissions[service_id] = permissions
+        return permissions
+
+    def subscription_service_mappings(self) -> Iterator[dict]:
+        for subscription_id in range(1, self.profile["subscriptions"] + 1):
+            for service_id in self.subscription_services(subscription_id):
+                yield {"subscription_id": subscription_id, "service_id": service_id}
+
+    def service_api_permission_mappings(self) -> Iterator[dict]:
+        for service_id in range(1, self.profile["services"] + 1):
+            for api_permission_id in self.service_api_permissions(service_id):
+                yield {"service_id": service_id, "api_permission_id": api_permission_id}
+
+    def service_page_permission_mappings(self) -> Iterator[dict]:
+        if not self.profile["page_permissions"]:
+            return
+        for service_id in range(1, self.profile["services"] + 1):
+            rng = random.Random(f"{self.seed}:service-page-permissions:{service_id}")
+            for page_permission_id in sample_ids(rng, self.profile["page_permissions"],
+                                                 self.profile["page_permissions_per_service"]):
+                yield {"service_id": service_id, "page_permission_id": page_permission_id}
+
+    def organization_subscription(self, organization_id: int) -> int:
+        return spread(random.Random(f"{self.seed}:organization-subscription:{organization_id}"),
+                      self.profile["subscriptions"], 1.5)
+
+    def organizations(self) -> Iterator[dict]:
+        rng = self.rng("organizations")
+        for index in range(self.profile["organizations"]):
+            name = f"{rng.choice(ORGANIZATION_WORDS)} {rng.choice(ORGANIZATION_SUFFIXES)} {index + 1}"
+            city, _, state_code = rng.choice(CITIES)
+            yield {"id": index + 1, "organization_name": f"{name} Private Limited", "display_name": name,
+                   "organization_type": rng.choice(ORGANIZATION_TYPES),
+                   "incorporation_date": date(1975, 1, 1) + timedelta(days=rng.randrange(18000)),
+                   **self.tax_codes.for_organization(index, name, state_code, city)}
+
+    def organization_subscriptions(self) -> Iterator[dict]:
+        if not self.profile["subscriptions"]:
+            return
+        rng = self.rng("organization-subscriptions")
+        for organization_id in range(1, self.profile["organizations"] + 1):
+            yield {"id": organization_id, "organization_id": organization_id,
+                   "subscription_id": self.organization_subscription(organization_id),
+                   "subscription_date": date(2020, 1, 1) + timedelta(days=rng.randrange(2000))}
+
+    def permission_document(self, subscription_id: int) -> dict:
+        """The user permission document for a subscription: its API permissions grouped into modules."""
+        document = self._documents.get(subscription_id)
+        if document is not None:
+            return document
+        builder = permission_tree_service.PermissionTreeBuilder()
+        api_permission_ids = sorted({permission_id for service_id in self.subscription_services(subscription_id)
+                                     for permission_id in self.service_api_permissions(service_id)})
+        for permission_id in api_permission_ids:
+            permission = self._api_permissions.get(permission_id)
+            if permission is None:
+                permission = self._api_permissions[permission_id] = self.api_permission(permission_id - 1)
+            builder.add(permission_id, permission["name"], permission["method"], permission["api_url"],
+                        permission["description"], permission["status"])
+        document = builder.document
+        self._documents[subscription_id] = document
+        return document
+
+    def user_rows(self, start: int, stop: int, role_ids: dict) -> dict:
+        """Address, login, user and permission rows of users start..stop-1 (0-based), keyed by entity."""
+        rng = random.Random(f"{self.seed}:users:{start}")
+        rows = {AddressEntity: [], LoginEntity: [], UserEntity: [], PermissionEntity: []}
+        for index in range(start, stop):
+            user_id = index + 1
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            email_id = f"{first_name}.{last_name}.{user_id}@{rng.choice(EMAIL_DOMAINS)}".lower()
+            city, state, _ = rng.choice(CITIES)
+            organization_id = spread(rng, self.profile["organizations"], 2.0) if self.profile["organizations"] else None
+            rows[AddressEntity].append({
+                "id": user_id, "address_line_1": f"{rng.randrange(1, 999)}, {rng.choice(ORGANIZATION_WORDS)} Nagar",
+                "address_line_2": f"Sector {rng.randrange(1, 60)}", "city": city, "state": state, "country": "India",
+                "pincode": digits(rng.randrange(110001, 855999), 6), "reference_id": str(user_id)})
+            rows[LoginEntity].append({
+                "id": user_id, "username": email_id, "password": PASSWORD_HASH, "account_active": rng.random() < 0.95,
+                "account_inactive_reason": None, "login_time": None, "logout_time": None})
+            rows[UserEntity].append({
+                "id": user_id, "customer_id": digits(user_id, 6), "first_name": first_name, "last_name": last_name,
+                "email_id": email_id, "mobile_no": str(6 * 10 ** 9 + self.mobile_numbers(index)),
+                "login_id": user_id, "role_id": role_ids["admin"] if rng.random() < 0.05 else role_ids["user"],
+                "organization_id": organization_id, "address_id": user_id})
+            if organization_id is not None and self.profile["subscriptions"]:
+                rows[PermissionEntity].append({
+                    "id": user_id, "permission_name": f"user_{user_id}_permissions", "user_id": user_id,
+                    "permission": self.permission_document(self.organization_subscription(organization_id))})
+        return rows
+
+
+async def ensure_roles(engine: AsyncEngine) -> dict:
+    """Ids of the ADMIN and USER roles, inserting whichever is missing."""
+    names = {"admin": Config.ROLE_ADMIN, "user": Config.ROLE_USER}
+    async with engine.begin() as connection:
+        existing = dict((await connection.execute(
+            select(RoleEntity.role, RoleEntity.id).where(RoleEntity.role.in_(names.values())))).all())
+        for name in names.values():
+            if name not in existing:
+                result = await connection.execute(insert(RoleEntity.__table__).values(
+                    role=name, description=f"Generated {name.lower()} role"))
+                existing[name] = result.inserted_primary_key[0]
+    return {key: existing[name] for key, name in names.items()}
+
+
+async def check_empty(engine: AsyncEngine):
+    async with engine.connect() as connection:
+        for entity in GENERATED_TABLES:
+            if (await connection.execute(select(func.count()).select_from(entity.__table__))).scalar():
+                raise ValueError(f"Table '{entity.__tablename__}' is not empty; generate into an empty database")
+
+
+async def sync_sequences(engine: AsyncEngine):
+    """Move Postgres id sequences past the explicit ids (MySQL and SQLite advance on their own)."""
+    if engine.dialect.name != "postgresql":
+        return
+    async with engine.begin() as connection:
+        for entity in GENERATED_TABLES:
+            table = entity.__tablename__
+            await connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM \"{table}\"), 0) + 1, false)"))
+
+
+async def generate(engine: AsyncEngine, profile: dict, seed: int, batch_size: int, logger: logging.Logger,
+                   search_index: bool = True) -> dict:
+    """Create the schema if needed and load one profile; returns the row count per table."""
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.run_sync(seed_catalog_versions)
+    await check_empty(engine)
+    role_ids = await ensure_roles(engine)
+    generator = DataGenerator(profile, seed)
+    counts = {}
+
+    async def load(entity, rows):
+        started = time.perf_counter()
+        counts[entity.__tablename__] = await insert_rows(engine, entity, rows, batch_size)
+        logger.info(f"{entity.__tablename__}: {counts[entity.__tablename__]} rows in "
+                    f"{time.perf_counter() - started:.1f}s")
+
+    await load(SubscriptionEntity, generator.subscriptions())
+    await load(ServiceEntity, generator.services())
+    await load(ApiPermissionEntity, generator.api_permissions())
+    await load(PagePermissionEntity, generator.page_permissions())
+    await load(SubscriptionServicesMapping, generator.subscription_service_mappings())
+    await load(ServiceApiPermissionsMapping, generator.service_api_permission_mappings())
+    await load(ServiceApiPagePermissionsMapping, generator.service_page_permission_mappings())
+    await load(OrganizationEntity, generator.organizations())
+    await load(OrganizationSubscriptionEntity, generator.organization_subscriptions())
+
+    # Users are generated a batch at a time and loaded parent tables first, so memory stays flat
+    started = time.perf_counter()
+    for entity in (AddressEntity, LoginEntity, UserEntity, PermissionEntity):
+        counts[entity.__tablename__] = 0
+    async with engine.connect() as connection:
+        for start in range(0, profile["users"], batch_size):
+            rows = generator.user_rows(start, min(start + batch_size, profile["users"]), role_ids)
+            for entity, entity_rows in rows.items():
+                if entity_rows:
+                    await connection.execute(insert(entity.__table__), entity_rows)
+                    counts[entity.__tablename__] += len(entity_rows)
+            await connection.commit()
+    logger.info(f"user: {counts[UserEntity.__tablename__]} users with address, login and permission rows in "
+                f"{time.perf_counter() - started:.1f}s")
+
+    await sync_sequences(engine)
+    async with AsyncSession(engine) as session:
+        # Running app workers drop their cached catalog graphs on the next version check
+        await bump_catalog_versions(session, *CATALOG_TABLES)
+        await session.commit()
+        started = time.perf_counter()
+        table = SubscriptionPermissionTreeEntity.__tablename__
+        counts[table] = await permission_tree_service.rebuild_all(session, logger)
+        logger.info(f"{table}: {counts[table]} trees in {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        await subscription_expiry_service.rebuild_all(session, logger)
+        logger.info(f"organization_subscription_details: expiry dates in {time.perf_counter() - started:.1f}s")
+        if search_index and profile["users"]:
+            started = time.perf_counter()
+            await rebuild_index(session, logger)
+            logger.info(f"user_search_token: rebuilt in {time.perf_counter() - started:.1f}s")
+    return counts
+
+
+def resolve_profile(args: argparse.Namespace) -> dict:
+    profile = dict(PROFILES[args.profile])
+    for key in profile:
+        override = getattr(args, key, None)
+        if override is not None:
+            profile[key] = override
+    return profile
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load seeded synthetic catalog and tenant data.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small", help="Size profile")
+    parser.add_argument("--seed", type=int, default=1, help="Seed; the same seed and sizes give the same rows")
+    parser.add_argument("--database-url", help="Target database (default: DATABASE_URL)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT batch")
+    parser.add_argument("--no-search-index", action="store_true", help="Skip rebuilding the user search index")
+    for key in PROFILES["small"]:
+        parser.add_argument("--" + key.replace("_", "-"), type=int, dest=key, help=f"Override the profile's {key}")
+    return parser.parse_args(argv)
+
+
+async def main_async(args: argparse.Namespace, logger: logging.Logger) -> dict:
+    engine = create_async_engine(args.database_url or Config.DATABASE_URL)
+    try:
+        return await generate(engine, resolve_profile(args), args.seed, args.batch_size, logger,
+                              search_index=not args.no_search_index)
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    logger = logging.getLogger("generate_data")
+    started = time.perf_counter()
+    try:
+        counts = asyncio.run(main_async(args, logger))
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    logger.info(f"Loaded {sum(counts.values())} rows ({args.profile}, seed {args.seed}) in "
+                f"{time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
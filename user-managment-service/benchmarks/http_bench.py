@@ -0,0 +1,502 @@
+# benchmarks/http_bench.py
+"""End-to-end HTTP benchmark of the subscription endpoints.
+
+Starts ``app.app`` against a throw-away SQLite database (aiosqlite) unless ``--database-url`` points
+elsewhere, seeds a catalog through the API, then drives every subscription_router endpoint with
+``--concurrency`` parallel clients. Per endpoint it reports p50/p95/p99 latency, throughput and SQL
+statements per request, and writes them to a JSON file that ``--compare`` diffs against another run:
+
+    python -m benchmarks.http_bench --output before.json
+    python -m benchmarks.http_bench --output after.json
+    python -m benchmarks.http_bench --compare before.json after.json
+
+Requests go through the ASGI interface in-process by default; ``--server`` runs uvicorn on a local
+port and benchmarks over TCP instead.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PREFIX = "/v1/api/subscriptions"
+RESULTS_VERSION = 1
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the subscription endpoints end to end.")
+    parser.add_argument("--database-url", help="Database to run against (default: a temporary SQLite file)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel clients per endpoint")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per read endpoint")
+    parser.add_argument("--subscriptions", type=int, default=20, help="Seeded subscriptions")
+    parser.add_argument("--services", type=int, default=5, help="Seeded services per subscription")
+    parser.add_argument("--api-permissions", type=int, default=200, help="Seeded API permissions")
+    parser.add_argument("--page-permissions", type=int, default=50, help="Seeded page permissions")
+    parser.add_argument("--permissions-per-service", type=int, default=10,
+                        help="API and page permissions mapped to each seeded service")
+    parser.add_argument("--profile", choices=("tiny", "small", "medium", "large"), help="Bulk-load this benchmarks.generate_data size profile instead of "
+                                           "seeding through the API (the sizes above are then ignored)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for --profile")
+    parser.add_argument("--only", action="append", default=[],
+                        help="Run only endpoints whose name contains this text (repeatable)")
+    parser.add_argument("--server", action="store_true", help="Serve with uvicorn and benchmark over TCP")
+    parser.add_argument("--port", type=int, default=5099, help="Port for --server")
+    parser.add_argument("--output", default="http_bench.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Diff two result files instead of running the benchmark")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="With --compare, percent slowdown of p95 or throughput reported as a regression")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace) -> Optional[str]:
+    """Point the app at the benchmark database before it is imported; returns a temp file to remove."""
+    database_file = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        handle, database_file = tempfile.mkstemp(prefix="http_bench_", suffix=".db")
+        os.close(handle)
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database_file}"
+    # The replica, SQL echo and console logging would only add noise to the numbers
+    os.environ["READ_DATABASE_URL"] = ""
+    os.environ.setdefault("DB_PROFILE", "bench")
+    os.environ.setdefault("LOG_TO_CONSOLE", "False")
+    os.environ.setdefault("LOG_DIR", os.path.join(tempfile.gettempdir(), "http_bench_logs"))
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    return database_file
+
+
+class QueryCounter:
+    """Counts statements executed on the app's engines."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def attach(self, *engines):
+        from sqlalchemy import event
+        for engine in {id(engine): engine for engine in engines}.values():
+            event.listen(engine.sync_engine, "before_cursor_execute", self)
+
+
+class Scenario:
+    """One endpoint: ``build(i)`` returns ``(method, url, json_body)`` for the i-th request."""
+
+    def __init__(self, name: str, method: str, path: str, build: Callable[[int], tuple],
+                 collect: Optional[Callable] = None, reads: bool = False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.build = build
+        self.collect = collect
+        self.reads = reads
+
+
+def envelope_code(response) -> int:
+    """ResponseBO ``code`` when the body carries one (errors are often HTTP 200), else the HTTP status."""
+    try:
+        body = response.json()
+    except ValueError:
+        return response.status_code
+    if isinstance(body, dict) and isinstance(body.get("code"), int):
+        return body["code"]
+    return response.status_code
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(client, scenario: Scenario, requests: int, concurrency: int, warmup: int,
+                       queries: QueryCounter) -> dict:
+    if scenario.reads:
+        for i in range(warmup):
+            method, url, body = scenario.build(i)
+            await client.request(method, url, json=body)
+
+    latencies, statuses, codes = [], Counter(), Counter()
+    indexes = iter(range(requests))
+
+    async def worker():
+        for i in indexes:
+            method, url, body = scenario.build(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] += 1
+            codes[str(envelope_code(response))] += 1
+            if scenario.collect is not None and response.status_code < 400:
+                scenario.collect(i, response)
+
+    queries_before = queries.count
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+    executed = queries.count - queries_before
+
+    latencies.sort()
+    measured = len(latencies)
+    return {
+        "method": scenario.method,
+        "path": scenario.path,
+        "requests": measured,
+        "errors": sum(count for code, count in codes.items() if int(code) >= 400),
+        "http_status": dict(sorted(statuses.items())),
+        "result_codes": dict(sorted(codes.items())),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        "throughput_rps": round(measured / elapsed, 2) if elapsed > 0 else 0.0,
+        "queries_per_request": round(executed / measured, 2) if measured else 0.0,
+    }
+
+
+def data_of(response):
+    return response.json().get("data")
+
+
+async def seed_catalog(client, args: argparse.Namespace) -> dict:
+    """Create the benchmark catalog through the API and return the ids the scenarios address."""
+
+    async def call(method, url, body=None):
+        response = await client.request(method, PREFIX + url, json=body)
+        if response.status_code >= 400 or envelope_code(response) >= 400:
+            raise RuntimeError(f"Seeding failed on {method} {url}: {response.status_code} {response.text[:300]}")
+        return response
+
+    await call("POST", "/service/apiPermissions/bulkUpsert", [
+        {"name": f"seed-api-{i}", "method": ("GET", "POST", "PUT", "DELETE")[i % 4],
+         "api_url": f"{PREFIX}/seed/{i}/{{id}}", "status": True}
+        for i in range(args.api_permissions)
+    ])
+    await call("POST", "/pagePermissions/bulkUpsert", [
+        {"name": f"seed-page-{i}", "page_url": f"/seed/page/{i}"} for i in range(args.page_permissions)
+    ])
+    api_permission_ids = [item["id"] for item in data_of(await call("GET", "/service/apiPermissions/getAll"))]
+    page_permission_ids = [item["id"] for item in data_of(await call("GET", "/pagePermissions/getAll"))]
+
+    def pick(ids, start):
+        return [ids[(start + offset) % len(ids)] for offset in range(min(args.permissions_per_service, len(ids)))]
+
+    subscription_ids, service_ids = [], []
+    for i in range(args.subscriptions):
+        subscription = data_of(await call("POST", "/create", {
+            "name": f"seed-subscription-{i}", "validity": 1 + i % 12, "cost": 10 + i,
+            "active_status": i % 5 != 0, "subscription_type": ("DAYS", "MONTH", "YEAR")[i % 3]}))
+        subscription_ids.append(subscription["id"])
+        for j in range(args.services):
+            position = i * args.services + j
+            service = data_of(await call("POST", "/service/create", {
+                "name": f"seed-service-{i}-{j}", "active_status": True, "subscription_id": subscription["id"],
+                "api_permission_id": pick(api_permission_ids, position) if api_permission_ids else None}))
+            service_ids.append(service["id"])
+            if page_permission_ids:
+                # Page permission mapping answers 500 on some trees; seeding continues without it
+                await client.post(PREFIX + "/pagePermissions/pagePermissionsMapping", json={
+                    "service_id": service["id"], "page_permission_id": pick(page_permission_ids, position)})
+
+    return {
+        "subscription_ids": subscription_ids,
+        "service_ids": service_ids,
+        "api_permission_ids": api_permission_ids,
+        "page_permission_ids": page_permission_ids,
+    }
+
+
+async def load_profile(engine, args: argparse.Namespace) -> dict:
+    """Bulk-load a generator profile straight into the database and return the ids the scenarios address."""
+    from benchmarks.generate_data import PROFILES, generate
+
+    profile = PROFILES[args.profile]
+    logger = logging.getLogger("http_bench")
+    await generate(engine, profile, args.seed, batch_size=5000, logger=logger)
+    return {
+        "subscription_ids": list(range(1, profile["subscriptions"] + 1)),
+        "service_ids": list(range(1, profile["services"] + 1)),
+        "api_permission_ids": list(range(1, profile["api_permissions"] + 1)),
+        "page_permission_ids": list(range(1, profile["page_permissions"] + 1)),
+    }
+
+
+def build_scenarios(catalog: dict, run_id: str) -> List[Scenario]:
+    """Every subscription_router endpoint, ordered so deletes consume what the creates produced."""
+    subscriptions = catalog["subscription_ids"]
+    services = catalog["service_ids"]
+    api_permissions = catalog["api_permission_ids"]
+    page_permissions = catalog["page_permission_ids"]
+    # Ids created by the i-th request of each create scenario, so later scenarios address the same rows
+    created = {"subscriptions": {}, "services": {}, "api_permissions": {}, "page_permissions": {}}
+
+    def cycle(ids):
+        return lambda i: ids[i % len(ids)] if ids else 0
+
+    subscription, service = cycle(subscriptions), cycle(services)
+    api_permission, page_permission = cycle(api_permissions), cycle(page_permissions)
+
+    def get(name, path, url):
+        return Scenario(name, "GET", path, lambda i: ("GET", PREFIX + url(i), None), reads=True)
+
+    def keep(bucket):
+        def collect(i, response):
+            data = data_of(response)
+            if isinstance(data, dict) and "id" in data:
+                created[bucket][i] = data["id"]
+        return collect
+
+    def take(bucket):
+        return lambda i: created[bucket].get(i, 0)
+
+    subscription_body = lambda name, i: {"name": name, "validity": 1 + i % 12, "cost": 10 + i % 50,
+                                          "active_status": True, "subscription_type": "MONTH"}
+    api_body = lambda name, i: {"name": name, "method": "GET", "api_url": f"{PREFIX}/bench/{run_id}/{i}",
+                                "status": True}
+    page_body = lambda name, i: {"name": name, "page_url": f"/bench/{run_id}/{i}"}
+
+    return [
+        get("subscription.get", "/get/{subscription_id}", lambda i: f"/get/{subscription(i)}"),
+        get("subscription.get_all", "/get_all", lambda i: "/get_all"),
+        get("subscription.get_all.projected", "/get_all?fields=name,cost",
+            lambda i: "/get_all?fields=name,cost"),
+        get("subscription.get_all_active", "/getAllActive", lambda i: "/getAllActive"),
+        get("service.get", "/service/get/{service_id}", lambda i: f"/service/get/{service(i)}"),
+        get("service.get_all", "/service/getAll", lambda i: "/service/getAll"),
+        get("service.get_by_subscription", "/service/getBySubscriptionId/{subscription_id}",
+            lambda i: f"/service/getBySubscriptionId/{subscription(i)}"),
+        get("api_permission.get", "/service/apiPermissions/get/{api_permission_id}",
+            lambda i: f"/service/apiPermissions/get/{api_permission(i)}"),
+        get("api_permission.get_all", "/service/apiPermissions/getAll", lambda i: "/service/apiPermissions/getAll"),
+        get("api_permission.get_by_service", "/service/apiPermissions/getApiPermissionsByServiceId/{service_id}",
+            lambda i: f"/service/apiPermissions/getApiPermissionsByServiceId/{service(i)}"),
+        get("page_permission.get", "/pagePermissions/get/{page_permission_id}",
+            lambda i: f"/pagePermissions/get/{page_permission(i)}"),
+        get("page_permission.get_all", "/pagePermissions/getAll", lambda i: "/pagePermissions/getAll"),
+        get("entitlement.check", "/entitlements/check",
+            lambda i: f"/entitlements/check?subscription_id={subscription(i)}&method=GET"
+                      f"&path={PREFIX}/seed/{i % max(1, len(api_permissions))}/{i}"),
+
+        Scenario("subscription.create", "POST", "/create",
+                 lambda i: ("POST", PREFIX + "/create", subscription_body(f"bench-{run_id}-subscription-{i}", i)),
+                 collect=keep("subscriptions")),
+        Scenario("subscription.update", "PUT", "/update/{subscription_id}",
+                 lambda i: ("PUT", PREFIX + f"/update/{take('subscriptions')(i)}",
+                            subscription_body(f"bench-{run_id}-subscription-{i}", i + 1))),
+        Scenario("service.create", "POST", "/service/create",
+                 lambda i: ("POST", PREFIX + "/service/create", {
+                     "name": f"bench-{run_id}-service-{i}", "active_status": True,
+                     "subscription_id": subscription(i), "api_permission_id": [api_permission(i)]}),
+                 collect=keep("services")),
+        Scenario("service.update", "PUT", "/service/update/{service_id}",
+                 lambda i: ("PUT", PREFIX + f"/service/update/{take('services')(i)}", {
+                     "name": f"bench-{run_id}-service-{i}", "description": "updated", "active_status": True,
+                     "subscription_id": subscription(i), "api_permission_id": [api_permission(i + 1)]})),
+        Scenario("service.mapping", "POST", "/service/servicesMapping",
+                 lambda i: ("POST", PREFIX + "/service/servicesMapping", {
+                     "subscription_id": subscription(i + 1), "service_id": [take("services")(i)]})),
+        Scenario("api_permission.create", "POST", "/service/apiPermissions/create",
+                 lambda i: ("POST", PREFIX + "/service/apiPermissions/create",
+                            api_body(f"bench-{run_id}-api-{i}", i)),
+                 collect=keep("api_permissions")),
+        Scenario("api_permission.update", "PUT", "/service/apiPermissions/update/{api_permission_id}",
+                 lambda i: ("PUT", PREFIX + f"/service/apiPermissions/update/{take('api_permissions')(i)}",
+                            api_body(f"bench-{run_id}-api-{i}", i + 1))),
+        Scenario("api_permission.bulk_upsert", "POST", "/service/apiPermissions/bulkUpsert",
+                 lambda i: ("POST", PREFIX + "/service/apiPermissions/bulkUpsert",
+                            [api_body(f"bench-{run_id}-bulk-api-{i}-{j}", j) for j in range(20)])),
+        Scenario("api_permission.mapping", "POST", "/service/apiPermissions/apiPermissionsMapping",
+                 lambda i: ("POST", PREFIX + "/service/apiPermissions/apiPermissionsMapping", {
+                     "service_id": take("services")(i), "api_permission_id": [take("api_permissions")(i)]})),
+        Scenario("page_permission.create", "POST", "/pagePermissions/create",
+                 lambda i: ("POST", PREFIX + "/pagePermissions/create",
+                            dict(page_body(f"bench-{run_id}-page-{i}", i), id=None)),
+                 collect=keep("page_permissions")),
+        Scenario("page_permission.update", "PUT", "/pagePermissions/update/{page_permission_id}",
+                 lambda i: ("PUT", PREFIX + f"/pagePermissions/update/{take('page_permissions')(i)}",
+                            page_body(f"bench-{run_id}-page-{i}", i + 1))),
+        Scenario("page_permission.bulk_upsert", "POST", "/pagePermissions/bulkUpsert",
+                 lambda i: ("POST", PREFIX + "/pagePermissions/bulkUpsert",
+                            [page_body(f"bench-{run_id}-bulk-page-{i}-{j}", j) for j in range(20)])),
+        Scenario("page_permission.mapping", "POST", "/pagePermissions/pagePermissionsMapping",
+                 lambda i: ("POST", PREFIX + "/pagePermissions/pagePermissionsMapping", {
+                     "service_id": take("services")(i), "page_permission_id": [take("page_permissions")(i)]})),
+
+        Scenario("service.delete", "DELETE", "/service/delete/serviceId/{service_id}/subscriptionId/{subscription_id}",
+                 lambda i: ("DELETE", PREFIX + f"/service/delete/serviceId/{take('services')(i)}"
+                                               f"/subscriptionId/{subscription(i)}", None)),
+        Scenario("api_permission.delete", "DELETE", "/service/apiPermissions/delete/{api_permission_id}",
+                 lambda i: ("DELETE", PREFIX + f"/service/apiPermissions/delete/{take('api_permissions')(i)}", None)),
+        Scenario("page_permission.delete", "DELETE", "/pagePermissions/delete/{page_permission_id}",
+                 lambda i: ("DELETE", PREFIX + f"/pagePermissions/delete/{take('page_permissions')(i)}", None)),
+        Scenario("subscription.delete", "DELETE", "/delete/{subscription_id}",
+                 lambda i: ("DELETE", PREFIX + f"/delete/{take('subscriptions')(i)}", None)),
+    ]
+
+
+def git_revision() -> dict:
+    def git(*command):
+        try:
+            return subprocess.run(["git", *command], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                                  timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--", "."))}
+
+
+async def open_client(app, args: argparse.Namespace):
+    """HTTP client for the app plus a coroutine that shuts it (and the server, if any) down."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(1, args.concurrency) + 4)
+    if not args.server:
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench", limits=limits)
+
+        async def close():
+            await client.aclose()
+            await lifespan.__aexit__(None, None, None)
+        return client, close
+
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning",
+                                           access_log=False))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.05)
+    client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60)
+
+    async def close():
+        await client.aclose()
+        server.should_exit = True
+        await serving
+    return client, close
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    from app.app import app
+    from app.configuration.db import engine, read_engine
+
+    # Per-request client logging would be written from inside the timed section
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    queries = QueryCounter()
+    queries.attach(engine, read_engine)
+    client, close = await open_client(app, args)
+    try:
+        seed_started = time.perf_counter()
+        catalog = await load_profile(engine, args) if args.profile else await seed_catalog(client, args)
+        seed_seconds = time.perf_counter() - seed_started
+        run_id = datetime.now(timezone.utc).strftime("%H%M%S")
+
+        results = {}
+        for scenario in build_scenarios(catalog, run_id):
+            if args.only and not any(text in scenario.name for text in args.only):
+                continue
+            results[scenario.name] = await run_scenario(client, scenario, args.requests, args.concurrency,
+                                                        args.warmup, queries)
+            print(format_row(scenario.name, results[scenario.name]), flush=True)
+    finally:
+        await close()
+
+    return {
+        "version": RESULTS_VERSION,
+        "meta": {
+            **git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name + "+" + engine.dialect.driver,
+            "transport": "uvicorn" if args.server else "asgi",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "profile": args.profile,
+            "seed": args.seed if args.profile else None,
+            "catalog": {key: len(ids) for key, ids in catalog.items()},
+            "seed_seconds": round(seed_seconds, 3),
+        },
+        "scenarios": results,
+    }
+
+
+def format_row(name: str, result: dict) -> str:
+    return (f"{name:<34} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"p99 {result['p99_ms']:>8.2f}ms  {result['throughput_rps']:>8.1f} req/s  "
+            f"{result['queries_per_request']:>6.2f} q/req  errors {result['errors']}")
+
+
+def change(before: float, after: float) -> Optional[float]:
+    return round((after - before) / before * 100, 1) if before else None
+
+
+def compare(baseline_path: str, current_path: str, threshold: float) -> int:
+    """Print per-endpoint deltas; returns 1 when any endpoint regressed past ``threshold`` percent."""
+    with open(baseline_path) as baseline_file, open(current_path) as current_file:
+        baseline, current = json.load(baseline_file), json.load(current_file)
+    print(f"baseline {baseline['meta'].get('commit')}  ->  current {current['meta'].get('commit')}")
+
+    regressions = []
+    for name, after in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name:<34} new endpoint")
+            continue
+        deltas = {metric: change(before[metric], after[metric])
+                  for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "queries_per_request")}
+        print(f"{name:<34} " + "  ".join(
+            f"{metric} {before[metric]}->{after[metric]}" + (f" ({deltas[metric]:+.1f}%)" if deltas[metric] is not None else "")
+            for metric in deltas))
+        slower = (deltas["p95_ms"] or 0) > threshold or -(deltas["throughput_rps"] or 0) > threshold
+        if slower or after["queries_per_request"] > before["queries_per_request"] or after["errors"] > before["errors"]:
+            regressions.append(name)
+
+    for name in sorted(set(baseline["scenarios"]) - set(current["scenarios"])):
+        print(f"{name:<34} missing from current run")
+    if regressions:
+        print(f"Regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+
+    database_file = configure_environment(args)
+    try:
+        results = asyncio.run(run_benchmark(args))
+    finally:
+        if database_file and os.path.exists(database_file):
+            os.remove(database_file)
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# tests/conftest.py
+
+import os
+import tempfile
+
+# A throwaway SQLite database per run; set before app.configuration reads the environment
+_work_dir = tempfile.mkdtemp(prefix="user-managment-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_work_dir}/test.db"
+os.environ["READ_DATABASE_URL"] = ""
+os.environ["DB_PROFILE"] = "dev"
+os.environ["DB_ECHO"] = "false"
+os.environ["LOG_TO_CONSOLE"] = "False"
+os.environ["LOG_DIR"] = os.path.join(_work_dir, "logs")
+os.environ["METRICS_DIR"] = ""
+os.environ["EXPIRY_NOTIFIER_ENABLED"] = "false"
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+SUBSCRIPTIONS = "/v1/api/subscriptions"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.app import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def run(client):
+    """Run a coroutine on the app's event loop, where the engine's pooled connections live."""
+    async def await_it(coroutine):
+        return await coroutine
+
+    return lambda coroutine: client.portal.call(await_it, coroutine)
+
+
+@pytest.fixture
+def session_factory(client):
+    from app.configuration.db import AsyncSessionLocal
+    return AsyncSessionLocal
+
+
+@pytest.fixture
+def unique():
+    """A name no other test uses; the database is shared by the whole run."""
+    return lambda prefix="t": f"{prefix}-{uuid.uuid4().hex[:10]}"
+
+
+def _data(response, code: int):
+    body = response.json()
+    assert body.get("code") == code, response.text
+    return body["data"]
+
+
+@pytest.fixture
+def make_subscription(client, unique):
+    def make(**fields) -> dict:
+        body = {"name": unique("plan"), "validity": 1, "cost": 5, "active_status": True,
+                "subscription_type": "MONTH", **fields}
+        return _data(client.post(f"{SUBSCRIPTIONS}/create", json=body), 201)
+    return make
+
+
+@pytest.fixture
+def make_api_permission(client, unique):
+    def make(**fields) -> dict:
+        name = unique("api")
+        body = {"name": name, "method": "GET", "api_url": f"/v1/api/{name}", "status": True, **fields}
+        return _data(client.post(f"{SUBSCRIPTIONS}/service/apiPermissions/create", json=body), 201)
+    return make
+
+
+@pytest.fixture
+def make_service(client, unique):
+    def make(subscription_id: int, api_permission_ids=(), **fields) -> dict:
+        body = {"name": unique("service"), "active_status": True, "subscription_id": subscription_id,
+                "api_permission_id": list(api_permission_ids), **fields}
+        return _data(client.post(f"{SUBSCRIPTIONS}/service/create", json=body), 201)
+    return make
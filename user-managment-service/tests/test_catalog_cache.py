@@ -0,0 +1,126 @@
+# tests/test_catalog_cache.py
+"""Catalog GETs are cached per process; every write must make the next GET see it."""
+
+from datetime import timezone
+
+from tests.conftest import SUBSCRIPTIONS
+
+
+def _get(client, subscription_id, **params):
+    return client.get(f"{SUBSCRIPTIONS}/get/{subscription_id}", params=params).json()
+
+
+def test_created_subscription_is_visible_after_a_cached_404(client, make_subscription):
+    next_id = make_subscription()["id"] + 1
+    for params in ({}, {"fields": "id,name"}):
+        assert _get(client, next_id, **params)["code"] == 404
+
+    created = make_subscription()
+    assert created["id"] == next_id
+    for params in ({}, {"fields": "id,name"}):
+        body = _get(client, next_id, **params)
+        assert body["code"] == 200, body
+        assert body["data"]["name"] == created["name"]
+
+
+def test_update_is_visible_to_cached_reads(client, make_subscription, unique):
+    subscription = make_subscription()
+    assert _get(client, subscription["id"])["data"]["name"] == subscription["name"]
+    assert any(item["id"] == subscription["id"] for item in client.get(f"{SUBSCRIPTIONS}/get_all").json()["data"])
+
+    renamed = unique("renamed")
+    response = client.put(f"{SUBSCRIPTIONS}/update/{subscription['id']}",
+                          json={"name": renamed, "validity": 3, "cost": 7, "active_status": True,
+                                "subscription_type": "DAYS"})
+    assert response.json()["code"] == 200, response.text
+
+    assert _get(client, subscription["id"])["data"]["name"] == renamed
+    listed = {item["id"]: item for item in client.get(f"{SUBSCRIPTIONS}/get_all").json()["data"]}
+    assert listed[subscription["id"]]["name"] == renamed
+
+
+def test_service_mapping_is_visible_in_the_cached_subscription(client, make_subscription, make_service):
+    subscription = make_subscription()
+    assert _get(client, subscription["id"])["data"]["services"] == []
+    service = make_service(subscription["id"])
+    assert [item["id"] for item in _get(client, subscription["id"])["data"]["services"]] == [service["id"]]
+
+
+def test_write_from_another_worker_is_not_served_under_the_new_etag(client, run, session_factory,
+                                                                    make_subscription, unique):
+    from sqlalchemy import update
+    from app.models.models import SubscriptionEntity
+    from app.services.catalog_version_service import bump_catalog_versions, SUBSCRIPTION
+
+    subscription = make_subscription()
+    url = f"{SUBSCRIPTIONS}/get/{subscription['id']}"
+    first = client.get(url)
+    old_etag = first.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": old_etag}).status_code == 304
+
+    # Another process commits the change: the version rows move, this process's cache is not told
+    renamed = unique("elsewhere")
+
+    async def write_elsewhere():
+        async with session_factory() as session:
+            await session.execute(update(SubscriptionEntity).where(SubscriptionEntity.id == subscription["id"])
+                                  .values(name=renamed))
+            await bump_catalog_versions(session, SUBSCRIPTION)
+            await session.commit()
+
+    run(write_elsewhere())
+
+    for headers in ({}, {"If-None-Match": old_etag}):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != old_etag
+        assert response.json()["data"]["name"] == renamed
+
+
+def test_if_modified_since_is_not_trusted_within_the_second_of_the_last_write(monkeypatch):
+    from datetime import timedelta
+    from email.utils import format_datetime
+    from starlette.requests import Request
+    from app.services import catalog_version_service
+    from app.services.catalog_version_service import CatalogValidators
+
+    now = catalog_version_service._utcnow()
+    monkeypatch.setattr(catalog_version_service, "_utcnow", lambda: now)
+
+    def request(since):
+        header = format_datetime(since.replace(tzinfo=timezone.utc), usegmt=True).encode()
+        return Request({"type": "http", "headers": [(b"if-modified-since", header)]})
+
+    # Written this second: a second write in it would keep the same whole-second stamp
+    current = CatalogValidators('"1.0"', now)
+    assert "Last-Modified" not in current.headers()
+    assert not current.matches(request(current.last_modified))
+    assert current.matches(Request({"type": "http", "headers": [(b"if-none-match", b'"1.0"')]}))
+
+    settled = CatalogValidators('"1.0"', now - timedelta(seconds=5))
+    assert settled.headers()["Last-Modified"] == settled.last_modified_header
+    assert settled.matches(request(settled.last_modified))
+    assert not settled.matches(request(settled.last_modified - timedelta(seconds=1)))
+
+
+def test_reads_without_a_generation_leave_the_versioned_entry_alone(run, session_factory, make_subscription):
+    import logging
+    from app.services import subscription_service
+    from app.services.catalog_cache import catalog_cache
+
+    subscription = make_subscription()
+    logger = logging.getLogger("test")
+
+    async def read(etag=None):
+        async with session_factory() as session:
+            return await subscription_service.get_subscription_by_id(subscription["id"], session, logger,
+                                                                     etag=etag)
+
+    run(read('"cached"'))
+    hits = catalog_cache.hits
+    # What a write path such as update_service does: read the subscription with no catalog ETag
+    assert run(read()).id == subscription["id"]
+    assert catalog_cache.hits == hits
+    assert catalog_cache._entries[("subscription", subscription["id"])][3] == '"cached"'
+    assert run(read('"cached"')).id == subscription["id"]
+    assert catalog_cache.hits == hits + 1
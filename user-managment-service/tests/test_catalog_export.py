@@ -0,0 +1,65 @@
+# tests/test_catalog_export.py
+"""GET /export/{name}: batched streaming of the tables and the catalog sheet, read back by the import."""
+
+import csv
+import io
+import json
+
+from tests.conftest import SUBSCRIPTIONS
+
+EXPORT = f"{SUBSCRIPTIONS}/export"
+
+
+def test_table_export_is_encoded_one_batch_at_a_time(client, monkeypatch, make_subscription):
+    from app.configuration.config import Config
+    from app.services import catalog_export_service
+
+    created = [make_subscription()["id"] for _ in range(3)]
+    monkeypatch.setattr(Config, "EXPORT_BATCH_ROWS", 2)
+    encode_ndjson = catalog_export_service.encode_ndjson
+    batches = []
+
+    def spy(columns, rows):
+        batches.append(len(rows))
+        return encode_ndjson(columns, rows)
+
+    monkeypatch.setattr(catalog_export_service, "encode_ndjson", spy)
+    with client.stream("GET", f"{EXPORT}/subscriptions") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.iter_lines() if line]
+
+    ids = [row["id"] for row in rows]
+    assert ids == sorted(ids) and set(created) <= set(ids)
+    assert max(batches) == 2 and sum(batches) == len(rows)
+
+
+def test_catalog_csv_round_trips_through_the_import(client, make_subscription, make_api_permission, make_service):
+    subscription = make_subscription()
+    permission = make_api_permission()
+    service = make_service(subscription["id"], [permission["id"]])
+
+    response = client.get(f"{EXPORT}/catalog", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == 'attachment; filename="catalog.csv"'
+    reader = csv.reader(io.StringIO(response.text))
+    header = next(reader)
+    ours = [row for row in reader if row[0] == subscription["name"]]
+    assert [dict(zip(header, row))["service"] for row in ours] == [service["name"]]
+    assert dict(zip(header, ours[0]))["api_permission"] == permission["name"]
+
+    sheet = io.StringIO()
+    writer = csv.writer(sheet, lineterminator="\n")
+    writer.writerows([header, *ours])
+    report = client.post(f"{SUBSCRIPTIONS}/catalog/import", params={"dry_run": "true"},
+                         content=sheet.getvalue().encode(), headers={"Content-Type": "text/csv"}).json()["data"]
+    assert report["error_count"] == 0, report["errors"]
+    assert report["subscriptions"] == {"created": 0, "updated": 0, "unchanged": 1, "created_names": [],
+                                       "updated_names": []}
+    assert report["subscription_services_mapping"] == {"added": 0, "removed": 0}
+    assert report["service_api_permissions_mapping"] == {"added": 0, "removed": 0}
+
+
+def test_unknown_export_and_format_are_rejected(client):
+    assert client.get(f"{EXPORT}/users").status_code == 404
+    assert client.get(f"{EXPORT}/subscriptions", params={"format": "xml"}).status_code == 400
@@ -0,0 +1,191 @@
+# tests/test_catalog_import.py
+"""POST /catalog/import through the router: parsing, the pooled connection and the applied catalog."""
+
+from tests.conftest import SUBSCRIPTIONS
+
+IMPORT = f"{SUBSCRIPTIONS}/catalog/import"
+
+
+def _csv(rows, header=("subscription", "service", "validity", "subscription_type", "cost",
+                        "subscription_active_status", "service_active_status")) -> bytes:
+    """Rows of (subscription, service, validity, type, cost); both active statuses default to true."""
+    lines = [",".join(header)]
+    lines += [",".join(str(value) for value in (*row, "true", "true")[:len(header)]) for row in rows]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _subscriptions_by_name(client) -> dict:
+    return {item["name"]: item for item in client.get(f"{SUBSCRIPTIONS}/get_all").json()["data"] or []}
+
+
+def test_upload_is_parsed_before_a_connection_is_checked_out(client, monkeypatch, unique):
+    from app.configuration.db import pool_metrics
+    from app.services import catalog_import_service
+
+    read_catalog_file = catalog_import_service.read_catalog_file
+    held_while_parsing = []
+
+    def spy(source, file_format):
+        held_while_parsing.append(pool_metrics.checkouts - pool_metrics.checkins)
+        return read_catalog_file(source, file_format)
+
+    monkeypatch.setattr(catalog_import_service, "read_catalog_file", spy)
+    plan, service = unique("plan"), unique("svc")
+    response = client.post(IMPORT, content=_csv([(plan, service, 3, "MONTH", 10)]),
+                           headers={"Content-Type": "text/csv"})
+
+    assert response.json()["code"] == 200, response.text
+    assert held_while_parsing == [0]
+    imported = _subscriptions_by_name(client)[plan]
+    assert [item["name"] for item in imported["services"]] == [service]
+
+
+def test_rows_are_folded_across_chunks(client, monkeypatch, unique):
+    from app.configuration.config import Config
+    from app.services import catalog_import_service
+
+    monkeypatch.setattr(Config, "CATALOG_IMPORT_CHUNK_ROWS", 2)
+    fold_chunk = catalog_import_service.fold_chunk
+    chunk_sizes = []
+
+    def spy(catalog, frame):
+        chunk_sizes.append(len(frame))
+        fold_chunk(catalog, frame)
+
+    monkeypatch.setattr(catalog_import_service, "fold_chunk", spy)
+    first, second = unique("plan"), unique("plan")
+    services = [unique("svc") for _ in range(3)]
+    # The first plan's services are spread over all three chunks
+    sheet = _csv([(first, services[0], 3, "MONTH", 10), (second, services[0], "", "", ""),
+                  (first, services[1], "", "", ""), (second, services[2], 1, "YEAR", 99),
+                  (first, services[2], 3, "", "")])
+
+    report = client.post(IMPORT, params={"dry_run": "true"}, content=sheet,
+                         headers={"Content-Type": "text/csv"}).json()["data"]
+    assert chunk_sizes == [2, 2, 1]
+    assert (report["rows"], report["error_count"], report["applied"]) == (5, 0, False)
+    assert report["subscriptions"]["created"] == 2 and report["services"]["created"] == 3
+    assert report["subscription_services_mapping"] == {"added": 5, "removed": 0}
+    assert first not in _subscriptions_by_name(client)
+
+    assert client.post(IMPORT, content=sheet, headers={"Content-Type": "text/csv"}).json()["code"] == 200
+    stored = _subscriptions_by_name(client)
+    assert sorted(item["name"] for item in stored[first]["services"]) == sorted(services)
+    assert (stored[first]["validity"], stored[second]["subscription_type"]) == (3, "YEAR")
+
+    # The file is authoritative for the plans it lists: services left out are unmapped
+    assert client.post(IMPORT, content=_csv([(first, services[1], "", "", "")]),
+                       headers={"Content-Type": "text/csv"}).json()["code"] == 200
+    assert [item["name"] for item in _subscriptions_by_name(client)[first]["services"]] == [services[1]]
+
+
+def test_errors_keep_their_sheet_row_across_chunks(client, monkeypatch, unique):
+    from app.configuration.config import Config
+
+    monkeypatch.setattr(Config, "CATALOG_IMPORT_CHUNK_ROWS", 2)
+    plan = unique("plan")
+    sheet = _csv([(plan, unique("svc"), 3, "MONTH", 10), (plan, unique("svc"), "", "", ""),
+                  (plan, unique("svc"), 4, "", ""), (plan, unique("svc"), "many", "", "")])
+
+    body = client.post(IMPORT, content=sheet, headers={"Content-Type": "text/csv"}).json()
+    assert body["code"] == 422
+    # Row 1 is the header; the conflicting validity and the bad number are in the second and third chunks
+    assert sorted((error["row"], error["column"]) for error in body["data"]["errors"]) == \
+        [(4, "validity"), (5, "validity")]
+    assert plan not in _subscriptions_by_name(client)
+
+
+def test_xlsx_sheet_is_read_in_chunks(client, monkeypatch, unique):
+    import io
+
+    import openpyxl
+
+    from app.configuration.config import Config
+
+    monkeypatch.setattr(Config, "CATALOG_IMPORT_CHUNK_ROWS", 2)
+    plan, services = unique("plan"), [unique("svc") for _ in range(3)]
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Subscription", "Service", "Validity", "Subscription Type", "Cost", "Subscription Active Status",
+                  "Service Active Status"])
+    # Excel hands whole numbers back as floats, and booleans as booleans
+    sheet.append([plan, services[0], 2.0, "MONTH", 15.0, True, True])
+    for service in services[1:]:
+        sheet.append([plan, service, None, None, None, None, False])
+    upload = io.BytesIO()
+    workbook.save(upload)
+
+    body = client.post(IMPORT, params={"format": "xlsx"}, content=upload.getvalue()).json()
+    assert body["code"] == 200, body
+    assert body["data"]["rows"] == 3
+    stored = _subscriptions_by_name(client)[plan]
+    assert (stored["validity"], stored["cost"]) == (2, 15)
+    assert sorted(item["name"] for item in stored["services"]) == sorted(services)
+
+
+def test_new_subscriptions_and_services_need_every_required_attribute(client, unique):
+    existing = client.post(IMPORT, content=_csv([(unique("plan"), unique("svc"), 1, "MONTH", 5)]),
+                           headers={"Content-Type": "text/csv"}).json()
+    assert existing["code"] == 200, existing
+    plan, service = unique("plan"), unique("svc")
+
+    body = client.post(IMPORT, content=_csv([(plan, service)], header=("subscription", "service")),
+                       headers={"Content-Type": "text/csv"}).json()
+    assert body["code"] == 422
+    assert sorted((error["row"], error["column"]) for error in body["data"]["errors"]) == \
+        [(2, "cost"), (2, "service_active_status"), (2, "subscription_active_status"), (2, "subscription_type"),
+         (2, "validity")]
+    assert body["data"]["applied"] is False
+    assert plan not in _subscriptions_by_name(client)
+
+    # Names the catalog already has only need the columns they change
+    plan_name = existing["data"]["subscriptions"]["created_names"][0]
+    service_name = existing["data"]["services"]["created_names"][0]
+    body = client.post(IMPORT, content=_csv([(plan_name, service_name)], header=("subscription", "service")),
+                       headers={"Content-Type": "text/csv"}).json()
+    assert body["code"] == 200, body
+
+
+def test_cost_must_be_positive_as_the_api_requires(client, unique):
+    sheet = _csv([(unique("plan"), unique("svc"), 1, "MONTH", 0), (unique("plan"), unique("svc"), 1, "MONTH", -5),
+                  (unique("plan"), unique("svc"), 1.5, "MONTH", 5), (unique("plan"), unique("svc"), 0, "DAYS", 1)])
+
+    body = client.post(IMPORT, params={"dry_run": "true"}, content=sheet,
+                       headers={"Content-Type": "text/csv"}).json()
+    assert body["code"] == 422
+    assert sorted((error["row"], error["column"]) for error in body["data"]["errors"]
+                  if "required" not in error["message"]) == [(2, "cost"), (3, "cost"), (4, "validity")]
+
+
+CLI_CHECK = """
+import sys
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.configuration import query_budget
+from app.services import catalog_import_service, permission_tree_service, subscription_expiry_service, \\
+    user_search_service
+
+catalog_import_service.main(sys.argv[1:])
+hooks = [(user_search_service, "after_flush"), (subscription_expiry_service, "after_flush"),
+         (permission_tree_service, "before_commit")]
+registered = [event.contains(Session, name, getattr(module, "_" + name)) for module, name in hooks]
+registered.append(event.contains(Session, "before_commit", query_budget._check_before_commit))
+print("hooks", registered)
+"""
+
+
+def test_cli_import_runs_under_the_apps_session_hooks(client, tmp_path, unique):
+    import os
+    import subprocess
+    import sys
+
+    plan = unique("plan")
+    sheet = tmp_path / "catalog.csv"
+    sheet.write_bytes(_csv([(plan, unique("svc"), 2, "YEAR", 40)]))
+    # Same database as the app under test (the environment set in conftest)
+    done = subprocess.run([sys.executable, "-c", CLI_CHECK, str(sheet)], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.dirname(__file__)), env=os.environ, timeout=60)
+
+    assert done.returncode == 0, done.stderr
+    assert "hooks [True, True, True, True]" in done.stdout
+    assert plan in _subscriptions_by_name(client)
@@ -0,0 +1,86 @@
+# tests/test_entitlements.py
+"""Entitlement checks are answered from the in-memory index, which a background task keeps current."""
+
+import logging
+import time
+
+from sqlalchemy import update
+
+from tests.conftest import SUBSCRIPTIONS
+
+CHECK = f"{SUBSCRIPTIONS}/entitlements/check"
+
+
+def _check(client, subscription_id, path, method="GET"):
+    return client.get(CHECK, params={"subscription_id": subscription_id, "method": method, "path": path}).json()
+
+
+def _eventually(client, subscription_id, path, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        body = _check(client, subscription_id, path)
+        if body["status"] == status or time.monotonic() > deadline:
+            return body
+        time.sleep(0.02)
+
+
+def test_write_in_this_process_reaches_the_index(client, make_subscription, make_api_permission, make_service):
+    subscription = make_subscription()
+    permission = make_api_permission()
+    assert _eventually(client, subscription["id"], permission["api_url"], "DENIED")["code"] == 200
+
+    make_service(subscription["id"], [permission["id"]])
+    body = _eventually(client, subscription["id"], permission["api_url"], "ALLOWED")
+    assert body["code"] == 200, body
+    assert body["data"]["matched_permission"] == permission["api_url"]
+
+
+def test_check_runs_no_statements(client, make_subscription, make_api_permission, make_service):
+    from app.configuration.metrics import labels, request_metrics
+
+    subscription = make_subscription()
+    permission = make_api_permission()
+    make_service(subscription["id"], [permission["id"]])
+    assert _eventually(client, subscription["id"], permission["api_url"], "ALLOWED")["code"] == 200
+
+    series = labels(method="GET", route=CHECK)
+    before = list(request_metrics.statements[series])
+    for path in (permission["api_url"], "/v1/api/not-granted"):
+        _check(client, subscription["id"], path)
+    assert _check(client, subscription["id"] + 10_000, "/anything")["code"] == 404
+    after = request_metrics.statements[series]
+    assert after[-1] == before[-1], "entitlement checks must not query the database"
+    assert sum(after[:-1]) == sum(before[:-1]) + 3
+
+
+def test_write_from_another_process_is_picked_up_by_the_version_poll(
+        client, run, session_factory, make_subscription, make_api_permission, make_service):
+    from app.models.models import SubscriptionEntity
+    from app.services.catalog_version_service import bump_catalog_versions, SUBSCRIPTION
+    from app.services.entitlement_service import entitlement_index
+
+    subscription = make_subscription()
+    permission = make_api_permission()
+    make_service(subscription["id"], [permission["id"]])
+    assert _eventually(client, subscription["id"], permission["api_url"], "ALLOWED")["code"] == 200
+
+    async def deactivate_elsewhere():
+        # What another worker does: write and bump the version, without touching this process's index
+        async with session_factory() as session:
+            await session.execute(update(SubscriptionEntity)
+                                  .where(SubscriptionEntity.id == subscription["id"])
+                                  .values(active_status=False))
+            await bump_catalog_versions(session, SUBSCRIPTION)
+            await session.commit()
+
+    async def poll():
+        async with session_factory() as session:
+            return await entitlement_index.refresh(session, logging.getLogger("test"))
+
+    run(deactivate_elsewhere())
+    run(poll())
+    # Unchanged versions leave the index as it is
+    assert run(poll()) is False
+    body = _check(client, subscription["id"], permission["api_url"])
+    assert body["status"] == "DENIED", body
+    assert body["data"]["subscription_active"] is False
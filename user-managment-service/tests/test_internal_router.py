@@ -0,0 +1,30 @@
+# tests/test_internal_router.py
+"""The /internal endpoints that rewrite tables or send mail need the internal token."""
+
+import pytest
+
+from app.configuration.config import Config
+
+GUARDED = ["/internal/user-search/rebuild", "/internal/permission-trees/rebuild",
+           "/internal/subscription-expiry/rebuild", "/internal/expiry-notices/run?dry_run=true"]
+
+
+@pytest.mark.parametrize("path", GUARDED)
+def test_guarded_endpoints_are_disabled_without_a_configured_token(client, monkeypatch, path):
+    monkeypatch.setattr(Config, "INTERNAL_API_TOKEN", "")
+    assert client.post(path, headers={"X-Internal-Token": ""}).status_code == 403
+
+
+@pytest.mark.parametrize("path", GUARDED)
+def test_guarded_endpoints_check_the_token(client, monkeypatch, path):
+    monkeypatch.setattr(Config, "INTERNAL_API_TOKEN", "s3cret")
+    assert client.post(path).status_code == 401
+    assert client.post(path, headers={"X-Internal-Token": "wrong"}).status_code == 401
+
+    response = client.post(path, headers={"X-Internal-Token": "s3cret"})
+    assert response.status_code == 200, response.text
+    assert response.json()["code"] == 200
+
+
+def test_stats_stay_readable(client):
+    assert client.get("/internal/catalog-cache").status_code == 200
@@ -0,0 +1,71 @@
+# tests/test_query_budget.py
+
+import logging
+
+import pytest
+from sqlalchemy import select
+
+from app.configuration.query_budget import QueryBudgetExceeded, query_budget, RAISE
+from app.models.models import SubscriptionEntity
+
+
+def _names(run, session_factory, name):
+    async def load():
+        async with session_factory() as session:
+            result = await session.execute(select(SubscriptionEntity.name).where(SubscriptionEntity.name == name))
+            return result.scalars().all()
+    return run(load())
+
+
+def test_overrun_fails_the_commit_not_the_committed_call(run, session_factory, unique):
+    name = unique("plan")
+
+    @query_budget(1, mode=RAISE)
+    async def write():
+        async with session_factory() as session:
+            await session.execute(select(SubscriptionEntity.id).limit(1))
+            session.add(SubscriptionEntity(name=name))
+            await session.commit()
+
+    with pytest.raises(QueryBudgetExceeded):
+        run(write())
+    assert _names(run, session_factory, name) == []
+
+
+def test_statements_after_commit_are_logged_not_raised(run, session_factory, unique, caplog):
+    name = unique("plan")
+
+    @query_budget(2, mode=RAISE)
+    async def write_then_read():
+        async with session_factory() as session:
+            session.add(SubscriptionEntity(name=name))
+            await session.commit()
+            for _ in range(2):
+                await session.execute(select(SubscriptionEntity.id).where(SubscriptionEntity.name == name))
+
+    with caplog.at_level(logging.WARNING):
+        run(write_then_read())
+    assert _names(run, session_factory, name) == [name]
+    assert "after its transaction committed" in caplog.text
+
+
+def test_read_overrun_raises(run, session_factory):
+    @query_budget(1, mode=RAISE)
+    async def read():
+        async with session_factory() as session:
+            for _ in range(2):
+                await session.execute(select(SubscriptionEntity.id).limit(1))
+
+    with pytest.raises(QueryBudgetExceeded):
+        run(read())
+
+
+def test_repeated_statement_shape_is_reported(run, session_factory):
+    @query_budget(mode=RAISE, repeat_limit=2)
+    async def n_plus_one():
+        async with session_factory() as session:
+            for subscription_id in range(3):
+                await session.execute(select(SubscriptionEntity.id).where(SubscriptionEntity.id == subscription_id))
+
+    with pytest.raises(QueryBudgetExceeded, match="possible N\\+1"):
+        run(n_plus_one())
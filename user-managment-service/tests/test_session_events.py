@@ -0,0 +1,55 @@
+# tests/test_session_events.py
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.models.models import SubscriptionEntity
+
+
+def test_rollback_after_integrity_error_keeps_the_original_error(run, session_factory, unique):
+    name = unique("plan")
+
+    async def scenario():
+        async with session_factory() as session:
+            session.add(SubscriptionEntity(name=name))
+            await session.commit()
+            session.add(SubscriptionEntity(name=name))
+            try:
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+            else:
+                raise AssertionError("duplicate name was committed")
+            result = await session.execute(select(SubscriptionEntity.id).where(SubscriptionEntity.name == name))
+            return result.scalars().all()
+
+    assert len(run(scenario())) == 1
+
+
+def test_explicit_rollback_discards_pending_writes(run, session_factory, unique):
+    name = unique("plan")
+
+    async def scenario():
+        async with session_factory() as session:
+            session.add(SubscriptionEntity(name=name))
+            await session.flush()
+            await session.rollback()
+            result = await session.execute(select(SubscriptionEntity.id).where(SubscriptionEntity.name == name))
+            return result.scalar()
+
+    assert run(scenario()) is None
+
+
+def test_rollback_forgets_the_pending_work_of_every_listener(run, session_factory):
+    from app.services.permission_tree_service import PENDING_KEY
+
+    keys = (PENDING_KEY, "user_search_changed", "subscription_expiry_changed")
+
+    async def scenario():
+        async with session_factory() as session:
+            await session.execute(select(SubscriptionEntity.id).limit(1))
+            session.info.update({PENDING_KEY: {1}, "user_search_changed": True, "subscription_expiry_changed": True})
+            await session.rollback()
+            return {key: key in session.info for key in keys}
+
+    assert run(scenario()) == {key: False for key in keys}
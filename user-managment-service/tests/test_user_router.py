@@ -0,0 +1,113 @@
+# tests/test_user_router.py
+"""Permission cursor pages, their cached totals and the user search, through the mounted routers."""
+
+import uuid
+
+import pytest
+
+PERMISSIONS = "/v1/api/permissions"
+USERS = "/v1/api/users"
+
+
+def new_user(**fields):
+    """A user with the address, organization, login and role a permission document is built from."""
+    from app.models.models import UserEntity, AddressEntity, OrganizationEntity, LoginEntity, RoleEntity
+
+    key = uuid.uuid4().hex
+    organization = OrganizationEntity(organization_name=f"Org {key}", display_name=f"Org {key}", gstin=key[:15],
+                                      pan=key[15:25], tan=key[25:], cin=key[:21])
+    fields = {"first_name": "Test", "last_name": "User", "email_id": f"{key}@example.com",
+              "mobile_no": str(uuid.uuid4().int)[:15], **fields}
+    return UserEntity(address=AddressEntity(city="Pune"), organization=organization,
+                      login=LoginEntity(username=key, account_active=True), role=RoleEntity(role=f"role-{key}"),
+                      **fields)
+
+
+@pytest.fixture
+def make_permissions(run, session_factory, unique):
+    """Insert ``count`` permissions sharing a fresh name prefix; returns (prefix, ids in id order)."""
+    from app.models.models import PermissionEntity
+
+    def make(count: int):
+        prefix = unique("perm")
+
+        async def insert():
+            async with session_factory() as session:
+                permissions = [PermissionEntity(permission_name=f"{prefix}-{index}", permission="{}", user=new_user())
+                               for index in range(count)]
+                session.add_all(permissions)
+                await session.commit()
+                return [permission.id for permission in permissions]
+
+        return prefix, run(insert())
+    return make
+
+
+def test_cursor_pages_walk_every_permission_once(client, make_permissions):
+    prefix, ids = make_permissions(5)
+    seen, after, pages = [], None, []
+    while True:
+        params = {"search_key": prefix, "limit": 2}
+        if after:
+            params["after"] = after
+        body = client.get(f"{PERMISSIONS}/get_all", params=params).json()
+        assert body["code"] == 200, body
+        assert body["totalElements"] is None
+        seen += [item["id"] for item in body["data"]]
+        pages.append((len(body["data"]), body["hasMore"]))
+        after = body["nextCursor"]
+        if not body["hasMore"]:
+            assert after is None
+            break
+    assert seen == ids
+    assert pages == [(2, True), (2, True), (1, False)]
+
+
+def test_cursor_total_and_bad_cursor(client, make_permissions):
+    prefix, _ = make_permissions(3)
+    body = client.get(f"{PERMISSIONS}/get_all", params={"search_key": prefix, "limit": 2,
+                                                         "include_total": "true"}).json()
+    assert (body["totalElements"], body["totalExact"]) == (3, True)
+
+    assert client.get(f"{PERMISSIONS}/get_all", params={"after": "not-a-cursor"}).status_code == 400
+
+
+def test_page_total_is_counted_once_then_cached(client, make_permissions):
+    from app.services.count_cache import count_cache
+
+    prefix, ids = make_permissions(3)
+    hits = count_cache.hits
+    for page, expected in ((1, ids[:2]), (2, ids[2:])):
+        body = client.get(f"{PERMISSIONS}/get_all", params={"search_key": prefix, "size": 2, "page": page}).json()
+        assert (body["totalElements"], body["totalPages"], body["totalExact"]) == (3, 2, True)
+        assert [item["id"] for item in body["data"]] == expected
+    assert count_cache.hits == hits + 1
+
+
+def test_user_search_matches_every_word_by_prefix(client, run, session_factory):
+    word = f"zq{uuid.uuid4().hex[:8]}"
+
+    async def insert():
+        async with session_factory() as session:
+            users = [new_user(first_name=word, last_name="Smith"), new_user(first_name=word, last_name="Jones")]
+            session.add_all(users)
+            await session.commit()
+            return [user.id for user in users]
+
+    smith, jones = run(insert())
+
+    body = client.get(f"{USERS}/search", params={"search_key": word[:6]}).json()
+    assert sorted(item["id"] for item in body["data"]) == sorted([smith, jones])
+    assert body["totalElements"] == 2
+
+    body = client.get(f"{USERS}/search", params={"search_key": f"{word} smi"}).json()
+    assert [item["id"] for item in body["data"]] == [smith]
+
+
+def test_only_the_paginated_permission_listing_is_mounted(client):
+    paths = client.get("/openapi.json").json()["paths"]
+    assert list(paths[f"{PERMISSIONS}/get_all"]) == ["get"]
+    assert not [path for path in paths if path.startswith("/v1/api/roles")]
+    assert [path for path in paths if path.startswith(PERMISSIONS)] == [f"{PERMISSIONS}/get_all"]
+    assert client.get("/v1/api/roles/get_all").status_code == 404
+    assert client.delete(f"{PERMISSIONS}/delete/1").status_code == 404
@@ -0,0 +1,57 @@
+# tests/test_write_budgets.py
+"""The catalog write flows stay within their statement budgets; the suite runs with DB_PROFILE=dev, where
+an overrun raises."""
+
+from tests.conftest import SUBSCRIPTIONS
+
+
+def test_update_subscription(client, make_subscription):
+    subscription = make_subscription()
+    response = client.put(f"{SUBSCRIPTIONS}/update/{subscription['id']}",
+                          json={"name": subscription["name"], "validity": 2, "cost": 6, "active_status": True,
+                                "subscription_type": "YEAR"})
+    assert response.json()["code"] == 200, response.text
+    assert response.json()["data"]["validity"] == 2
+
+
+def test_create_and_update_service(client, make_subscription, make_api_permission, make_service, unique):
+    # Renames the service and replaces its permissions: the most statements update_service runs
+    subscription = make_subscription()
+    first, second = make_api_permission(), make_api_permission()
+    service = make_service(subscription["id"], [first["id"]])
+    assert [permission["id"] for permission in service["api_permissions"]] == [first["id"]]
+
+    response = client.put(f"{SUBSCRIPTIONS}/service/update/{service['id']}",
+                          json={"name": unique("renamed"), "description": "Renamed", "active_status": True,
+                                "subscription_id": subscription["id"], "api_permission_id": [second["id"]]})
+    assert response.json()["code"] == 200, response.text
+    response = client.get(f"{SUBSCRIPTIONS}/service/get/{service['id']}")
+    assert [permission["id"] for permission in response.json()["data"]["api_permissions"]] == [second["id"]]
+
+
+def test_mapping_writes(client, make_subscription, make_api_permission, make_service):
+    subscription, other = make_subscription(), make_subscription()
+    service = make_service(subscription["id"])
+    permission = make_api_permission()
+
+    for path, body in (("/service/apiPermissions/apiPermissionsMapping",
+                        {"service_id": service["id"], "api_permission_id": [permission["id"]]}),
+                       ("/service/servicesMapping", {"subscription_id": other["id"], "service_id": [service["id"]]})):
+        response = client.post(f"{SUBSCRIPTIONS}{path}", json=body)
+        assert response.status_code == 200 and response.json()["code"] in (200, 201), f"{path}: {response.text}"
+
+
+def test_delete_flows(client, make_subscription, make_api_permission, make_service):
+    subscription = make_subscription()
+    permission = make_api_permission()
+    service = make_service(subscription["id"], [permission["id"]])
+
+    for path in (f"/service/delete/serviceId/{service['id']}/subscriptionId/{subscription['id']}",
+                 f"/delete/{subscription['id']}"):
+        response = client.delete(f"{SUBSCRIPTIONS}{path}")
+        assert response.status_code == 200 and response.json()["code"] == 200, f"{path}: {response.text}"
+
+    # The endpoint answers 404 even after deleting, so check the row instead
+    response = client.delete(f"{SUBSCRIPTIONS}/service/apiPermissions/delete/{permission['id']}")
+    assert response.status_code == 200, response.text
+    assert client.get(f"{SUBSCRIPTIONS}/service/apiPermissions/get/{permission['id']}").json()["code"] == 404